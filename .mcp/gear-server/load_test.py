@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Load test for the gear MCP server over the stdio transport.
+
+Starts the server on a scratch copy of the gear inventory, fires
+concurrent tools/call requests (a mix of list_gear, search_gear and
+update_gear) and reports throughput and latency percentiles per tool,
+followed by the server's own server_stats.
+
+Usage:
+    python .mcp/gear-server/load_test.py [--requests N] [--concurrency N]
+                                         [--writes PCT] [--server-cmd CMD]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+SERVER_SCRIPT = Path(__file__).resolve().parent / "server.py"
+GEAR_DIR = PROJECT_ROOT / "website" / "data" / "gear"
+
+SEARCH_QUERIES = ["delay", "fuzz", "reverb", "boss", "analog", "distortion", "hizumita", "synth"]
+PERCENTILES = (50, 90, 99)
+
+
+def default_server_cmd() -> List[str]:
+    """Run the server with uv when available, else with this interpreter."""
+    if shutil.which("uv"):
+        return ["uv", "run", str(SERVER_SCRIPT)]
+    return [sys.executable, str(SERVER_SCRIPT)]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Return the nearest-rank percentile of pre-sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class StdioClient:
+    """Minimal JSON-RPC client for an MCP server on stdin/stdout."""
+
+    def __init__(self, cmd: List[str], env: Dict[str, str]):
+        self.proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            env=env,
+            cwd=PROJECT_ROOT
+        )
+        self._next_id = 0
+        self._write_lock = threading.Lock()
+        self._pending: Dict[int, Tuple[threading.Event, List[Any]]] = {}
+        self._pending_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def _read_loop(self) -> None:
+        """Deliver responses to their waiting callers by id."""
+        for line in self.proc.stdout:
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if "id" not in message:
+                continue
+            with self._pending_lock:
+                waiter = self._pending.pop(message["id"], None)
+            if waiter is not None:
+                waiter[1].append(message)
+                waiter[0].set()
+        # Server exited: wake everyone up
+        with self._pending_lock:
+            for event, _ in self._pending.values():
+                event.set()
+            self._pending.clear()
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        """Write one message as a line of JSON."""
+        with self._write_lock:
+            self.proc.stdin.write(json.dumps(message) + "\n")
+            self.proc.stdin.flush()
+
+    def request(self, method: str, params: Dict[str, Any], timeout: float = 60.0) -> Dict[str, Any]:
+        """
+        Send a request and wait for its response.
+
+        Raises:
+            RuntimeError: If the server returns an error or doesn't answer
+        """
+        event = threading.Event()
+        box: List[Any] = []
+        with self._pending_lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._pending[request_id] = (event, box)
+        self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+
+        if not event.wait(timeout) or not box:
+            raise RuntimeError(f"No response to {method} (id {request_id})")
+        response = box[0]
+        if "error" in response:
+            raise RuntimeError(f"{method} failed: {response['error']}")
+        return response["result"]
+
+    def notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        """Send a notification (no response expected)."""
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        self._send(message)
+
+    def initialize(self) -> Dict[str, Any]:
+        """Perform the MCP initialize handshake."""
+        result = self.request("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {"name": "gear-load-test", "version": "1.0.0"}
+        })
+        self.notify("notifications/initialized")
+        return result
+
+    def close(self) -> None:
+        """Stop the server."""
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+
+
+def build_workload(count: int, write_pct: int, slugs: List[str], seed: int) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Build a shuffled list of (tool, arguments) calls.
+
+    Writes are update_gear calls spread over a handful of slugs, so some
+    land on the same slug concurrently and exercise the per-slug locks.
+    """
+    rng = random.Random(seed)
+    hot = slugs[:5] or ["missing"]
+    calls = []
+    for i in range(count):
+        roll = rng.randrange(100)
+        if roll < write_pct:
+            calls.append(("update_gear", {"slug": rng.choice(hot), "description": f"Load test edit {i}"}))
+        elif roll < write_pct + (100 - write_pct) // 2:
+            calls.append(("search_gear", {"query": rng.choice(SEARCH_QUERIES), "limit": 10}))
+        else:
+            calls.append(("list_gear", {}))
+    return calls
+
+
+def run_load(client: StdioClient, calls: List[Tuple[str, Dict[str, Any]]],
+             concurrency: int) -> Tuple[Dict[str, List[float]], int, float]:
+    """
+    Fire calls with at most `concurrency` in flight.
+
+    Returns:
+        Tuple of ({tool: [latency seconds]}, error count, wall time seconds)
+    """
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+    lock = threading.Lock()
+    queue = iter(calls)
+
+    def worker() -> None:
+        nonlocal errors
+        while True:
+            with lock:
+                call = next(queue, None)
+            if call is None:
+                return
+            tool, arguments = call
+            start = time.perf_counter()
+            try:
+                client.request("tools/call", {"name": tool, "arguments": arguments})
+            except RuntimeError:
+                with lock:
+                    errors += 1
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[tool].append(elapsed)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def format_report(latencies: Dict[str, List[float]], errors: int, elapsed: float) -> str:
+    """Format throughput and latency percentiles (milliseconds) per tool."""
+    columns = "".join(f"{f'p{p}':>9}" for p in PERCENTILES)
+    lines = [f"{'tool':<14}{'calls':>7}{columns}{'max':>9}"]
+    everything = []
+    for tool in sorted(latencies):
+        values = sorted(latencies[tool])
+        everything.extend(values)
+        cells = "".join(f"{percentile(values, p) * 1000:9.2f}" for p in PERCENTILES)
+        lines.append(f"{tool:<14}{len(values):>7}{cells}{values[-1] * 1000:9.2f}")
+
+    everything.sort()
+    if everything:
+        cells = "".join(f"{percentile(everything, p) * 1000:9.2f}" for p in PERCENTILES)
+        lines.append(f"{'all':<14}{len(everything):>7}{cells}{everything[-1] * 1000:9.2f}")
+
+    total = len(everything) + errors
+    lines.append("")
+    lines.append(f"{total} calls in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.1f} calls/s), {errors} errors")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    cmd = shlex.split(args.server_cmd) if args.server_cmd else default_server_cmd()
+
+    with tempfile.TemporaryDirectory(prefix="gear-load-") as tmp:
+        # Writes go to a scratch copy, never to the real inventory; keep the
+        # website/data layout so compiled files land inside the copy too
+        gear_dir = Path(tmp) / "website" / "data" / "gear"
+        shutil.copytree(args.gear_dir, gear_dir)
+        slugs = sorted(path.stem for path in gear_dir.glob("*.yaml"))
+
+        env = dict(os.environ, GEAR_DATA_DIR=str(gear_dir))
+        if args.workers:
+            env["GEAR_IO_WORKERS"] = str(args.workers)
+
+        client = StdioClient(cmd, env)
+        try:
+            client.initialize()
+            # Warm up so startup cost doesn't skew the percentiles
+            client.request("tools/call", {"name": "list_gear", "arguments": {}})
+
+            calls = build_workload(args.requests, args.writes, slugs, args.seed)
+            print(f"Running {len(calls)} calls against {len(slugs)} gear files, "
+                  f"concurrency {args.concurrency}...")
+            latencies, errors, elapsed = run_load(client, calls, args.concurrency)
+            stats = client.request("tools/call", {"name": "server_stats", "arguments": {}})
+        except RuntimeError as e:
+            print(f"✗ {e}", file=sys.stderr)
+            return 1
+        finally:
+            client.close()
+
+    print()
+    print(format_report(latencies, errors, elapsed))
+    print()
+    print("Server-side stats:")
+    for content in stats.get("content", []):
+        print(content.get("text", ""))
+    return 1 if errors else 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500, help='Number of tool calls (default: 500)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Calls in flight at once (default: 16)')
+    parser.add_argument('--writes', type=int, default=10, help='Percentage of update_gear calls (default: 10)')
+    parser.add_argument('--workers', type=int, help='Server I/O pool size (GEAR_IO_WORKERS)')
+    parser.add_argument('--gear-dir', type=Path, default=GEAR_DIR, help='Inventory to copy (default: website/data/gear)')
+    parser.add_argument('--seed', type=int, default=0, help='Workload random seed (default: 0)')
+    parser.add_argument('--server-cmd', help='Command starting the server (default: uv run server.py)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,8 +2,13 @@
 """MCP server for managing Obscvrat gear inventory."""
 
 import asyncio
+import contextlib
+import json
 import os
 import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -11,33 +16,98 @@ import yaml
 from mcp.server import Server
 from mcp.types import TextContent, Tool
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Share the parsed-content index with the scripts/ tools
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+import atomic_io  # noqa: E402
+import compile_gear  # noqa: E402
+import frontmatter_codec  # noqa: E402
+import gear_batch  # noqa: E402
+import gear_query  # noqa: E402
+from content_index import open_index  # noqa: E402
+from gear_store import STATUSES, GearStore  # noqa: E402
+from tool_metrics import IOCounters, Metrics  # noqa: E402
+
 # Get gear data directory from environment or default
 GEAR_DATA_DIR = Path(os.getenv("GEAR_DATA_DIR", "website/data/gear"))
 
+# Optional periodic metrics dump (one JSON line per interval)
+METRICS_FILE = os.getenv("GEAR_METRICS_FILE")
+METRICS_INTERVAL = float(os.getenv("GEAR_METRICS_INTERVAL", "60"))
+
+# Per-tool call counts, latency and I/O, reported by server_stats
+metrics = Metrics()
+
+content_index = open_index(PROJECT_ROOT)
+content_index.observer = metrics.observe_load
+
+# Resident gear records for every status, built once and refreshed per changed file
+gear_store = GearStore(GEAR_DATA_DIR, loader=content_index.load)
+
 server = Server("gear-manager")
 
+# File I/O and YAML parsing run here so the event loop keeps serving
+# requests; the bound keeps a burst of calls from exhausting file handles
+io_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("GEAR_IO_WORKERS", "8")),
+    thread_name_prefix="gear-io"
+)
+
+# Writers to the same slug queue here instead of tying up pool threads
+slug_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
 
-def slugify(text: str) -> str:
-    """Convert text to URL-friendly slug."""
-    return text.lower().replace(" ", "-").replace("/", "-")
+WRITE_TOOLS = ("add_gear", "update_gear", "delete_gear", "move_gear",
+               "add_gear_batch", "update_gear_batch", "delete_gear_batch")
 
+# Fields of one gear item, shared by add_gear and add_gear_batch
+GEAR_ITEM_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "description": "Gear name (e.g., 'BD-2 Blues Driver')"},
+        "manufacturer": {"type": "string", "description": "Manufacturer name (e.g., 'BOSS')"},
+        "category": {"type": "string", "enum": list(gear_batch.CATEGORIES), "description": "Gear category"},
+        "technology": {"type": "string", "enum": list(gear_batch.TECHNOLOGIES), "description": "Technology type"},
+        "types": {"type": "array", "items": {"type": "string"}, "description": "Gear types (e.g., ['Distortion', 'Overdrive'])"},
+        "controls": {"type": "array", "items": {"type": "string"}, "description": "Control names as labeled on device"},
+        "url": {"type": "string", "description": "Official product URL"},
+        "description": {"type": "string", "description": "Brief description (1-2 sentences)"}
+    },
+    "required": list(gear_batch.REQUIRED_FIELDS)
+}
 
-def generate_filename(name: str, manufacturer: str) -> str:
-    """Generate YAML filename from gear name and manufacturer."""
-    slug = f"{slugify(manufacturer)}-{slugify(name)}"
-    return f"{slug}.yaml"
+# Paging and output options, shared by list_gear and search_gear
+PAGE_PROPERTIES = {
+    "cursor": {"type": "string", "description": "next_cursor from the previous page"},
+    "fields": {
+        "type": "array",
+        "items": {"type": "string", "enum": list(gear_query.FIELDS)},
+        "description": "Only return these fields (default: all)"
+    },
+    "format": {"type": "string", "enum": ["text", "json"], "description": "Result format (default: text)"},
+    "status": {
+        "type": "array",
+        "items": {"type": "string", "enum": list(STATUSES)},
+        "description": "Statuses to include (default: ['active'])"
+    }
+}
 
 
 def read_gear_file(filepath: Path) -> Dict[str, Any]:
-    """Read and parse a gear YAML file."""
-    with open(filepath) as f:
-        return yaml.safe_load(f)
+    """Read a gear YAML file through the shared content index."""
+    return content_index.load(filepath)
 
 
 def write_gear_file(filepath: Path, data: Dict[str, Any]) -> None:
-    """Write gear data to YAML file."""
-    with open(filepath, "w") as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+    """Atomically write gear data to YAML file."""
+    atomic_io.write_text(filepath, frontmatter_codec.dump(data, sort_keys=False))
+    gear_store.invalidate(filepath)
+
+
+def create_gear_file(filepath: Path, data: Dict[str, Any]) -> None:
+    """Atomically create a gear YAML file, failing if it already exists."""
+    atomic_io.create_text(filepath, frontmatter_codec.dump(data, sort_keys=False))
+    gear_store.invalidate(filepath)
 
 
 @server.list_tools()
@@ -47,40 +117,31 @@ async def list_tools() -> List[Tool]:
         Tool(
             name="add_gear",
             description="Add new gear to inventory. Required: name, manufacturer, category, technology. Optional: types, controls, url, description.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Gear name (e.g., 'BD-2 Blues Driver')"},
-                    "manufacturer": {"type": "string", "description": "Manufacturer name (e.g., 'BOSS')"},
-                    "category": {"type": "string", "enum": ["Pedal", "Synth"], "description": "Gear category"},
-                    "technology": {"type": "string", "enum": ["Analog", "Digital", "Hybrid"], "description": "Technology type"},
-                    "types": {"type": "array", "items": {"type": "string"}, "description": "Gear types (e.g., ['Distortion', 'Overdrive'])"},
-                    "controls": {"type": "array", "items": {"type": "string"}, "description": "Control names as labeled on device"},
-                    "url": {"type": "string", "description": "Official product URL"},
-                    "description": {"type": "string", "description": "Brief description (1-2 sentences)"}
-                },
-                "required": ["name", "manufacturer", "category", "technology"]
-            }
+            inputSchema=GEAR_ITEM_SCHEMA
         ),
         Tool(
             name="list_gear",
-            description="List all gear in inventory with optional filters.",
+            description="List gear in inventory with optional filters, one page at a time. Pass next_cursor back to get the following page.",
             inputSchema={
                 "type": "object",
                 "properties": {
                     "category": {"type": "string", "description": "Filter by category (Pedal/Synth)"},
                     "manufacturer": {"type": "string", "description": "Filter by manufacturer"},
-                    "technology": {"type": "string", "description": "Filter by technology (Analog/Digital/Hybrid)"}
+                    "technology": {"type": "string", "description": "Filter by technology (Analog/Digital/Hybrid)"},
+                    "limit": {"type": "integer", "description": f"Page size (default: {gear_query.DEFAULT_LIMIT}, max: {gear_query.MAX_LIMIT})"},
+                    **PAGE_PROPERTIES
                 }
             }
         ),
         Tool(
             name="search_gear",
-            description="Search gear by name, manufacturer, types, or description.",
+            description="Ranked search over name, manufacturer, types, controls, and description. Tolerates typos and partial words.",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "query": {"type": "string", "description": "Search query"}
+                    "query": {"type": "string", "description": "Search query"},
+                    "limit": {"type": "integer", "description": "Page size (default: 20)"},
+                    **PAGE_PROPERTIES
                 },
                 "required": ["query"]
             }
@@ -110,21 +171,163 @@ async def list_tools() -> List[Tool]:
                 },
                 "required": ["slug"]
             }
+        ),
+        Tool(
+            name="move_gear",
+            description="Move gear to another status: active, sold, want, or archived (kept but not published).",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "slug": {"type": "string", "description": "Gear filename without .yaml"},
+                    "status": {"type": "string", "enum": list(STATUSES), "description": "Target status"}
+                },
+                "required": ["slug", "status"]
+            }
+        ),
+        Tool(
+            name="add_gear_batch",
+            description="Add many gear items in one call. Every item is validated first; if any is invalid nothing is written. Returns a per-item result table.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "items": {
+                        "type": "array",
+                        "description": "Gear items with the same fields as add_gear",
+                        "items": GEAR_ITEM_SCHEMA
+                    }
+                },
+                "required": ["items"]
+            }
+        ),
+        Tool(
+            name="update_gear_batch",
+            description="Update many gear items in one call. Each item has a slug plus fields to update. All or nothing; returns a per-item result table.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "items": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "slug": {"type": "string", "description": "Gear filename without .yaml"},
+                                "types": {"type": "array", "items": {"type": "string"}},
+                                "controls": {"type": "array", "items": {"type": "string"}},
+                                "url": {"type": "string"},
+                                "description": {"type": "string"}
+                            },
+                            "required": ["slug"]
+                        }
+                    }
+                },
+                "required": ["items"]
+            }
+        ),
+        Tool(
+            name="delete_gear_batch",
+            description="Delete many gear items in one call. All or nothing; returns a per-item result table.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "slugs": {"type": "array", "items": {"type": "string"}, "description": "Gear filenames without .yaml"}
+                },
+                "required": ["slugs"]
+            }
+        ),
+        Tool(
+            name="server_stats",
+            description="Per-tool call counts, latency percentiles, files read, bytes parsed, and cache hits/misses since the server started.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "format": {"type": "string", "enum": ["text", "json"], "description": "Result format (default: text)"}
+                }
+            }
         )
     ]
 
 
+def write_slugs(name: str, arguments: Dict) -> List[str]:
+    """
+    Return the slugs a tool call writes, sorted (empty for read-only tools).
+
+    Malformed arguments give no slugs; the tool reports the error itself.
+    """
+    if name not in WRITE_TOOLS:
+        return []
+
+    slugs = set()
+    if name == "add_gear_batch":
+        for item in arguments.get("items", []):
+            if isinstance(item, dict) and "name" in item and "manufacturer" in item:
+                slugs.add(Path(gear_batch.generate_filename(item["name"], item["manufacturer"])).stem)
+    elif name == "update_gear_batch":
+        slugs.update(item["slug"] for item in arguments.get("items", [])
+                     if isinstance(item, dict) and isinstance(item.get("slug"), str))
+    elif name == "delete_gear_batch":
+        slugs.update(slug for slug in arguments.get("slugs", []) if isinstance(slug, str))
+    elif name == "add_gear":
+        if "name" in arguments and "manufacturer" in arguments:
+            slugs.add(Path(gear_batch.generate_filename(arguments["name"], arguments["manufacturer"])).stem)
+    elif isinstance(arguments.get("slug"), str):
+        slugs.add(arguments["slug"])
+    return sorted(slugs)
+
+
 @server.call_tool()
 async def call_tool(name: str, arguments: Dict) -> List[TextContent]:
-    """Handle tool calls."""
+    """
+    Handle tool calls on the I/O pool.
+
+    Reads run in parallel; writes take a lock per slug they touch (in
+    sorted order, so batches can't deadlock) and are serialized per slug.
+    """
+    loop = asyncio.get_running_loop()
+    counters = IOCounters()
+    start = time.perf_counter()
+    error = True
+    try:
+        async with contextlib.AsyncExitStack() as stack:
+            for slug in write_slugs(name, arguments):
+                await stack.enter_async_context(slug_locks[slug])
+            result = await loop.run_in_executor(io_executor, run_tool, name, arguments, counters)
+        error = False
+        return result
+    finally:
+        # Latency includes time queued for slug locks and pool threads
+        metrics.record(name, time.perf_counter() - start, error, counters)
+
+
+def run_tool(name: str, arguments: Dict, counters: IOCounters) -> List[TextContent]:
+    """Run one tool call, persisting any newly parsed files afterwards."""
+    with metrics.io_scope(counters):
+        try:
+            result = handle_tool(name, arguments)
+            if name in WRITE_TOOLS:
+                compile_catalog()
+            return result
+        finally:
+            content_index.save()
+
+
+def compile_catalog() -> None:
+    """Recompile the gear catalog the Hugo templates render from."""
+    try:
+        compile_gear.write_catalog(GEAR_DATA_DIR, store=gear_store)
+    except (OSError, ValueError, UnicodeDecodeError, yaml.YAMLError) as e:
+        print(f"⚠ Could not compile gear catalog: {e}", file=sys.stderr)
+
+
+def handle_tool(name: str, arguments: Dict) -> List[TextContent]:
+    """Dispatch a tool call to its implementation."""
     
     if name == "add_gear":
         # Generate filename
-        filename = generate_filename(arguments["name"], arguments["manufacturer"])
+        filename = gear_batch.generate_filename(arguments["name"], arguments["manufacturer"])
         filepath = GEAR_DATA_DIR / filename
         
-        # Check if already exists
-        if filepath.exists():
+        # Check if already exists (in any status)
+        if gear_store.path(filepath.stem) or filepath.exists():
             return [TextContent(
                 type="text",
                 text=f"❌ Gear already exists: {filename}\nUse update_gear to modify it."
@@ -148,8 +351,14 @@ async def call_tool(name: str, arguments: Dict) -> List[TextContent]:
         if "controls" in arguments:
             gear_data["controls"] = arguments["controls"]
         
-        # Write file
-        write_gear_file(filepath, gear_data)
+        # Write file (create-only, so a concurrent add can't be overwritten)
+        try:
+            create_gear_file(filepath, gear_data)
+        except FileExistsError:
+            return [TextContent(
+                type="text",
+                text=f"❌ Gear already exists: {filename}\nUse update_gear to modify it."
+            )]
         
         missing = []
         if "controls" not in arguments:
@@ -165,93 +374,89 @@ async def call_tool(name: str, arguments: Dict) -> List[TextContent]:
         
         return [TextContent(type="text", text=result)]
     
-    elif name == "list_gear":
-        # Read all gear files
-        gear_files = sorted(GEAR_DATA_DIR.glob("*.yaml"))
-        gear_list = []
+    elif name == "list_gear" or name == "search_gear":
+        problems = gear_query.validate_fields(arguments.get("fields"))
+        if problems:
+            return [TextContent(type="text", text=f"❌ {'; '.join(problems)}")]
         
-        for filepath in gear_files:
-            gear = read_gear_file(filepath)
-            
-            # Apply filters
-            if "category" in arguments and gear.get("category") != arguments["category"]:
-                continue
-            if "manufacturer" in arguments and gear.get("manufacturer") != arguments["manufacturer"]:
-                continue
-            if "technology" in arguments and gear.get("technology") != arguments["technology"]:
-                continue
-            
-            types_str = ", ".join(gear.get("types", [])) if gear.get("types") else "N/A"
-            gear_list.append(
-                f"• {gear['manufacturer']} {gear['name']} ({gear['category']}, {gear['technology']}) - {types_str}"
-            )
+        # Pages are cut straight from the resident store
+        statuses = arguments.get("status") or ["active"]
+        try:
+            if name == "list_gear":
+                page = gear_query.list_page(gear_store, arguments, arguments.get("limit"), arguments.get("cursor"),
+                                            statuses)
+            else:
+                page = gear_query.search_page(gear_store, arguments["query"], arguments.get("limit", 20),
+                                              arguments.get("cursor"), statuses)
+        except ValueError as e:
+            return [TextContent(type="text", text=f"❌ {e}")]
         
-        if not gear_list:
-            return [TextContent(type="text", text="No gear found matching filters.")]
+        if arguments.get("format") == "json":
+            return [TextContent(type="text", text=gear_query.page_to_json(page, arguments.get("fields")))]
         
-        result = f"Found {len(gear_list)} items:\n\n" + "\n".join(gear_list)
-        return [TextContent(type="text", text=result)]
-    
-    elif name == "search_gear":
-        query = arguments["query"].lower()
-        gear_files = sorted(GEAR_DATA_DIR.glob("*.yaml"))
-        matches = []
+        if not page.items:
+            if name == "list_gear":
+                return [TextContent(type="text", text="No gear found matching filters.")]
+            return [TextContent(type="text", text=f"No gear found matching '{arguments['query']}'.")]
         
-        for filepath in gear_files:
-            gear = read_gear_file(filepath)
-            
-            # Search in name, manufacturer, types, description
-            searchable = [
-                gear.get("name", ""),
-                gear.get("manufacturer", ""),
-                " ".join(gear.get("types", [])),
-                gear.get("description", "")
-            ]
-            
-            if any(query in field.lower() for field in searchable):
-                types_str = ", ".join(gear.get("types", [])) if gear.get("types") else "N/A"
-                matches.append(
-                    f"• {gear['manufacturer']} {gear['name']} ({types_str})\n  {filepath.stem}"
+        lines = []
+        for gear in page.items:
+            if arguments.get("fields"):
+                lines.append(gear_query.format_projection(gear, arguments["fields"]))
+                continue
+            types_str = ", ".join(gear.get("types", [])) if gear.get("types") else "N/A"
+            status = f" [{gear['_status']}]" if gear['_status'] != "active" else ""
+            if name == "list_gear":
+                lines.append(
+                    f"• {gear['manufacturer']} {gear['name']} ({gear['category']}, {gear['technology']}) - {types_str}{status}"
+                )
+            else:
+                lines.append(
+                    f"• {gear['manufacturer']} {gear['name']} ({types_str}){status}\n  {Path(gear['_filename']).stem}"
                 )
         
-        if not matches:
-            return [TextContent(type="text", text=f"No gear found matching '{arguments['query']}'.")]
-        
-        result = f"Found {len(matches)} matches:\n\n" + "\n\n".join(matches)
+        if name == "list_gear":
+            result = f"Found {len(lines)} items:\n\n" + "\n".join(lines)
+        else:
+            result = f"Found {len(lines)} matches:\n\n" + "\n\n".join(lines)
+        if page.next_cursor:
+            result += f"\n\nMore results: cursor={page.next_cursor}"
         return [TextContent(type="text", text=result)]
     
     elif name == "update_gear":
-        filepath = GEAR_DATA_DIR / f"{arguments['slug']}.yaml"
+        filepath = gear_store.path(arguments['slug'])
         
-        if not filepath.exists():
+        if filepath is None:
             return [TextContent(
                 type="text",
                 text=f"❌ Gear not found: {arguments['slug']}.yaml"
             )]
         
-        # Read existing data
-        gear_data = read_gear_file(filepath)
+        # Hold the lock across read-modify-write so concurrent updates aren't lost
+        with atomic_io.locked(filepath):
+            # Read existing data
+            gear_data = read_gear_file(filepath)
         
-        # Update fields
-        updated_fields = []
-        if "types" in arguments:
-            gear_data["types"] = arguments["types"]
-            updated_fields.append("types")
-        if "controls" in arguments:
-            gear_data["controls"] = arguments["controls"]
-            updated_fields.append("controls")
-        if "url" in arguments:
-            gear_data["url"] = arguments["url"]
-            updated_fields.append("url")
-        if "description" in arguments:
-            gear_data["description"] = arguments["description"]
-            updated_fields.append("description")
+            # Update fields
+            updated_fields = []
+            if "types" in arguments:
+                gear_data["types"] = arguments["types"]
+                updated_fields.append("types")
+            if "controls" in arguments:
+                gear_data["controls"] = arguments["controls"]
+                updated_fields.append("controls")
+            if "url" in arguments:
+                gear_data["url"] = arguments["url"]
+                updated_fields.append("url")
+            if "description" in arguments:
+                gear_data["description"] = arguments["description"]
+                updated_fields.append("description")
         
-        if not updated_fields:
-            return [TextContent(type="text", text="⚠️  No fields to update.")]
+            if not updated_fields:
+                return [TextContent(type="text", text="⚠️  No fields to update.")]
         
-        # Write updated data
-        write_gear_file(filepath, gear_data)
+            # Write updated data
+            write_gear_file(filepath, gear_data)
         
         return [TextContent(
             type="text",
@@ -259,31 +464,97 @@ async def call_tool(name: str, arguments: Dict) -> List[TextContent]:
         )]
     
     elif name == "delete_gear":
-        filepath = GEAR_DATA_DIR / f"{arguments['slug']}.yaml"
+        filepath = gear_store.path(arguments['slug'])
         
-        if not filepath.exists():
+        if filepath is None:
             return [TextContent(
                 type="text",
                 text=f"❌ Gear not found: {arguments['slug']}.yaml"
             )]
         
-        filepath.unlink()
+        with atomic_io.locked(filepath):
+            filepath.unlink(missing_ok=True)
+        content_index.forget(filepath)
+        gear_store.invalidate(filepath)
         return [TextContent(type="text", text=f"✅ Deleted {arguments['slug']}.yaml")]
     
+    elif name == "move_gear":
+        try:
+            filepath = gear_store.move(arguments["slug"], arguments["status"])
+        except KeyError:
+            return [TextContent(type="text", text=f"❌ Gear not found: {arguments['slug']}.yaml")]
+        except (OSError, ValueError) as e:
+            return [TextContent(type="text", text=f"❌ {e}")]
+        return [TextContent(
+            type="text",
+            text=f"✅ Moved {arguments['slug']}.yaml to {arguments['status']} ({filepath.relative_to(GEAR_DATA_DIR)})"
+        )]
+
+    elif name in ("add_gear_batch", "update_gear_batch", "delete_gear_batch"):
+        # Validate the whole batch, then write it in one transaction
+        if name == "add_gear_batch":
+            plan = gear_batch.plan_add(arguments["items"], GEAR_DATA_DIR, gear_store.path)
+        elif name == "update_gear_batch":
+            plan = gear_batch.plan_update(arguments["items"], GEAR_DATA_DIR, gear_store.path)
+        else:
+            plan = gear_batch.plan_delete(arguments["slugs"], GEAR_DATA_DIR, gear_store.path)
+
+        results = gear_batch.apply(plan, read_gear_file)
+
+        for item in results:
+            if item.status == gear_batch.OK:
+                if item.action == "delete":
+                    content_index.forget(item.path)
+                gear_store.invalidate(item.path)
+
+        return [TextContent(type="text", text=gear_batch.format_results(results))]
+
+    elif name == "server_stats":
+        if arguments.get("format") == "json":
+            return [TextContent(type="text", text=json.dumps(metrics.snapshot()))]
+        return [TextContent(type="text", text=metrics.format_report())]
+
     return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
 
+async def dump_metrics(path: Path, interval: float) -> None:
+    """Append a metrics snapshot to path every interval seconds."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await loop.run_in_executor(io_executor, metrics.dump, path)
+        except OSError as e:
+            print(f"⚠ Could not write metrics to {path}: {e}", file=sys.stderr)
+
+
 async def main():
     """Run the MCP server."""
     from mcp.server.stdio import stdio_server
     
-    async with stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            server.create_initialization_options()
-        )
+    dumper = None
+    if METRICS_FILE:
+        dumper = asyncio.create_task(dump_metrics(Path(METRICS_FILE), METRICS_INTERVAL))
+
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(
+                read_stream,
+                write_stream,
+                server.create_initialization_options()
+            )
+    finally:
+        if dumper is not None:
+            dumper.cancel()
+            # Final snapshot so short sessions are recorded too
+            try:
+                metrics.dump(Path(METRICS_FILE))
+            except OSError as e:
+                print(f"⚠ Could not write metrics to {METRICS_FILE}: {e}", file=sys.stderr)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    finally:
+        io_executor.shutdown(wait=True)
@@ -1,4 +1,4 @@
-.PHONY: gear
+.PHONY: gear gear-import
 
 gear: ## Manage gear inventory (pedals, synths, instruments)
 	@if [ -f .venv/bin/python3 ]; then \
@@ -6,3 +6,11 @@ gear: ## Manage gear inventory (pedals, synths, instruments)
 	else \
 		python3 scripts/manage_gear.py; \
 	fi
+
+gear-import: ## Bulk import gear from CSV/JSONL (usage: make gear-import FILE=gear.csv [DRY_RUN=1])
+	@if [ -z "$(FILE)" ]; then \
+		echo "✗ Usage: make gear-import FILE=gear.csv [DRY_RUN=1]"; \
+		exit 1; \
+	fi
+	@python=python3; [ -f .venv/bin/python3 ] && python=.venv/bin/python3; \
+	$$python scripts/manage_gear.py import "$(FILE)" $(if $(filter 1,$(DRY_RUN)),--dry-run,)
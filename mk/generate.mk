@@ -1,16 +1,23 @@
 # Generate markdown from YAML data files
 
-.PHONY: generate bump-version create-release
+.PHONY: generate watch bump-version create-release
+
+PYTHON := $(if $(wildcard .venv/bin/python3),.venv/bin/python3,python3)
 
 generate: ## Generate markdown from YAML data (usage: make generate [live|music|media|gear])
 	@target="$(filter-out $@,$(MAKECMDGOALS))"; \
 	if [ -z "$$target" ]; then \
-		./scripts/generate-markdown.sh all; \
+		./scripts/generate-markdown.sh all && $(PYTHON) scripts/compile_gear.py; \
+	elif [ "$$target" = "gear" ]; then \
+		$(PYTHON) scripts/compile_gear.py; \
 	else \
 		./scripts/generate-markdown.sh "$$target"; \
 	fi; \
 	cd website && hugo --quiet
 
+watch: ## Regenerate content when website/data changes (run alongside make serve)
+	@$(PYTHON) scripts/watch_content.py
+
 bump-version: ## Bump version in CHANGELOG.md (usage: make bump-version [TYPE=patch|minor|major])
 	@python3 scripts/bump_version.py $(or $(TYPE),patch)
 
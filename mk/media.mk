@@ -2,3 +2,39 @@
 
 media: ## Manage media (add pictures, videos, others)
 	@python3 scripts/manage_media.py
+
+.PHONY: media-dedup-report media-dedup
+
+media-dedup-report: ## Report duplicate media files
+	@python3 scripts/media_store.py report
+
+media-dedup: ## Collapse duplicate media into the content-addressed store (usage: make media-dedup [DRY_RUN=1])
+	@python3 scripts/media_store.py migrate $(if $(filter 1,$(DRY_RUN)),--dry-run,)
+
+.PHONY: media-optimize
+
+media-optimize: ## Optimize source images in place (usage: make media-optimize [DRY_RUN=1] [HUGO=1])
+	@python3 scripts/image_optimizer.py $(if $(filter 1,$(DRY_RUN)),--dry-run,) $(if $(filter 1,$(HUGO)),--hugo,)
+
+.PHONY: media-manifest
+
+media-manifest: ## Record image dimensions and placeholders for the templates (usage: make media-manifest [CHECK=1])
+	@python3 scripts/image_manifest.py $(if $(filter 1,$(CHECK)),--check,)
+
+.PHONY: media-variants
+
+media-variants: ## Build WebP/AVIF image variants and report bytes per gig page (usage: make media-variants [REPORT=1])
+	@python3 scripts/image_variants.py $(if $(filter 1,$(REPORT)),--report,)
+
+.PHONY: media-migrate-static media-verify-static
+
+media-migrate-static: ## Move static/media into assets/media and rewrite references (usage: make media-migrate-static [DRY_RUN=1])
+	@python3 scripts/static_media.py migrate $(if $(filter 1,$(DRY_RUN)),--dry-run,)
+
+media-verify-static: ## Fail if website/static ships unresized photos
+	@python3 scripts/static_media.py verify
+
+.PHONY: media-ingest
+
+media-ingest: ## Add pictures to gigs in bulk from a YAML/CSV manifest (usage: make media-ingest MANIFEST=path [WORKERS=n])
+	@python3 scripts/manage_media.py ingest $(MANIFEST) $(if $(WORKERS),--workers $(WORKERS),)
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Crash-safe file writes shared by the content management tools.
+
+Every writer goes through this module so that a crash, a full disk or a
+second process (e.g. the gear MCP server next to a CLI session) can never
+leave a half-written or lost data file:
+
+- ``write_text`` writes to a temp file in the same directory, fsyncs it,
+  renames it over the target and fsyncs the directory
+- ``locked`` holds a per-file ``fcntl`` advisory lock; wrap read-modify-write
+  cycles in it so concurrent writers serialize instead of clobbering
+- ``Transaction`` journals multi-file changes (e.g. rename = write new +
+  delete old) so they are rolled forward by ``recover`` after a crash
+
+Lock files live in a shared temp directory, not next to the data files,
+so they never show up in website/data or git.
+
+Usage:
+    python atomic_io.py recover DIRECTORY...
+"""
+
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+LOCK_DIR = Path(tempfile.gettempdir()) / "obscvrat-locks"
+
+JOURNAL_PREFIX = ".journal-"
+JOURNAL_SUFFIX = ".json"
+
+# Re-entrant lock bookkeeping: flock() on a second descriptor for the same
+# file would block against ourselves, so nested locks reuse the outer one
+_held = threading.local()
+
+# os.umask() can only be read by setting it, so do it once at import time
+# rather than racing other threads on every write
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _lock_path(path: Path) -> Path:
+    """Return the lock file used for a data file."""
+    digest = hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:32]
+    return LOCK_DIR / f"{digest}.lock"
+
+
+@contextlib.contextmanager
+def locked(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on a file.
+
+    Re-entrant within a thread, so helpers that lock (like write_text) can
+    be called while the caller already holds the lock.
+
+    Args:
+        path: File to lock (does not need to exist)
+    """
+    counts: Dict[str, Tuple[int, int]] = _held.__dict__.setdefault('counts', {})
+    key = os.path.abspath(path)
+
+    if key in counts:
+        fd, depth = counts[key]
+        counts[key] = (fd, depth + 1)
+        try:
+            yield
+        finally:
+            fd, depth = counts[key]
+            counts[key] = (fd, depth - 1)
+        return
+
+    LOCK_DIR.mkdir(parents=True, exist_ok=True)
+    fd = os.open(_lock_path(path), os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        counts[key] = (fd, 1)
+        try:
+            yield
+        finally:
+            del counts[key]
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+@contextlib.contextmanager
+def locked_many(paths: List[Path]) -> Iterator[None]:
+    """Lock several files, always in the same order to avoid deadlocks."""
+    with contextlib.ExitStack() as stack:
+        for key in sorted({os.path.abspath(p) for p in paths}):
+            stack.enter_context(locked(Path(key)))
+        yield
+
+
+def fsync_dir(directory: Path) -> None:
+    """Flush a directory entry change (rename, unlink) to disk."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Some filesystems don't support fsync on directories
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_temp(path: Path, text: str, encoding: str) -> Path:
+    """Write text to a synced temp file next to path and return its path."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    tmp_path = Path(tmp_name)
+    try:
+        # mkstemp creates 0600; keep the target's mode, or the usual default
+        try:
+            mode = path.stat().st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.fchmod(fd, mode)
+
+        with os.fdopen(fd, 'w', encoding=encoding) as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path
+
+
+def write_text(path: Path, text: str, encoding: str = 'utf-8') -> None:
+    """
+    Atomically replace a file's content.
+
+    Readers see either the old or the new content, never a partial file.
+
+    Args:
+        path: Target file
+        text: New content
+        encoding: Text encoding
+
+    Raises:
+        OSError: If the file can't be written
+    """
+    path = Path(path)
+    with locked(path):
+        tmp_path = _write_temp(path, text, encoding)
+        try:
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        fsync_dir(path.parent)
+
+
+def create_text(path: Path, text: str, encoding: str = 'utf-8') -> None:
+    """
+    Atomically create a file that must not exist yet.
+
+    Args:
+        path: Target file
+        text: Content
+        encoding: Text encoding
+
+    Raises:
+        FileExistsError: If the file already exists
+        OSError: If the file can't be written
+    """
+    path = Path(path)
+    with locked(path):
+        tmp_path = _write_temp(path, text, encoding)
+        try:
+            # link() fails instead of overwriting, unlike rename()
+            os.link(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        fsync_dir(path.parent)
+
+
+class Transaction:
+    """
+    All-or-nothing change to several files.
+
+    Staged writes go to synced temp files first. On commit a journal listing
+    every step is written and synced (the commit point), then the renames and
+    deletes are applied and the journal removed. A crash after the commit
+    point is rolled forward by ``recover``; a crash before it leaves the
+    original files untouched.
+
+    Example:
+        with Transaction() as txn:
+            txn.write(new_path, content)
+            txn.delete(old_path)
+    """
+
+    def __init__(self, encoding: str = 'utf-8'):
+        self.encoding = encoding
+        self.writes: List[Tuple[Path, str]] = []
+        self.deletes: List[Path] = []
+
+    def write(self, path: Path, text: str) -> None:
+        """Stage a file write."""
+        self.writes.append((Path(path), text))
+
+    def delete(self, path: Path) -> None:
+        """Stage a file deletion."""
+        self.deletes.append(Path(path))
+
+    def commit(self) -> None:
+        """
+        Apply all staged changes.
+
+        Raises:
+            OSError: If staging fails (nothing is changed in that case)
+        """
+        paths = [path for path, _ in self.writes] + self.deletes
+        if not paths:
+            return
+
+        with locked_many(paths):
+            staged: List[Tuple[Path, Path]] = []
+            try:
+                for path, text in self.writes:
+                    staged.append((_write_temp(path, text, self.encoding), path))
+                journal = self._write_journal(staged)
+            except BaseException:
+                for tmp_path, _ in staged:
+                    tmp_path.unlink(missing_ok=True)
+                raise
+
+            _apply_journal(journal)
+
+        self.writes.clear()
+        self.deletes.clear()
+
+    def _write_journal(self, staged: List[Tuple[Path, Path]]) -> Path:
+        """Write and sync the journal describing the staged changes."""
+        directory = staged[0][1].parent if staged else self.deletes[0].parent
+        payload = {
+            'replace': [[str(tmp), str(dest)] for tmp, dest in staged],
+            'delete': [str(path) for path in self.deletes],
+        }
+        fd, name = tempfile.mkstemp(dir=directory, prefix=JOURNAL_PREFIX, suffix=".tmp")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(payload, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # The rename makes the journal visible to recover() all at once
+        journal = Path(name).with_suffix(JOURNAL_SUFFIX)
+        os.replace(name, journal)
+        fsync_dir(directory)
+        return journal
+
+    def __enter__(self) -> 'Transaction':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+
+
+def _apply_journal(journal: Path) -> None:
+    """Roll a committed journal forward and remove it."""
+    with open(journal, 'r', encoding='utf-8') as f:
+        payload = json.load(f)
+
+    touched = set()
+    for tmp, dest in payload.get('replace', []):
+        # Already applied if the temp file is gone
+        if os.path.exists(tmp):
+            os.replace(tmp, dest)
+        touched.add(os.path.dirname(dest))
+    for path in payload.get('delete', []):
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        touched.add(os.path.dirname(path))
+
+    for directory in touched:
+        fsync_dir(Path(directory))
+    journal.unlink()
+    fsync_dir(journal.parent)
+
+
+def recover(directory: Path) -> int:
+    """
+    Finish transactions interrupted by a crash.
+
+    Committed journals are rolled forward. A crash before the commit point
+    leaves only a hidden ``.journal-*.tmp`` behind and the original files
+    untouched, so there is nothing to undo.
+
+    Args:
+        directory: Directory that may contain journals
+
+    Returns:
+        Number of journals processed
+    """
+    directory = Path(directory)
+    if not directory.is_dir():
+        return 0
+
+    count = 0
+    for journal in sorted(directory.glob(f"{JOURNAL_PREFIX}*{JOURNAL_SUFFIX}")):
+        try:
+            with open(journal, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            continue
+        paths = [Path(dest) for _, dest in payload.get('replace', [])]
+        paths += [Path(p) for p in payload.get('delete', [])]
+        with locked_many(paths):
+            if journal.exists():
+                _apply_journal(journal)
+                count += 1
+    return count
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    for directory in args.directories:
+        count = recover(Path(directory))
+        print(f"✓ {directory}: {count} interrupted transactions recovered")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    recover_parser = subparsers.add_parser('recover', help='Roll forward interrupted transactions')
+    recover_parser.add_argument('directories', nargs='+', help='Directories to recover')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for frontmatter parsing.
+
+Builds a synthetic corpus of live performance files (frontmatter plus a
+long description body) and compares listing it the old way (read whole
+file, slice, pure Python yaml.safe_load) with frontmatter_codec (stream
+the header only, libyaml when available).
+
+Usage:
+    python bench_frontmatter.py [--files N] [--body-lines N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+import frontmatter_codec
+import yaml
+
+HEADER = """---
+title: "Benchmark Gig {n}"
+date: 2025-01-01
+venue: "Venue {n}"
+location: "Helsinki"
+poster: "obscvrat-benchmark-gig-{n}-poster-2025.jpg"
+other_performers:
+  - name: "Artist A"
+    url: "https://example.com/a"
+  - name: "Artist B"
+media:
+  pictures:
+    author: "Photographer"
+    images:
+      - obscvrat-benchmark-gig-{n}-performance-1.jpg
+      - obscvrat-benchmark-gig-{n}-performance-2.jpg
+draft: false
+---
+
+"""
+
+BODY_LINE = "Harsh noise wall, broken circuits and infected field recordings.\n"
+
+
+def build_corpus(directory: Path, files: int, body_lines: int) -> List[Path]:
+    """Write the synthetic corpus and return its paths."""
+    body = BODY_LINE * body_lines
+    paths = []
+    for n in range(files):
+        path = directory / f"2025-01-01-benchmark-gig-{n}.yaml"
+        path.write_text(HEADER.format(n=n) + body)
+        paths.append(path)
+    return paths
+
+
+def legacy_parse(path: Path) -> dict:
+    """Parse the way the manage_* tools did before the shared codec."""
+    with open(path, 'r') as f:
+        content = f.read()
+    end_idx = content.find('\n---\n', 4)
+    return yaml.safe_load(content[4:end_idx])
+
+
+def pure_python_header(path: Path) -> dict:
+    """Stream the header but parse it with the pure Python loader."""
+    header, _has_frontmatter = frontmatter_codec.read_header_text(path)
+    return yaml.load(header, Loader=yaml.SafeLoader)
+
+
+def time_run(label: str, parse: Callable[[Path], dict], paths: List[Path]) -> float:
+    """Parse every path once and print the elapsed time."""
+    start = time.perf_counter()
+    for path in paths:
+        parse(path)
+    elapsed = time.perf_counter() - start
+    per_file = elapsed / len(paths) * 1_000_000
+    print(f"  {label:<36} {elapsed:8.3f}s  {per_file:8.1f}µs/file")
+    return elapsed
+
+
+def main() -> int:
+    """Run the benchmark."""
+    args = parse_args()
+
+    print(f"Corpus: {args.files} files, {args.body_lines} body lines each")
+    print(f"libyaml available: {'yes' if frontmatter_codec.HAS_LIBYAML else 'no'}")
+    print()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = build_corpus(Path(temp_dir), args.files, args.body_lines)
+
+        # Warm the page cache so the first run isn't penalised
+        for path in paths:
+            path.read_bytes()
+
+        legacy = time_run("legacy (full read + safe_load)", legacy_parse, paths)
+        time_run("codec header (pure Python loader)", pure_python_header, paths)
+        codec = time_run("codec header (fastest loader)", frontmatter_codec.read_header, paths)
+
+    print()
+    print(f"Speedup: {legacy / codec:.1f}x")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=10_000, help='Number of files (default: 10000)')
+    parser.add_argument('--body-lines', type=int, default=200,
+                        help='Description lines per file (default: 200)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
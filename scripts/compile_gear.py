@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Compile the gear inventory into one JSON data file for Hugo.
+
+Reads every published gear YAML under website/data/gear, including the
+sold/ and want/ subdirectories (archived/ is left out), through the gear
+store, and writes website/data/gear_catalog.json: all items
+sorted by status and slug, plus precomputed counts and category,
+technology and type facets. The gear templates range over this file once
+instead of calling readDir and indexing .Site.Data.gear per file, so the
+gear section's render time stays flat as the inventory grows.
+
+It also writes one small index per facet to website/static/gear/facets/
+(category.json, technology.json, type.json), mapping each value to its
+count and item IDs, so a browser can filter by fetching a single facet
+instead of the full /gear/index.json.
+
+Files are only rewritten when their content changes. Run after editing
+gear by hand; manage_gear.py, the gear MCP server and `make watch` keep
+it current automatically.
+
+Usage:
+    python compile_gear.py [--check]
+"""
+
+import argparse
+import json
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import atomic_io
+import gear_store
+import yaml
+from file_watch import is_data_file
+from gear_store import GearStore
+
+CATALOG_VERSION = 1
+CATALOG_NAME = "gear_catalog.json"
+FACETS_SUBDIR = Path("static") / "gear" / "facets"
+
+# Published statuses and their directories, in display order
+STATUSES = gear_store.PUBLISHED_STATUSES
+STATUS_DIRS = tuple((status, subdir) for status, subdir in gear_store.STATUS_DIRS if status in STATUSES)
+
+# Facet name -> record field (type facets come from the types list)
+FACET_FIELDS = (
+    ("category", "category"),
+    ("technology", "technology"),
+    ("type", "types"),
+)
+
+Loader = Callable[[Path], Any]
+
+# Serializes in-process compiles so the last one always sees the newest data
+_compile_lock = threading.Lock()
+
+
+def default_catalog_path(gear_dir: Path) -> Path:
+    """Return the catalog location for a gear directory (next to it in data/)."""
+    return Path(gear_dir).parent / CATALOG_NAME
+
+
+def default_facets_dir(gear_dir: Path) -> Path:
+    """Return the facet index directory for website/data/gear (website/static/gear/facets)."""
+    return Path(gear_dir).parent.parent / FACETS_SUBDIR
+
+
+def facet_counts(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """
+    Count items per facet value.
+
+    Returns:
+        {facet: {value: count}} with values sorted alphabetically
+    """
+    facets = {}
+    for facet, field in FACET_FIELDS:
+        counts: Counter = Counter()
+        for item in items:
+            value = item.get(field)
+            values = value if isinstance(value, list) else [value]
+            counts.update(v for v in dict.fromkeys(values) if isinstance(v, str) and v)
+        facets[facet] = dict(sorted(counts.items()))
+    return facets
+
+
+def build_catalog(gear_dir: Path, loader: Optional[Loader] = None,
+                  store: Optional[GearStore] = None) -> Dict[str, Any]:
+    """
+    Build the catalog from the gear files.
+
+    Args:
+        gear_dir: Gear data directory
+        loader: Function parsing one file (default: frontmatter_codec.read_header)
+        store: Resident gear store to read from instead of indexing gear_dir afresh
+
+    Returns:
+        Catalog with version, counts, facets (per status and overall) and items
+
+    Raises:
+        OSError: If a file can't be read
+        ValueError: If a file isn't a YAML mapping or duplicates another slug
+        yaml.YAMLError: If a file is invalid YAML
+    """
+    if store is None:
+        store = GearStore(gear_dir, loader=loader, use_inotify=False)
+    for error in store.failures(STATUSES).values():
+        raise error
+
+    items = []
+    for status in STATUSES:
+        for record in store.all([status]):
+            item = {"id": Path(record['_filename']).stem, "status": status}
+            item.update((k, v) for k, v in record.items() if not k.startswith('_'))
+            items.append(item)
+
+    by_status = {status: [item for item in items if item["status"] == status] for status in STATUSES}
+    counts = {status: len(group) for status, group in by_status.items()}
+    counts["total"] = len(items)
+
+    facets = {status: facet_counts(group) for status, group in by_status.items()}
+    facets["all"] = facet_counts(items)
+
+    return {"version": CATALOG_VERSION, "counts": counts, "facets": facets, "items": items}
+
+
+def build_facet_index(catalog: Dict[str, Any], facet: str) -> Dict[str, Any]:
+    """
+    Build the client-side index for one facet.
+
+    Args:
+        catalog: Catalog from build_catalog
+        facet: Facet name from FACET_FIELDS
+
+    Returns:
+        {"facet", "total", "values": {value: {"count", "ids"}}}; IDs cover
+        every status, in catalog order, so the page's sold/want toggles
+        still apply on the client
+    """
+    field = dict(FACET_FIELDS)[facet]
+    values: Dict[str, List[str]] = {}
+    for item in catalog["items"]:
+        value = item.get(field)
+        for v in dict.fromkeys(value if isinstance(value, list) else [value]):
+            if isinstance(v, str) and v:
+                values.setdefault(v, []).append(item["id"])
+    return {
+        "facet": facet,
+        "total": len(catalog["items"]),
+        "values": {v: {"count": len(ids), "ids": ids} for v, ids in sorted(values.items())},
+    }
+
+
+def render_catalog(catalog: Dict[str, Any]) -> str:
+    """Serialize a catalog deterministically."""
+    return json.dumps(catalog, indent=2, ensure_ascii=False, default=str) + "\n"
+
+
+def render_facet_index(index: Dict[str, Any]) -> str:
+    """Serialize a facet index compactly (it is fetched by browsers)."""
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def compile_outputs(gear_dir: Path, output: Optional[Path] = None, facets_dir: Optional[Path] = None,
+                    loader: Optional[Loader] = None, store: Optional[GearStore] = None) -> Dict[Path, str]:
+    """
+    Render every compiled file.
+
+    Args:
+        gear_dir: Gear data directory
+        output: Catalog path (default: gear_catalog.json next to gear_dir)
+        facets_dir: Facet index directory (default: website/static/gear/facets)
+        loader: Function parsing one file
+        store: Resident gear store to read from
+
+    Returns:
+        {path: content} for the catalog and each facet index
+
+    Raises:
+        OSError, ValueError, yaml.YAMLError: As for build_catalog
+    """
+    output = Path(output) if output else default_catalog_path(gear_dir)
+    facets_dir = Path(facets_dir) if facets_dir else default_facets_dir(gear_dir)
+
+    catalog = build_catalog(gear_dir, loader, store)
+    outputs = {output: render_catalog(catalog)}
+    for facet, _field in FACET_FIELDS:
+        outputs[facets_dir / f"{facet}.json"] = render_facet_index(build_facet_index(catalog, facet))
+    return outputs
+
+
+def stale_outputs(outputs: Dict[Path, str]) -> List[Path]:
+    """Return the outputs whose file content differs (or that don't exist)."""
+    stale = []
+    for path, text in outputs.items():
+        try:
+            if path.read_text(encoding='utf-8') == text:
+                continue
+        except FileNotFoundError:
+            pass
+        stale.append(path)
+    return stale
+
+
+def write_catalog(gear_dir: Path, output: Optional[Path] = None, facets_dir: Optional[Path] = None,
+                  loader: Optional[Loader] = None, store: Optional[GearStore] = None) -> bool:
+    """
+    Compile the catalog and facet indexes, writing the files that changed.
+
+    Args:
+        gear_dir: Gear data directory
+        output: Catalog path (default: gear_catalog.json next to gear_dir)
+        facets_dir: Facet index directory (default: website/static/gear/facets)
+        loader: Function parsing one file
+        store: Resident gear store to read from
+
+    Returns:
+        Whether any file was written
+
+    Raises:
+        OSError, ValueError, yaml.YAMLError: As for build_catalog
+    """
+    with _compile_lock:
+        outputs = compile_outputs(gear_dir, output, facets_dir, loader, store)
+        with atomic_io.locked_many(list(outputs)):
+            stale = stale_outputs(outputs)
+            for path in stale:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                atomic_io.write_text(path, outputs[path])
+        return bool(stale)
+
+
+def is_gear_path(path: Path, gear_dir: Path) -> bool:
+    """Return whether path is a gear file the catalog is built from."""
+    try:
+        relative = Path(path).relative_to(gear_dir)
+    except ValueError:
+        return False
+    subdirs = {subdir for _, subdir in STATUS_DIRS if subdir != "."}
+    if len(relative.parts) == 1:
+        return is_data_file(relative)
+    return len(relative.parts) == 2 and relative.parts[0] in subdirs and is_data_file(relative)
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    project_root = Path(__file__).parent.parent
+    gear_dir = project_root / "website" / "data" / "gear"
+    output = default_catalog_path(gear_dir)
+
+    try:
+        if args.check:
+            stale = stale_outputs(compile_outputs(gear_dir))
+            for path in stale:
+                print(f"✗ {path.relative_to(project_root)} is out of date")
+            if stale:
+                print("  Run: make generate gear")
+                return 1
+            print("✓ Gear catalog and facet indexes are up to date")
+            return 0
+
+        written = write_catalog(gear_dir, output)
+    except (OSError, ValueError, UnicodeDecodeError, yaml.YAMLError) as e:
+        print(f"✗ Error compiling gear catalog: {e}", file=sys.stderr)
+        return 1
+
+    catalog = json.loads(output.read_text(encoding='utf-8'))
+    counts = ", ".join(f"{catalog['counts'][s]} {s}" for s in STATUSES)
+    state = "Compiled" if written else "Unchanged"
+    print(f"✓ {state} {output.relative_to(project_root)} and facet indexes ({counts})")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--check', action='store_true',
+                        help='Exit with 1 if any compiled file is out of date instead of writing it')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Persistent parsed-content index for website/data.
+
+Keeps the parsed YAML header of every data file (live, gear, music, media)
+in an on-disk cache keyed by path, mtime, size and header hash, so the manage_*
+tools and the gear MCP server only re-parse files that actually changed
+since the last run.
+
+Usage:
+    python content_index.py [--stats]
+"""
+
+import argparse
+import copy
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import frontmatter_codec
+import yaml
+
+# Sections of website/data covered by the index
+CONTENT_SECTIONS = ("live", "gear", "music", "media")
+
+# Bump when the cached entry layout or parse rules change
+INDEX_VERSION = 2
+
+DEFAULT_CACHE_NAME = "content-index.pickle"
+
+
+class ContentIndex:
+    """On-disk cache of parsed data files, validated per file (thread-safe)."""
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = cache_path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        # Guards entries against concurrent loads and saves
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Called as observer(hit, bytes_read, bytes_parsed) after each load
+        self.observer: Optional[Callable[[bool, int, int], None]] = None
+        self._read_cache()
+
+    def _read_cache(self) -> None:
+        """Load cached entries, discarding unreadable or outdated caches."""
+        try:
+            with open(self.cache_path, 'rb') as f:
+                payload = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return
+
+        if isinstance(payload, dict) and payload.get('version') == INDEX_VERSION:
+            self.entries = payload.get('entries', {})
+
+    def save(self) -> None:
+        """Persist the index if anything changed since it was loaded."""
+        with self._lock:
+            if not self.dirty:
+                return
+
+            tmp_path = self.cache_path.with_name(f".{self.cache_path.name}.{os.getpid()}.tmp")
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump({'version': INDEX_VERSION, 'entries': self.entries}, f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.cache_path)
+                self.dirty = False
+            except OSError as e:
+                # The index is only a cache; failing to persist it is not fatal
+                tmp_path.unlink(missing_ok=True)
+                print(f"⚠ Could not save content index: {e}", file=sys.stderr)
+
+    def load(self, path: Path) -> Any:
+        """
+        Return parsed data for a file, re-parsing only if it changed.
+
+        Args:
+            path: Data file path
+
+        Returns:
+            Deep copy of the parsed header (frontmatter files) or document
+            (pure YAML files); callers may mutate it freely
+
+        Raises:
+            OSError: If the file can't be read
+            ValueError: If frontmatter is malformed
+            yaml.YAMLError: If the YAML is invalid
+        """
+        key = os.path.abspath(path)
+        st = os.stat(key)
+        entry = self.entries.get(key)
+
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            self.hits += 1
+            if self.observer:
+                self.observer(True, 0, 0)
+            return copy.deepcopy(entry['data'])
+
+        # Only the header is indexed, so body-only edits keep the same hash
+        header, _has_frontmatter = frontmatter_codec.read_header_text(Path(key))
+        encoded = header.encode('utf-8')
+        digest = hashlib.sha256(encoded).hexdigest()
+        size = len(encoded)
+
+        if entry and entry['sha256'] == digest:
+            # Touched but header unchanged: refresh the stat key, skip the parse
+            self.hits += 1
+            data = entry['data']
+            if self.observer:
+                self.observer(True, size, 0)
+        else:
+            self.misses += 1
+            data = frontmatter_codec.load(header)
+            if self.observer:
+                self.observer(False, size, size)
+
+        with self._lock:
+            self.entries[key] = {
+                'mtime_ns': st.st_mtime_ns,
+                'size': st.st_size,
+                'sha256': digest,
+                'data': data,
+            }
+            self.dirty = True
+        return copy.deepcopy(data)
+
+    def load_many(self, paths: Iterable[Path]) -> List[Tuple[Path, Any, Optional[Exception]]]:
+        """
+        Load several files, collecting per-file errors instead of raising.
+
+        Args:
+            paths: Data file paths
+
+        Returns:
+            List of (path, data, error) tuples; data is None when error is set
+        """
+        results = []
+        for path in paths:
+            try:
+                results.append((path, self.load(path), None))
+            except (OSError, ValueError, UnicodeDecodeError, yaml.YAMLError) as e:
+                results.append((path, None, e))
+        self.save()
+        return results
+
+    def forget(self, path: Path) -> None:
+        """Drop a file from the index (e.g. after deleting it)."""
+        with self._lock:
+            if self.entries.pop(os.path.abspath(path), None) is not None:
+                self.dirty = True
+
+    def prune(self) -> int:
+        """
+        Drop entries for files that no longer exist.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            stale = [key for key in self.entries if not os.path.exists(key)]
+            for key in stale:
+                del self.entries[key]
+            if stale:
+                self.dirty = True
+        return len(stale)
+
+    def warm(self, data_dir: Path, sections: Iterable[str] = CONTENT_SECTIONS) -> int:
+        """
+        Index every YAML file under the given data sections.
+
+        Args:
+            data_dir: website/data directory
+            sections: Section subdirectories to index
+
+        Returns:
+            Number of files indexed
+        """
+        paths = []
+        for section in sections:
+            section_dir = data_dir / section
+            if section_dir.exists():
+                paths.extend(section_dir.rglob("*.yaml"))
+        self.prune()
+        self.load_many(paths)
+        return len(paths)
+
+
+def default_cache_path(project_root: Path) -> Path:
+    """Return the shared index location for a project checkout."""
+    return project_root / ".cache" / DEFAULT_CACHE_NAME
+
+
+def open_index(project_root: Path) -> ContentIndex:
+    """Open the shared content index for a project checkout."""
+    return ContentIndex(default_cache_path(project_root))
+
+
+def main() -> int:
+    """Warm the content index for the whole website/data tree."""
+    args = parse_args()
+    project_root = Path(__file__).parent.parent
+    index = open_index(project_root)
+
+    count = index.warm(project_root / "website" / "data")
+    print(f"✓ Indexed {count} data files ({index.misses} parsed, {index.hits} cached)")
+
+    if args.stats:
+        print(f"  Cache: {index.cache_path}")
+        print(f"  Entries: {len(index.entries)}")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--stats', action='store_true', help='Print index statistics')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Local HTTP cache for media downloads.
+
+Photographers re-share the same gallery links and editors paste them again
+when re-running add_pictures or create_live, so downloader.Downloader keeps
+a copy of every body it fetches here, keyed by URL together with its ETag,
+Last-Modified, freshness lifetime and SHA-256 hash:
+
+- A fresh entry (Cache-Control max-age / Expires) is served without any
+  network request.
+- A stale entry is revalidated with If-None-Match / If-Modified-Since; a
+  304 reply is served from the cache.
+- Bodies are stored once per content hash, so the same image behind two
+  URLs takes the space of one.
+- Total size is capped; least recently used entries are evicted first.
+
+MediaManager and LiveManager share one cache under .cache/downloads.
+
+Usage:
+    python download_cache.py [--stats] [--sweep] [--clear]
+"""
+
+import argparse
+import email.utils
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Bump when the index layout changes
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_NAME = "downloads"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def parse_http_date(value: Optional[str]) -> Optional[float]:
+    """Return an HTTP date header as a Unix timestamp, or None."""
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def freshness(headers: Dict[str, Optional[str]], now: float) -> Optional[float]:
+    """
+    Return when a response stops being fresh, per Cache-Control and Expires.
+
+    Args:
+        headers: Response headers (Cache-Control, Expires, Date), lower-case keys
+        now: Time the response was received
+
+    Returns:
+        Expiry timestamp; None if the response must not be cached at all
+    """
+    cache_control = (headers.get("cache-control") or "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return now
+    match = re.search(r"max-age=(\d+)", cache_control)
+    if match:
+        return now + int(match.group(1))
+    expires = parse_http_date(headers.get("expires"))
+    if expires is not None:
+        # Measure against the server's clock so skew doesn't extend the lifetime
+        date = parse_http_date(headers.get("date")) or now
+        return now + max(expires - date, 0)
+    return now
+
+
+class DownloadCache:
+    """On-disk cache of downloaded bodies keyed by URL, LRU-capped (thread-safe)."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.index_path = cache_dir / "index.json"
+        self.blob_dir = cache_dir / "blobs"
+        self.max_bytes = max_bytes
+        # url -> entry, least recently used first
+        self.entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.dirty = False
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._read_index()
+
+    def _read_index(self) -> None:
+        """Load the index, discarding unreadable or outdated ones."""
+        try:
+            payload = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(payload, dict) and payload.get("version") == CACHE_VERSION:
+            self.entries = OrderedDict(payload.get("entries", []))
+
+    def save(self) -> None:
+        """Persist the index if anything changed since it was loaded."""
+        with self._lock:
+            if not self.dirty:
+                return
+            payload = {"version": CACHE_VERSION, "entries": list(self.entries.items())}
+            tmp_path = self.index_path.with_name(f".{self.index_path.name}.{os.getpid()}.tmp")
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+                os.replace(tmp_path, self.index_path)
+                self.dirty = False
+            except OSError as e:
+                # Only a cache; failing to persist it is not fatal
+                tmp_path.unlink(missing_ok=True)
+                print(f"⚠ Could not save download cache: {e}", file=sys.stderr)
+
+    def blob_path(self, sha256: str) -> Path:
+        """Return where a body with the given hash is stored."""
+        return self.blob_dir / sha256[:2] / sha256
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cache entry for a URL, if its body is still on disk.
+
+        Args:
+            url: Requested URL
+
+        Returns:
+            Copy of the entry (etag, last_modified, expires, sha256, size), or None
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                return None
+            try:
+                intact = self.blob_path(entry["sha256"]).stat().st_size == entry["size"]
+            except OSError:
+                intact = False
+            if not intact:
+                del self.entries[url]
+                self.dirty = True
+                return None
+            return dict(entry)
+
+    def is_fresh(self, entry: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """Return whether an entry may be served without asking the server."""
+        return entry["expires"] > (time.time() if now is None else now)
+
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """Return If-None-Match / If-Modified-Since headers to revalidate an entry."""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def copy_to(self, entry: Dict[str, Any], dest: Path) -> None:
+        """
+        Copy a cached body to dest.
+
+        Raises:
+            OSError: If the blob can't be read or dest written
+        """
+        shutil.copyfile(self.blob_path(entry["sha256"]), dest)
+
+    def hit(self, url: str, revalidated: bool = False,
+            headers: Optional[Dict[str, Optional[str]]] = None) -> None:
+        """
+        Record that an entry was served, refreshing its LRU position.
+
+        Args:
+            url: Requested URL
+            revalidated: True if the server answered 304 Not Modified
+            headers: Headers of the 304 reply, which may update the validators
+        """
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                return
+            if revalidated:
+                self.revalidated += 1
+                headers = headers or {}
+                expires = freshness(headers, now)
+                entry["expires"] = now if expires is None else expires
+                entry["etag"] = headers.get("etag") or entry.get("etag")
+                entry["last_modified"] = headers.get("last-modified") or entry.get("last_modified")
+            else:
+                self.hits += 1
+            entry["used"] = now
+            self.entries.move_to_end(url)
+            self.dirty = True
+
+    def store(self, url: str, path: Path, sha256: str, headers: Dict[str, Optional[str]]) -> bool:
+        """
+        Add a downloaded body to the cache.
+
+        Args:
+            url: Requested URL
+            path: Complete downloaded file
+            sha256: Hex digest of the file
+            headers: Response headers (ETag, Last-Modified, Cache-Control,
+                Expires, Date), lower-case keys
+
+        Returns:
+            True if the body was cached (False for no-store or oversized bodies)
+        """
+        now = time.time()
+        expires = freshness(headers, now)
+        size = path.stat().st_size
+        with self._lock:
+            self.misses += 1
+        if expires is None or size > self.max_bytes:
+            return False
+
+        blob = self.blob_path(sha256)
+        try:
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp_blob = blob.with_name(f".{blob.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+                shutil.copyfile(path, tmp_blob)
+                os.replace(tmp_blob, blob)
+        except OSError as e:
+            print(f"⚠ Could not cache {url}: {e}", file=sys.stderr)
+            return False
+
+        with self._lock:
+            previous = self.entries.get(url)
+            self.entries[url] = {
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "expires": expires,
+                "sha256": sha256,
+                "size": size,
+                "used": now,
+            }
+            self.entries.move_to_end(url)
+            self.dirty = True
+            if previous is not None and previous["sha256"] != sha256:
+                # The body behind the URL changed; its old blob may now be unreferenced
+                self._release(previous["sha256"])
+            self._evict()
+        return True
+
+    def _release(self, digest: str) -> None:
+        """Delete a blob unless an entry still references it (lock held)."""
+        if not any(entry["sha256"] == digest for entry in self.entries.values()):
+            self.blob_path(digest).unlink(missing_ok=True)
+
+    def total_bytes(self) -> int:
+        """Return the size of all cached bodies (shared bodies counted once)."""
+        with self._lock:
+            return sum({e["sha256"]: e["size"] for e in self.entries.values()}.values())
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits (lock held)."""
+        sizes = {e["sha256"]: e["size"] for e in self.entries.values()}
+        total = sum(sizes.values())
+        refs: Dict[str, int] = {}
+        for entry in self.entries.values():
+            refs[entry["sha256"]] = refs.get(entry["sha256"], 0) + 1
+
+        while total > self.max_bytes and len(self.entries) > 1:
+            _, entry = self.entries.popitem(last=False)
+            digest = entry["sha256"]
+            refs[digest] -= 1
+            if not refs[digest]:
+                total -= sizes[digest]
+                self.blob_path(digest).unlink(missing_ok=True)
+
+    def sweep(self) -> int:
+        """
+        Delete blobs that no entry references (left behind by older versions or crashes).
+
+        Returns:
+            Number of blobs deleted
+        """
+        with self._lock:
+            referenced = {entry["sha256"] for entry in self.entries.values()}
+            removed = 0
+            for blob in self.blob_dir.glob("*/*"):
+                # Skip in-flight temp copies and anything that isn't a blob
+                if blob.name.startswith(".") or blob.name in referenced:
+                    continue
+                blob.unlink(missing_ok=True)
+                removed += 1
+            return removed
+
+    def clear(self) -> int:
+        """
+        Remove every cached body.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            count = len(self.entries)
+            self.entries.clear()
+            self.dirty = True
+            shutil.rmtree(self.blob_dir, ignore_errors=True)
+        self.save()
+        return count
+
+
+def default_cache_dir(project_root: Path) -> Path:
+    """Return the shared download cache location for a project checkout."""
+    return project_root / ".cache" / DEFAULT_CACHE_NAME
+
+
+def open_cache(project_root: Path) -> DownloadCache:
+    """Open the shared download cache for a project checkout."""
+    return DownloadCache(default_cache_dir(project_root))
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    project_root = Path(__file__).parent.parent
+    cache = open_cache(project_root)
+
+    if args.clear:
+        count = cache.clear()
+        print(f"✓ Cleared {count} cached downloads")
+        return 0
+
+    print(f"Cache: {cache.cache_dir}")
+    print(f"  Entries: {len(cache.entries)}")
+    print(f"  Size: {cache.total_bytes() / 1024 / 1024:.1f} MB of {cache.max_bytes / 1024 / 1024:.0f} MB")
+    if args.stats:
+        now = time.time()
+        fresh = sum(1 for entry in cache.entries.values() if cache.is_fresh(entry, now))
+        validated = sum(1 for entry in cache.entries.values() if entry.get("etag") or entry.get("last_modified"))
+        print(f"  Fresh: {fresh}")
+        print(f"  Revalidatable: {validated}")
+    if args.sweep:
+        print(f"✓ Removed {cache.sweep()} unreferenced blobs")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--stats', action='store_true',
+                        help='Print freshness statistics')
+    parser.add_argument('--sweep', action='store_true',
+                        help='Remove stored bodies no cache entry refers to')
+    parser.add_argument('--clear', action='store_true', help='Remove every cached download')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+Concurrent, resumable HTTP downloads for the media tools.
+
+Used by manage_media.py (gig pictures, standalone pictures) and
+manage_live.py (posters). Compared to urllib.request.urlretrieve:
+
+- Keep-alive connections are pooled per host and reused across downloads
+  and threads, so a 50-photo gallery from one host costs a handful of TLS
+  handshakes instead of 50. Idle connections expire after a few seconds,
+  and a reused connection the server has already closed is replaced by a
+  fresh one without counting as a failed attempt.
+- fetch_many() runs downloads on a bounded thread pool.
+- Every request has a timeout; connection errors, timeouts, 429 and 5xx
+  responses are retried with exponential backoff (honoring Retry-After).
+- A dropped transfer resumes with an HTTP Range request instead of
+  starting over, when the server supports it.
+- Bodies are streamed to a unique temp file next to the destination and
+  renamed into place only when complete, so concurrent sessions never
+  collide and a failed download never leaves a truncated file behind.
+- Responses larger than max_bytes are refused.
+- With a download_cache.DownloadCache, repeat fetches of a URL are served
+  from disk or revalidated with If-None-Match / If-Modified-Since.
+
+Usage:
+    python downloader.py URL DEST [URL DEST ...] [--workers N]
+"""
+
+import argparse
+import hashlib
+import http.client
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+
+if TYPE_CHECKING:
+    from download_cache import DownloadCache
+
+DEFAULT_WORKERS = 8
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# Shorter than common server keep-alive timeouts (Apache 5s, nginx 75s)
+DEFAULT_IDLE_TIMEOUT = 4.0
+MAX_REDIRECTS = 5
+MAX_RETRY_AFTER = 30.0
+CHUNK_SIZE = 64 * 1024
+USER_AGENT = "obscvrat-media/1.0"
+# Characters left as-is when percent-encoding a URL's path and query
+URL_SAFE = "/%:@!$&'()*+,;=~"
+
+# Suffixes for messages about a DownloadResult, by its cache field
+CACHE_NOTES = {"": "", "hit": " (cached)", "revalidated": " (not modified, cached copy)"}
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+
+class DownloadError(Exception):
+    """A download failed; retryable errors may succeed on another attempt."""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class DownloadResult(NamedTuple):
+    """Outcome of one download."""
+    url: str
+    path: Path
+    ok: bool
+    size: int = 0
+    attempts: int = 0
+    resumed: bool = False
+    error: str = ""
+    # Hex SHA-256 of the body, computed while streaming
+    sha256: str = ""
+    # "hit" (served from cache), "revalidated" (304 from server) or "" (downloaded)
+    cache: str = ""
+
+
+class ConnectionPool:
+    """Idle keep-alive connections per (scheme, host, port), shared by threads."""
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, max_idle: int = DEFAULT_WORKERS,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.created = 0
+        # (scheme, netloc) -> [(connection, time it was released)], most recent last
+        self._idle: Dict[Tuple[str, str], List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme: str, netloc: str, fresh: bool = False) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Return a connection to the host.
+
+        Args:
+            scheme: http or https
+            netloc: Host and optional port
+            fresh: Open a new connection even if idle ones exist
+
+        Returns:
+            Tuple of (connection, whether it is a reused idle one)
+        """
+        conn = None
+        with self._lock:
+            idle = self._idle.get((scheme, netloc), [])
+            # Released in time order, so the expired ones are a prefix
+            deadline = time.monotonic() - self.idle_timeout
+            live = next((i for i, (_, released) in enumerate(idle) if released >= deadline), len(idle))
+            expired = [candidate for candidate, _ in idle[:live]]
+            del idle[:live]
+            if idle and not fresh:
+                conn, _ = idle.pop()
+            else:
+                self.created += 1
+        for candidate in expired:
+            candidate.close()
+        if conn is not None:
+            return conn, True
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout), False
+        return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+
+    def release(self, scheme: str, netloc: str, conn: http.client.HTTPConnection, reusable: bool) -> None:
+        """Return a connection for reuse, or close it."""
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault((scheme, netloc), [])
+                if len(idle) < self.max_idle:
+                    idle.append((conn, time.monotonic()))
+                    return
+        conn.close()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        with self._lock:
+            conns = [conn for idle in self._idle.values() for conn, _ in idle]
+            self._idle.clear()
+        for conn in conns:
+            conn.close()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return a Retry-After header in seconds (only the delta-seconds form)."""
+    if not value:
+        return None
+    try:
+        return min(max(float(value), 0.0), MAX_RETRY_AFTER)
+    except ValueError:
+        return None
+
+
+def cache_headers(response: http.client.HTTPResponse) -> Dict[str, Optional[str]]:
+    """Return the response headers the download cache needs, with lower-case keys."""
+    return {name: response.getheader(name)
+            for name in ("etag", "last-modified", "cache-control", "expires", "date")}
+
+
+class _Transfer:
+    """State of one download carried across attempts."""
+
+    def __init__(self, temp: Path):
+        self.temp = temp
+        self.received = 0
+        self.hasher = hashlib.sha256()
+        self.validator: Optional[str] = None
+        self.headers: Dict[str, Optional[str]] = {}
+        self.resumed = False
+        self.not_modified = False
+
+    def restart(self) -> None:
+        """Discard what earlier attempts received."""
+        self.temp.write_bytes(b"")
+        self.received = 0
+        self.hasher = hashlib.sha256()
+        self.resumed = False
+
+    def update(self, chunk: bytes) -> None:
+        """Account for a chunk written to the temp file."""
+        self.received += len(chunk)
+        self.hasher.update(chunk)
+
+
+def temp_path_for(dest: Path) -> Path:
+    """Create a unique, empty temp file next to dest (same filesystem, so rename is atomic)."""
+    fd, name = tempfile.mkstemp(prefix=f".{dest.name}.", suffix=".part", dir=dest.parent)
+    os.close(fd)
+    return Path(name)
+
+
+class Downloader:
+    """Download URLs to files with pooled connections, retries and resume (thread-safe)."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 max_bytes: int = DEFAULT_MAX_BYTES, cache: Optional["DownloadCache"] = None):
+        """
+        Create a downloader.
+
+        Args:
+            workers: Maximum concurrent downloads in fetch_many
+            timeout: Socket timeout per connect/read, in seconds
+            retries: Extra attempts after the first for retryable failures
+            backoff: Base delay before a retry; doubles on every attempt
+            max_bytes: Largest accepted response body
+            cache: Conditional-request cache shared with other downloaders
+        """
+        self.workers = max(1, workers)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_bytes = max_bytes
+        self.cache = cache
+        self.pool = ConnectionPool(timeout, max_idle=self.workers)
+
+    def _request(self, url: str, headers: Dict[str, str]) -> Tuple[http.client.HTTPResponse, Callable[[bool], None], str]:
+        """
+        Send a GET, following redirects.
+
+        Returns:
+            Tuple of (response, release function taking "reusable", final URL)
+
+        Raises:
+            DownloadError: On connection errors and unsupported URLs
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            try:
+                parts = urlsplit(url)
+            except ValueError as e:
+                raise DownloadError(f"Invalid URL: {url} ({e})") from e
+            if parts.scheme not in ("http", "https") or not parts.netloc:
+                raise DownloadError(f"Unsupported URL: {url}")
+            path = quote(parts.path or "/", safe=URL_SAFE)
+            if parts.query:
+                path += f"?{quote(parts.query, safe=URL_SAFE)}"
+
+            fresh = False
+            while True:
+                conn, reused = self.pool.acquire(parts.scheme, parts.netloc, fresh)
+                try:
+                    conn.request("GET", path, headers={"User-Agent": USER_AGENT, **headers})
+                    response = conn.getresponse()
+                    break
+                except (http.client.InvalidURL, ValueError) as e:
+                    conn.close()
+                    raise DownloadError(f"Invalid URL: {url} ({e})") from e
+                except (OSError, http.client.HTTPException) as e:
+                    conn.close()
+                    if reused:
+                        # The server closed the idle connection; that's not a failed attempt
+                        fresh = True
+                        continue
+                    raise DownloadError(f"{type(e).__name__}: {e}", retryable=True) from e
+
+            def release(reusable: bool, conn=conn, parts=parts) -> None:
+                self.pool.release(parts.scheme, parts.netloc, conn, reusable)
+
+            if response.status in REDIRECT_STATUSES and response.getheader("Location"):
+                location = response.getheader("Location")
+                response.read()
+                release(not response.will_close)
+                url = urljoin(url, location)
+                continue
+            return response, release, url
+        raise DownloadError(f"Too many redirects: {url}")
+
+    def _attempt(self, url: str, transfer: "_Transfer", conditional: Dict[str, str]) -> None:
+        """
+        Transfer the body into transfer.temp, resuming after whatever it already holds.
+
+        Args:
+            url: URL to fetch
+            transfer: State carried across attempts; updated in place
+            conditional: Revalidation headers for a cached copy, sent only
+                while nothing has been received yet
+
+        Raises:
+            DownloadError: If the attempt failed
+        """
+        have = transfer.received
+        headers = {}
+        if have:
+            headers["Range"] = f"bytes={have}-"
+            if transfer.validator:
+                # The server ignores Range (sends everything) if the file changed
+                headers["If-Range"] = transfer.validator
+        else:
+            headers.update(conditional)
+
+        response, release, _ = self._request(url, headers)
+        reusable = False
+        try:
+            status = response.status
+            if status == 304 and conditional and not have:
+                response.read()
+                reusable = not response.will_close
+                transfer.not_modified = True
+                transfer.headers = cache_headers(response)
+                return
+            if status == 416 and have:
+                # Nothing left to fetch: the earlier attempt got everything
+                response.read()
+                reusable = not response.will_close
+                return
+            if status in RETRY_STATUSES:
+                response.read()
+                reusable = not response.will_close
+                raise DownloadError(f"HTTP {status} {response.reason}", retryable=True,
+                                    retry_after=parse_retry_after(response.getheader("Retry-After")))
+            if status not in (200, 206):
+                response.read()
+                reusable = not response.will_close
+                raise DownloadError(f"HTTP {status} {response.reason}")
+
+            if status == 206 and not response.getheader("Content-Range", "").startswith(f"bytes {have}-"):
+                raise DownloadError("Server sent an unexpected byte range", retryable=True)
+            if status == 206 and have:
+                transfer.resumed = True
+            else:
+                transfer.restart()
+            transfer.headers = cache_headers(response)
+            transfer.validator = response.getheader("ETag") or response.getheader("Last-Modified")
+
+            length = response.getheader("Content-Length")
+            expected = transfer.received + int(length) if length and length.isdigit() else None
+            if expected is not None and expected > self.max_bytes:
+                raise DownloadError(f"Too large: {expected} bytes (limit {self.max_bytes})")
+
+            with open(transfer.temp, "ab") as f:
+                while True:
+                    try:
+                        chunk = response.read(CHUNK_SIZE)
+                    except (OSError, http.client.HTTPException) as e:
+                        raise DownloadError(f"Transfer interrupted after {transfer.received} bytes: {e}",
+                                            retryable=True) from e
+                    if not chunk:
+                        break
+                    if transfer.received + len(chunk) > self.max_bytes:
+                        raise DownloadError(f"Too large: over {self.max_bytes} bytes")
+                    f.write(chunk)
+                    transfer.update(chunk)
+
+            if expected is not None and transfer.received < expected:
+                raise DownloadError(f"Transfer interrupted after {transfer.received} of {expected} bytes",
+                                    retryable=True)
+            reusable = not response.will_close
+        finally:
+            release(reusable)
+
+    def fetch(self, url: str, dest: Path) -> DownloadResult:
+        """
+        Download one URL to dest.
+
+        The body goes to a unique temp file in dest's directory and is
+        renamed over dest only once complete. With a cache, a fresh copy is
+        served without a request and a stale one is revalidated first.
+
+        Args:
+            url: http(s) URL
+            dest: Destination file (parent directories are created)
+
+        Returns:
+            DownloadResult; ok is False (with error set) if every attempt failed
+        """
+        dest = Path(dest)
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            temp = temp_path_for(dest)
+        except OSError as e:
+            return DownloadResult(url, dest, False, error=str(e))
+
+        entry = self.cache.lookup(url) if self.cache else None
+        transfer = _Transfer(temp)
+        attempts = 0
+        try:
+            if entry and self.cache.is_fresh(entry):
+                return self._from_cache(url, dest, entry, temp, attempts, "hit")
+
+            conditional = self.cache.conditional_headers(entry) if entry else {}
+            while True:
+                attempts += 1
+                try:
+                    self._attempt(url, transfer, conditional)
+                    break
+                except DownloadError as e:
+                    if not e.retryable or attempts > self.retries:
+                        return DownloadResult(url, dest, False, attempts=attempts, error=str(e))
+                    delay = e.retry_after if e.retry_after is not None else self.backoff * 2 ** (attempts - 1)
+                    time.sleep(delay * random.uniform(0.8, 1.2))
+                except OSError as e:
+                    # Local write failures aren't worth retrying
+                    return DownloadResult(url, dest, False, attempts=attempts, error=str(e))
+
+            if transfer.not_modified:
+                return self._from_cache(url, dest, entry, temp, attempts, "revalidated", transfer.headers)
+
+            digest = transfer.hasher.hexdigest()
+            if self.cache:
+                self.cache.store(url, temp, digest, transfer.headers)
+                self.cache.save()
+            os.replace(temp, dest)
+            return DownloadResult(url, dest, True, transfer.received, attempts, transfer.resumed,
+                                  sha256=digest)
+        finally:
+            temp.unlink(missing_ok=True)
+
+    def _from_cache(self, url: str, dest: Path, entry: Dict[str, Any], temp: Path, attempts: int,
+                    cache: str, headers: Optional[Dict[str, Optional[str]]] = None) -> DownloadResult:
+        """Serve a download from a cache entry through the temp file."""
+        try:
+            self.cache.copy_to(entry, temp)
+            os.replace(temp, dest)
+        except OSError as e:
+            return DownloadResult(url, dest, False, attempts=attempts, error=str(e))
+        self.cache.hit(url, revalidated=cache == "revalidated", headers=headers)
+        self.cache.save()
+        return DownloadResult(url, dest, True, entry["size"], attempts, sha256=entry["sha256"], cache=cache)
+
+    def fetch_many(self, jobs: List[Tuple[str, Path]],
+                   progress: Optional[Callable[[DownloadResult], None]] = None) -> List[DownloadResult]:
+        """
+        Download several URLs concurrently.
+
+        Args:
+            jobs: (url, dest) pairs
+            progress: Called with each result as it completes (from worker threads)
+
+        Returns:
+            Results in the order of jobs
+        """
+        if not jobs:
+            return []
+
+        def run(job: Tuple[str, Path]) -> DownloadResult:
+            result = self.fetch(*job)
+            if progress is not None:
+                progress(result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs)), thread_name_prefix="download") as pool:
+            return list(pool.map(run, jobs))
+
+    def close(self) -> None:
+        """Close pooled connections."""
+        self.pool.close()
+
+    def __enter__(self) -> "Downloader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    if len(args.pairs) % 2:
+        print("✗ Expected URL DEST pairs", file=sys.stderr)
+        return 1
+    jobs = [(args.pairs[i], Path(args.pairs[i + 1])) for i in range(0, len(args.pairs), 2)]
+
+    start = time.perf_counter()
+    with Downloader(workers=args.workers) as downloader:
+        results = downloader.fetch_many(jobs)
+        connections = downloader.pool.created
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for result in results:
+        if result.ok:
+            note = " (resumed)" if result.resumed else CACHE_NOTES[result.cache]
+            print(f"✓ {result.path} ({result.size} bytes){note}")
+        else:
+            failed += 1
+            print(f"✗ {result.url}: {result.error}")
+    total = sum(result.size for result in results)
+    print(f"{len(results) - failed} of {len(results)} downloaded, {total} bytes in {elapsed:.2f}s "
+          f"over {connections} connections")
+    return 1 if failed else 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pairs', nargs='+', metavar='URL DEST', help='URL and destination file pairs')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Concurrent downloads (default: {DEFAULT_WORKERS})')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
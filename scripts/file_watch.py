@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Watch data directories for changed YAML files.
+
+InotifyWatcher uses Linux inotify through libc and reports exactly which
+files were written, renamed or deleted; PollingWatcher compares mtime/size
+snapshots and works everywhere. Both watch directories non-recursively and
+ignore editor swap and temp files. Used by watch_content.py and the gear
+store.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+DEFAULT_POLL_INTERVAL = 0.5
+
+
+def is_data_file(path: Path) -> bool:
+    """Return True for YAML data files (not editor swap or temp files)."""
+    return path.suffix == '.yaml' and not path.name.startswith('.')
+
+
+class PollingWatcher:
+    """Detect changes by comparing mtime/size snapshots of the watched directories."""
+
+    def __init__(self, directories: Iterable[Path], interval: float = DEFAULT_POLL_INTERVAL):
+        self.directories = list(directories)
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        """Return {path: (mtime_ns, size)} for every data file."""
+        snapshot = {}
+        for directory in self.directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                path = Path(entry.path)
+                if not is_data_file(path):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def poll(self, timeout: Optional[float]) -> Set[Path]:
+        """
+        Wait up to timeout seconds for changes.
+
+        Args:
+            timeout: Seconds to wait (None waits one polling interval)
+
+        Returns:
+            Paths that were created, modified or deleted
+        """
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        current = self._scan()
+        changed = {path for path in current.keys() | self.snapshot.keys()
+                   if current.get(path) != self.snapshot.get(path)}
+        self.snapshot = current
+        return changed
+
+    def close(self) -> None:
+        """Release resources (nothing to do for polling)."""
+
+
+class InotifyWatcher:
+    """Detect changes with Linux inotify through libc."""
+
+    def __init__(self, directories: Iterable[Path]):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or not libc_name:
+            raise OSError("inotify is only available on Linux")
+
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError("libc has no inotify support")
+        self._libc = libc
+
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.directories: Dict[int, Path] = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                self.close()
+                raise OSError(errno, f"Cannot watch {directory}")
+            self.directories[wd] = Path(directory)
+
+    def _rescan(self) -> Set[Path]:
+        """Return every data file after the kernel queue overflowed."""
+        return {path for directory in self.directories.values()
+                for path in directory.glob("*.yaml") if is_data_file(path)}
+
+    def poll(self, timeout: Optional[float]) -> Set[Path]:
+        """
+        Wait up to timeout seconds for changes.
+
+        Args:
+            timeout: Seconds to wait (None blocks until an event arrives)
+
+        Returns:
+            Paths that were written, renamed or deleted
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed: Set[Path] = set()
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(buffer, offset)
+                offset += EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    changed |= self._rescan()
+                elif wd in self.directories and name:
+                    path = self.directories[wd] / os.fsdecode(name)
+                    if is_data_file(path):
+                        changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        """Close the inotify file descriptor."""
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def create_watcher(directories: List[Path], force_polling: bool = False,
+                   interval: float = DEFAULT_POLL_INTERVAL):
+    """
+    Create the best available watcher.
+
+    Args:
+        directories: Directories to watch (non-recursive)
+        force_polling: Skip inotify even when available
+        interval: Polling interval for the fallback watcher
+
+    Returns:
+        InotifyWatcher or PollingWatcher
+    """
+    if not force_polling:
+        try:
+            return InotifyWatcher(directories)
+        except OSError as e:
+            print(f"⚠ inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(directories, interval)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Frontmatter codec shared by the content management tools.
+
+Data files come in two formats:
+- Hugo frontmatter: ``---\\n<yaml>\\n---\\n<body>``
+- Pure YAML: the whole file is one YAML document
+
+Listing operations only need the header, so ``read_header`` streams lines
+until the closing ``---`` instead of reading long description bodies.
+Uses libyaml (``CSafeLoader``/``CDumper``) when PyYAML was built with it
+and falls back to the pure Python implementation otherwise.
+"""
+
+from pathlib import Path
+from typing import IO, Any, Optional, Tuple
+
+import yaml
+
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+Dumper = getattr(yaml, 'CDumper', yaml.Dumper)
+HAS_LIBYAML = SafeLoader is not yaml.SafeLoader
+
+DELIMITER = '---\n'
+
+
+def load(text: str) -> Any:
+    """Parse a YAML string with the fastest available safe loader."""
+    return yaml.load(text, Loader=SafeLoader)
+
+
+def dump(data: Any, stream: Optional[IO[str]] = None, **kwargs: Any) -> Optional[str]:
+    """
+    Serialize data as block-style YAML.
+
+    Args:
+        data: Data to serialize
+        stream: Optional stream to write to (returns a string if omitted)
+        **kwargs: Extra yaml.dump options (e.g. sort_keys=False)
+
+    Returns:
+        YAML string when no stream is given, otherwise None
+    """
+    kwargs.setdefault('default_flow_style', False)
+    kwargs.setdefault('allow_unicode', True)
+    return yaml.dump(data, stream, Dumper=Dumper, **kwargs)
+
+
+def split(text: str) -> Tuple[Optional[str], str]:
+    """
+    Split file content into header YAML and body.
+
+    Args:
+        text: File content
+
+    Returns:
+        Tuple of (header, body); header is None for pure YAML files,
+        in which case body is the whole document
+
+    Raises:
+        ValueError: If frontmatter is opened but never closed
+    """
+    if not text.startswith(DELIMITER):
+        return None, text
+
+    end_idx = text.find('\n' + DELIMITER, len(DELIMITER))
+    if end_idx == -1:
+        raise ValueError("Invalid YAML frontmatter: missing closing ---")
+    return text[len(DELIMITER):end_idx], text[end_idx + len(DELIMITER) + 1:]
+
+
+def parse(text: str) -> Tuple[Any, str, bool]:
+    """
+    Parse file content in either format.
+
+    Args:
+        text: File content
+
+    Returns:
+        Tuple of (data, body, has_frontmatter); body is empty for pure YAML
+
+    Raises:
+        ValueError: If frontmatter is opened but never closed
+        yaml.YAMLError: If the YAML is invalid
+    """
+    header, body = split(text)
+    if header is None:
+        return load(body), "", False
+    return load(header), body, True
+
+
+def read_document(path: Path) -> Tuple[Any, str, bool]:
+    """Read and parse a whole data file (header and body)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse(f.read())
+
+
+def read_header_text(path: Path) -> Tuple[str, bool]:
+    """
+    Read only the YAML header of a data file.
+
+    Stops at the closing ``---`` so the body is never read. Pure YAML
+    files have no body, so they are read whole.
+
+    Args:
+        path: Data file path
+
+    Returns:
+        Tuple of (header YAML text, has_frontmatter)
+
+    Raises:
+        ValueError: If frontmatter is opened but never closed
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.readline()
+        if first != DELIMITER:
+            return first + f.read(), False
+
+        lines = []
+        for line in f:
+            if line == DELIMITER:
+                return ''.join(lines), True
+            lines.append(line)
+
+    raise ValueError("Invalid YAML frontmatter: missing closing ---")
+
+
+def read_header(path: Path) -> Any:
+    """Read and parse only the YAML header of a data file."""
+    header, _has_frontmatter = read_header_text(path)
+    return load(header)
+
+
+def format_document(data: Any, body: str = "", has_frontmatter: bool = True, **kwargs: Any) -> str:
+    """
+    Serialize data (and body) back into file content.
+
+    Args:
+        data: Header data
+        body: Text written after the closing delimiter, verbatim
+        has_frontmatter: False to write a pure YAML document (body ignored)
+        **kwargs: Extra yaml.dump options
+
+    Returns:
+        File content
+    """
+    if not has_frontmatter:
+        return dump(data, **kwargs)
+    return DELIMITER + dump(data, **kwargs) + DELIMITER + body
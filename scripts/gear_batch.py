@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Batch add/update/delete of gear files.
+
+Used by the gear MCP server's batch tools. A batch is validated as a whole
+before anything is written; if every item is valid, all writes and deletes
+are applied in one journaled transaction (see atomic_io), so a batch either
+lands completely or not at all.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import atomic_io
+import frontmatter_codec
+
+CATEGORIES = ("Pedal", "Synth")
+TECHNOLOGIES = ("Analog", "Digital", "Hybrid")
+REQUIRED_FIELDS = ("name", "manufacturer", "category", "technology")
+OPTIONAL_FIELDS = ("types", "controls", "url", "description")
+LIST_FIELDS = ("types", "controls")
+
+# Optional fields reported as missing after an add
+RECOMMENDED_FIELDS = ("controls", "url", "description")
+
+OK = "ok"
+ERROR = "error"
+SKIPPED = "skipped"
+
+
+# Finds the existing file of a slug (None if there is none)
+Locator = Callable[[str], Optional[Path]]
+
+
+class BatchItem(NamedTuple):
+    """One planned (and later applied) batch operation."""
+    action: str
+    slug: str
+    path: Optional[Path]
+    data: Dict[str, Any]
+    status: str = OK
+    note: str = ""
+
+
+def slugify(text: str) -> str:
+    """Convert text to URL-friendly slug."""
+    return text.lower().replace(" ", "-").replace("/", "-")
+
+
+def generate_filename(name: str, manufacturer: str) -> str:
+    """Generate YAML filename from gear name and manufacturer."""
+    slug = f"{slugify(manufacturer)}-{slugify(name)}"
+    return f"{slug}.yaml"
+
+
+def validate_fields(item: Dict[str, Any], required: bool = True) -> List[str]:
+    """
+    Check gear fields against the schema.
+
+    Args:
+        item: Gear fields
+        required: Whether name, manufacturer, category and technology must be present
+
+    Returns:
+        List of problems (empty when valid)
+    """
+    problems = []
+    if required:
+        for field in REQUIRED_FIELDS:
+            value = item.get(field)
+            if not isinstance(value, str) or not value.strip():
+                problems.append(f"{field} required")
+    if "category" in item and item["category"] not in CATEGORIES:
+        problems.append(f"category must be one of {', '.join(CATEGORIES)}")
+    if "technology" in item and item["technology"] not in TECHNOLOGIES:
+        problems.append(f"technology must be one of {', '.join(TECHNOLOGIES)}")
+    for field in LIST_FIELDS:
+        if field in item and not (isinstance(item[field], list)
+                                  and all(isinstance(v, str) for v in item[field])):
+            problems.append(f"{field} must be a list of strings")
+    for field in ("url", "description"):
+        if field in item and not isinstance(item[field], str):
+            problems.append(f"{field} must be a string")
+    return problems
+
+
+def build_gear_data(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Build gear file data in the canonical field order."""
+    data = {field: item[field] for field in REQUIRED_FIELDS}
+    for field in ("types", "url", "description", "controls"):
+        if field in item:
+            data[field] = item[field]
+    return data
+
+
+def _existing(slug: str, gear_dir: Path, locate: Optional[Locator]) -> Optional[Path]:
+    """Return the file a slug already has, in any status when locate is given."""
+    if locate is not None:
+        return locate(slug)
+    path = gear_dir / f"{slug}.yaml"
+    return path if path.exists() else None
+
+
+def plan_add(items: List[Dict[str, Any]], gear_dir: Path,
+             locate: Optional[Locator] = None) -> List[BatchItem]:
+    """
+    Validate a batch of new gear.
+
+    Args:
+        items: Gear fields per item
+        gear_dir: Directory new files are created in
+        locate: Finds existing files by slug (default: look in gear_dir only)
+    """
+    plan = []
+    seen = set()
+    for item in items:
+        problems = validate_fields(item)
+        if problems:
+            label = slugify(f"{item.get('manufacturer', '?')}-{item.get('name', '?')}")
+            plan.append(BatchItem("add", label, None, {}, ERROR, "; ".join(problems)))
+            continue
+
+        filename = generate_filename(item["name"], item["manufacturer"])
+        slug = filename[:-len(".yaml")]
+        path = gear_dir / filename
+        if slug in seen:
+            plan.append(BatchItem("add", slug, path, {}, ERROR, "duplicate in batch"))
+        elif _existing(slug, gear_dir, locate):
+            plan.append(BatchItem("add", slug, path, {}, ERROR, "already exists"))
+        else:
+            missing = [field for field in RECOMMENDED_FIELDS if field not in item]
+            note = f"missing: {', '.join(missing)}" if missing else ""
+            plan.append(BatchItem("add", slug, path, build_gear_data(item), OK, note))
+        seen.add(slug)
+    return plan
+
+
+def plan_update(items: List[Dict[str, Any]], gear_dir: Path,
+                locate: Optional[Locator] = None) -> List[BatchItem]:
+    """Validate a batch of field updates keyed by slug (see plan_add for locate)."""
+    plan = []
+    seen = set()
+    for item in items:
+        slug = item.get("slug")
+        if not isinstance(slug, str) or not slug:
+            plan.append(BatchItem("update", "?", None, {}, ERROR, "slug required"))
+            continue
+
+        existing = _existing(slug, gear_dir, locate)
+        path = existing or gear_dir / f"{slug}.yaml"
+        fields = {field: item[field] for field in OPTIONAL_FIELDS if field in item}
+        problems = validate_fields(fields, required=False)
+        if problems:
+            plan.append(BatchItem("update", slug, path, {}, ERROR, "; ".join(problems)))
+        elif not fields:
+            plan.append(BatchItem("update", slug, path, {}, ERROR, "no fields to update"))
+        elif slug in seen:
+            plan.append(BatchItem("update", slug, path, {}, ERROR, "duplicate in batch"))
+        elif not existing:
+            plan.append(BatchItem("update", slug, path, {}, ERROR, "not found"))
+        else:
+            plan.append(BatchItem("update", slug, path, fields, OK, ", ".join(fields)))
+        seen.add(slug)
+    return plan
+
+
+def plan_delete(slugs: List[str], gear_dir: Path,
+                locate: Optional[Locator] = None) -> List[BatchItem]:
+    """Validate a batch of deletions (see plan_add for locate)."""
+    plan = []
+    seen = set()
+    for slug in slugs:
+        if not isinstance(slug, str) or not slug:
+            plan.append(BatchItem("delete", "?", None, {}, ERROR, "slug required"))
+            continue
+
+        existing = _existing(slug, gear_dir, locate)
+        path = existing or gear_dir / f"{slug}.yaml"
+        if slug in seen:
+            plan.append(BatchItem("delete", slug, path, {}, ERROR, "duplicate in batch"))
+        elif not existing:
+            plan.append(BatchItem("delete", slug, path, {}, ERROR, "not found"))
+        else:
+            plan.append(BatchItem("delete", slug, path, {}))
+        seen.add(slug)
+    return plan
+
+
+def _abort(plan: List[BatchItem]) -> List[BatchItem]:
+    """Mark every valid item as skipped because another item failed."""
+    return [item if item.status == ERROR else item._replace(status=SKIPPED, note="batch not applied")
+            for item in plan]
+
+
+def apply(plan: List[BatchItem], loader: Callable[[Path], Any]) -> List[BatchItem]:
+    """
+    Apply a validated plan in one transaction.
+
+    Nothing is written if any item failed validation, or if a file appeared
+    or disappeared between planning and applying.
+
+    Args:
+        plan: Items from plan_add/plan_update/plan_delete
+        loader: Reads current gear data (for updates)
+
+    Returns:
+        The plan with final statuses
+    """
+    if not plan or any(item.status == ERROR for item in plan):
+        return _abort(plan)
+
+    with atomic_io.locked_many([item.path for item in plan]):
+        # Re-check under the locks: another writer may have raced us
+        checked = []
+        for item in plan:
+            exists = item.path.exists()
+            if item.action == "add" and exists:
+                checked.append(item._replace(status=ERROR, note="already exists"))
+            elif item.action != "add" and not exists:
+                checked.append(item._replace(status=ERROR, note="not found"))
+            else:
+                checked.append(item)
+        if any(item.status == ERROR for item in checked):
+            return _abort(checked)
+
+        with atomic_io.Transaction() as txn:
+            for item in checked:
+                if item.action == "add":
+                    txn.write(item.path, frontmatter_codec.dump(item.data, sort_keys=False))
+                elif item.action == "update":
+                    current = loader(item.path)
+                    current.update(item.data)
+                    current.pop('_filename', None)
+                    txn.write(item.path, frontmatter_codec.dump(current, sort_keys=False))
+                else:
+                    txn.delete(item.path)
+    return checked
+
+
+def format_results(results: List[BatchItem]) -> str:
+    """
+    Format results as a compact table.
+
+    Returns:
+        Summary line followed by one row per item
+    """
+    applied = sum(1 for item in results if item.status == OK)
+    failed = sum(1 for item in results if item.status == ERROR)
+    if failed:
+        header = f"❌ Batch rejected: {failed} invalid of {len(results)}, nothing written"
+    else:
+        header = f"✅ Batch applied: {applied} of {len(results)}"
+
+    width = max((len(item.slug) for item in results), default=0)
+    rows = [f"{item.status:<7} {item.action:<6} {item.slug:<{width}}  {item.note}".rstrip()
+            for item in results]
+    return "\n".join([header, ""] + rows)
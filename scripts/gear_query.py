@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Paginated, projected gear queries for the gear MCP server.
+
+Pages are cut straight from the resident GearStore: listings use keyset
+pagination on the filename (stable while items are added or deleted
+between pages), search results are paged by rank. Cursors are opaque
+URL-safe strings; callers pass back whatever the previous page returned.
+"""
+
+import base64
+import binascii
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from gear_store import GearStore
+
+# Fields a caller can ask for; "slug" is the filename without .yaml
+FIELDS = ("slug", "status", "name", "manufacturer", "category", "technology",
+          "types", "controls", "url", "description")
+FILTER_FIELDS = ("category", "manufacturer", "technology")
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class Page(NamedTuple):
+    """One page of query results."""
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+    scores: Optional[List[float]] = None
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    """Encode pagination state as an opaque cursor."""
+    raw = json.dumps(state, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    Decode a cursor made by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(state, dict):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return state
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Return a page size within 1..MAX_LIMIT (DEFAULT_LIMIT when unset)."""
+    if limit is None:
+        return DEFAULT_LIMIT
+    return max(1, min(int(limit), MAX_LIMIT))
+
+
+def validate_fields(fields: Optional[Sequence[str]]) -> List[str]:
+    """
+    Check a projection.
+
+    Returns:
+        List of problems (empty when valid)
+    """
+    if fields is None:
+        return []
+    if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields):
+        return ["fields must be a list of strings"]
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        return [f"unknown fields: {', '.join(unknown)} (valid: {', '.join(FIELDS)})"]
+    return []
+
+
+def project(record: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Copy the requested fields of a record (all known fields by default).
+
+    Fields missing from the record are left out rather than set to null.
+    """
+    projected = {}
+    for field in fields or FIELDS:
+        if field == "slug":
+            projected["slug"] = Path(record["_filename"]).stem
+        elif field == "status":
+            projected["status"] = record["_status"]
+        elif field in record:
+            projected[field] = record[field]
+    return projected
+
+
+def list_page(index: GearStore, filters: Optional[Dict[str, str]] = None,
+              limit: Optional[int] = None, cursor: Optional[str] = None,
+              statuses: Optional[Iterable[str]] = None) -> Page:
+    """
+    Return one page of gear sorted by filename.
+
+    Args:
+        index: Resident gear store
+        filters: Exact-match values for category, manufacturer and technology
+        limit: Page size
+        cursor: Cursor from the previous page
+        statuses: Statuses to list (default: all)
+
+    Returns:
+        Page of records (shared with the store; project before mutating)
+
+    Raises:
+        ValueError: If the cursor or a status is invalid
+    """
+    after = None
+    if cursor:
+        after = decode_cursor(cursor).get("after")
+        if not isinstance(after, str):
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    wanted = {k: v for k, v in (filters or {}).items() if k in FILTER_FIELDS and v is not None}
+
+    def match(record: Dict[str, Any]) -> bool:
+        return all(record.get(k) == v for k, v in wanted.items())
+
+    items, more = index.page(after, clamp_limit(limit), match if wanted else None, statuses)
+    next_cursor = encode_cursor({"after": items[-1]["_filename"]}) if more and items else None
+    return Page(items, next_cursor)
+
+
+def search_page(index: GearStore, query: str, limit: Optional[int] = None,
+                cursor: Optional[str] = None, statuses: Optional[Iterable[str]] = None) -> Page:
+    """
+    Return one page of ranked search results.
+
+    Args:
+        index: Resident gear store
+        query: Search query
+        limit: Page size
+        cursor: Cursor from the previous page of the same query
+        statuses: Statuses to search (default: all)
+
+    Returns:
+        Page of records with their scores
+
+    Raises:
+        ValueError: If the cursor is invalid or belongs to another query,
+            or a status is unknown
+    """
+    offset = 0
+    if cursor:
+        state = decode_cursor(cursor)
+        offset = state.get("offset")
+        if state.get("query") != query or not isinstance(offset, int) or offset < 0:
+            raise ValueError(f"Invalid cursor for query '{query}': {cursor}")
+
+    size = clamp_limit(limit)
+    hits = index.search(query, limit=offset + size + 1, statuses=statuses)
+    items, scores = [], []
+    for hit in hits[offset:offset + size]:
+        record = index.records.get(hit.key)
+        if record is None:
+            # Deleted by a concurrent call since the search ran
+            continue
+        items.append(record)
+        scores.append(hit.score)
+
+    next_cursor = None
+    if len(hits) > offset + size:
+        next_cursor = encode_cursor({"query": query, "offset": offset + size})
+    return Page(items, next_cursor, scores)
+
+
+def page_to_json(page: Page, fields: Optional[Sequence[str]] = None) -> str:
+    """Serialize a page as JSON: {"items": [...], "next_cursor": ...}."""
+    items = [project(record, fields) for record in page.items]
+    if page.scores is not None:
+        for item, score in zip(items, page.scores):
+            item["score"] = round(score, 4)
+    return json.dumps({"items": items, "next_cursor": page.next_cursor}, ensure_ascii=False)
+
+
+def format_projection(record: Dict[str, Any], fields: Sequence[str]) -> str:
+    """Render the requested fields of one record as a bullet line."""
+    parts = []
+    for field, value in project(record, fields).items():
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in value)
+        parts.append(f"{field}: {value}")
+    return "• " + " | ".join(parts)
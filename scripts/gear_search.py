@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Ranked full-text and fuzzy search over gear records.
+
+An inverted index over name, manufacturer, types, controls and description
+with BM25 ranking (field-weighted term frequencies). Query terms that are
+not in the vocabulary are expanded to indexed terms that start with them
+(``"hizu"``) or share enough character trigrams with them (``"hizumita"``
+for ``"hizumitas"``), so typos and partial words still match.
+
+Documents are added and removed one at a time, so the index can be kept
+in step with GearStore instead of being rebuilt per query.
+
+Usage:
+    python gear_search.py QUERY [--limit N]
+"""
+
+import argparse
+import bisect
+import heapq
+import math
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Set, Tuple
+
+# Field weights for the combined term frequency
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'manufacturer': 2.0,
+    'types': 1.5,
+    'controls': 1.0,
+    'description': 1.0,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Score multipliers for expanded query terms
+PREFIX_WEIGHT = 0.8
+MIN_PREFIX_LENGTH = 2
+MIN_FUZZY_LENGTH = 3
+MIN_SIMILARITY = 0.45
+MAX_EXPANSIONS = 5
+
+TOKEN_RE = re.compile(r'\w+(?:[-./]\w+)*')
+WORD_RE = re.compile(r'\w+')
+
+
+class SearchResult(NamedTuple):
+    """One ranked search hit."""
+    key: str
+    score: float
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms.
+
+    Hyphenated and dotted words are indexed both as parts and joined
+    (``"BD-2"`` gives ``bd``, ``2`` and ``bd2``) so either spelling matches.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms (with repeats, for term frequency)
+    """
+    terms = []
+    for token in TOKEN_RE.findall(text.casefold()):
+        parts = WORD_RE.findall(token)
+        terms.extend(parts)
+        if len(parts) > 1:
+            terms.append(''.join(parts))
+    return terms
+
+
+def trigrams(term: str) -> Set[str]:
+    """Return the padded character trigrams of a term."""
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def field_text(value: Any) -> str:
+    """Flatten a field value (string, number or list) to text."""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(field_text(item) for item in value)
+    return str(value)
+
+
+class SearchIndex:
+    """Incrementally maintained inverted index with BM25 ranking."""
+
+    def __init__(self, field_weights: Dict[str, float] = None):
+        self.field_weights = field_weights or FIELD_WEIGHTS
+        # term -> {key: weighted term frequency}
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        # trigram -> terms containing it
+        self.trigram_terms: Dict[str, Set[str]] = defaultdict(set)
+        self.doc_terms: Dict[str, Dict[str, float]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.total_length = 0.0
+        self._vocabulary: List[str] = []
+        # term -> (generation, {key: score}, [(score, key)] best first)
+        self._impacts: Dict[str, Tuple[int, Dict[str, float], List[Tuple[float, str]]]] = {}
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_terms)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.doc_terms
+
+    def add(self, key: str, record: Dict[str, Any]) -> None:
+        """
+        Index (or re-index) one record.
+
+        Args:
+            key: Unique document key (e.g. gear filename)
+            record: Gear data
+        """
+        if key in self.doc_terms:
+            self.remove(key)
+        self._generation += 1
+
+        frequencies: Dict[str, float] = defaultdict(float)
+        for field, weight in self.field_weights.items():
+            for term in tokenize(field_text(record.get(field))):
+                frequencies[term] += weight
+
+        for term, tf in frequencies.items():
+            if term not in self.postings:
+                bisect.insort(self._vocabulary, term)
+                for gram in trigrams(term):
+                    self.trigram_terms[gram].add(term)
+            self.postings[term][key] = tf
+
+        length = sum(frequencies.values())
+        self.doc_terms[key] = dict(frequencies)
+        self.doc_lengths[key] = length
+        self.total_length += length
+
+    def remove(self, key: str) -> None:
+        """Remove one record from the index (no-op if absent)."""
+        frequencies = self.doc_terms.pop(key, None)
+        if frequencies is None:
+            return
+        self._generation += 1
+
+        self.total_length -= self.doc_lengths.pop(key)
+        for term in frequencies:
+            docs = self.postings[term]
+            docs.pop(key, None)
+            if not docs:
+                del self.postings[term]
+                self._impacts.pop(term, None)
+                idx = bisect.bisect_left(self._vocabulary, term)
+                del self._vocabulary[idx]
+                for gram in trigrams(term):
+                    terms = self.trigram_terms[gram]
+                    terms.discard(term)
+                    if not terms:
+                        del self.trigram_terms[gram]
+
+    def expand(self, term: str) -> List[Tuple[str, float]]:
+        """
+        Map a query term to indexed terms with a match weight.
+
+        Exact matches win outright; otherwise terms starting with the query
+        term, then terms with similar trigrams are used.
+
+        Args:
+            term: Query term
+
+        Returns:
+            List of (indexed term, weight)
+        """
+        if term in self.postings:
+            return [(term, 1.0)]
+
+        expansions: Dict[str, float] = {}
+        if len(term) >= MIN_PREFIX_LENGTH:
+            idx = bisect.bisect_left(self._vocabulary, term)
+            while idx < len(self._vocabulary) and self._vocabulary[idx].startswith(term):
+                expansions[self._vocabulary[idx]] = PREFIX_WEIGHT
+                idx += 1
+                if len(expansions) >= MAX_EXPANSIONS:
+                    break
+
+        if not expansions and len(term) >= MIN_FUZZY_LENGTH:
+            grams = trigrams(term)
+            shared: Dict[str, int] = defaultdict(int)
+            for gram in grams:
+                for candidate in self.trigram_terms.get(gram, ()):
+                    shared[candidate] += 1
+
+            scored = []
+            for candidate, count in shared.items():
+                similarity = count / (len(grams) + len(candidate) - count)
+                if similarity >= MIN_SIMILARITY:
+                    scored.append((similarity, candidate))
+            for similarity, candidate in heapq.nlargest(MAX_EXPANSIONS, scored):
+                expansions[candidate] = similarity
+
+        return list(expansions.items())
+
+    def _term_impacts(self, term: str) -> Tuple[Dict[str, float], List[Tuple[float, str]]]:
+        """
+        Return BM25 scores of one indexed term for every document containing it.
+
+        Cached until the corpus next changes (N and average length feed the
+        score), so repeated queries only pay for the top of each list.
+
+        Returns:
+            Tuple of ({key: score}, [(score, key)] sorted best first)
+        """
+        cached = self._impacts.get(term)
+        if cached is not None and cached[0] == self._generation:
+            return cached[1], cached[2]
+
+        count = len(self.doc_terms)
+        avg_length = self.total_length / count
+        docs = self.postings[term]
+        idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+
+        scores = {}
+        for key, tf in docs.items():
+            norm = K1 * (1 - B + B * self.doc_lengths[key] / avg_length)
+            scores[key] = idf * tf * (K1 + 1) / (tf + norm)
+        ordered = sorted(((score, key) for key, score in scores.items()), key=lambda item: (-item[0], item[1]))
+
+        self._impacts[term] = (self._generation, scores, ordered)
+        return scores, ordered
+
+    def search(self, query: str, limit: int = 10) -> List[SearchResult]:
+        """
+        Return the best matching records for a query.
+
+        Terms are OR-ed together; records matching more (and rarer) terms,
+        in higher weighted fields, rank first. Uses the threshold algorithm
+        over score-ordered posting lists, so only the top of each list is
+        visited once the k-th best score can no longer be beaten.
+
+        Args:
+            query: Free text query
+            limit: Maximum number of results
+
+        Returns:
+            Results ordered by descending score
+        """
+        if not self.doc_terms or limit <= 0:
+            return []
+
+        lists = []
+        for term in dict.fromkeys(tokenize(query)):
+            for indexed, weight in self.expand(term):
+                scores, ordered = self._term_impacts(indexed)
+                lists.append((weight, scores, ordered))
+        if not lists:
+            return []
+
+        seen: Set[str] = set()
+        top: List[Tuple[float, str]] = []  # min-heap of the best `limit`
+        depth = 0
+        while True:
+            frontier = 0.0
+            exhausted = True
+            for weight, _scores, ordered in lists:
+                if depth >= len(ordered):
+                    continue
+                exhausted = False
+                score, key = ordered[depth]
+                frontier += weight * score
+                if key in seen:
+                    continue
+                seen.add(key)
+                total = sum(w * scores.get(key, 0.0) for w, scores, _ in lists)
+                if len(top) < limit:
+                    heapq.heappush(top, (total, key))
+                elif total > top[0][0]:
+                    heapq.heapreplace(top, (total, key))
+            depth += 1
+            if exhausted or (len(top) >= limit and top[0][0] >= frontier):
+                break
+
+        ranked = sorted(top, key=lambda item: (-item[0], item[1]))
+        return [SearchResult(key, score) for score, key in ranked]
+
+
+def build_index(records: Iterable[Dict[str, Any]], key_field: str = '_filename') -> SearchIndex:
+    """Build a SearchIndex from records keyed by one of their fields."""
+    index = SearchIndex()
+    for record in records:
+        index.add(record[key_field], record)
+    return index
+
+
+def main() -> int:
+    """Search the gear inventory from the command line."""
+    args = parse_args()
+    from gear_store import GearStore
+
+    gear_dir = Path(__file__).parent.parent / "website" / "data" / "gear"
+    gear = GearStore(gear_dir, use_inotify=False)
+    for result in gear.search(args.query, limit=args.limit):
+        record = gear.records[result.key]
+        print(f"{result.score:6.2f}  {record['_status']:<8}  {record['manufacturer']} - {record['name']}")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('query', help='Search query')
+    parser.add_argument('--limit', type=int, default=10, help='Maximum results (default: 10)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
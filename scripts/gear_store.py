@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Resident gear store across every status directory.
+
+Gear lives in website/data/gear (active) and its sold/, want/ and
+archived/ subdirectories. The store indexes all of them once, partitioned
+by status, and keeps the index current per file: on Linux an inotify
+watch reports exactly which files changed, elsewhere a cheap mtime/size
+scan (no parsing) finds them. Only changed files are re-read, so repeated
+queries from long-running processes like the gear MCP server are served
+from memory regardless of inventory size.
+
+Each partition is kept sorted both by filename (MCP pagination) and by
+manufacturer and name (menus and listings); both orders are patched with
+bisect as records change instead of being re-sorted. Slugs are unique
+across statuses, so moving an item between statuses is one rename plus an
+update of the partition it belongs to, without rescanning the directories
+or re-sorting. manage_gear.py, the gear MCP server and
+compile_gear.py all go through the store instead of globbing the
+directories themselves.
+"""
+
+import bisect
+import heapq
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import atomic_io
+import frontmatter_codec
+import yaml
+from file_watch import InotifyWatcher, is_data_file
+from gear_search import SearchIndex, SearchResult
+
+# Status -> directory relative to the gear directory, in display order
+STATUS_DIRS = (
+    ("active", "."),
+    ("sold", "sold"),
+    ("want", "want"),
+    ("archived", "archived"),
+)
+STATUSES = tuple(status for status, _ in STATUS_DIRS)
+
+# Statuses the site renders; archived gear is kept but never published
+PUBLISHED_STATUSES = ("active", "sold", "want")
+
+Loader = Callable[[Path], Any]
+DisplayKey = Tuple[str, str, str]
+
+
+def display_key(gear: Dict[str, Any]) -> DisplayKey:
+    """Sort by manufacturer and name; the filename keeps keys unique."""
+    return (str(gear.get('manufacturer') or ''), str(gear.get('name') or ''), gear['_filename'])
+
+
+def check_statuses(statuses: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """
+    Normalize a status selection (None means every status).
+
+    Returns:
+        The selected statuses in display order
+
+    Raises:
+        ValueError: If a status is unknown
+    """
+    if statuses is None:
+        return STATUSES
+    wanted = set(statuses)
+    unknown = wanted - set(STATUSES)
+    if unknown:
+        raise ValueError(f"Unknown status: {', '.join(sorted(unknown))} (valid: {', '.join(STATUSES)})")
+    return tuple(status for status in STATUSES if status in wanted)
+
+
+class GearStore:
+    """Gear records for every status directory, partitioned by status (thread-safe)."""
+
+    def __init__(self, gear_dir: Path, loader: Optional[Loader] = None, use_inotify: bool = True):
+        """
+        Build the store.
+
+        Args:
+            gear_dir: Active gear directory; the other statuses are its subdirectories
+            loader: Function parsing one file (default: frontmatter_codec.read_header)
+            use_inotify: Watch for changes with inotify when available
+        """
+        self.gear_dir = Path(gear_dir)
+        self.loader = loader or frontmatter_codec.read_header
+        self.directories = {status: self.gear_dir / subdir for status, subdir in STATUS_DIRS}
+        # Every record by filename, and the filenames in each status
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.partitions: Dict[str, Dict[str, Dict[str, Any]]] = {status: {} for status in STATUSES}
+        self.search_index = SearchIndex()
+        self.errors: Dict[str, Exception] = {}
+        self._status: Dict[str, str] = {}
+        self._stats: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        self._orders: Dict[str, Optional[List[str]]] = dict.fromkeys(STATUSES)
+        # Display keys of every record, and each status's keys in display order
+        self._keys: Dict[str, DisplayKey] = {}
+        self._display: Dict[str, Optional[List[DisplayKey]]] = dict.fromkeys(STATUSES)
+        self._watcher: Optional[InotifyWatcher] = None
+        self._watched: Tuple[str, ...] = ()
+
+        self.loads = 0
+        self._lock = threading.RLock()
+        if use_inotify:
+            watched = tuple(s for s in STATUSES if self.directories[s].is_dir())
+            try:
+                self._watcher = InotifyWatcher([self.directories[s] for s in watched])
+                self._watched = watched
+            except OSError:
+                self._watcher = None
+        self.rebuild()
+
+    def _relative(self, status: str, name: str) -> str:
+        """Return a file's path relative to the gear directory (error keys)."""
+        subdir = dict(STATUS_DIRS)[status]
+        return name if subdir == "." else f"{subdir}/{name}"
+
+    def _scan(self, statuses: Iterable[str] = STATUSES) -> Dict[Tuple[str, str], Tuple[int, int]]:
+        """Return {(status, filename): (mtime_ns, size)} for every gear file."""
+        stats = {}
+        for status in statuses:
+            try:
+                entries = list(os.scandir(self.directories[status]))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.is_file() or not is_data_file(Path(entry.name)):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                stats[(status, entry.name)] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def _stat(self, status: str, name: str) -> Optional[Tuple[int, int]]:
+        """Return (mtime_ns, size) of one file, or None if it doesn't exist."""
+        try:
+            st = (self.directories[status] / name).stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self, status: str, name: str) -> None:
+        """(Re)load one file, or drop it if it no longer exists."""
+        path = self.directories[status] / name
+        relative = self._relative(status, name)
+        self.errors.pop(relative, None)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self._stats.pop((status, name), None)
+            if self._status.get(name) == status:
+                self._drop(name)
+                # A duplicate in another status takes over
+                for other in STATUSES:
+                    if (other, name) in self._stats:
+                        self._load(other, name)
+                        break
+            return
+
+        self._stats[(status, name)] = (st.st_mtime_ns, st.st_size)
+        owner = self._status.get(name)
+        if owner is not None and owner != status and (owner, name) in self._stats:
+            self.errors[relative] = ValueError(f"{relative} duplicates {self._relative(owner, name)}")
+            return
+
+        self.loads += 1
+        try:
+            data = self.loader(path)
+        except (OSError, ValueError, UnicodeDecodeError, yaml.YAMLError) as e:
+            self._drop(name)
+            self.errors[relative] = e
+            return
+        if not isinstance(data, dict):
+            self._drop(name)
+            self.errors[relative] = ValueError(f"Not a gear mapping: {relative}")
+            return
+        self._put(status, name, data)
+
+    def _put(self, status: str, name: str, data: Dict[str, Any]) -> None:
+        """Index a record under a status."""
+        data['_filename'] = name
+        self.records[name] = data
+        self._assign(name, status)
+        self.search_index.add(name, data)
+
+    def _assign(self, name: str, status: str) -> None:
+        """Put an indexed record in a status partition, leaving any previous one."""
+        record = self.records[name]
+        previous = self._status.get(name)
+        if previous is not None and previous != status:
+            del self.partitions[previous][name]
+            order = self._orders[previous]
+            if order is not None:
+                del order[bisect.bisect_left(order, name)]
+        if previous != status:
+            order = self._orders[status]
+            if order is not None:
+                bisect.insort(order, name)
+        # Reloads can change manufacturer or name, so the display key is checked either way
+        old_key = self._keys.get(name)
+        key = display_key(record)
+        if previous != status or old_key != key:
+            if previous is not None and old_key is not None:
+                self._unsort(previous, old_key)
+            self._keys[name] = key
+            display = self._display[status]
+            if display is not None:
+                bisect.insort(display, key)
+        record['_status'] = status
+        self.partitions[status][name] = record
+        self._status[name] = status
+
+    def _drop(self, name: str) -> None:
+        """Remove a record from the index."""
+        status = self._status.pop(name, None)
+        if status is None:
+            return
+        del self.records[name]
+        del self.partitions[status][name]
+        order = self._orders[status]
+        if order is not None:
+            del order[bisect.bisect_left(order, name)]
+        key = self._keys.pop(name, None)
+        if key is not None:
+            self._unsort(status, key)
+        self.search_index.remove(name)
+
+    def _unsort(self, status: str, key: DisplayKey) -> None:
+        """Remove a display key from a status's display order."""
+        display = self._display[status]
+        if display is not None:
+            del display[bisect.bisect_left(display, key)]
+
+    def _order(self, status: str) -> List[str]:
+        """Return the filenames in one status, sorted (kept sorted once built)."""
+        order = self._orders[status]
+        if order is None:
+            order = self._orders[status] = sorted(self.partitions[status])
+        return order
+
+    def _merged(self, statuses: Sequence[str], after: Optional[str] = None) -> Iterable[str]:
+        """Iterate filenames of several statuses in one sorted sequence."""
+        orders = []
+        for status in statuses:
+            order = self._order(status)
+            start = bisect.bisect_right(order, after) if after else 0
+            orders.append(order[start:] if start else order)
+        return orders[0] if len(orders) == 1 else heapq.merge(*orders)
+
+    def _display_order(self, status: str) -> List[DisplayKey]:
+        """Return the display keys of one status, sorted (kept sorted once built)."""
+        display = self._display[status]
+        if display is None:
+            display = self._display[status] = sorted(self._keys[name] for name in self.partitions[status])
+        return display
+
+    def status_for_path(self, path: Path) -> Optional[str]:
+        """Return the status whose directory holds path (None if outside the store)."""
+        parent = Path(path).parent
+        for status, directory in self.directories.items():
+            if directory == parent:
+                return status
+        return None
+
+    def rebuild(self) -> None:
+        """Re-read every file from scratch."""
+        with self._lock:
+            self.records.clear()
+            for partition in self.partitions.values():
+                partition.clear()
+            self.search_index = SearchIndex()
+            self.errors.clear()
+            self._status.clear()
+            self._stats.clear()
+            self._orders = dict.fromkeys(STATUSES)
+            self._keys.clear()
+            self._display = dict.fromkeys(STATUSES)
+            # Display order, so the first copy of a duplicated slug wins
+            for status, name in self._scan():
+                self._load(status, name)
+
+    def refresh(self) -> int:
+        """
+        Re-read files changed since the last call.
+
+        Returns:
+            Number of files re-read or dropped
+        """
+        with self._lock:
+            changed = set()
+            unwatched = [s for s in STATUSES if s not in self._watched]
+            if self._watcher is not None:
+                for path in self._watcher.poll(0):
+                    status = self.status_for_path(path)
+                    # Events for the store's own writes and moves were already applied
+                    if status is not None and self._stat(status, path.name) != self._stats.get((status, path.name)):
+                        changed.add((status, path.name))
+            if unwatched:
+                # Without inotify, or for directories created after the watch started
+                current = self._scan(unwatched)
+                known = {key for key in self._stats if key[0] in unwatched}
+                changed |= {key for key in current.keys() | known
+                            if current.get(key) != self._stats.get(key)}
+
+            for status, name in sorted(changed, key=lambda key: (STATUSES.index(key[0]), key[1])):
+                self._load(status, name)
+            return len(changed)
+
+    def invalidate(self, path: Path) -> None:
+        """Re-read one file right away (e.g. after writing it)."""
+        status = self.status_for_path(path)
+        if status is None:
+            return
+        with self._lock:
+            self._load(status, Path(path).name)
+
+    def all(self, statuses: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Return gear records sorted by filename (shared; copy before mutating).
+
+        Args:
+            statuses: Statuses to include (default: all)
+
+        Raises:
+            ValueError: If a status is unknown
+        """
+        selected = check_statuses(statuses)
+        with self._lock:
+            self.refresh()
+            return [self.records[name] for name in self._merged(selected)]
+
+    def by_display(self, statuses: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Return gear records sorted by manufacturer and name (shared; copy before mutating).
+
+        Args:
+            statuses: Statuses to include (default: all)
+
+        Raises:
+            ValueError: If a status is unknown
+        """
+        selected = check_statuses(statuses)
+        with self._lock:
+            self.refresh()
+            orders = [self._display_order(status) for status in selected]
+            keys = orders[0] if len(orders) == 1 else heapq.merge(*orders)
+            return [self.records[key[2]] for key in keys]
+
+    def page(self, after: Optional[str] = None, limit: int = 50,
+             match: Optional[Callable[[Dict[str, Any]], bool]] = None,
+             statuses: Optional[Iterable[str]] = None) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Return one page of records sorted by filename (keyset pagination).
+
+        Args:
+            after: Filename of the last record of the previous page
+            limit: Maximum records on the page
+            match: Predicate records must satisfy (default: all)
+            statuses: Statuses to include (default: all)
+
+        Returns:
+            Tuple of (records, whether more matching records follow)
+
+        Raises:
+            ValueError: If a status is unknown
+        """
+        selected = check_statuses(statuses)
+        with self._lock:
+            self.refresh()
+            items: List[Dict[str, Any]] = []
+            for name in self._merged(selected, after):
+                record = self.records[name]
+                if match is not None and not match(record):
+                    continue
+                if len(items) == limit:
+                    return items, True
+                items.append(record)
+            return items, False
+
+    def get(self, slug: str, statuses: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """Return one gear record by slug (filename without .yaml), if it has one of statuses."""
+        selected = check_statuses(statuses)
+        with self._lock:
+            self.refresh()
+            record = self.records.get(f"{slug}.yaml")
+            if record is None or record['_status'] not in selected:
+                return None
+            return record
+
+    def status(self, slug: str) -> Optional[str]:
+        """Return the status of a slug, or None if there is no such gear."""
+        with self._lock:
+            self.refresh()
+            return self._status.get(f"{slug}.yaml")
+
+    def path(self, slug: str) -> Optional[Path]:
+        """Return the file of a slug in whichever status it has, or None."""
+        status = self.status(slug)
+        return self.directories[status] / f"{slug}.yaml" if status else None
+
+    def failures(self, statuses: Optional[Iterable[str]] = None) -> Dict[str, Exception]:
+        """
+        Return files that couldn't be indexed.
+
+        Args:
+            statuses: Statuses to report on (default: all)
+
+        Returns:
+            {path relative to the gear directory: error}
+        """
+        selected = check_statuses(statuses)
+        with self._lock:
+            self.refresh()
+            return {relative: error for relative, error in sorted(self.errors.items())
+                    if self.status_for_path(self.gear_dir / relative) in selected}
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of items per status."""
+        with self._lock:
+            self.refresh()
+            return {status: len(partition) for status, partition in self.partitions.items()}
+
+    def search(self, query: str, limit: int = 10,
+               statuses: Optional[Iterable[str]] = None) -> List[SearchResult]:
+        """
+        Ranked full-text search over the current records.
+
+        Args:
+            query: Free text query (typos and partial words are tolerated)
+            limit: Maximum number of results
+            statuses: Statuses to include (default: all)
+
+        Returns:
+            Results ordered by descending score; keys are filenames
+
+        Raises:
+            ValueError: If a status is unknown
+        """
+        selected = check_statuses(statuses)
+        with self._lock:
+            self.refresh()
+            if selected == STATUSES:
+                return self.search_index.search(query, limit)
+            # Over-fetch until enough hits survive the status filter
+            fetch = limit
+            while True:
+                hits = self.search_index.search(query, fetch)
+                kept = [hit for hit in hits if self._status.get(hit.key) in selected]
+                if len(kept) >= limit or len(hits) < fetch:
+                    return kept[:limit]
+                fetch *= 4
+
+    def move(self, slug: str, status: str) -> Path:
+        """
+        Move one item to another status.
+
+        The file is renamed into the status directory (created if needed)
+        and the record switches partition in place without being re-parsed,
+        re-indexed or re-sorted.
+
+        Args:
+            slug: Gear filename without .yaml
+            status: Target status
+
+        Returns:
+            New path of the file
+
+        Raises:
+            KeyError: If there is no such gear
+            ValueError: If the status is unknown
+            FileExistsError: If the target directory already has the file
+        """
+        check_statuses([status])
+        name = f"{slug}.yaml"
+        with self._lock:
+            self.refresh()
+            current = self._status.get(name)
+            if current is None:
+                raise KeyError(f"Gear not found: {slug}")
+            src = self.directories[current] / name
+            dst = self.directories[status] / name
+            if current == status:
+                return dst
+
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_io.locked_many([src, dst]):
+                if dst.exists():
+                    raise FileExistsError(f"{self._relative(status, name)} already exists")
+                os.rename(src, dst)
+            atomic_io.fsync_dir(dst.parent)
+
+            del self._stats[(current, name)]
+            st = dst.stat()
+            self._stats[(status, name)] = (st.st_mtime_ns, st.st_size)
+            self._assign(name, status)
+            return dst
+
+    def close(self) -> None:
+        """Stop watching the directories."""
+        if self._watcher is not None:
+            self._watcher.close()
+            self._watcher = None
+            self._watched = ()
+
+    def __len__(self) -> int:
+        return len(self.records)
@@ -0,0 +1,515 @@
+#!/usr/bin/env python3
+"""
+Generate Hugo markdown content from YAML data files.
+
+In-process replacement for the yq/sed/awk pipeline that used to live in
+generate-markdown.sh. Output is byte-for-byte identical to that pipeline:
+the YAML frontmatter is copied verbatim (only the body keys are removed),
+and descriptions are converted to HTML paragraphs with linkified URLs.
+
+Unchanged outputs are never rewritten, so Hugo only re-renders pages whose
+content actually changed. A manifest in .cache/ maps each data file hash
+to its output hash; --incremental uses it to skip unchanged sources, and
+--file regenerates a single item.
+
+Usage:
+    python generate_markdown.py [live|music|media|all] [--incremental] [--jobs N]
+    python generate_markdown.py --file website/data/live/<gig>.yaml
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import frontmatter_codec
+import yaml
+
+CONTENT_TYPES = ("live", "music", "media")
+
+# Bump when rendering changes so cached output hashes are not trusted
+MANIFEST_VERSION = 1
+
+DEFAULT_MANIFEST_NAME = "markdown-manifest.json"
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+# sed -E 's|(https?://[^[:space:]]+)|...|g' from the original pipeline
+URL_RE = re.compile(r'(https?://[^ \t\n\r\f\v]+)')
+URL_LINK = r'<a href="\1" target="_blank" rel="noopener noreferrer">\1</a>'
+
+# A top-level mapping key, optionally quoted (e.g. `description:` or `"content":`)
+TOP_LEVEL_KEY_RE = re.compile(r'''^(["']?)([^\s"':#][^"':]*)\1[ \t]*:(?:[ \t]|$)''')
+
+
+def text_to_html(text: str) -> str:
+    """
+    Convert plain text to HTML paragraphs with linkified URLs.
+
+    Blank lines separate paragraphs, single newlines become <br>.
+    Mirrors the sed/awk text_to_html from the original shell pipeline.
+
+    Args:
+        text: Plain text
+
+    Returns:
+        HTML string without a trailing newline
+    """
+    text = URL_RE.sub(URL_LINK, text.rstrip('\n'))
+
+    output = []
+    in_para = False
+    for line in text.split('\n'):
+        if not line.strip(' \t'):
+            if in_para:
+                output.append('</p>\n\n')
+                in_para = False
+        else:
+            output.append('<br>\n' if in_para else '<p>')
+            in_para = True
+            output.append(line)
+    if in_para:
+        output.append('</p>')
+
+    return ''.join(output).rstrip('\n')
+
+
+def strip_top_level_keys(yaml_text: str, keys: Sequence[str]) -> str:
+    """
+    Remove top-level keys (and their nested values) from YAML text.
+
+    Works on the text rather than re-dumping parsed data, so quoting,
+    key order and formatting of everything else is preserved.
+
+    Args:
+        yaml_text: YAML mapping document
+        keys: Top-level keys to remove
+
+    Returns:
+        YAML text with a trailing newline
+    """
+    lines = yaml_text.split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()
+
+    kept: List[str] = []
+    i = 0
+    while i < len(lines):
+        match = TOP_LEVEL_KEY_RE.match(lines[i])
+        if not match or match.group(2).rstrip() not in keys:
+            kept.append(lines[i])
+            i += 1
+            continue
+
+        # Skip the key line and its block: indented lines, indentless
+        # sequence items, and blank lines inside the block
+        i += 1
+        while i < len(lines):
+            line = lines[i]
+            if line[:1] in (' ', '\t') or (line.startswith('-') and not line.startswith('---')):
+                i += 1
+            elif not line.strip():
+                ahead = i
+                while ahead < len(lines) and not lines[ahead].strip():
+                    ahead += 1
+                if ahead < len(lines) and lines[ahead][:1] in (' ', '\t'):
+                    i = ahead
+                else:
+                    break
+            else:
+                break
+
+    return ''.join(line + '\n' for line in kept)
+
+
+def scalar_text(value: Any) -> str:
+    """Render a YAML value the way `yq eval '.key // ""'` prints it."""
+    if value is None or value is False:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true"
+    if isinstance(value, (dict, list)):
+        return frontmatter_codec.dump(value)
+    return str(value)
+
+
+def split_source(text: str) -> Tuple[str, Dict[str, Any], str]:
+    """
+    Split a data file into its YAML text, parsed data and body.
+
+    Data files are normally pure YAML; files written in frontmatter format
+    by the manage_* tools carry the description as body instead.
+
+    Returns:
+        Tuple of (yaml_text, data, body)
+    """
+    header, body = frontmatter_codec.split(text)
+    if header is None:
+        header, body = text, ""
+    data = frontmatter_codec.load(header) or {}
+    if not isinstance(data, dict):
+        raise ValueError("Data file must be a YAML mapping")
+    return header, data, body.strip()
+
+
+def render_with_body(text: str, body_key: str, drop_keys: Sequence[str]) -> str:
+    """Render frontmatter without drop_keys followed by body_key as HTML."""
+    yaml_text, data, body = split_source(text)
+    body_text = scalar_text(data.get(body_key)) or body
+    return (
+        "---\n"
+        + strip_top_level_keys(yaml_text, drop_keys)
+        + "---\n\n"
+        + text_to_html(body_text)
+        + "\n"
+    )
+
+
+def render_live(text: str) -> str:
+    """Render a live performance data file as Hugo markdown."""
+    return render_with_body(text, 'description', ('description', 'content'))
+
+
+def render_music(text: str) -> str:
+    """Render a music release data file as Hugo markdown."""
+    return render_with_body(text, 'content', ('content',))
+
+
+def render_media(text: str) -> str:
+    """Render a media data file as Hugo markdown (frontmatter only)."""
+    yaml_text, _data, _body = split_source(text)
+    if not yaml_text.endswith('\n'):
+        yaml_text += '\n'
+    return "---\n" + yaml_text + "\n---\n"
+
+
+RENDERERS: Dict[str, Callable[[str], str]] = {
+    'live': render_live,
+    'music': render_music,
+    'media': render_media,
+}
+
+
+def output_path(content_type: str, yaml_file: Path, content_dir: Path) -> Path:
+    """Return the markdown path generated from a data file."""
+    return content_dir / content_type / f"{yaml_file.stem}.md"
+
+
+def content_hash(data: bytes) -> str:
+    """Return the SHA-256 hex digest used in the manifest."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class GenerateResult(NamedTuple):
+    """Outcome of generating one data file."""
+    content_type: str
+    source: Path
+    output: Path
+    status: str  # one of WRITTEN, IDENTICAL, UNCHANGED, REMOVED
+    source_hash: Optional[str] = None
+    output_hash: Optional[str] = None
+
+
+WRITTEN = "written"
+IDENTICAL = "identical"
+UNCHANGED = "unchanged"
+REMOVED = "removed"
+
+
+class Manifest:
+    """On-disk map of data file hash to generated markdown hash."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self.dirty = False
+        self._read()
+
+    def _read(self) -> None:
+        """Load entries, discarding unreadable or outdated manifests."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if isinstance(payload, dict) and payload.get('version') == MANIFEST_VERSION:
+            self.entries = payload.get('entries', {})
+
+    def save(self) -> None:
+        """Persist the manifest if anything changed."""
+        if not self.dirty:
+            return
+
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': MANIFEST_VERSION, 'entries': self.entries}, f,
+                          indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError as e:
+            # The manifest is only a cache; the next run regenerates everything
+            tmp_path.unlink(missing_ok=True)
+            print(f"⚠ Could not save markdown manifest: {e}", file=sys.stderr)
+
+    def get(self, source: Path) -> Optional[Dict[str, str]]:
+        """Return the recorded hashes for a data file."""
+        return self.entries.get(os.path.abspath(source))
+
+    def record(self, result: GenerateResult) -> None:
+        """Record (or drop) the hashes from a generation result."""
+        key = os.path.abspath(result.source)
+        if result.status == REMOVED:
+            if self.entries.pop(key, None) is not None:
+                self.dirty = True
+            return
+
+        entry = {'source': result.source_hash, 'output': result.output_hash}
+        if self.entries.get(key) != entry:
+            self.entries[key] = entry
+            self.dirty = True
+
+
+def default_manifest_path(project_root: Path) -> Path:
+    """Return the manifest location for a project checkout."""
+    return project_root / ".cache" / DEFAULT_MANIFEST_NAME
+
+
+def generate_file(content_type: str, yaml_file: Path, content_dir: Path,
+                  known: Optional[Dict[str, str]] = None) -> GenerateResult:
+    """
+    Generate one markdown file from one data file.
+
+    The output is only written when its content changes, so Hugo does not
+    see a new mtime for pages that render the same. When ``known`` hashes
+    match both the source and the existing output, rendering is skipped.
+
+    Args:
+        content_type: live, music or media
+        yaml_file: Source data file
+        content_dir: website/content directory
+        known: Manifest entry from the previous run (incremental mode)
+
+    Returns:
+        GenerateResult describing what happened
+    """
+    md_file = output_path(content_type, yaml_file, content_dir)
+
+    source = yaml_file.read_bytes()
+    source_hash = content_hash(source)
+
+    try:
+        existing: Optional[bytes] = md_file.read_bytes()
+    except FileNotFoundError:
+        existing = None
+    existing_hash = content_hash(existing) if existing is not None else None
+
+    if known and known.get('source') == source_hash and known.get('output') == existing_hash:
+        return GenerateResult(content_type, yaml_file, md_file, UNCHANGED, source_hash, existing_hash)
+
+    rendered = RENDERERS[content_type](source.decode('utf-8')).encode('utf-8')
+    output_hash = content_hash(rendered)
+    if rendered == existing:
+        return GenerateResult(content_type, yaml_file, md_file, IDENTICAL, source_hash, output_hash)
+
+    md_file.parent.mkdir(parents=True, exist_ok=True)
+    md_file.write_bytes(rendered)
+    return GenerateResult(content_type, yaml_file, md_file, WRITTEN, source_hash, output_hash)
+
+
+def remove_output(content_type: str, yaml_file: Path, content_dir: Path) -> GenerateResult:
+    """Remove the markdown generated from a data file that no longer exists."""
+    md_file = output_path(content_type, yaml_file, content_dir)
+    md_file.unlink(missing_ok=True)
+    return GenerateResult(content_type, yaml_file, md_file, REMOVED)
+
+
+def _generate_job(job: Tuple[str, Path, Path, Optional[Dict[str, str]]]) -> GenerateResult:
+    """Process pool entry point."""
+    return generate_file(*job)
+
+
+def collect_sources(content_type: str, data_dir: Path) -> List[Tuple[str, Path]]:
+    """
+    List (content_type, data file) pairs for a target.
+
+    Args:
+        content_type: live, music, media or all
+        data_dir: website/data directory
+
+    Returns:
+        Sorted list of sources
+    """
+    types = CONTENT_TYPES if content_type == 'all' else (content_type,)
+    sources = []
+    for kind in types:
+        sources.extend((kind, path) for path in sorted((data_dir / kind).glob("*.yaml")) if path.is_file())
+    return sources
+
+
+def source_type(path: Path, data_dir: Path) -> str:
+    """
+    Return the content type of a data file from its location.
+
+    Raises:
+        ValueError: If the file is not directly under a content section
+    """
+    try:
+        relative = Path(os.path.abspath(path)).relative_to(os.path.abspath(data_dir))
+    except ValueError:
+        raise ValueError(f"Not a data file: {path}") from None
+    if len(relative.parts) != 2 or relative.parts[0] not in CONTENT_TYPES or relative.suffix != '.yaml':
+        raise ValueError(f"Not a data file: {path}")
+    return relative.parts[0]
+
+
+def run_jobs(jobs: List[Tuple[str, Path, Path, Optional[Dict[str, str]]]],
+             workers: int) -> List[GenerateResult]:
+    """Run generation jobs, fanning out across a process pool for large batches."""
+    if workers > 1 and len(jobs) >= PARALLEL_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_generate_job, jobs, chunksize=16))
+    return [_generate_job(job) for job in jobs]
+
+
+def report(results: List[GenerateResult]) -> None:
+    """Print written files and a one-line summary."""
+    for result in results:
+        if result.status == WRITTEN:
+            print(f"Generating {result.output}")
+        elif result.status == REMOVED:
+            print(f"Removing {result.output}")
+
+    written = sum(1 for r in results if r.status == WRITTEN)
+    skipped = sum(1 for r in results if r.status in (IDENTICAL, UNCHANGED))
+    print(f"✓ {written} written, {skipped} unchanged")
+
+
+def generate(content_type: str, project_root: Path, jobs: Optional[int] = None,
+             incremental: bool = False, verbose: bool = True) -> List[GenerateResult]:
+    """
+    Generate markdown for a content type (or all of them).
+
+    Large batches fan out across a process pool; small ones run inline.
+    Unchanged outputs are never rewritten. In incremental mode data files
+    whose hash matches the manifest (and whose output is intact) are not
+    rendered at all.
+
+    Args:
+        content_type: live, music, media or all
+        project_root: Project root directory
+        jobs: Worker processes (default: CPU count)
+        incremental: Skip sources unchanged since the last run
+        verbose: Print per-file progress and a summary
+
+    Returns:
+        One GenerateResult per data file
+
+    Raises:
+        ValueError: If content_type is unknown
+    """
+    if content_type != 'all' and content_type not in CONTENT_TYPES:
+        raise ValueError(f"Unknown content type: {content_type}")
+
+    data_dir = project_root / "website" / "data"
+    content_dir = project_root / "website" / "content"
+    manifest = Manifest(default_manifest_path(project_root))
+
+    job_list = [
+        (kind, path, content_dir, manifest.get(path) if incremental else None)
+        for kind, path in collect_sources(content_type, data_dir)
+    ]
+    results = run_jobs(job_list, jobs or os.cpu_count() or 1)
+
+    for result in results:
+        manifest.record(result)
+    manifest.save()
+
+    if verbose:
+        report(results)
+    return results
+
+
+def generate_paths(paths: Iterable[Path], project_root: Path, verbose: bool = True) -> List[GenerateResult]:
+    """
+    Regenerate markdown for specific data files only.
+
+    Used by the manage_* tools after touching a single item. Paths that no
+    longer exist (deleted or renamed items) have their markdown removed.
+
+    Args:
+        paths: Data files under website/data/<type>/
+        project_root: Project root directory
+        verbose: Print per-file progress and a summary
+
+    Returns:
+        One GenerateResult per path
+
+    Raises:
+        ValueError: If a path is not a data file
+    """
+    data_dir = project_root / "website" / "data"
+    content_dir = project_root / "website" / "content"
+    manifest = Manifest(default_manifest_path(project_root))
+
+    results = []
+    for path in paths:
+        content_type = source_type(path, data_dir)
+        if path.exists():
+            results.append(generate_file(content_type, path, content_dir, manifest.get(path)))
+        else:
+            results.append(remove_output(content_type, path, content_dir))
+
+    for result in results:
+        manifest.record(result)
+    manifest.save()
+
+    if verbose:
+        report(results)
+    return results
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    project_root = Path(__file__).parent.parent
+
+    try:
+        if args.file:
+            generate_paths([Path(p) for p in args.file], project_root)
+        else:
+            generate(args.type, project_root, jobs=args.jobs, incremental=args.incremental)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"✗ Error generating markdown: {e}", file=sys.stderr)
+        return 1
+
+    print("✅ Markdown generation complete")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('type', nargs='?', default='all', choices=CONTENT_TYPES + ('all',),
+                        help='Content type to generate (default: all)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only render data files that changed since the last run')
+    parser.add_argument('--file', action='append', metavar='PATH',
+                        help='Regenerate only this data file (repeatable)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Worker processes for large batches (default: CPU count)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Image dimension and placeholder manifest for the templates.
+
+Records, for every image under website/assets/media, website/static/media
+and website/assets/images, its intrinsic width and height, dominant color and a
+tiny inline JPEG (LQIP) in website/data/image_manifest.json. Templates look
+images up by site path (e.g. media/live/<gig>/<file>.jpg) to emit width and
+height attributes and a placeholder background without decoding the image,
+so the browser reserves space and gig pages don't shift while photos load.
+
+Entries carry the image's SHA-256 and are only recomputed when it changes.
+The media tools update the manifest as they add images; this script
+backfills and prunes it for images already in the tree.
+
+Requires Pillow.
+
+Usage:
+    python image_manifest.py [PATH ...] [--check] [--workers N]
+"""
+
+import argparse
+import base64
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import atomic_io
+import image_optimizer
+import media_store
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+MANIFEST_VERSION = 1
+
+# Trees whose images are served under the site root, relative to website/
+IMAGE_ROOTS = ("assets", "static")
+DEFAULT_PATHS = (Path("assets/media"), Path("static/media"), Path("assets/images"))
+
+LQIP_SIZE = 16
+LQIP_QUALITY = 40
+PALETTE_SIZE = 5
+
+
+def default_manifest_path(website_dir: Path) -> Path:
+    """Return the manifest location for a Hugo site."""
+    return website_dir / "data" / "image_manifest.json"
+
+
+def manifest_key(path: Path, website_dir: Path) -> Optional[str]:
+    """
+    Return an image's site path, the key templates look it up by.
+
+    Args:
+        path: Image under website/assets or website/static
+        website_dir: Hugo site directory
+
+    Returns:
+        Path relative to its tree (e.g. media/live/gig/photo.jpg), or None
+        if the image is outside both trees
+    """
+    for root in IMAGE_ROOTS:
+        try:
+            return Path(os.path.abspath(path)).relative_to(os.path.abspath(website_dir / root)).as_posix()
+        except ValueError:
+            continue
+    return None
+
+
+def dominant_color(image: "Image.Image") -> str:
+    """Return the most common color of an image as #rrggbb."""
+    small = image.convert("RGB")
+    small.thumbnail((64, 64))
+    palette_image = small.quantize(colors=PALETTE_SIZE)
+    palette = palette_image.getpalette()
+    _count, index = max(palette_image.getcolors())
+    r, g, b = palette[index * 3:index * 3 + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def lqip(image: "Image.Image") -> str:
+    """Return a tiny blurred-up JPEG of an image as a data URI."""
+    small = image.convert("RGB")
+    small.thumbnail((LQIP_SIZE, LQIP_SIZE), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    small.save(buffer, "JPEG", quality=LQIP_QUALITY, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def describe(path: Path, sha256: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Measure one image.
+
+    Args:
+        path: Image file
+        sha256: Content hash, if already known
+
+    Returns:
+        Entry with width, height, color, lqip and sha256
+
+    Raises:
+        OSError: If the file can't be read or isn't an image
+        RuntimeError: If Pillow isn't installed
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is not installed")
+    with Image.open(path) as image:
+        image = ImageOps.exif_transpose(image)
+        width, height = image.size
+        return {
+            "width": width,
+            "height": height,
+            "color": dominant_color(image),
+            "lqip": lqip(image),
+            "sha256": sha256 or media_store.hash_file(path),
+        }
+
+
+def _describe_job(job: Tuple[Path, str]) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Process pool entry point; returns (entry, error)."""
+    try:
+        return describe(*job), ""
+    except (OSError, ValueError, RuntimeError) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def load_manifest(manifest_path: Path) -> Dict[str, Dict[str, Any]]:
+    """Return the manifest's image entries, or an empty mapping."""
+    try:
+        payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if isinstance(payload, dict) and payload.get("version") == MANIFEST_VERSION:
+        return payload.get("images", {})
+    return {}
+
+
+def render_manifest(images: Dict[str, Dict[str, Any]]) -> str:
+    """Serialize the manifest deterministically, one image per line."""
+    lines = [f"    {json.dumps(key)}: {json.dumps(images[key], sort_keys=True)}" for key in sorted(images)]
+    body = ",\n".join(lines)
+    return f'{{\n  "version": {MANIFEST_VERSION},\n  "images": {{\n{body}\n  }}\n}}\n'
+
+
+def find_images(paths: Iterable[Path]) -> List[Path]:
+    """Return image files under the given files and directories."""
+    images = []
+    for path in paths:
+        candidates = path.rglob("*") if path.is_dir() else [path]
+        images.extend(p for p in candidates if p.is_file() and not p.name.startswith(".")
+                      and p.suffix.lower() in media_store.MEDIA_SUFFIXES)
+    return sorted(set(images))
+
+
+def build_manifest(website_dir: Path, images: Iterable[Path], existing: Dict[str, Dict[str, Any]],
+                   prune: bool = False, workers: Optional[int] = None,
+                   hashes: Optional[Dict[Path, str]] = None) -> Tuple[Dict[str, Dict[str, Any]], int, List[str]]:
+    """
+    Merge entries for the given images into a manifest.
+
+    Args:
+        website_dir: Hugo site directory
+        images: Image files to (re)describe if their content changed
+        existing: Current manifest entries
+        prune: Drop entries whose image no longer exists
+        workers: Process pool size (default: CPU count)
+        hashes: Known content hashes by path, to skip re-reading
+
+    Returns:
+        Tuple of (manifest entries, number of entries (re)computed, errors)
+    """
+    hashes = hashes or {}
+    manifest = dict(existing)
+    if prune:
+        manifest = {key: entry for key, entry in manifest.items()
+                    if any((website_dir / root / key).exists() for root in IMAGE_ROOTS)}
+
+    jobs = []
+    for path in images:
+        key = manifest_key(path, website_dir)
+        if key is None:
+            continue
+        sha256 = hashes.get(path) or media_store.hash_file(path)
+        if manifest.get(key, {}).get("sha256") != sha256:
+            jobs.append((key, path, sha256))
+
+    errors = []
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    tasks = [(path, sha256) for _, path, sha256 in jobs]
+    if workers <= 1:
+        results = [_describe_job(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_describe_job, tasks))
+    for (key, _, _), (entry, error) in zip(jobs, results):
+        if entry is None:
+            errors.append(f"{key}: {error}")
+        else:
+            manifest[key] = entry
+    return manifest, len(jobs) - len(errors), errors
+
+
+def update_manifest(website_dir: Path, images: Iterable[Path], manifest_path: Optional[Path] = None,
+                    prune: bool = False, workers: Optional[int] = None,
+                    hashes: Optional[Dict[Path, str]] = None) -> Tuple[int, List[str]]:
+    """
+    Describe new or changed images and write the manifest if it changed.
+
+    Args:
+        website_dir: Hugo site directory
+        images: Image files to record
+        manifest_path: Manifest file (default: website/data/image_manifest.json)
+        prune: Drop entries whose image no longer exists
+        workers: Process pool size (default: CPU count)
+        hashes: Known content hashes by path, to skip re-reading
+
+    Returns:
+        Tuple of (number of entries (re)computed, per-image errors)
+
+    Raises:
+        OSError: If the manifest can't be written
+    """
+    manifest_path = manifest_path or default_manifest_path(website_dir)
+    with atomic_io.locked(manifest_path):
+        existing = load_manifest(manifest_path)
+        manifest, updated, errors = build_manifest(website_dir, images, existing, prune, workers, hashes)
+        text = render_manifest(manifest)
+        try:
+            unchanged = manifest_path.read_text(encoding="utf-8") == text
+        except FileNotFoundError:
+            unchanged = False
+        if not unchanged:
+            manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_io.write_text(manifest_path, text)
+    return updated, errors
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    website_dir = Path(__file__).parent.parent / "website"
+    manifest_path = default_manifest_path(website_dir)
+
+    if not image_optimizer.available():
+        print("✗ Pillow is not installed (pip install Pillow)")
+        return 1
+
+    backfill = not args.paths
+    images = find_images(args.paths or [website_dir / path for path in DEFAULT_PATHS])
+
+    if args.check:
+        existing = load_manifest(manifest_path)
+        manifest, updated, errors = build_manifest(website_dir, images, existing, prune=backfill,
+                                                   workers=args.workers)
+        if manifest != existing:
+            print(f"✗ {manifest_path.relative_to(website_dir.parent)} is out of date "
+                  f"({updated} images to describe)")
+            print("  Run: make media-manifest")
+            return 1
+        print(f"✓ Image manifest is up to date ({len(existing)} images)")
+        return 0
+
+    try:
+        updated, errors = update_manifest(website_dir, images, manifest_path, prune=backfill,
+                                          workers=args.workers)
+    except OSError as e:
+        print(f"✗ Error writing image manifest: {e}", file=sys.stderr)
+        return 1
+    for error in errors:
+        print(f"✗ {error}")
+    print(f"✓ Described {updated} of {len(images)} images in {manifest_path.relative_to(website_dir.parent)}")
+    return 1 if errors else 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', type=Path,
+                        help='Images or directories (default: all of assets/media, static/media and assets/images, '
+                             'pruning entries for deleted images)')
+    parser.add_argument('--check', action='store_true',
+                        help='Exit with 1 if the manifest is out of date instead of writing it')
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: CPU count)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Offline optimizer for source photos and posters.
+
+Camera originals (multi-megabyte, 6000px) make every cold Hugo build spend
+minutes in .Resize. Before an image enters website/assets or static, this
+module:
+
+- applies the EXIF orientation, then drops EXIF (camera data, GPS);
+- caps the longest side at MAX_DIMENSION (the largest rendition the
+  templates produce is 1600px wide, so this leaves headroom);
+- recompresses JPEGs (progressive, optimized) and PNGs.
+
+Work runs on a process pool. Pillow is optional: without it images are
+stored as they are and a warning says so.
+
+manage_media.py (add_pictures, add_standalone_picture) and manage_live.py
+(create_live posters) call it on every new image; this script is the bulk
+command for images already in the tree.
+
+Usage:
+    python image_optimizer.py [PATH ...] [--dry-run] [--hugo] [--workers N]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+import media_store
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+MAX_DIMENSION = 2400
+JPEG_QUALITY = 86
+
+# Animated GIFs and already-modern formats are left alone
+OPTIMIZABLE_SUFFIXES = (".jpg", ".jpeg", ".png")
+
+# Bulk command defaults, relative to the project root
+DEFAULT_PATHS = (Path("website/assets/media"), Path("website/static/media"), Path("website/assets/images"))
+
+# Re-encoding alone must save this fraction, so repeated runs don't recompress forever
+MIN_SAVING = 0.05
+
+EXIF_ORIENTATION = 0x0112
+
+PILLOW_MISSING = "⚠ Pillow is not installed; images are stored unoptimized (pip install Pillow)"
+
+
+class OptimizeResult(NamedTuple):
+    """Outcome of optimizing one image."""
+    source: Path
+    path: Path
+    before: int
+    after: int
+    changed: bool = False
+    error: str = ""
+
+    @property
+    def saved(self) -> int:
+        """Bytes saved (0 if unchanged or failed)."""
+        return self.before - self.after if self.changed else 0
+
+
+def available() -> bool:
+    """Return whether Pillow is installed."""
+    return Image is not None
+
+
+def is_optimizable(path: Path) -> bool:
+    """Return whether the optimizer handles this file type."""
+    return path.suffix.lower() in OPTIMIZABLE_SUFFIXES
+
+
+def optimize_file(source: Path, dest: Optional[Path] = None, max_dimension: int = MAX_DIMENSION,
+                  quality: int = JPEG_QUALITY, dry_run: bool = False) -> OptimizeResult:
+    """
+    Orient, downscale, strip and recompress one image.
+
+    The result replaces dest (default: source, in place) atomically, and
+    only if something was gained: the image was rotated, resized or
+    carried EXIF, or recompressing saved at least MIN_SAVING. Otherwise dest is
+    left alone (and not created when it differs from source).
+
+    Args:
+        source: Image to read
+        dest: Where to write the optimized image (default: source)
+        max_dimension: Longest side after optimizing, in pixels
+        quality: JPEG quality
+        dry_run: Measure the result but write nothing
+
+    Returns:
+        OptimizeResult; path is the file to use afterwards (dest if
+        changed, else source)
+    """
+    source = Path(source)
+    dest = Path(dest) if dest is not None else source
+    try:
+        before = source.stat().st_size
+    except OSError as e:
+        return OptimizeResult(source, source, 0, 0, error=str(e))
+    if Image is None:
+        return OptimizeResult(source, source, before, before, error="Pillow is not installed")
+    if not is_optimizable(source):
+        return OptimizeResult(source, source, before, before)
+
+    tmp = None
+    try:
+        with Image.open(source) as image:
+            image_format = image.format
+            exif = image.getexif()
+            has_metadata = bool(exif) or "exif" in image.info
+            oriented = exif.get(EXIF_ORIENTATION, 1) not in (1, None)
+            icc_profile = image.info.get("icc_profile")
+
+            image = ImageOps.exif_transpose(image)
+            resized = max(image.size) > max_dimension
+            if resized:
+                image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+            fd, name = tempfile.mkstemp(prefix=f".{dest.name}.", suffix=".tmp", dir=dest.parent)
+            os.close(fd)
+            tmp = Path(name)
+            if image_format == "JPEG":
+                if image.mode not in ("RGB", "L", "CMYK"):
+                    image = image.convert("RGB")
+                image.save(tmp, "JPEG", quality=quality, optimize=True, progressive=True,
+                           icc_profile=icc_profile)
+            else:
+                image.save(tmp, image_format, optimize=True, icc_profile=icc_profile)
+
+        after = tmp.stat().st_size
+        changed = resized or oriented or has_metadata or after < before * (1 - MIN_SAVING)
+        if not changed:
+            return OptimizeResult(source, source, before, before)
+        if dry_run:
+            return OptimizeResult(source, source, before, after, changed=True)
+        os.replace(tmp, dest)
+        tmp = None
+        return OptimizeResult(source, dest, before, after, changed=True)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        return OptimizeResult(source, source, before, before, error=f"{type(e).__name__}: {e}")
+    finally:
+        if tmp is not None:
+            tmp.unlink(missing_ok=True)
+
+
+def _optimize_job(job: Tuple[Path, Optional[Path], int, int, bool]) -> OptimizeResult:
+    """Process pool entry point."""
+    return optimize_file(*job)
+
+
+def optimize_many(jobs: List[Tuple[Path, Optional[Path]]], workers: Optional[int] = None,
+                  max_dimension: int = MAX_DIMENSION, quality: int = JPEG_QUALITY,
+                  dry_run: bool = False) -> List[OptimizeResult]:
+    """
+    Optimize several images on a process pool.
+
+    Args:
+        jobs: (source, dest) pairs; dest None means in place
+        workers: Pool size (default: CPU count)
+        max_dimension: Longest side after optimizing, in pixels
+        quality: JPEG quality
+        dry_run: Measure the results but write nothing
+
+    Returns:
+        Results in the order of jobs
+    """
+    tasks = [(Path(source), dest, max_dimension, quality, dry_run) for source, dest in jobs]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1 or Image is None:
+        return [_optimize_job(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_optimize_job, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+
+def summarize(results: List[OptimizeResult]) -> str:
+    """Return a one-line summary of bytes saved."""
+    before = sum(r.before for r in results)
+    after = sum(r.after if r.changed else r.before for r in results)
+    changed = sum(1 for r in results if r.changed)
+    percent = (before - after) * 100 / before if before else 0
+    return (f"{changed} of {len(results)} images, "
+            f"{before / 1024 / 1024:.1f} MB → {after / 1024 / 1024:.1f} MB ({percent:.0f}% saved)")
+
+
+def find_images(paths: List[Path]) -> List[Path]:
+    """Return optimizable images under the given files and directories."""
+    images = []
+    for path in paths:
+        candidates = path.rglob("*") if path.is_dir() else [path]
+        images.extend(p for p in candidates
+                      if p.is_file() and is_optimizable(p) and not p.name.startswith("."))
+    return sorted(set(images))
+
+
+def time_hugo_build(website_dir: Path) -> Optional[float]:
+    """
+    Time a cold Hugo build (no resource cache, rendered to memory).
+
+    Args:
+        website_dir: Hugo site directory
+
+    Returns:
+        Seconds, or None if Hugo isn't installed or the build failed
+    """
+    if not shutil.which("hugo"):
+        return None
+    with tempfile.TemporaryDirectory(prefix="obscvrat-hugo-") as cache_dir:
+        start = time.perf_counter()
+        result = subprocess.run(
+            ["hugo", "--quiet", "--renderToMemory", "--ignoreCache", "--cacheDir", cache_dir],
+            cwd=website_dir, capture_output=True, text=True,
+        )
+    if result.returncode != 0:
+        print(f"⚠ Hugo build failed: {result.stderr.strip()}")
+        return None
+    return time.perf_counter() - start
+
+
+def refresh_store(project_root: Path, results: List[OptimizeResult]) -> None:
+    """Re-register rewritten files with the media store so its hardlinks stay current."""
+    store = media_store.open_store(project_root)
+    for result in results:
+        if result.changed:
+            store.link(store.put(result.path), result.path)
+    store.save()
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    project_root = Path(__file__).parent.parent
+
+    if not available():
+        print("✗ Pillow is not installed (pip install Pillow)")
+        return 1
+
+    paths = args.paths or [project_root / path for path in DEFAULT_PATHS]
+    images = find_images(paths)
+    if not images:
+        print("⚠ No images found")
+        return 0
+
+    website_dir = project_root / "website"
+    hugo_before = time_hugo_build(website_dir) if args.hugo else None
+
+    start = time.perf_counter()
+    results = optimize_many([(image, None) for image in images], workers=args.workers,
+                            max_dimension=args.max_dimension, quality=args.quality, dry_run=args.dry_run)
+    elapsed = time.perf_counter() - start
+
+    failed = 0
+    for result in results:
+        if result.error:
+            failed += 1
+            print(f"✗ {result.source}: {result.error}")
+        elif result.changed:
+            print(f"✓ {os.path.relpath(result.source)}: "
+                  f"{result.before / 1024:.0f} KB → {result.after / 1024:.0f} KB")
+
+    if not args.dry_run:
+        refresh_store(project_root, results)
+
+    prefix = "Would optimize" if args.dry_run else "Optimized"
+    print(f"{prefix}: {summarize(results)} in {elapsed:.1f}s")
+
+    if args.hugo:
+        hugo_after = None if args.dry_run else time_hugo_build(website_dir)
+        if hugo_before is None:
+            print("⚠ Hugo not available; build time not measured")
+        elif hugo_after is not None:
+            print(f"Hugo cold build: {hugo_before:.1f}s before, {hugo_after:.1f}s after")
+        else:
+            print(f"Hugo cold build: {hugo_before:.1f}s")
+    return 1 if failed else 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('paths', nargs='*', type=Path,
+                        help='Images or directories (default: website media and image directories)')
+    parser.add_argument('--dry-run', action='store_true', help='Report savings without writing')
+    parser.add_argument('--hugo', action='store_true', help='Time a cold Hugo build before and after')
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: CPU count)')
+    parser.add_argument('--max-dimension', type=int, default=MAX_DIMENSION,
+                        help=f'Longest side in pixels (default: {MAX_DIMENSION})')
+    parser.add_argument('--quality', type=int, default=JPEG_QUALITY,
+                        help=f'JPEG quality (default: {JPEG_QUALITY})')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+WebP and AVIF variants of site images for <picture> sources.
+
+Hugo renders the JPEG sizes the templates fall back to, but it can't encode
+AVIF. For every image in website/data/image_manifest.json this script
+writes WebP and AVIF copies at each of WIDTHS it is at least as wide as
+into website/assets/variants
+(not committed; the deploy workflow builds and caches it). Variants are named
+after the source's SHA-256, so an image is only encoded again when its content
+changes, and encoding runs on a process pool. Images narrower than the
+smallest width get no variants, since a srcset entry must name the file's
+real width.
+
+The templates look variants up through the image-variant partial and only
+emit a <source> for files that exist, so a site built without this step
+serves JPEG as before.
+
+The report lists, per gig page, the bytes its poster and gallery thumbnails
+cost in each format. JPEG sizes are measured by encoding at Hugo's q85, so
+they approximate what Hugo serves.
+
+Requires Pillow (AVIF needs Pillow 11.3 or later).
+
+Usage:
+    python image_variants.py [--report] [--workers N]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import atomic_io
+import image_manifest
+import image_optimizer
+import yaml
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+    ImageOps = None
+    features = None
+
+# Bump when the index layout or encoder settings change
+VARIANTS_VERSION = 2
+
+WIDTHS = (400, 800, 1200, 1600)
+
+# Format: (Pillow format name, quality)
+FORMATS = {
+    "avif": ("AVIF", 50),
+    "webp": ("WEBP", 80),
+}
+
+LABELS = {"jpeg": "JPEG", "avif": "AVIF", "webp": "WebP"}
+
+# What Hugo's .Resize "...x q85" produces, for the report
+JPEG_QUALITY = 85
+
+# Rendered widths per gig page view, matching live/single.html
+POSTER_WIDTH = 800
+THUMB_WIDTH = 400
+
+
+class VariantResult(NamedTuple):
+    """Outcome of building one image's variants."""
+    sha256: str
+    sizes: Dict[str, Dict[str, int]]
+    written: int = 0
+    error: str = ""
+
+
+def default_variants_dir(website_dir: Path) -> Path:
+    """Return the variant directory for a Hugo site."""
+    return website_dir / "assets" / "variants"
+
+
+def variant_path(variants_dir: Path, sha256: str, width: int, image_format: str) -> Path:
+    """Return where a variant lives (mirrored by the image-variant partial)."""
+    return variants_dir / sha256[:2] / f"{sha256}-{width}.{image_format}"
+
+
+def available_formats() -> List[str]:
+    """Return the variant formats this Pillow can encode."""
+    if Image is None:
+        return []
+    return [name for name in FORMATS if features.check(name)]
+
+
+def plan_widths(width: int) -> List[int]:
+    """Return the widths to render for an image, never upscaling (none below the smallest)."""
+    return [w for w in WIDTHS if w <= width]
+
+
+def _encode(image: "Image.Image", image_format: str, **options: Any) -> bytes:
+    """Encode an image in memory."""
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def build_variants(source: Path, sha256: str, variants_dir: Path, formats: List[str]) -> VariantResult:
+    """
+    Render one image at every planned width and format.
+
+    Variants already on disk are kept; only missing ones are encoded.
+
+    Args:
+        source: Image file
+        sha256: Its content hash (names the variants)
+        variants_dir: Variant directory
+        formats: Formats to write (keys of FORMATS)
+
+    Returns:
+        VariantResult with byte sizes per width and format (plus "jpeg")
+    """
+    sizes: Dict[str, Dict[str, int]] = {}
+    written = 0
+    try:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image).convert("RGB")
+            for width in plan_widths(image.width):
+                resized = image.copy()
+                if width < image.width:
+                    resized = resized.resize((width, round(image.height * width / image.width)),
+                                             Image.Resampling.LANCZOS)
+                entry = {"jpeg": len(_encode(resized, "JPEG", quality=JPEG_QUALITY))}
+                for name in formats:
+                    dest = variant_path(variants_dir, sha256, width, name)
+                    if not dest.exists():
+                        pil_format, quality = FORMATS[name]
+                        dest.parent.mkdir(parents=True, exist_ok=True)
+                        fd, tmp = tempfile.mkstemp(prefix=f".{dest.name}.", suffix=".tmp", dir=dest.parent)
+                        try:
+                            with os.fdopen(fd, "wb") as f:
+                                f.write(_encode(resized, pil_format, quality=quality))
+                            os.replace(tmp, dest)
+                        finally:
+                            Path(tmp).unlink(missing_ok=True)
+                        written += 1
+                    entry[name] = dest.stat().st_size
+                sizes[str(width)] = entry
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        return VariantResult(sha256, {}, written, f"{type(e).__name__}: {e}")
+    return VariantResult(sha256, sizes, written)
+
+
+def _build_job(job: Tuple[Path, str, Path, List[str]]) -> VariantResult:
+    """Process pool entry point."""
+    return build_variants(*job)
+
+
+def load_index(variants_dir: Path) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """Return recorded variant sizes by source hash, or an empty mapping."""
+    try:
+        payload = json.loads((variants_dir / "index.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if isinstance(payload, dict) and payload.get("version") == VARIANTS_VERSION:
+        return payload.get("images", {})
+    return {}
+
+
+def is_complete(variants_dir: Path, sha256: str, sizes: Optional[Dict[str, Dict[str, int]]],
+                formats: List[str]) -> bool:
+    """Return whether an image was planned and every recorded variant of it is on disk."""
+    return sizes is not None and all(
+        name in entry and variant_path(variants_dir, sha256, int(width), name).exists()
+        for width, entry in sizes.items() for name in formats
+    )
+
+
+def prune(variants_dir: Path, keep: Dict[str, Any]) -> int:
+    """
+    Delete variants of images no longer in the manifest, or of widths no longer planned.
+
+    Args:
+        variants_dir: Variant directory
+        keep: Recorded sizes by source hash (index.json images)
+
+    Returns:
+        Number of files removed
+    """
+    removed = 0
+    for path in variants_dir.glob("??/*"):
+        sha256, _, width = path.stem.partition("-")
+        if width not in keep.get(sha256, {}):
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def update_variants(website_dir: Path, workers: Optional[int] = None,
+                    formats: Optional[List[str]] = None) -> Tuple[int, int, List[str]]:
+    """
+    Build missing variants for every image in the manifest.
+
+    Args:
+        website_dir: Hugo site directory
+        workers: Process pool size (default: CPU count)
+        formats: Formats to write (default: all this Pillow can encode)
+
+    Returns:
+        Tuple of (images encoded, files written, errors)
+
+    Raises:
+        OSError: If the variant index can't be written
+    """
+    formats = available_formats() if formats is None else formats
+    variants_dir = default_variants_dir(website_dir)
+    manifest = image_manifest.load_manifest(image_manifest.default_manifest_path(website_dir))
+    sources = {entry["sha256"]: key for key, entry in manifest.items()}
+
+    variants_dir.mkdir(parents=True, exist_ok=True)
+    with atomic_io.locked(variants_dir / "index.json"):
+        index = {sha: sizes for sha, sizes in load_index(variants_dir).items() if sha in sources}
+        jobs = []
+        for sha256, key in sorted(sources.items(), key=lambda item: item[1]):
+            if is_complete(variants_dir, sha256, index.get(sha256), formats):
+                continue
+            source = next((website_dir / root / key for root in image_manifest.IMAGE_ROOTS
+                           if (website_dir / root / key).exists()), None)
+            if source is not None:
+                jobs.append((source, sha256, variants_dir, formats))
+
+        workers = min(workers or os.cpu_count() or 1, len(jobs))
+        if workers <= 1:
+            results = [_build_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_build_job, jobs))
+
+        errors = []
+        for (source, _, _, _), result in zip(jobs, results):
+            if result.error:
+                errors.append(f"{source.name}: {result.error}")
+            else:
+                index[result.sha256] = result.sizes
+        prune(variants_dir, index)
+        atomic_io.write_text(variants_dir / "index.json",
+                             json.dumps({"version": VARIANTS_VERSION, "images": index}, indent=2, sort_keys=True) + "\n")
+    return len(jobs) - len(errors), sum(r.written for r in results), errors
+
+
+def _size_at(sizes: Dict[str, Dict[str, int]], width: int) -> Dict[str, int]:
+    """Return the sizes of the variant served for a rendered width."""
+    if not sizes:
+        return {}
+    fitting = [int(w) for w in sizes if int(w) <= width] or [min(int(w) for w in sizes)]
+    return sizes[str(max(fitting))]
+
+
+def page_weights(website_dir: Path) -> List[Tuple[str, int, Dict[str, int]]]:
+    """
+    Total the image bytes each gig page loads, per format.
+
+    A page view is the poster at POSTER_WIDTH plus every gallery thumbnail at
+    THUMB_WIDTH.
+
+    Args:
+        website_dir: Hugo site directory
+
+    Returns:
+        (gig, images counted, bytes by format) per gig with measured images
+    """
+    manifest = image_manifest.load_manifest(image_manifest.default_manifest_path(website_dir))
+    index = load_index(default_variants_dir(website_dir))
+    weights = []
+    for path in sorted((website_dir / "data" / "live").glob("*.yaml")):
+        try:
+            gig = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        except (OSError, yaml.YAMLError):
+            continue
+        images = []
+        if gig.get("poster"):
+            images.append((os.path.basename(gig["poster"]), POSTER_WIDTH))
+        pictures = ((gig.get("media") or {}).get("pictures") or {}).get("images") or []
+        images.extend((name, THUMB_WIDTH) for name in pictures)
+
+        totals: Dict[str, int] = {}
+        counted = 0
+        for name, width in images:
+            entry = manifest.get(f"media/live/{path.stem}/{name}")
+            sizes = _size_at(index.get(entry["sha256"], {}), width) if entry else {}
+            if not sizes:
+                continue
+            counted += 1
+            for image_format, size in sizes.items():
+                totals[image_format] = totals.get(image_format, 0) + size
+        if counted:
+            weights.append((path.stem, counted, totals))
+    return weights
+
+
+def report(website_dir: Path) -> None:
+    """Print image bytes per gig page by format."""
+    weights = page_weights(website_dir)
+    if not weights:
+        print("⚠ No measured gig images (run without --report first)")
+        return
+    formats = ["jpeg"] + [name for name in FORMATS if any(name in totals for _, _, totals in weights)]
+    grand = dict.fromkeys(formats, 0)
+    print("Image bytes per gig page (poster + gallery thumbnails):")
+    for gig, counted, totals in weights:
+        print(f"  {gig} ({counted} images): {_format_sizes(totals, formats)}")
+        for name in formats:
+            grand[name] += totals.get(name, 0)
+    print(f"  Total: {_format_sizes(grand, formats)}")
+
+
+def _format_sizes(totals: Dict[str, int], formats: List[str]) -> str:
+    """Format per-format byte totals relative to JPEG."""
+    jpeg = totals.get("jpeg", 0)
+    parts = [f"JPEG {jpeg / 1024:.0f} KB"]
+    for name in formats[1:]:
+        size = totals.get(name, 0)
+        saved = f" (-{(jpeg - size) * 100 / jpeg:.0f}%)" if jpeg else ""
+        parts.append(f"{LABELS[name]} {size / 1024:.0f} KB{saved}")
+    return ", ".join(parts)
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    website_dir = Path(__file__).parent.parent / "website"
+
+    if args.report:
+        report(website_dir)
+        return 0
+
+    if not image_optimizer.available():
+        print("✗ Pillow is not installed (pip install Pillow)")
+        return 1
+    formats = available_formats()
+    for name in FORMATS:
+        if name not in formats:
+            print(f"⚠ This Pillow can't encode {LABELS[name]}; skipping it (pip install -U Pillow)")
+
+    try:
+        encoded, written, errors = update_variants(website_dir, workers=args.workers, formats=formats)
+    except OSError as e:
+        print(f"✗ Error writing variants: {e}", file=sys.stderr)
+        return 1
+    for error in errors:
+        print(f"✗ {error}")
+    print(f"✓ Encoded {encoded} images ({written} variant files) in "
+          f"{default_variants_dir(website_dir).relative_to(website_dir.parent)}")
+    report(website_dir)
+    return 1 if errors else 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--report', action='store_true', help='Only print the per-gig byte report')
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: CPU count)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
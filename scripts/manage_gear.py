@@ -4,16 +4,35 @@ Gear inventory management tool for Obscvrat website.
 Manages YAML data files for musical gear (pedals, synths, instruments).
 
 For AI-assisted gear addition, just tell Kiro: "add BOSS BD-2 to gear"
+
+Usage:
+    python manage_gear.py                        # interactive menu
+    python manage_gear.py import FILE [--dry-run]
+
+Import files are CSV (header row with name, manufacturer, category,
+technology and optionally types, controls, url, description; list fields
+separated by ";") or JSONL (one gear object per line).
 """
 
+import argparse
+import csv
+import json
 import os
 import sys
-import yaml
 import re
 import shutil
 import subprocess
+import time
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import atomic_io
+import compile_gear
+import frontmatter_codec
+import gear_batch
+import yaml
+from content_index import ContentIndex, open_index
+from gear_store import STATUSES, GearStore
 
 # Set UTF-8 encoding for stdin/stdout
 if sys.stdin.encoding != 'utf-8':
@@ -21,7 +40,17 @@ if sys.stdin.encoding != 'utf-8':
 if sys.stdout.encoding != 'utf-8':
     sys.stdout.reconfigure(encoding='utf-8')
 
-GEAR_DIR = Path(__file__).parent.parent / "website" / "data" / "gear"
+PROJECT_ROOT = Path(__file__).parent.parent
+GEAR_DIR = PROJECT_ROOT / "website" / "data" / "gear"
+
+_content_index: Optional[ContentIndex] = None
+
+def get_content_index() -> ContentIndex:
+    """Return the shared parsed-content index, opening it on first use."""
+    global _content_index
+    if _content_index is None:
+        _content_index = open_index(PROJECT_ROOT)
+    return _content_index
 
 def fzf_select(options: List[str], prompt: str = "Select") -> Optional[str]:
     """Use fzf for selection if available, otherwise fall back to numbered menu."""
@@ -76,21 +105,27 @@ def slugify(text):
     text = re.sub(r'[-\s]+', '-', text)
     return text
 
-def load_gear():
-    """Load all gear from YAML files."""
-    gear_list = []
-    if not GEAR_DIR.exists():
-        return gear_list
-    
-    for file in GEAR_DIR.glob("*.yaml"):
-        if file.name == '.gitkeep':
-            continue
-        with open(file, 'r') as f:
-            data = yaml.safe_load(f)
-            data['_filename'] = file.name
-            gear_list.append(data)
-    
-    return sorted(gear_list, key=lambda x: (x['manufacturer'], x['name']))
+_gear_store: Optional[GearStore] = None
+
+def get_gear_store() -> GearStore:
+    """Return the session gear store (every status), creating it on first use."""
+    global _gear_store
+    if _gear_store is None:
+        _gear_store = GearStore(GEAR_DIR, loader=get_content_index().load)
+    return _gear_store
+
+def load_gear(statuses: Sequence[str] = ("active",)) -> List[Dict[str, Any]]:
+    """
+    Load gear of the given statuses, sorted by manufacturer and name.
+
+    Records come from the session store, which only re-reads files that
+    changed since the last call and keeps each status in display order.
+    """
+    return get_gear_store().by_display(statuses)
+
+def gear_path(gear: Dict[str, Any]) -> Path:
+    """Return the file of a loaded gear record, in whichever status it has."""
+    return get_gear_store().directories[gear['_status']] / gear['_filename']
 
 def save_gear(data):
     """Save gear data to YAML file."""
@@ -99,11 +134,18 @@ def save_gear(data):
     slug = slugify(f"{data['manufacturer']}-{data['name']}")
     filename = GEAR_DIR / f"{slug}.yaml"
     
-    with open(filename, 'w') as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+    atomic_io.write_text(filename, frontmatter_codec.dump(data, sort_keys=False))
     
     return filename
 
+def compile_catalog():
+    """Recompile the gear catalog the Hugo templates render from."""
+    try:
+        if compile_gear.write_catalog(GEAR_DIR, store=get_gear_store()):
+            print(f"✓ Updated {compile_gear.CATALOG_NAME}")
+    except (OSError, ValueError, UnicodeDecodeError, yaml.YAMLError) as e:
+        print(f"⚠️  Could not compile gear catalog: {e}")
+
 def add_gear():
     """Add new gear interactively."""
     print("\n=== Add New Gear ===\n")
@@ -165,11 +207,13 @@ def add_gear():
     
     # Save
     filename = save_gear(data)
+    get_gear_store().invalidate(filename)
     print(f"\n✅ Gear saved: {filename.name}")
+    compile_catalog()
 
-def list_gear(filter_category=None, filter_manufacturer=None, filter_type=None):
-    """List all gear with optional filters."""
-    gear_list = load_gear()
+def list_gear(filter_category=None, filter_manufacturer=None, filter_type=None, statuses=("active",)):
+    """List gear of the given statuses with optional filters."""
+    gear_list = load_gear(statuses)
     
     if not gear_list:
         print("\n📦 No gear found")
@@ -201,13 +245,11 @@ def search_gear():
     if not keyword:
         return
     
-    gear_list = load_gear()
-    results = []
+    store = get_gear_store()
     
-    for gear in gear_list:
-        searchable = f"{gear['manufacturer']} {gear['name']} {gear.get('description', '')} {' '.join(gear.get('types', []))}"
-        if keyword in searchable.lower():
-            results.append(gear)
+    # Ranked, typo-tolerant search over name, manufacturer, types, controls and description
+    hits = store.search(keyword, limit=max(len(store), 1), statuses=("active",))
+    results = [store.records[hit.key] for hit in hits]
     
     if not results:
         print(f"\n📦 No gear found matching '{keyword}'")
@@ -235,11 +277,13 @@ def edit_gear():
     # Find selected gear
     idx = options.index(selected)
     gear = gear_list[idx]
-    filename = GEAR_DIR / gear['_filename']
+    filename = gear_path(gear)
     
     editor = os.environ.get('EDITOR', 'nano')
     os.system(f"{editor} {filename}")
+    get_gear_store().invalidate(filename)
     print(f"✅ Edited: {filename.name}")
+    compile_catalog()
 
 def delete_gear():
     """Delete gear."""
@@ -263,22 +307,30 @@ def delete_gear():
     confirm = input(f"Delete '{gear['manufacturer']} - {gear['name']}'? (yes/no): ").strip().lower()
     
     if confirm == 'yes':
-        filename = GEAR_DIR / gear['_filename']
+        filename = gear_path(gear)
         filename.unlink()
+        get_gear_store().invalidate(filename)
         print(f"✅ Deleted: {gear['manufacturer']} - {gear['name']}")
+        compile_catalog()
     else:
         print("❌ Cancelled")
 
-def archive_gear():
-    """Archive gear by moving to archived directory."""
-    gear_list = load_gear()
+def change_status(from_statuses: Sequence[str] = STATUSES, to_status: Optional[str] = None):
+    """
+    Move gear to another status (active, sold, want or archived).
+
+    Args:
+        from_statuses: Statuses to pick gear from
+        to_status: Target status (asked for when None)
+    """
+    gear_list = load_gear(from_statuses)
     
     if not gear_list:
-        print("No gear found")
+        print(f"No {'/'.join(from_statuses)} gear found")
         return
     
-    options = [f"{g['manufacturer']} - {g['name']}" for g in gear_list]
-    selected = fzf_select(options, "Select gear to archive")
+    options = [f"{g['manufacturer']} - {g['name']} [{g['_status']}]" for g in gear_list]
+    selected = fzf_select(options, "Select gear to move")
     
     if not selected:
         print("❌ Cancelled")
@@ -287,49 +339,157 @@ def archive_gear():
     idx = options.index(selected)
     gear = gear_list[idx]
     
-    archived_dir = GEAR_DIR / "archived"
-    archived_dir.mkdir(exist_ok=True)
+    if to_status is None:
+        to_status = fzf_select([s for s in STATUSES if s != gear['_status']], "Move to")
+        if not to_status:
+            print("❌ Cancelled")
+            return
     
-    src = GEAR_DIR / gear['_filename']
-    dst = archived_dir / gear['_filename']
-    
-    shutil.move(str(src), str(dst))
-    print(f"✅ Archived: {gear['manufacturer']} - {gear['name']}")
+    try:
+        get_gear_store().move(Path(gear['_filename']).stem, to_status)
+    except (OSError, KeyError) as e:
+        print(f"❌ Could not move {gear['manufacturer']} - {gear['name']}: {e}")
+        return
+    print(f"✅ Moved to {to_status}: {gear['manufacturer']} - {gear['name']}")
+    compile_catalog()
+
+def archive_gear():
+    """Archive active gear (kept in archived/, never published)."""
+    change_status(("active",), "archived")
 
 def unarchive_gear():
-    """Unarchive gear by moving back to main directory."""
-    archived_dir = GEAR_DIR / "archived"
-    
-    if not archived_dir.exists():
-        print("No archived gear found")
-        return
-    
-    gear_list = []
-    for file in archived_dir.glob("*.yaml"):
-        with open(file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-            data['_filename'] = file.name
-            gear_list.append(data)
-    
-    if not gear_list:
-        print("No archived gear found")
-        return
-    
-    options = [f"{g['manufacturer']} - {g['name']}" for g in gear_list]
-    selected = fzf_select(options, "Select gear to unarchive")
-    
-    if not selected:
-        print("❌ Cancelled")
-        return
-    
-    idx = options.index(selected)
-    gear = gear_list[idx]
-    
-    src = archived_dir / gear['_filename']
-    dst = GEAR_DIR / gear['_filename']
-    
-    shutil.move(str(src), str(dst))
-    print(f"✅ Unarchived: {gear['manufacturer']} - {gear['name']}")
+    """Move archived gear back to active."""
+    change_status(("archived",), "active")
+
+IMPORT_LIST_SEPARATOR = ";"
+
+def read_import_rows(path: Path) -> Iterator[Tuple[int, Optional[Dict[str, Any]], str]]:
+    """
+    Stream rows from a CSV or JSONL import file.
+
+    Args:
+        path: File ending in .csv, .jsonl or .ndjson
+
+    Yields:
+        (line number, gear fields or None, problem) per row
+
+    Raises:
+        ValueError: If the file type is not supported
+    """
+    suffix = path.suffix.lower()
+    if suffix not in ('.csv', '.jsonl', '.ndjson'):
+        raise ValueError(f"Unsupported import file type: {path.name} (use .csv or .jsonl)")
+
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if suffix == '.csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                item = {key.strip(): value.strip() for key, value in row.items()
+                        if key and isinstance(value, str) and value.strip()}
+                for field in gear_batch.LIST_FIELDS:
+                    if field in item:
+                        item[field] = [v.strip() for v in item[field].split(IMPORT_LIST_SEPARATOR) if v.strip()]
+                yield reader.line_num, item, ""
+            return
+
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(item, dict):
+                yield line_number, None, "not a JSON object"
+                continue
+            yield line_number, item, ""
+
+def plan_import(rows: Iterator[Tuple[int, Optional[Dict[str, Any]], str]], gear_dir: Path,
+                existing: Iterable[str] = ()) -> List[Tuple[int, gear_batch.BatchItem]]:
+    """
+    Validate import rows and assign slugs.
+
+    Args:
+        rows: Rows from read_import_rows
+        gear_dir: Directory new gear is written to
+        existing: Slugs already in the store, in any status (count as collisions)
+
+    Returns:
+        List of (line number, BatchItem); invalid rows have status ERROR
+    """
+    # Every slug already taken, in the store or earlier in the file
+    taken: Dict[str, str] = dict.fromkeys(existing, "already exists")
+
+    plan = []
+    for line_number, item, problem in rows:
+        if item is None:
+            plan.append((line_number, gear_batch.BatchItem("add", "?", None, {}, gear_batch.ERROR, problem)))
+            continue
+
+        problems = gear_batch.validate_fields(item)
+        slug = slugify(f"{item.get('manufacturer', '')}-{item.get('name', '')}")
+        if problems:
+            plan.append((line_number, gear_batch.BatchItem("add", slug, None, {}, gear_batch.ERROR,
+                                                           "; ".join(problems))))
+        elif slug in taken:
+            plan.append((line_number, gear_batch.BatchItem("add", slug, None, {}, gear_batch.ERROR, taken[slug])))
+        else:
+            taken[slug] = f"duplicate of line {line_number}"
+            plan.append((line_number, gear_batch.BatchItem("add", slug, gear_dir / f"{slug}.yaml",
+                                                           gear_batch.build_gear_data(item))))
+    return plan
+
+def import_gear(path: Path, dry_run: bool = False) -> int:
+    """
+    Import gear from a CSV or JSONL file in one batched write.
+
+    Valid rows are written together in one transaction; invalid or
+    colliding rows are skipped and listed in the summary.
+
+    Args:
+        path: Import file
+        dry_run: Validate and report without writing
+
+    Returns:
+        Exit code (1 if any row was rejected)
+    """
+    start = time.perf_counter()
+    try:
+        existing = [Path(gear['_filename']).stem for gear in get_gear_store().all()]
+        plan = plan_import(read_import_rows(path), GEAR_DIR, existing)
+    except (OSError, ValueError, UnicodeDecodeError, csv.Error) as e:
+        print(f"❌ Could not read {path}: {e}")
+        return 1
+
+    valid = [item for _, item in plan if item.status == gear_batch.OK]
+    rejected = [(line, item) for line, item in plan if item.status != gear_batch.OK]
+
+    written = []
+    if valid and not dry_run:
+        GEAR_DIR.mkdir(parents=True, exist_ok=True)
+        results = gear_batch.apply(valid, get_content_index().load)
+        written = [item for item in results if item.status == gear_batch.OK]
+        if not written:
+            # Files appeared between planning and writing: report them per row
+            lines = {item.slug: line for line, item in plan}
+            rejected += [(lines[item.slug], item) for item in results if item.status == gear_batch.ERROR]
+            rejected.sort()
+        else:
+            for item in written:
+                get_gear_store().invalidate(item.path)
+            compile_catalog()
+
+    elapsed = time.perf_counter() - start
+    count = len(valid) if dry_run else len(written)
+    verb = "Would import" if dry_run else "Imported"
+    print(f"{'✅' if not rejected else '⚠️ '} {verb} {count} of {len(plan)} rows from {path.name} in {elapsed:.2f}s")
+    if rejected:
+        print(f"\n❌ {len(rejected)} rows skipped:")
+        width = max(len(item.slug) for _, item in rejected)
+        for line, item in rejected:
+            print(f"  line {line:<5} {item.slug:<{width}}  {item.note}")
+    return 1 if rejected else 0
 
 def main_menu():
     """Display main menu."""
@@ -339,9 +499,11 @@ def main_menu():
             "List all gear",
             "List by category",
             "List by manufacturer",
+            "List by status",
             "Search gear",
             "Edit gear",
             "Delete gear",
+            "Change gear status",
             "Archive gear",
             "Unarchive gear",
             "Exit"
@@ -365,20 +527,43 @@ def main_menu():
             mfr = input("\nFilter by manufacturer: ").strip()
             if mfr:
                 list_gear(filter_manufacturer=mfr)
+        elif choice == "List by status":
+            status = fzf_select(list(STATUSES), "Filter by status")
+            if status:
+                list_gear(statuses=(status,))
         elif choice == "Search gear":
             search_gear()
         elif choice == "Edit gear":
             edit_gear()
         elif choice == "Delete gear":
             delete_gear()
+        elif choice == "Change gear status":
+            change_status()
         elif choice == "Archive gear":
             archive_gear()
         elif choice == "Unarchive gear":
             unarchive_gear()
 
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command')
+    import_parser = subparsers.add_parser('import', help='Import gear from a CSV or JSONL file')
+    import_parser.add_argument('file', type=Path, help='CSV or JSONL file')
+    import_parser.add_argument('--dry-run', action='store_true', help='Validate and report without writing')
+    return parser.parse_args()
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    if args.command == 'import':
+        return import_gear(args.file, dry_run=args.dry_run)
+    main_menu()
+    return 0
+
 if __name__ == '__main__':
     try:
-        main_menu()
+        sys.exit(main())
     except KeyboardInterrupt:
         print("\n\n👋 Goodbye!")
         sys.exit(0)
@@ -15,11 +15,18 @@ import re
 import shutil
 import subprocess
 import sys
-import urllib.request
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+import atomic_io
+import download_cache
+import downloader
+import frontmatter_codec
+import generate_markdown
+import image_manifest
+import image_optimizer
 import yaml
+from content_index import open_index
 
 
 def fzf_select(options: List[str], prompt: str = "Select") -> Optional[str]:
@@ -86,6 +93,11 @@ class LiveManager:
         self.live_dir = project_root / "website" / "data" / "live"
         self.content_dir = project_root / "website" / "content" / "live"
         self.script_dir = project_root / "scripts"
+        self.index = open_index(project_root)
+        self.downloader = downloader.Downloader(workers=1, cache=download_cache.open_cache(project_root))
+
+        # Finish any rename interrupted by a crash in a previous session
+        atomic_io.recover(self.live_dir)
 
     def show_menu(self) -> None:
         """Display main menu and handle user selection."""
@@ -114,15 +126,34 @@ class LiveManager:
                 return
 
     def download_poster(self, url: str, output_path: Path) -> bool:
-        """Download poster from URL."""
-        try:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            urllib.request.urlretrieve(url, output_path)
-            print(f"✓ Downloaded poster to {output_path}")
-            return True
-        except Exception as e:
-            print(f"✗ Failed to download poster from {url}: {e}")
+        """Download poster from URL (written in place only once complete)."""
+        result = self.downloader.fetch(url, output_path)
+        if not result.ok:
+            print(f"✗ Failed to download poster from {url}: {result.error}")
             return False
+        print(f"✓ Downloaded poster to {output_path}{downloader.CACHE_NOTES[result.cache]}")
+        return True
+
+    def optimize_poster(self, poster_path: Path) -> None:
+        """
+        Orient, downscale, strip EXIF and recompress a poster in place, then
+        record its dimensions and placeholder in the image manifest.
+        """
+        if not image_optimizer.available():
+            print(image_optimizer.PILLOW_MISSING)
+            return
+        result = image_optimizer.optimize_file(poster_path)
+        if result.error:
+            print(f"⚠ Could not optimize poster: {result.error}")
+        elif result.changed:
+            print(f"✓ Optimized poster: {result.before / 1024:.0f} KB → {result.after / 1024:.0f} KB")
+        try:
+            _, errors = image_manifest.update_manifest(self.project_root / "website", [poster_path])
+        except OSError as e:
+            print(f"⚠ Could not update image manifest: {e}")
+            return
+        for error in errors:
+            print(f"⚠ Poster not added to image manifest: {error}")
 
     def get_multiline_input(self, prompt: str) -> str:
         """Get multiline input ending with 'END'."""
@@ -217,6 +248,8 @@ class LiveManager:
                     print(f"✓ Copied poster to {poster_path}")
                 else:
                     print(f"✗ Poster file not found: {poster_input}")
+            if poster:
+                self.optimize_poster(poster_path)
 
         try:
             event_url = input("Event link URL (or press Enter to skip): ").strip()
@@ -258,16 +291,12 @@ class LiveManager:
 
         # Write file
         self.live_dir.mkdir(parents=True, exist_ok=True)
-        with open(filepath, 'w') as f:
-            f.write('---\n')
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True)
-            f.write('---\n\n')
-            f.write(description)
+        self.write_live_file(filepath, data, description)
 
         print(f"✓ Created live performance: {filename}")
 
         # Generate markdown
-        self.run_generate_markdown("live")
+        self.run_generate_markdown("live", [filepath])
 
         try:
             open_editor = input("Open in editor? (y/N): ").strip().lower()
@@ -296,23 +325,19 @@ class LiveManager:
                 pass
             return
 
-        for i, file_path in enumerate(files, 1):
-            try:
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                    if content.startswith('---\n'):
-                        end_idx = content.find('\n---\n', 4)
-                        if end_idx != -1:
-                            data = yaml.safe_load(content[4:end_idx])
-                            title = data.get('title', 'Unknown')
-                            date_part = file_path.stem.split('-')[:3]
-                            date_str = '-'.join(date_part)
-                            location = data.get('location', 'Unknown')
-                            print(f"{i}) {date_str} - {title} ({location})")
-                            print(f"   File: {file_path.name}")
-                            print()
-            except Exception as e:
-                print(f"✗ Error reading {file_path.name}: {e}")
+        for i, (file_path, data, error) in enumerate(self.index.load_many(files), 1):
+            if error:
+                print(f"✗ Error reading {file_path.name}: {error}")
+                continue
+            if not isinstance(data, dict):
+                continue
+            title = data.get('title', 'Unknown')
+            date_part = file_path.stem.split('-')[:3]
+            date_str = '-'.join(date_part)
+            location = data.get('location', 'Unknown')
+            print(f"{i}) {date_str} - {title} ({location})")
+            print(f"   File: {file_path.name}")
+            print()
 
         try:
             input("Press Enter to continue...")
@@ -328,22 +353,13 @@ class LiveManager:
 
         # Build options list with metadata
         options = []
-        for file_path in files:
-            try:
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                    if content.startswith('---\n'):
-                        end_idx = content.find('\n---\n', 4)
-                        if end_idx != -1:
-                            data = yaml.safe_load(content[4:end_idx])
-                            title = data.get('title', 'Unknown')
-                            options.append(f"{file_path.name} - {title}")
-                        else:
-                            options.append(f"{file_path.name}")
-                    else:
-                        options.append(f"{file_path.name}")
-            except Exception:
+        for file_path, data, error in self.index.load_many(files):
+            if error:
                 options.append(f"{file_path.name} - (error reading)")
+            elif isinstance(data, dict):
+                options.append(f"{file_path.name} - {data.get('title', 'Unknown')}")
+            else:
+                options.append(f"{file_path.name}")
 
         # Use fzf or numbered selection
         selected = fzf_select(options, action)
@@ -360,28 +376,19 @@ class LiveManager:
 
     def parse_live_file(self, file_path: Path) -> Tuple[Dict, str]:
         """Parse live performance YAML file."""
-        with open(file_path, 'r') as f:
-            content = f.read()
-
-        if not content.startswith('---\n'):
+        frontmatter, body, has_frontmatter = frontmatter_codec.read_document(file_path)
+        if not has_frontmatter:
             raise ValueError("Invalid YAML frontmatter")
 
-        end_idx = content.find('\n---\n', 4)
-        if end_idx == -1:
-            raise ValueError("Invalid YAML frontmatter")
-
-        frontmatter = yaml.safe_load(content[4:end_idx])
-        body = content[end_idx + 5:].strip()
-
-        return frontmatter, body
+        return frontmatter, body.strip()
 
     def write_live_file(self, file_path: Path, data: Dict, body: str) -> None:
         """Write live performance YAML file."""
-        with open(file_path, 'w') as f:
-            f.write('---\n')
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True)
-            f.write('---\n\n')
-            f.write(body)
+        atomic_io.write_text(file_path, self.format_live_file(data, body))
+
+    def format_live_file(self, data: Dict, body: str) -> str:
+        """Format live performance data and description as file content."""
+        return frontmatter_codec.format_document(data, '\n' + body)
 
     def edit_live(self) -> None:
         """Edit existing live performance."""
@@ -455,17 +462,20 @@ class LiveManager:
         new_filename = f"{date}-{slug}.yaml"
         new_filepath = self.live_dir / new_filename
 
-        # Write file
-        self.write_live_file(new_filepath, new_data, description)
+        # Write new file and remove the old one (if renamed) as one transaction
+        touched = [new_filepath]
+        with atomic_io.Transaction() as txn:
+            txn.write(new_filepath, self.format_live_file(new_data, description))
+            if selected_file != new_filepath:
+                txn.delete(selected_file)
+                touched.append(selected_file)
 
-        # Remove old file if filename changed
         if selected_file != new_filepath:
-            selected_file.unlink()
             print(f"✓ Updated and renamed: {new_filename}")
         else:
             print(f"✓ Updated: {new_filename}")
 
-        self.run_generate_markdown("live")
+        self.run_generate_markdown("live", touched)
 
     def delete_live(self) -> None:
         """Delete live performance."""
@@ -479,20 +489,28 @@ class LiveManager:
             if confirm == 'y':
                 selected_file.unlink()
                 print(f"✓ Deleted: {selected_file.name}")
-                self.run_generate_markdown("live")
+                self.run_generate_markdown("live", [selected_file])
             else:
                 print("⚠ Cancelled")
         except (EOFError, KeyboardInterrupt):
             print("⚠ Cancelled")
 
-    def run_generate_markdown(self, content_type: str) -> None:
-        """Run generate-markdown.sh script."""
+    def run_generate_markdown(self, content_type: str, paths: Optional[List[Path]] = None) -> None:
+        """
+        Regenerate markdown in-process.
+
+        Args:
+            content_type: live, music or media
+            paths: Data files that were touched; only these are regenerated.
+                Without paths, every changed file of the content type is.
+        """
         try:
-            script_path = self.script_dir / "generate-markdown.sh"
-            if script_path.exists():
-                subprocess.run([str(script_path), content_type], check=True)
-                print("⚠ Generated markdown...")
-        except subprocess.CalledProcessError as e:
+            if paths:
+                generate_markdown.generate_paths(paths, self.project_root)
+            else:
+                generate_markdown.generate(content_type, self.project_root, incremental=True)
+            print("⚠ Generated markdown...")
+        except (OSError, ValueError, yaml.YAMLError) as e:
             print(f"✗ Error generating markdown: {e}")
 
 
@@ -6,8 +6,12 @@ Manages pictures, videos, and other media content for live performances
 and standalone content. Handles YAML file processing, file operations,
 and interactive prompts.
 
+The ingest command adds pictures in bulk from a manifest instead (see
+media_ingest.py for the format).
+
 Usage:
     python manage_media.py
+    python manage_media.py ingest MANIFEST [--workers N] [--downloads N]
 """
 
 import argparse
@@ -16,12 +20,22 @@ import re
 import shutil
 import subprocess
 import sys
-import urllib.request
+import tempfile
 from datetime import date
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+import atomic_io
+import download_cache
+import downloader
+import frontmatter_codec
+import generate_markdown
+import image_manifest
+import image_optimizer
+import media_ingest
+import media_store
 import yaml
+from content_index import open_index
 
 
 def fzf_select(options: List[str], prompt: str = "Select") -> Optional[str]:
@@ -89,6 +103,9 @@ class MediaManager:
         self.media_dir = project_root / "website" / "assets" / "media"
         self.others_file = project_root / "website" / "data" / "media" / "others.yaml"
         self.script_dir = project_root / "scripts"
+        self.index = open_index(project_root)
+        self.downloader = downloader.Downloader(cache=download_cache.open_cache(project_root))
+        self.store = media_store.open_store(project_root)
 
     def show_menu(self) -> None:
         """Display main menu and handle user selection."""
@@ -134,26 +151,12 @@ class MediaManager:
         if not self.live_dir.exists():
             return performances
 
-        for file_path in self.live_dir.glob("*.yaml"):
-            if file_path.name == "_index.md":
-                continue
-            try:
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                    # Handle both pure YAML and Hugo frontmatter format
-                    if content.startswith('---\n'):
-                        # Hugo frontmatter format
-                        end_idx = content.find('\n---\n', 4)
-                        if end_idx != -1:
-                            frontmatter = yaml.safe_load(content[4:end_idx])
-                            performances.append((file_path, frontmatter))
-                    else:
-                        # Pure YAML format
-                        frontmatter = yaml.safe_load(content)
-                        if frontmatter:
-                            performances.append((file_path, frontmatter))
-            except (yaml.YAMLError, IOError) as e:
-                print(f"✗ Error reading {file_path}: {e}")
+        files = [f for f in self.live_dir.glob("*.yaml") if f.name != "_index.md"]
+        for file_path, frontmatter, error in self.index.load_many(files):
+            if error:
+                print(f"✗ Error reading {file_path}: {error}")
+            elif frontmatter:
+                performances.append((file_path, frontmatter))
 
         return performances
 
@@ -185,27 +188,131 @@ class MediaManager:
 
     def download_file(self, url: str, output_path: Path) -> bool:
         """Download file from URL."""
+        return self.download_files([(url, output_path)])[0].ok
+
+    def download_files(self, jobs: List[Tuple[str, Path]]) -> List[downloader.DownloadResult]:
+        """
+        Download several files concurrently over pooled connections.
+
+        Args:
+            jobs: (url, output_path) pairs
+
+        Returns:
+            Download results (with content hashes), in the order of jobs
+        """
+        if len(jobs) > 1:
+            print(f"Downloading {len(jobs)} files...")
+        results = self.downloader.fetch_many(jobs)
+        for result in results:
+            if result.ok:
+                print(f"✓ Downloaded to {result.path}{downloader.CACHE_NOTES[result.cache]}")
+            else:
+                print(f"✗ Failed to download from {result.url}: {result.error}")
+        return results
+
+    def optimize_images(self, sources: List[Tuple[Path, Optional[str]]],
+                        temp_dir: Path) -> List[Tuple[Path, Optional[str]]]:
+        """
+        Orient, downscale, strip EXIF and recompress images before storing them.
+
+        Sources are never modified; optimized copies go to temp_dir.
+
+        Args:
+            sources: (image path, content hash or None) pairs
+            temp_dir: Directory for the optimized copies
+
+        Returns:
+            (path to store, content hash or None) per source, in order; the
+            hash is dropped for images that were rewritten
+        """
+        if not sources:
+            return []
+        if not image_optimizer.available():
+            print(image_optimizer.PILLOW_MISSING)
+            return list(sources)
+
+        jobs = [(path, temp_dir / f"optimized-{i}{path.suffix.lower()}") for i, (path, _) in enumerate(sources)]
+        results = image_optimizer.optimize_many(jobs)
+        for result in results:
+            if result.error:
+                print(f"⚠ Could not optimize {result.source.name}, storing as is: {result.error}")
+        print(f"✓ Optimized {image_optimizer.summarize(results)}")
+        return [(result.path, None if result.changed else sha256)
+                for result, (_, sha256) in zip(results, sources)]
+
+    def record_images(self, images: List[Path]) -> None:
+        """
+        Add saved images' dimensions and placeholders to the image manifest.
+
+        Args:
+            images: Image files under website/assets or website/static
+        """
+        if not images or not image_optimizer.available():
+            return
         try:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            urllib.request.urlretrieve(url, output_path)
-            print(f"✓ Downloaded to {output_path}")
-            return True
-        except Exception as e:
-            print(f"✗ Failed to download from {url}: {e}")
-            return False
-
-    def generate_image_versions(self, source_file: Path, base_name: str, output_dir: Path) -> bool:
-        """Generate image versions (Hugo handles responsive images)."""
+            updated, errors = image_manifest.update_manifest(self.project_root / "website", images)
+        except OSError as e:
+            print(f"⚠ Could not update image manifest: {e}")
+            return
+        for error in errors:
+            print(f"⚠ Not added to image manifest: {error}")
+        if updated:
+            print(f"✓ Recorded {updated} images in the image manifest")
+
+    def generate_image_versions(self, source_file: Path, base_name: str, output_dir: Path,
+                                sha256: Optional[str] = None) -> bool:
+        """
+        Save an image through the media store (Hugo renders the responsive sizes).
+
+        The content goes into the content-addressed store once and output_dir
+        gets a hardlink to it.
+
+        Args:
+            source_file: Image to save
+            base_name: File name in output_dir
+            output_dir: Gig or standalone media directory
+            sha256: Content hash, if already known from the download
+
+        Returns:
+            True if the image was saved
+        """
         try:
-            output_dir.mkdir(parents=True, exist_ok=True)
-            output_path = output_dir / base_name
-            shutil.copy2(source_file, output_path)
+            self.store.add(source_file, output_dir / base_name, sha256)
             print(f"✓ Saved: {base_name} (Hugo will generate responsive versions)")
             return True
-        except Exception as e:
+        except OSError as e:
             print(f"✗ Error saving image: {e}")
             return False
 
+    def save_standalone_image(self, source_file: Path, image_name: str, standalone_dir: Path,
+                              sha256: Optional[str] = None) -> Optional[str]:
+        """
+        Save a standalone picture, reusing a copy the site already has.
+
+        Args:
+            source_file: Image to save
+            image_name: File name in standalone_dir
+            standalone_dir: assets/media/standalone directory
+            sha256: Content hash, if already known from the download
+
+        Returns:
+            Resource path for the content file's image field (relative to
+            assets/), or None on error
+        """
+        try:
+            sha256 = self.store.put(source_file, sha256)
+            existing = self.store.asset_path(sha256)
+            if existing:
+                print(f"✓ Same image already published at {existing}, not saving a copy")
+                return existing
+        except OSError as e:
+            print(f"✗ Error saving image: {e}")
+            return None
+
+        if not self.generate_image_versions(source_file, image_name, standalone_dir, sha256):
+            return None
+        return f"media/standalone/{image_name}"
+
     def extract_youtube_id(self, url: str) -> Optional[str]:
         """Extract YouTube video ID from URL."""
         patterns = [
@@ -222,48 +329,30 @@ class MediaManager:
     def update_live_performance_yaml(self, file_path: Path, media_data: Dict) -> bool:
         """Update live performance YAML file with media data."""
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
-
-            # Handle both pure YAML and Hugo frontmatter format
-            if content.startswith('---\n'):
-                # Hugo frontmatter format
-                end_idx = content.find('\n---\n', 4)
-                if end_idx == -1:
-                    print("✗ Invalid YAML frontmatter: missing closing ---")
-                    return False
-                frontmatter = yaml.safe_load(content[4:end_idx])
-                body = content[end_idx + 5:]
-                has_frontmatter = True
-            else:
-                # Pure YAML format
+            # Hold the lock across read-modify-write so concurrent edits aren't lost
+            with atomic_io.locked(file_path):
+                # Handle both pure YAML and Hugo frontmatter format
                 try:
-                    frontmatter = yaml.safe_load(content)
-                    if not frontmatter:
-                        print("✗ Empty YAML file")
-                        return False
+                    frontmatter, body, has_frontmatter = frontmatter_codec.read_document(file_path)
+                except ValueError as e:
+                    print(f"✗ {e}")
+                    return False
                 except yaml.YAMLError as e:
                     print(f"✗ YAML parsing error: {e}")
                     return False
-                body = ""
-                has_frontmatter = False
-
-            # Update media section
-            if 'media' not in frontmatter:
-                frontmatter['media'] = {}
-
-            frontmatter['media'].update(media_data)
-
-            # Write back in the same format
-            with open(file_path, 'w') as f:
-                if has_frontmatter:
-                    f.write('---\n')
-                    yaml.dump(frontmatter, f, default_flow_style=False, allow_unicode=True)
-                    f.write('---\n')
-                    f.write(body)
-                else:
-                    # Pure YAML format
-                    yaml.dump(frontmatter, f, default_flow_style=False, allow_unicode=True)
+                if not frontmatter:
+                    print("✗ Empty YAML file")
+                    return False
+
+                # Update media section
+                if 'media' not in frontmatter:
+                    frontmatter['media'] = {}
+
+                frontmatter['media'].update(media_data)
+
+                # Write back in the same format
+                atomic_io.write_text(file_path,
+                                     frontmatter_codec.format_document(frontmatter, body, has_frontmatter))
 
             print(f"✓ Updated {file_path.name}")
             return True
@@ -273,14 +362,22 @@ class MediaManager:
             traceback.print_exc()
             return False
 
-    def run_generate_markdown(self, content_type: str) -> None:
-        """Run generate-markdown.sh script."""
+    def run_generate_markdown(self, content_type: str, paths: Optional[List[Path]] = None) -> None:
+        """
+        Regenerate markdown in-process.
+
+        Args:
+            content_type: live, music or media
+            paths: Data files that were touched; only these are regenerated.
+                Without paths, every changed file of the content type is.
+        """
         try:
-            script_path = self.script_dir / "generate-markdown.sh"
-            if script_path.exists():
-                subprocess.run([str(script_path), content_type], check=True)
-                print("⚠ Generated markdown...")
-        except subprocess.CalledProcessError as e:
+            if paths:
+                generate_markdown.generate_paths(paths, self.project_root)
+            else:
+                generate_markdown.generate(content_type, self.project_root, incremental=True)
+            print("⚠ Generated markdown...")
+        except (OSError, ValueError, yaml.YAMLError) as e:
             print(f"✗ Error generating markdown: {e}")
 
     def add_pictures(self) -> None:
@@ -302,11 +399,11 @@ class MediaManager:
 
         # Get gig slug from filename
         gig_slug = file_path.stem
-        media_dir = self.project_root / "website" / "static" / "media" / "live" / gig_slug
+        media_dir = self.media_dir / "live" / gig_slug
         media_dir.mkdir(parents=True, exist_ok=True)
 
-        # Add pictures
-        pictures = []
+        # Collect pictures first so URLs can be downloaded in parallel
+        entries = []
         pic_counter = 1
 
         print("Add picture URLs or paths (press Enter when done):")
@@ -323,25 +420,37 @@ class MediaManager:
 
                 descriptive_name = f"obscvrat-{gig_slug}-performance-{pic_counter}.{ext}"
 
-                # Handle URL or local file
-                if pic_input.startswith(('http://', 'https://')):
-                    temp_file = Path(f"/tmp/temp-pic-{pic_counter}.{ext}")
-                    if self.download_file(pic_input, temp_file):
-                        if self.generate_image_versions(temp_file, descriptive_name, media_dir):
-                            pictures.append(descriptive_name)
-                        temp_file.unlink(missing_ok=True)
+                if pic_input.startswith(('http://', 'https://')) or Path(pic_input).exists():
+                    entries.append((descriptive_name, pic_input))
                 else:
-                    source_path = Path(pic_input)
-                    if source_path.exists():
-                        if self.generate_image_versions(source_path, descriptive_name, media_dir):
-                            pictures.append(descriptive_name)
-                    else:
-                        print(f"✗ File not found: {pic_input}")
+                    print(f"✗ File not found: {pic_input}")
 
                 pic_counter += 1
             except (EOFError, KeyboardInterrupt):
                 break
 
+        pictures = []
+        with tempfile.TemporaryDirectory(prefix="obscvrat-pictures-") as temp_dir:
+            jobs = [(pic_input, Path(temp_dir) / name) for name, pic_input in entries
+                    if pic_input.startswith(('http://', 'https://'))]
+            downloaded = {result.path: result.sha256 for result in self.download_files(jobs) if result.ok}
+
+            sources = []
+            for descriptive_name, pic_input in entries:
+                if pic_input.startswith(('http://', 'https://')):
+                    source_path = Path(temp_dir) / descriptive_name
+                    if source_path in downloaded:
+                        sources.append((descriptive_name, source_path, downloaded[source_path]))
+                else:
+                    sources.append((descriptive_name, Path(pic_input), None))
+
+            optimized = self.optimize_images([(path, sha256) for _, path, sha256 in sources], Path(temp_dir))
+            for (descriptive_name, _, _), (source_path, sha256) in zip(sources, optimized):
+                if self.generate_image_versions(source_path, descriptive_name, media_dir, sha256):
+                    pictures.append(descriptive_name)
+
+        self.record_images([media_dir / name for name in pictures])
+
         if not pictures:
             print("⚠ No pictures added")
             return
@@ -359,7 +468,124 @@ class MediaManager:
 
         if self.update_live_performance_yaml(file_path, media_data):
             print(f"✓ Added {len(pictures)} pictures to live performance")
-            self.run_generate_markdown("live")
+            self.run_generate_markdown("live", [file_path])
+
+    def append_pictures(self, file_path: Path, names: List[str], author: str = "",
+                        author_url: str = "") -> bool:
+        """
+        Add pictures to a gig's existing media.pictures in one write.
+
+        Args:
+            file_path: Live performance YAML file
+            names: New picture file names
+            author: Photographer (kept as is if empty)
+            author_url: Photographer URL (kept as is if empty)
+
+        Returns:
+            True if the file was updated
+        """
+        try:
+            with atomic_io.locked(file_path):
+                frontmatter, body, has_frontmatter = frontmatter_codec.read_document(file_path)
+                if not frontmatter:
+                    print(f"✗ Empty YAML file: {file_path.name}")
+                    return False
+                pictures = frontmatter.setdefault('media', {}).setdefault('pictures', {})
+                pictures['images'] = (pictures.get('images') or []) + names
+                if author:
+                    pictures['author'] = author
+                if author_url:
+                    pictures['author_url'] = author_url
+                atomic_io.write_text(file_path,
+                                     frontmatter_codec.format_document(frontmatter, body, has_frontmatter))
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            print(f"✗ Error updating {file_path.name}: {e}")
+            return False
+        print(f"✓ Added {len(names)} pictures to {file_path.name}")
+        return True
+
+    def ingest(self, manifest_path: Path, cpu_workers: Optional[int] = None,
+               io_workers: int = media_ingest.DEFAULT_IO_WORKERS) -> int:
+        """
+        Add pictures to gigs in bulk from a manifest.
+
+        Pictures are fetched, validated, optimized, deduplicated and written
+        by media_ingest.run_pipeline; afterwards each gig's YAML is updated
+        once and the markdown regenerated once.
+
+        Args:
+            manifest_path: YAML or CSV manifest
+            cpu_workers: Optimize processes (default: CPU count)
+            io_workers: Concurrent downloads
+
+        Returns:
+            Exit code: 0 if every picture was written or was a duplicate
+        """
+        try:
+            batches = media_ingest.load_manifest(manifest_path)
+        except (OSError, media_ingest.IngestError) as e:
+            print(f"✗ Can't read manifest: {e}")
+            return 1
+
+        data_files = {}
+        pictures = []
+        known = {}
+        numbers = {}
+        for batch in batches:
+            data_file = self.live_dir / f"{batch.gig}.yaml"
+            if not data_file.exists():
+                print(f"✗ Unknown gig {batch.gig} (no {data_file.relative_to(self.project_root)}), skipping")
+                continue
+            data_files[batch.gig] = data_file
+            gig_dir = self.media_dir / "live" / batch.gig
+            existing = media_store.media_files([gig_dir])
+            known[batch.gig] = {media_store.hash_file(path) for path in existing}
+            numbers[batch.gig] = 1 + max((int(m.group(1)) for m in (
+                re.search(r"-performance-(\d+)\.", path.name) for path in existing) if m), default=0)
+            pictures.extend(media_ingest.Picture(index, batch.gig, source)
+                            for index, source in enumerate(batch.sources, len(pictures)))
+        if not pictures:
+            print("⚠ No pictures to ingest")
+            return 1
+
+        if not image_optimizer.available():
+            print(image_optimizer.PILLOW_MISSING)
+        print(f"Ingesting {len(pictures)} pictures for {len(data_files)} gigs...")
+
+        written: Dict[str, List[str]] = {}
+        paths: List[Path] = []
+
+        def write(prepared: media_ingest.Prepared) -> media_ingest.Prepared:
+            gig = prepared.picture.gig
+            name = f"obscvrat-{gig}-performance-{numbers[gig]}{prepared.suffix}"
+            dest = self.media_dir / "live" / gig / name
+            try:
+                self.store.put(prepared.path, prepared.sha256)
+                self.store.link(prepared.sha256, dest)
+            except OSError as e:
+                return prepared._replace(status="failed", error=str(e))
+            numbers[gig] += 1
+            written.setdefault(gig, []).append(name)
+            paths.append(dest)
+            return prepared
+
+        with tempfile.TemporaryDirectory(prefix="obscvrat-ingest-") as temp_dir:
+            stats = media_ingest.run_pipeline(pictures, self.downloader, Path(temp_dir), write, known,
+                                              io_workers=io_workers, cpu_workers=cpu_workers,
+                                              progress=media_ingest.print_progress)
+        self.store.save()
+
+        updated = []
+        for batch in batches:
+            if batch.gig in written and self.append_pictures(data_files[batch.gig], written[batch.gig],
+                                                             batch.author, batch.author_url):
+                updated.append(data_files[batch.gig])
+        self.record_images(paths)
+        if updated:
+            self.run_generate_markdown("live", updated)
+
+        print(f"✓ Ingest: {stats.summary()}")
+        return 1 if stats.counts["failed"] or stats.counts["rejected"] else 0
 
     def add_video(self) -> None:
         """Add video to live performance."""
@@ -417,7 +643,7 @@ class MediaManager:
 
         if self.update_live_performance_yaml(file_path, media_data):
             print("✓ Added YouTube video to live performance")
-            self.run_generate_markdown("live")
+            self.run_generate_markdown("live", [file_path])
 
     def add_standalone_picture(self) -> None:
         """Add standalone picture."""
@@ -441,35 +667,39 @@ class MediaManager:
         content_file = self.project_root / "website" / "content" / "media" / "pictures" / filename
         content_file.parent.mkdir(parents=True, exist_ok=True)
 
-        standalone_dir = self.project_root / "website" / "static" / "media" / "standalone"
+        standalone_dir = self.media_dir / "standalone"
         standalone_dir.mkdir(parents=True, exist_ok=True)
 
         # Process image
         image_name = f"{today}-{slug}.jpg"
-        if pic_input.startswith(('http://', 'https://')):
-            temp_file = Path(f"/tmp/{image_name}")
-            if not self.download_file(pic_input, temp_file):
-                return
-            if not self.generate_image_versions(temp_file, image_name, standalone_dir):
-                temp_file.unlink(missing_ok=True)
-                return
-            temp_file.unlink(missing_ok=True)
-        else:
-            source_path = Path(pic_input)
-            if not source_path.exists():
-                print(f"✗ File not found: {pic_input}")
-                return
-            original_ext = source_path.suffix.lower()
-            image_name = f"{today}-{slug}{original_ext}"
-            if not self.generate_image_versions(source_path, image_name, standalone_dir):
+        with tempfile.TemporaryDirectory(prefix="obscvrat-picture-") as temp_dir:
+            sha256 = None
+            if pic_input.startswith(('http://', 'https://')):
+                source_path = Path(temp_dir) / image_name
+                result = self.download_files([(pic_input, source_path)])[0]
+                if not result.ok:
+                    return
+                sha256 = result.sha256
+            else:
+                source_path = Path(pic_input)
+                if not source_path.exists():
+                    print(f"✗ File not found: {pic_input}")
+                    return
+                original_ext = source_path.suffix.lower()
+                image_name = f"{today}-{slug}{original_ext}"
+            source_path, sha256 = self.optimize_images([(source_path, sha256)], Path(temp_dir))[0]
+            image_url = self.save_standalone_image(source_path, image_name, standalone_dir, sha256)
+            if not image_url:
                 return
+            if image_url == f"media/standalone/{image_name}":
+                self.record_images([standalone_dir / image_name])
 
         # Create content file
         frontmatter = {
             'title': title,
             'date': today,
             'type': 'picture',
-            'image': f'/media/standalone/{image_name}',
+            'image': image_url,
             'author': photographer,
             'draft': False
         }
@@ -481,10 +711,7 @@ class MediaManager:
         if description:
             frontmatter['description'] = description
 
-        with open(content_file, 'w') as f:
-            f.write('---\n')
-            yaml.dump(frontmatter, f, default_flow_style=False, allow_unicode=True)
-            f.write('---\n')
+        atomic_io.write_text(content_file, frontmatter_codec.format_document(frontmatter))
 
         print(f"✓ Created standalone picture: {filename}")
 
@@ -527,10 +754,7 @@ class MediaManager:
         if description:
             frontmatter['description'] = description
 
-        with open(content_file, 'w') as f:
-            f.write('---\n')
-            yaml.dump(frontmatter, f, default_flow_style=False, allow_unicode=True)
-            f.write('---\n')
+        atomic_io.write_text(content_file, frontmatter_codec.format_document(frontmatter))
 
         print(f"✓ Created standalone video: {filename}")
 
@@ -540,13 +764,7 @@ class MediaManager:
             return {'title': 'Others', 'items': []}
 
         try:
-            with open(self.others_file, 'r') as f:
-                content = f.read()
-                if content.startswith('---\n'):
-                    end_idx = content.find('\n---\n', 4)
-                    if end_idx != -1:
-                        return yaml.safe_load(content[4:end_idx])
-                return yaml.safe_load(content)
+            return frontmatter_codec.read_header(self.others_file)
         except Exception as e:
             print(f"✗ Error loading others data: {e}")
             return {'title': 'Others', 'items': []}
@@ -555,10 +773,7 @@ class MediaManager:
         """Save others.yaml data."""
         try:
             self.others_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.others_file, 'w') as f:
-                f.write('---\n')
-                yaml.dump(data, f, default_flow_style=False, allow_unicode=True)
-                f.write('---\n')
+            atomic_io.write_text(self.others_file, frontmatter_codec.format_document(data))
             return True
         except Exception as e:
             print(f"✗ Error saving others data: {e}")
@@ -606,13 +821,15 @@ class MediaManager:
         if item_date:
             item['date'] = item_date
 
-        # Load and update data
-        data = self.load_others_data()
-        data['items'].append(item)
+        # Load and update data under one lock so concurrent additions aren't lost
+        with atomic_io.locked(self.others_file):
+            data = self.load_others_data()
+            data['items'].append(item)
+            saved = self.save_others_data(data)
 
-        if self.save_others_data(data):
+        if saved:
             print("✓ Added to Others")
-            self.run_generate_markdown("media")
+            self.run_generate_markdown("media", [self.others_file])
 
     def edit_others(self) -> None:
         """Edit Others item."""
@@ -684,8 +901,13 @@ class MediaManager:
         print("✗ Video editing not implemented - please edit YAML files manually")
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     """Main function."""
+    args = parse_args(argv)
+    if args.command == "ingest":
+        # Before changing directory, so relative manifest paths work
+        args.manifest = args.manifest.resolve()
+
     # Find project root
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
@@ -702,16 +924,24 @@ def main() -> int:
         return 1
 
     manager = MediaManager(project_root)
+    if args.command == "ingest":
+        return manager.ingest(args.manifest, args.workers, args.downloads)
     manager.show_menu()
     return 0
 
 
-def parse_args() -> argparse.Namespace:
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     """Parse command line arguments."""
-    parser = argparse.ArgumentParser(description=__doc__)
-    return parser.parse_args()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command')
+    ingest_parser = subparsers.add_parser('ingest', help='Add pictures to gigs in bulk from a YAML/CSV manifest')
+    ingest_parser.add_argument('manifest', type=Path, help='Manifest file')
+    ingest_parser.add_argument('--workers', type=int, default=None,
+                               help='Processes for optimizing (default: CPU count)')
+    ingest_parser.add_argument('--downloads', type=int, default=media_ingest.DEFAULT_IO_WORKERS,
+                               help=f'Concurrent downloads (default: {media_ingest.DEFAULT_IO_WORKERS})')
+    return parser.parse_args(argv)
 
 
 if __name__ == '__main__':
-    args = parse_args()
     sys.exit(main())
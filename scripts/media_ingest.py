@@ -0,0 +1,403 @@
+"""
+Bulk, manifest-driven picture ingest for live performances.
+
+Used by `manage_media.py ingest MANIFEST` after a festival weekend or any
+batch too large for the interactive prompts. A manifest lists pictures
+per gig, as YAML:
+
+    - gig: 2025-10-11-noise-space-xv
+      author: Photographer Name
+      author_url: https://example.com        # optional
+      pictures:
+        - https://example.com/photos/1.jpg   # URL
+        - ~/Pictures/noise-space/2.jpg       # file
+        - ~/Pictures/noise-space/day2/       # every image in a directory
+        - ~/Pictures/noise-space/*.JPG       # glob
+
+or as CSV with the columns gig, picture, author, author_url (one picture
+per row; author is taken from the gig's first row that has one). Relative
+paths are resolved against the manifest's directory.
+
+Each picture runs through the stages
+
+    fetch -> sniff/validate -> optimize -> dedupe -> write
+
+Fetching and sniffing run on a thread pool, optimizing on a process pool,
+and a coordinator hands each picture to the next stage as soon as the
+previous one finishes, so downloads, encoding and writes overlap. At most
+max_in_flight pictures are between stages at any time, which bounds temp
+disk use. Dedupe and writes happen in manifest order, so file numbering is
+stable and the first copy of a repeated picture is the one kept.
+"""
+
+import csv
+import glob
+import os
+import sys
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import downloader
+import image_optimizer
+import media_store
+import yaml
+
+DEFAULT_IO_WORKERS = 8
+
+# Magic bytes -> canonical suffix (AVIF and WebP are checked separately)
+SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+
+class GigBatch(NamedTuple):
+    """Pictures for one gig from a manifest."""
+    gig: str
+    author: str
+    author_url: str
+    sources: List[str]
+
+
+class Picture(NamedTuple):
+    """One picture moving through the pipeline."""
+    index: int
+    gig: str
+    source: str
+
+
+class Prepared(NamedTuple):
+    """A picture after the pipeline, ready to write (or why it isn't)."""
+    picture: Picture
+    path: Optional[Path] = None
+    sha256: str = ""
+    suffix: str = ""
+    before: int = 0
+    after: int = 0
+    status: str = "ok"  # ok, duplicate, rejected, failed
+    error: str = ""
+    temp_files: Tuple[Path, ...] = ()
+
+
+class IngestError(ValueError):
+    """Raised when a manifest can't be read."""
+
+
+def is_url(source: str) -> bool:
+    """Return whether a picture source is an http(s) URL."""
+    return source.startswith(("http://", "https://"))
+
+
+def load_manifest(path: Path) -> List[GigBatch]:
+    """
+    Read a YAML or CSV ingest manifest.
+
+    Args:
+        path: Manifest file (.csv for CSV, anything else is YAML)
+
+    Returns:
+        Batches in manifest order, one per gig
+
+    Raises:
+        IngestError: If the manifest is malformed
+        OSError: If it can't be read
+    """
+    if path.suffix.lower() == ".csv":
+        entries = _read_csv(path)
+    else:
+        try:
+            data = yaml.safe_load(path.read_text(encoding="utf-8"))
+        except yaml.YAMLError as e:
+            raise IngestError(f"{path}: {e}") from e
+        if isinstance(data, dict) and "gigs" in data:
+            data = data["gigs"]
+        if not isinstance(data, list):
+            raise IngestError(f"{path}: expected a list of gigs")
+        entries = data
+
+    batches: Dict[str, GigBatch] = {}
+    for number, entry in enumerate(entries, 1):
+        if not isinstance(entry, dict) or not entry.get("gig"):
+            raise IngestError(f"{path}: entry {number} has no gig")
+        pictures = entry.get("pictures") or []
+        if isinstance(pictures, str):
+            pictures = [pictures]
+        gig = str(entry["gig"])
+        batch = batches.get(gig) or GigBatch(gig, "", "", [])
+        batches[gig] = batch._replace(
+            author=batch.author or str(entry.get("author") or ""),
+            author_url=batch.author_url or str(entry.get("author_url") or ""),
+            sources=batch.sources + expand_sources([str(p) for p in pictures], path.parent),
+        )
+    return list(batches.values())
+
+
+def _read_csv(path: Path) -> List[Dict[str, str]]:
+    """Read CSV rows as manifest entries."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or not {"gig", "picture"} <= set(reader.fieldnames):
+            raise IngestError(f"{path}: CSV needs gig and picture columns")
+        return [{"gig": row["gig"], "pictures": [row["picture"]] if row.get("picture") else [],
+                 "author": row.get("author", ""), "author_url": row.get("author_url", "")}
+                for row in reader]
+
+
+def expand_sources(sources: List[str], base_dir: Path) -> List[str]:
+    """
+    Expand directories and globs into picture sources.
+
+    Args:
+        sources: URLs, files, directories or glob patterns
+        base_dir: Directory relative paths are resolved against
+
+    Returns:
+        URLs and file paths; directories and globs expand to their media
+        files in sorted order (patterns matching nothing are kept, so they
+        are reported as missing)
+    """
+    expanded = []
+    for source in sources:
+        if is_url(source):
+            expanded.append(source)
+            continue
+        path = Path(os.path.expanduser(source))
+        if not path.is_absolute():
+            path = base_dir / path
+        if path.is_dir():
+            expanded.extend(str(p) for p in media_store.media_files([path]))
+        elif glob.has_magic(str(path)):
+            matches = sorted(p for p in glob.glob(str(path)) if Path(p).is_file())
+            expanded.extend(matches or [str(path)])
+        else:
+            expanded.append(str(path))
+    return expanded
+
+
+def sniff(path: Path) -> Optional[str]:
+    """
+    Identify an image by its leading bytes.
+
+    Args:
+        path: File to check
+
+    Returns:
+        Canonical suffix (.jpg, .png, .gif, .webp, .avif), or None if the
+        file isn't a supported image (e.g. an HTML error page)
+    """
+    with open(path, "rb") as f:
+        head = f.read(16)
+    for signature, suffix in SIGNATURES:
+        if head.startswith(signature):
+            return suffix
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return ".avif"
+    return None
+
+
+def validate(path: Path) -> str:
+    """Return why an image can't be decoded, or "" (checked only with Pillow)."""
+    if image_optimizer.Image is None:
+        return ""
+    try:
+        with image_optimizer.Image.open(path) as image:
+            image.verify()
+    except (OSError, ValueError, image_optimizer.Image.DecompressionBombError) as e:
+        return f"{type(e).__name__}: {e}"
+    return ""
+
+
+def _fetch(picture: Picture, fetcher: downloader.Downloader, temp_dir: Path) -> Prepared:
+    """Fetch, sniff and validate one picture (thread pool stage)."""
+    try:
+        return _fetch_and_sniff(picture, fetcher, temp_dir)
+    except OSError as e:
+        return Prepared(picture, status="failed", error=str(e))
+
+
+def _fetch_and_sniff(picture: Picture, fetcher: downloader.Downloader, temp_dir: Path) -> Prepared:
+    """Body of _fetch; OSError propagates."""
+    temp_files: Tuple[Path, ...] = ()
+    if is_url(picture.source):
+        fetched = temp_dir / f"{picture.index}-fetched"
+        result = fetcher.fetch(picture.source, fetched)
+        if not result.ok:
+            return Prepared(picture, status="failed", error=result.error)
+        path = fetched
+        temp_files = (fetched,)
+    else:
+        path = Path(picture.source)
+        if not path.is_file():
+            return Prepared(picture, status="failed", error="file not found")
+
+    suffix = sniff(path)
+    if suffix is None:
+        return Prepared(picture, status="rejected", error="not an image", temp_files=temp_files)
+    if temp_files:
+        # The optimizer picks formats by suffix
+        named = path.with_name(f"{picture.index}-fetched{suffix}")
+        os.replace(path, named)
+        path = named
+        temp_files = (named,)
+    error = validate(path)
+    if error:
+        return Prepared(picture, status="rejected", error=error, temp_files=temp_files)
+    size = path.stat().st_size
+    return Prepared(picture, path, suffix=suffix, before=size, after=size, temp_files=temp_files)
+
+
+def _optimize(job: Tuple[Path, Path]) -> Tuple[image_optimizer.OptimizeResult, str]:
+    """Optimize one image and hash the result (process pool stage); the hash is "" if unreadable."""
+    result = image_optimizer.optimize_file(*job)
+    try:
+        return result, media_store.hash_file(result.path)
+    except OSError as e:
+        return result._replace(error=str(e)), ""
+
+
+class PipelineStats:
+    """Counters and timings for the throughput summary."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.counts = {"ok": 0, "duplicate": 0, "rejected": 0, "failed": 0}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def done(self) -> int:
+        """Pictures through the pipeline."""
+        return sum(self.counts.values())
+
+    def summary(self) -> str:
+        """Return a one-line throughput summary."""
+        elapsed = self.elapsed or time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed else 0
+        mb_in = self.bytes_in / 1024 / 1024
+        return (f"{self.counts['ok']} of {self.total} pictures written in {elapsed:.1f}s "
+                f"({rate:.1f} pictures/s, {mb_in / elapsed if elapsed else 0:.1f} MB/s in; "
+                f"{mb_in:.1f} MB → {self.bytes_out / 1024 / 1024:.1f} MB); "
+                f"{self.counts['duplicate']} duplicates, {self.counts['rejected']} rejected, "
+                f"{self.counts['failed']} failed")
+
+
+def run_pipeline(pictures: List[Picture], fetcher: downloader.Downloader, temp_dir: Path,
+                 write: Callable[[Prepared], Prepared], known: Optional[Dict[str, Set[str]]] = None,
+                 io_workers: int = DEFAULT_IO_WORKERS, cpu_workers: Optional[int] = None,
+                 max_in_flight: Optional[int] = None,
+                 progress: Optional[Callable[[Prepared, PipelineStats], None]] = None) -> PipelineStats:
+    """
+    Run pictures through fetch, sniff/validate, optimize, dedupe and write.
+
+    Args:
+        pictures: Pictures in manifest order (index is their position)
+        fetcher: Downloader for URL sources
+        temp_dir: Directory for fetched and optimized copies
+        write: Called in manifest order for every picture; stores ok ones
+            and returns the final outcome
+        known: Content hashes already in each gig, for dedupe (updated)
+        io_workers: Fetch/sniff threads
+        cpu_workers: Optimize processes (default: CPU count)
+        max_in_flight: Pictures between stages at once (default: enough to
+            keep both pools busy)
+        progress: Called after each write
+
+    Returns:
+        PipelineStats for the run
+    """
+    known = known if known is not None else {}
+    cpu_workers = cpu_workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or io_workers + cpu_workers * 2
+    optimizing = image_optimizer.available()
+    stats = PipelineStats(len(pictures))
+
+    queue = iter(pictures)
+    pending: Dict[Future, Tuple[str, Prepared]] = {}
+    resolved: Dict[int, Prepared] = {}
+    next_write = 0
+
+    with ThreadPoolExecutor(max_workers=io_workers) as io_pool, \
+            ProcessPoolExecutor(max_workers=cpu_workers) as cpu_pool:
+
+        def fill() -> None:
+            # Only start fetching while fewer than max_in_flight pictures are between stages
+            while len(pending) + len(resolved) < max_in_flight:
+                picture = next(queue, None)
+                if picture is None:
+                    return
+                future = io_pool.submit(_fetch, picture, fetcher, temp_dir)
+                pending[future] = ("fetch", Prepared(picture))
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, prepared = pending.pop(future)
+                if stage == "fetch":
+                    prepared = future.result()
+                    if prepared.status == "ok" and optimizing:
+                        dest = temp_dir / f"{prepared.picture.index}-optimized{prepared.suffix}"
+                        pending[cpu_pool.submit(_optimize, (prepared.path, dest))] = (
+                            "optimize", prepared._replace(temp_files=prepared.temp_files + (dest,)))
+                        continue
+                    if prepared.status == "ok":
+                        prepared = prepared._replace(sha256=media_store.hash_file(prepared.path))
+                else:
+                    result, sha256 = future.result()
+                    if not sha256:
+                        prepared = prepared._replace(status="failed", error=result.error)
+                    else:
+                        if result.error:
+                            print(f"⚠ Could not optimize {prepared.picture.source}, storing as is: {result.error}")
+                        prepared = prepared._replace(path=result.path, sha256=sha256,
+                                                     after=result.after if result.changed else result.before)
+                resolved[prepared.picture.index] = prepared
+
+            # Dedupe and write in manifest order as soon as the next picture is resolved,
+            # so the first copy is the one kept and a failed write doesn't claim its hash
+            while next_write in resolved:
+                prepared = resolved.pop(next_write)
+                seen = known.setdefault(prepared.picture.gig, set())
+                if prepared.status == "ok" and prepared.sha256 in seen:
+                    prepared = prepared._replace(status="duplicate", error="already in this gig")
+                if prepared.status == "ok":
+                    prepared = write(prepared)
+                if prepared.status == "ok":
+                    seen.add(prepared.sha256)
+                for temp_file in prepared.temp_files:
+                    temp_file.unlink(missing_ok=True)
+                stats.counts[prepared.status] += 1
+                if prepared.status == "ok":
+                    stats.bytes_in += prepared.before
+                    stats.bytes_out += prepared.after
+                if progress:
+                    progress(prepared, stats)
+                next_write += 1
+            fill()
+
+    stats.elapsed = time.perf_counter() - stats.started
+    return stats
+
+
+def print_progress(prepared: Prepared, stats: PipelineStats) -> None:
+    """Report problems per picture and a running counter on terminals."""
+    if prepared.status != "ok":
+        symbol = "⚠" if prepared.status == "duplicate" else "✗"
+        print(f"\r{symbol} {prepared.picture.source}: {prepared.status} ({prepared.error})")
+    if sys.stdout.isatty():
+        end = "\n" if stats.done == stats.total else ""
+        print(f"\r  [{stats.done}/{stats.total}] {stats.counts['ok']} written", end=end, flush=True)
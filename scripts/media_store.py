@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for media files.
+
+Every image the media tools save goes into a blob store keyed by SHA-256,
+and the gig or standalone directory gets a hardlink to the blob (a copy
+where hardlinks aren't possible). The same photo attached to a gig and to
+a standalone picture therefore takes the space of one file, and a
+standalone picture whose image is already on the site simply references
+the existing copy instead of shipping a second one.
+
+The store lives in .cache/media-store (not committed); its index maps each
+hash to the website files that hold it.
+
+Commands:
+    report   List duplicate media files and the space they waste
+    migrate  Collapse existing duplicates into the store (hardlinks) and
+             point standalone pictures at an existing published copy
+
+Usage:
+    python media_store.py report
+    python media_store.py migrate [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import atomic_io
+import frontmatter_codec
+import yaml
+
+# Bump when the index layout changes
+STORE_VERSION = 1
+
+DEFAULT_STORE_NAME = "media-store"
+CHUNK_SIZE = 1024 * 1024
+
+# Media trees scanned by report and migrate, relative to the project root
+MEDIA_ROOTS = (Path("website/assets/media"), Path("website/static/media"))
+ASSETS_DIR = Path("website/assets")
+STATIC_DIR = Path("website/static")
+STANDALONE_CONTENT_DIR = Path("website/content/media/pictures")
+
+MEDIA_SUFFIXES = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif")
+
+
+def hash_file(path: Path) -> str:
+    """Return the hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MediaStore:
+    """Blob store keyed by SHA-256 with hardlinked working copies (thread-safe)."""
+
+    def __init__(self, root: Path, project_root: Path):
+        self.root = root
+        self.project_root = project_root
+        self.blob_dir = root / "blobs"
+        self.index_path = root / "index.json"
+        # sha256 -> project-relative paths linked to that blob
+        self.refs: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        self._read_index()
+
+    def _read_index(self) -> None:
+        """Load the index, discarding unreadable or outdated ones."""
+        try:
+            payload = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(payload, dict) and payload.get("version") == STORE_VERSION:
+            self.refs = payload.get("refs", {})
+
+    def save(self) -> None:
+        """Persist the index."""
+        with self._lock:
+            payload = json.dumps({"version": STORE_VERSION, "refs": self.refs}, indent=1, sort_keys=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+        atomic_io.write_text(self.index_path, payload + "\n")
+
+    def blob_path(self, sha256: str) -> Path:
+        """Return where a blob with the given hash is stored."""
+        return self.blob_dir / sha256[:2] / sha256
+
+    def _relative(self, path: Path) -> str:
+        """Return path relative to the project root, as the index stores it."""
+        try:
+            return Path(os.path.abspath(path)).relative_to(os.path.abspath(self.project_root)).as_posix()
+        except ValueError:
+            return os.path.abspath(path)
+
+    def put(self, source: Path, sha256: Optional[str] = None, link: bool = False) -> str:
+        """
+        Add a file's content to the store.
+
+        When the hash isn't known, the file is copied into the store and
+        hashed in the same pass.
+
+        Args:
+            source: File to add
+            sha256: Hash of source, if already computed (e.g. while downloading)
+            link: Hardlink source into the store instead of copying it (for
+                files already inside the project)
+
+        Returns:
+            Hex SHA-256 of the content
+
+        Raises:
+            OSError: If the file can't be read or the store written
+        """
+        if sha256 and self.blob_path(sha256).exists():
+            return sha256
+
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.blob_dir / f".{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp.unlink(missing_ok=True)
+        try:
+            if sha256:
+                try:
+                    if not link:
+                        raise OSError("copy requested")
+                    os.link(source, tmp)
+                except OSError:
+                    shutil.copyfile(source, tmp)
+            else:
+                digest = hashlib.sha256()
+                with open(source, 'rb') as src, open(tmp, 'wb') as dst:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                        digest.update(chunk)
+                        dst.write(chunk)
+                sha256 = digest.hexdigest()
+
+            blob = self.blob_path(sha256)
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp, blob)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return sha256
+
+    def link(self, sha256: str, dest: Path) -> bool:
+        """
+        Replace dest with a hardlink to a blob (a copy across filesystems).
+
+        Args:
+            sha256: Blob hash
+            dest: Working-copy path
+
+        Returns:
+            True if dest is a hardlink, False if it had to be copied
+
+        Raises:
+            OSError: If dest can't be written
+        """
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        blob = self.blob_path(sha256)
+        tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.unlink(missing_ok=True)
+        try:
+            try:
+                os.link(blob, tmp)
+                linked = True
+            except OSError:
+                shutil.copyfile(blob, tmp)
+                linked = False
+            os.replace(tmp, dest)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+        key = self._relative(dest)
+        with self._lock:
+            for paths in self.refs.values():
+                if key in paths:
+                    paths.remove(key)
+            self.refs[sha256] = sorted(set(self.refs.get(sha256, [])) | {key})
+            self.refs = {digest: paths for digest, paths in self.refs.items() if paths}
+        return linked
+
+    def add(self, source: Path, dest: Path, sha256: Optional[str] = None) -> str:
+        """
+        Store a file's content and place it at dest.
+
+        Args:
+            source: File to add
+            dest: Working-copy path (e.g. assets/media/live/<gig>/<name>.jpg)
+            sha256: Hash of source, if already computed
+
+        Returns:
+            Hex SHA-256 of the content
+
+        Raises:
+            OSError: If the file can't be read or written
+        """
+        sha256 = self.put(source, sha256)
+        self.link(sha256, dest)
+        self.save()
+        return sha256
+
+    def published(self, sha256: str) -> List[Path]:
+        """
+        Return existing working copies of a blob.
+
+        Paths whose content has since been replaced are dropped.
+
+        Args:
+            sha256: Blob hash
+
+        Returns:
+            Absolute paths, sorted
+        """
+        try:
+            blob = self.blob_path(sha256).stat()
+        except OSError:
+            return []
+
+        found = []
+        with self._lock:
+            for key in self.refs.get(sha256, []):
+                path = self.project_root / key
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                if (st.st_dev, st.st_ino) == (blob.st_dev, blob.st_ino) or (
+                        st.st_size == blob.st_size and hash_file(path) == sha256):
+                    found.append(path)
+        return sorted(found)
+
+    def asset_path(self, sha256: str) -> Optional[str]:
+        """Return the resource path (e.g. media/live/<gig>/x.jpg) of a copy of the blob under assets/, if any."""
+        assets_dir = self.project_root / ASSETS_DIR
+        for path in self.published(sha256):
+            try:
+                return path.relative_to(assets_dir).as_posix()
+            except ValueError:
+                continue
+        return None
+
+
+def default_store_dir(project_root: Path) -> Path:
+    """Return the shared media store location for a project checkout."""
+    return project_root / ".cache" / DEFAULT_STORE_NAME
+
+
+def open_store(project_root: Path) -> MediaStore:
+    """Open the shared media store for a project checkout."""
+    return MediaStore(default_store_dir(project_root), project_root)
+
+
+def media_files(roots: Iterable[Path]) -> List[Path]:
+    """Return media files under the given directories, skipping hidden and temp files."""
+    files = []
+    for root in roots:
+        if not root.exists():
+            continue
+        for path in root.rglob("*"):
+            if path.suffix.lower() in MEDIA_SUFFIXES and not path.name.startswith(".") and path.is_file():
+                files.append(path)
+    return sorted(files)
+
+
+def find_duplicates(paths: Iterable[Path]) -> Dict[str, List[Path]]:
+    """
+    Group files with identical content.
+
+    Only files sharing a size are hashed.
+
+    Args:
+        paths: Files to compare
+
+    Returns:
+        Mapping of hash to its paths (two or more, sorted)
+    """
+    by_size: Dict[int, List[Path]] = {}
+    for path in paths:
+        by_size.setdefault(path.stat().st_size, []).append(path)
+
+    groups: Dict[str, List[Path]] = {}
+    for same_size in by_size.values():
+        if len(same_size) < 2:
+            continue
+        for path in same_size:
+            groups.setdefault(hash_file(path), []).append(path)
+    return {digest: sorted(group) for digest, group in groups.items() if len(group) > 1}
+
+
+def wasted_bytes(groups: Dict[str, List[Path]]) -> int:
+    """Return the space taken by every copy after the first, ignoring existing hardlinks."""
+    total = 0
+    for group in groups.values():
+        inodes = {(p.stat().st_dev, p.stat().st_ino): p.stat().st_size for p in group}
+        total += sum(inodes.values()) - next(iter(inodes.values()))
+    return total
+
+
+def image_reference(project_root: Path, path: Path) -> Optional[str]:
+    """
+    Return how content files refer to a media file.
+
+    Args:
+        project_root: Project checkout
+        path: Media file
+
+    Returns:
+        Resource path for files under assets/ (media/...), site URL for
+        legacy files under static/ (/media/...), or None for other files
+    """
+    for root, prefix in ((ASSETS_DIR, ""), (STATIC_DIR, "/")):
+        try:
+            return prefix + path.relative_to(project_root / root).as_posix()
+        except ValueError:
+            continue
+    return None
+
+
+def standalone_references(project_root: Path) -> Dict[str, List[Path]]:
+    """
+    Map standalone picture image URLs to the content files that use them.
+
+    Args:
+        project_root: Project checkout
+
+    Returns:
+        Mapping of image reference (e.g. media/standalone/x.jpg) to content files
+    """
+    refs: Dict[str, List[Path]] = {}
+    content_dir = project_root / STANDALONE_CONTENT_DIR
+    if not content_dir.exists():
+        return refs
+    for path in sorted(content_dir.iterdir()):
+        if path.suffix not in (".yaml", ".md"):
+            continue
+        try:
+            data = frontmatter_codec.read_header(path)
+        except (OSError, ValueError, yaml.YAMLError):
+            continue
+        if isinstance(data, dict) and isinstance(data.get("image"), str):
+            refs.setdefault(data["image"], []).append(path)
+    return refs
+
+
+def migrate(project_root: Path, store: MediaStore, dry_run: bool = False) -> Tuple[int, int, int]:
+    """
+    Collapse duplicate media files.
+
+    Every media file is registered in the store. Duplicates become
+    hardlinks to one blob, and a standalone picture whose image duplicates
+    another published file is pointed at that file, its own copy removed,
+    so the site ships the image once.
+
+    Args:
+        project_root: Project checkout
+        store: Media store
+        dry_run: Report what would change without touching anything
+
+    Returns:
+        Tuple of (files linked, standalone pictures re-pointed, bytes reclaimed)
+    """
+    files = media_files(project_root / root for root in MEDIA_ROOTS)
+    groups = find_duplicates(files)
+    reclaimed = wasted_bytes(groups)
+    digests = {path: digest for digest, group in groups.items() for path in group}
+
+    linked = 0
+    if not dry_run:
+        # Unique files are registered too, so later additions find them
+        for path in files:
+            digest = digests.get(path) or hash_file(path)
+            store.put(path, digest, link=True)
+            store.link(digest, path)
+            linked += path in digests
+
+    references = standalone_references(project_root)
+    repointed = 0
+    for group in groups.values():
+        # Prefer a gig's copy (assets/ before static/); standalone copies are the redundant ones
+        canonical = next((p for p in group if "standalone" not in p.parts), group[0])
+        reference = image_reference(project_root, canonical)
+        for path in group:
+            old_reference = image_reference(project_root, path)
+            if path == canonical or old_reference not in references:
+                continue
+            print(f"  {'Would point' if dry_run else 'Pointing'} {old_reference} -> {reference}")
+            repointed += 1
+            if dry_run:
+                continue
+            for content_file in references[old_reference]:
+                update_image(content_file, reference)
+            path.unlink()
+
+    if not dry_run:
+        store.save()
+    return linked, repointed, reclaimed
+
+
+def update_image(content_file: Path, reference: str) -> None:
+    """Rewrite the image field of a standalone picture content file."""
+    with atomic_io.locked(content_file):
+        data, body, has_frontmatter = frontmatter_codec.read_document(content_file)
+        data["image"] = reference
+        atomic_io.write_text(content_file, frontmatter_codec.format_document(data, body, has_frontmatter))
+
+
+def report(project_root: Path) -> int:
+    """
+    Print duplicate media files.
+
+    Args:
+        project_root: Project checkout
+
+    Returns:
+        Number of duplicate groups
+    """
+    files = media_files(project_root / root for root in MEDIA_ROOTS)
+    groups = find_duplicates(files)
+    for digest, group in sorted(groups.items(), key=lambda item: item[1][0]):
+        size = group[0].stat().st_size
+        print(f"{digest[:12]}  {size / 1024:.0f} KB × {len(group)}")
+        for path in group:
+            print(f"  {path.relative_to(project_root)}")
+    print(f"Scanned {len(files)} media files: {len(groups)} duplicated, "
+          f"{wasted_bytes(groups) / 1024 / 1024:.1f} MB reclaimable")
+    return len(groups)
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    project_root = Path(__file__).parent.parent
+
+    if args.command == "report":
+        report(project_root)
+        return 0
+
+    try:
+        linked, repointed, reclaimed = migrate(project_root, open_store(project_root), args.dry_run)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"✗ Migration failed: {e}")
+        return 1
+    verb = "Would reclaim" if args.dry_run else "Reclaimed"
+    print(f"✓ {verb} {reclaimed / 1024 / 1024:.1f} MB: {linked} duplicate files linked, "
+          f"{repointed} standalone pictures re-pointed")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('report', help='List duplicate media files')
+    migrate_parser = subparsers.add_parser('migrate', help='Collapse duplicates into the media store')
+    migrate_parser.add_argument('--dry-run', action='store_true', help='Show what would change')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
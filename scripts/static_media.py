@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Move legacy media from website/static/media into website/assets/media.
+
+Files under static/ bypass Hugo's image processing and ship at full
+resolution, while the templates resize images from assets/. The media
+tools now write into assets/; this script moves what is left under
+static/media there and rewrites the references to it:
+
+- standalone pictures' image field (/media/... URL -> media/... resource path);
+- a gig's media.pictures.images and poster entries written as paths
+  (/media/live/<gig>/x.jpg), which the templates resolve as bare file
+  names inside assets/media/live/<gig>.
+
+A file identical to the one already in assets/ is simply removed. Files
+that aren't images, or that differ from an assets/ file of the same name,
+are reported and left in place.
+
+verify checks that nothing under static/ ships an unresized photo: static/media
+must be empty and no image under static/ may exceed the optimizer's
+MAX_DIMENSION.
+
+Commands:
+    migrate  Move static/media into assets/media (--dry-run to preview)
+    verify   Exit with 1 if static/ still ships photos
+
+Usage:
+    python static_media.py migrate [--dry-run]
+    python static_media.py verify
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+import atomic_io
+import frontmatter_codec
+import image_optimizer
+import media_store
+import yaml
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+STATIC_MEDIA = media_store.STATIC_DIR / "media"
+ASSETS_MEDIA = media_store.ASSETS_DIR / "media"
+LIVE_DATA_DIR = Path("website/data/live")
+
+
+class Move(NamedTuple):
+    """One file to move out of static/media."""
+    source: Path
+    dest: Path
+    sha256: str
+    duplicate: bool = False
+
+
+def is_image(path: Path) -> bool:
+    """Return whether a file decodes as an image (by suffix without Pillow)."""
+    if path.suffix.lower() not in media_store.MEDIA_SUFFIXES:
+        return False
+    if Image is None:
+        return True
+    try:
+        with Image.open(path) as image:
+            image.verify()
+        return True
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return False
+
+
+def plan(project_root: Path) -> Tuple[List[Move], List[str]]:
+    """
+    Work out where every file under static/media goes.
+
+    Args:
+        project_root: Project checkout
+
+    Returns:
+        Tuple of (moves, problems with files that can't be moved)
+    """
+    static_media = project_root / STATIC_MEDIA
+    assets_media = project_root / ASSETS_MEDIA
+    moves = []
+    problems = []
+    if not static_media.exists():
+        return moves, problems
+
+    for source in sorted(p for p in static_media.rglob("*") if p.is_file() and not p.name.startswith(".")):
+        relative = source.relative_to(static_media)
+        if not is_image(source):
+            problems.append(f"{source.relative_to(project_root)}: not an image, left in place")
+            continue
+        sha256 = media_store.hash_file(source)
+        dest = assets_media / relative
+        if not dest.exists():
+            moves.append(Move(source, dest, sha256))
+        elif media_store.hash_file(dest) == sha256:
+            moves.append(Move(source, dest, sha256, duplicate=True))
+        else:
+            # Content already resolves the name to the assets/ file; only a person can tell which is wanted
+            problems.append(f"{source.relative_to(project_root)}: differs from "
+                            f"{dest.relative_to(project_root)}, left in place")
+    return moves, problems
+
+
+def normalize_gig(project_root: Path, gig: str, dry_run: bool = False) -> int:
+    """
+    Rewrite a gig's poster and picture entries given as paths to bare file names.
+
+    Args:
+        project_root: Project checkout
+        gig: Gig slug (data/live/<gig>.yaml)
+        dry_run: Count without writing
+
+    Returns:
+        Number of entries rewritten
+    """
+    data_file = project_root / LIVE_DATA_DIR / f"{gig}.yaml"
+    if not data_file.exists():
+        return 0
+    with atomic_io.locked(data_file):
+        data, body, has_frontmatter = frontmatter_codec.read_document(data_file)
+        changed = 0
+        if "/" in str(data.get("poster") or ""):
+            data["poster"] = os.path.basename(data["poster"])
+            changed += 1
+        images = ((data.get("media") or {}).get("pictures") or {}).get("images") or []
+        for i, name in enumerate(images):
+            if isinstance(name, str) and "/" in name:
+                images[i] = os.path.basename(name)
+                changed += 1
+        if changed and not dry_run:
+            atomic_io.write_text(data_file, frontmatter_codec.format_document(data, body, has_frontmatter))
+    return changed
+
+
+def migrate(project_root: Path, store: media_store.MediaStore,
+            dry_run: bool = False) -> Tuple[int, int, List[str]]:
+    """
+    Move static/media into assets/media and rewrite references.
+
+    Args:
+        project_root: Project checkout
+        store: Media store (moved files become hardlinks to its blobs)
+        dry_run: Report what would change without touching anything
+
+    Returns:
+        Tuple of (files moved or removed, references rewritten, problems)
+    """
+    moves, problems = plan(project_root)
+    references = media_store.standalone_references(project_root)
+    static_media = project_root / STATIC_MEDIA
+    rewritten = 0
+    gigs = set()
+
+    for move in moves:
+        old = media_store.image_reference(project_root, move.source)
+        new = media_store.image_reference(project_root, move.dest)
+        verb = "remove duplicate" if move.duplicate else "move"
+        print(f"  {'Would ' + verb if dry_run else verb.capitalize()} {old} -> {new}")
+
+        relative = move.source.relative_to(static_media)
+        if relative.parts[0] == "live" and len(relative.parts) == 3:
+            gigs.add(relative.parts[1])
+
+        for content_file in references.get(old, []):
+            rewritten += 1
+            if not dry_run:
+                media_store.update_image(content_file, new)
+
+        if not dry_run:
+            if not move.duplicate:
+                store.put(move.source, move.sha256, link=True)
+                store.link(move.sha256, move.dest)
+            move.source.unlink()
+
+    for gig in sorted(gigs):
+        rewritten += normalize_gig(project_root, gig, dry_run)
+
+    if not dry_run:
+        store.save()
+        for directory in sorted((p for p in static_media.rglob("*") if p.is_dir()), reverse=True):
+            if not any(directory.iterdir()):
+                directory.rmdir()
+        if static_media.exists() and not any(static_media.iterdir()):
+            static_media.rmdir()
+    return len(moves), rewritten, problems
+
+
+def verify(project_root: Path, max_dimension: int = image_optimizer.MAX_DIMENSION) -> List[str]:
+    """
+    Find photos that would ship unresized from static/.
+
+    Args:
+        project_root: Project checkout
+        max_dimension: Largest side allowed for images under static/
+
+    Returns:
+        Problems found (empty if static/ is clean)
+    """
+    static_dir = project_root / media_store.STATIC_DIR
+    problems = [f"{path.relative_to(project_root)}: media file under static/ (move it to assets/)"
+                for path in sorted((project_root / STATIC_MEDIA).rglob("*")) if path.is_file()]
+    if Image is None:
+        print("⚠ Pillow is not installed; sizes of images under static/ not checked")
+        return problems
+    for path in media_store.media_files([static_dir]):
+        if path.is_relative_to(project_root / STATIC_MEDIA):
+            continue
+        size = _dimensions(path)
+        if size and max(size) > max_dimension:
+            problems.append(f"{path.relative_to(project_root)}: {size[0]}x{size[1]} exceeds {max_dimension}px")
+    return problems
+
+
+def _dimensions(path: Path) -> Optional[Tuple[int, int]]:
+    """Return an image's size, or None if it can't be read."""
+    try:
+        with Image.open(path) as image:
+            return image.size
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    project_root = Path(__file__).parent.parent
+
+    if args.command == "migrate":
+        try:
+            moved, rewritten, problems = migrate(project_root, media_store.open_store(project_root), args.dry_run)
+        except (OSError, ValueError, yaml.YAMLError) as e:
+            print(f"✗ Migration failed: {e}")
+            return 1
+        for problem in problems:
+            print(f"⚠ {problem}")
+        verb = "Would move" if args.dry_run else "Moved"
+        print(f"✓ {verb} {moved} files into assets/media, {rewritten} references rewritten")
+        if args.dry_run:
+            return 0
+
+    problems = verify(project_root)
+    for problem in problems:
+        print(f"✗ {problem}")
+    if problems:
+        return 1
+    print("✓ No unresized photos under website/static")
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help='Move static/media into assets/media')
+    migrate_parser.add_argument('--dry-run', action='store_true', help='Show what would change')
+    subparsers.add_parser('verify', help='Check that static/ ships no unresized photos')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
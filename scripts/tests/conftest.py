@@ -0,0 +1,32 @@
+"""
+Shared fixtures for the script tests.
+"""
+
+from typing import Iterable
+
+import pytest
+
+
+@pytest.fixture
+def pil():
+    """Return PIL.Image, skipping the test when Pillow isn't installed."""
+    return pytest.importorskip("PIL.Image")
+
+
+def _write_gear(directory, slug: str, name: str, *, manufacturer: str = "BOSS", category: str = "Pedal",
+                technology: str = "Analog", types: Iterable[str] = ("Fuzz",)):
+    """Write a gear file, creating its directory, and return its path."""
+    directory.mkdir(parents=True, exist_ok=True)
+    types_yaml = "".join(f"  - {t}\n" for t in types)
+    path = directory / f"{slug}.yaml"
+    path.write_text(
+        f"name: {name}\nmanufacturer: {manufacturer}\ncategory: {category}\n"
+        f"technology: {technology}\ntypes:\n{types_yaml}"
+    )
+    return path
+
+
+@pytest.fixture
+def write_gear():
+    """Return a function writing gear files: write_gear(directory, slug, name, **fields)."""
+    return _write_gear
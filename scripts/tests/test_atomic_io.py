@@ -0,0 +1,166 @@
+"""
+Unit tests for atomic_io.py
+
+Tests cover atomic replacement and creation, re-entrant per-file locks
+that serialize concurrent processes, and journaled multi-file
+transactions including crash recovery.
+"""
+
+import multiprocessing
+import os
+from unittest.mock import patch
+
+import atomic_io
+import pytest
+
+
+def increment(path, rounds):
+    """Read-modify-write a counter file under the lock (subprocess target)."""
+    for _ in range(rounds):
+        with atomic_io.locked(path):
+            value = int(path.read_text())
+            atomic_io.write_text(path, str(value + 1))
+
+
+class TestWriteText:
+    """Test write_text and create_text functions."""
+
+    def test_write_replaces_content(self, tmp_path):
+        """Test content is replaced and no temp files are left behind."""
+        path = tmp_path / "gig.yaml"
+        path.write_text("old")
+
+        atomic_io.write_text(path, "new")
+
+        assert path.read_text() == "new"
+        assert os.listdir(tmp_path) == ["gig.yaml"]
+
+    def test_write_preserves_mode(self, tmp_path):
+        """Test the target's permissions survive the replace."""
+        path = tmp_path / "gig.yaml"
+        path.write_text("old")
+        path.chmod(0o640)
+
+        atomic_io.write_text(path, "new")
+
+        assert path.stat().st_mode & 0o777 == 0o640
+
+    def test_failed_write_keeps_original(self, tmp_path):
+        """Test a failure before the rename leaves the old content intact."""
+        path = tmp_path / "gig.yaml"
+        path.write_text("old")
+
+        with patch('atomic_io.os.replace', side_effect=OSError("disk full")):
+            with pytest.raises(OSError, match="disk full"):
+                atomic_io.write_text(path, "new")
+
+        assert path.read_text() == "old"
+        assert os.listdir(tmp_path) == ["gig.yaml"]
+
+    def test_create_text(self, tmp_path):
+        """Test create_text writes new files and refuses existing ones."""
+        path = tmp_path / "gear.yaml"
+        atomic_io.create_text(path, "first")
+
+        with pytest.raises(FileExistsError):
+            atomic_io.create_text(path, "second")
+
+        assert path.read_text() == "first"
+        assert os.listdir(tmp_path) == ["gear.yaml"]
+
+
+class TestLocked:
+    """Test locked context manager."""
+
+    def test_reentrant(self, tmp_path):
+        """Test nested locks on the same file don't deadlock."""
+        path = tmp_path / "gig.yaml"
+        with atomic_io.locked(path):
+            with atomic_io.locked(path):
+                atomic_io.write_text(path, "nested")
+
+        assert path.read_text() == "nested"
+
+    def test_serializes_processes(self, tmp_path):
+        """Test concurrent read-modify-write cycles lose no updates."""
+        path = tmp_path / "counter"
+        path.write_text("0")
+
+        ctx = multiprocessing.get_context('fork')
+        workers = [ctx.Process(target=increment, args=(path, 25)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert path.read_text() == "100"
+
+
+class TestTransaction:
+    """Test Transaction class and recover function."""
+
+    def test_rename(self, tmp_path):
+        """Test writing a new file and deleting the old one together."""
+        old = tmp_path / "2025-01-01-old.yaml"
+        new = tmp_path / "2025-01-01-new.yaml"
+        old.write_text("old")
+
+        with atomic_io.Transaction() as txn:
+            txn.write(new, "new")
+            txn.delete(old)
+
+        assert not old.exists()
+        assert new.read_text() == "new"
+        assert os.listdir(tmp_path) == ["2025-01-01-new.yaml"]
+
+    def test_exception_discards_changes(self, tmp_path):
+        """Test nothing is applied when the block raises."""
+        old = tmp_path / "old.yaml"
+        old.write_text("old")
+
+        with pytest.raises(RuntimeError):
+            with atomic_io.Transaction() as txn:
+                txn.write(tmp_path / "new.yaml", "new")
+                txn.delete(old)
+                raise RuntimeError("cancelled")
+
+        assert os.listdir(tmp_path) == ["old.yaml"]
+
+    def test_crash_before_commit_point(self, tmp_path):
+        """Test a failure while staging leaves the original files untouched."""
+        old = tmp_path / "old.yaml"
+        old.write_text("old")
+
+        txn = atomic_io.Transaction()
+        txn.write(tmp_path / "new.yaml", "new")
+        txn.delete(old)
+        with patch.object(atomic_io.Transaction, '_write_journal', side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                txn.commit()
+
+        assert os.listdir(tmp_path) == ["old.yaml"]
+
+    def test_crash_after_commit_point_recovered(self, tmp_path):
+        """Test recover rolls forward a journal whose apply step never ran."""
+        old = tmp_path / "old.yaml"
+        new = tmp_path / "new.yaml"
+        old.write_text("old")
+
+        txn = atomic_io.Transaction()
+        txn.write(new, "new")
+        txn.delete(old)
+        with patch('atomic_io._apply_journal', side_effect=KeyboardInterrupt):
+            with pytest.raises(KeyboardInterrupt):
+                txn.commit()
+
+        assert old.exists()
+        assert not new.exists()
+
+        assert atomic_io.recover(tmp_path) == 1
+        assert sorted(os.listdir(tmp_path)) == ["new.yaml"]
+        assert new.read_text() == "new"
+
+    def test_recover_nothing_to_do(self, tmp_path):
+        """Test recover on clean or missing directories."""
+        assert atomic_io.recover(tmp_path) == 0
+        assert atomic_io.recover(tmp_path / "missing") == 0
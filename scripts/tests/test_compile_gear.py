@@ -0,0 +1,133 @@
+"""
+Unit tests for compile_gear.py
+
+Tests cover collecting active, sold and want gear into one sorted
+catalog, facet counts, and rewriting the file only when it changes.
+"""
+
+import json
+
+import compile_gear
+import pytest
+
+
+@pytest.fixture
+def gear_dir(tmp_path, write_gear):
+    """Create a gear directory with active, sold and want items."""
+    gear_dir = tmp_path / "data" / "gear"
+    write_gear(gear_dir, "boss-ds-1", "DS-1", types=("Distortion",))
+    write_gear(gear_dir, "boss-bd-2", "BD-2", types=("Overdrive", "Distortion"))
+    write_gear(gear_dir, "korg-ms-20", "MS-20", category="Synth", types=("Monophonic",))
+    write_gear(gear_dir / "sold", "boss-rc-20", "RC-20", technology="Digital", types=("Looper",))
+    write_gear(gear_dir / "want", "dod-fx86", "FX86")
+    (gear_dir / ".boss-ds-1.yaml.swp").write_text("junk")
+    (gear_dir / "archived").mkdir()
+    write_gear(gear_dir / "archived", "old", "Old")
+    return gear_dir
+
+
+class TestBuildCatalog:
+    """Test build_catalog function."""
+
+    def test_items_sorted_by_status_then_slug(self, gear_dir):
+        """Test every status is included in display order, archived and temp files are not."""
+        catalog = compile_gear.build_catalog(gear_dir)
+
+        assert [(i["status"], i["id"]) for i in catalog["items"]] == [
+            ("active", "boss-bd-2"),
+            ("active", "boss-ds-1"),
+            ("active", "korg-ms-20"),
+            ("sold", "boss-rc-20"),
+            ("want", "dod-fx86"),
+        ]
+        assert catalog["items"][0]["name"] == "BD-2"
+        assert catalog["counts"] == {"active": 3, "sold": 1, "want": 1, "total": 5}
+
+    def test_facets(self, gear_dir):
+        """Test facet counts per status and overall."""
+        facets = compile_gear.build_catalog(gear_dir)["facets"]
+
+        assert facets["active"]["category"] == {"Pedal": 2, "Synth": 1}
+        assert facets["active"]["type"] == {"Distortion": 2, "Monophonic": 1, "Overdrive": 1}
+        assert facets["sold"]["technology"] == {"Digital": 1}
+        assert facets["all"]["technology"] == {"Analog": 4, "Digital": 1}
+        assert list(facets["all"]["type"]) == sorted(facets["all"]["type"])
+
+    def test_invalid_file(self, gear_dir):
+        """Test a non-mapping gear file is reported."""
+        (gear_dir / "broken.yaml").write_text("- just\n- a list\n")
+        with pytest.raises(ValueError, match="Not a gear mapping"):
+            compile_gear.build_catalog(gear_dir)
+
+    def test_missing_directory(self, tmp_path):
+        """Test an empty catalog for a missing gear directory."""
+        catalog = compile_gear.build_catalog(tmp_path / "gear")
+        assert catalog["items"] == []
+        assert catalog["counts"]["total"] == 0
+
+
+class TestWriteCatalog:
+    """Test write_catalog function."""
+
+    def test_writes_only_on_change(self, gear_dir, write_gear):
+        """Test the file is written next to the gear directory and left alone when unchanged."""
+        output = gear_dir.parent / "gear_catalog.json"
+
+        assert compile_gear.write_catalog(gear_dir) is True
+        mtime = output.stat().st_mtime_ns
+        assert compile_gear.write_catalog(gear_dir) is False
+        assert output.stat().st_mtime_ns == mtime
+
+        write_gear(gear_dir, "boss-sd-1", "SD-1")
+        assert compile_gear.write_catalog(gear_dir) is True
+        assert json.loads(output.read_text())["counts"]["active"] == 4
+
+    def test_is_gear_path(self, gear_dir):
+        """Test which paths feed the catalog."""
+        assert compile_gear.is_gear_path(gear_dir / "boss-ds-1.yaml", gear_dir)
+        assert compile_gear.is_gear_path(gear_dir / "sold" / "boss-rc-20.yaml", gear_dir)
+        assert not compile_gear.is_gear_path(gear_dir / "archived" / "old.yaml", gear_dir)
+        assert not compile_gear.is_gear_path(gear_dir / ".swp.yaml", gear_dir)
+        assert not compile_gear.is_gear_path(gear_dir.parent / "live" / "gig.yaml", gear_dir)
+
+
+class TestFacetIndexes:
+    """Test facet index files."""
+
+    def test_build_facet_index(self, gear_dir):
+        """Test each value maps to its count and IDs across statuses."""
+        catalog = compile_gear.build_catalog(gear_dir)
+
+        index = compile_gear.build_facet_index(catalog, "type")
+        assert index["facet"] == "type"
+        assert index["total"] == 5
+        assert index["values"]["Distortion"] == {"count": 2, "ids": ["boss-bd-2", "boss-ds-1"]}
+        assert index["values"]["Looper"]["ids"] == ["boss-rc-20"]
+        assert list(index["values"]) == sorted(index["values"])
+
+        technology = compile_gear.build_facet_index(catalog, "technology")
+        assert technology["values"]["Analog"]["count"] == 4
+
+    def test_written_under_static(self, tmp_path, write_gear):
+        """Test facet files are written to website/static/gear/facets, compactly."""
+        gear_dir = tmp_path / "website" / "data" / "gear"
+        write_gear(gear_dir, "boss-ds-1", "DS-1")
+
+        compile_gear.write_catalog(gear_dir)
+
+        facets_dir = tmp_path / "website" / "static" / "gear" / "facets"
+        assert sorted(p.name for p in facets_dir.iterdir()) == ["category.json", "technology.json", "type.json"]
+        text = (facets_dir / "category.json").read_text()
+        assert json.loads(text)["values"] == {"Pedal": {"count": 1, "ids": ["boss-ds-1"]}}
+        assert " " not in text.strip()
+
+    def test_stale_outputs(self, gear_dir, tmp_path):
+        """Test a changed facet file alone is reported stale and rewritten."""
+        facets_dir = tmp_path / "facets"
+        compile_gear.write_catalog(gear_dir, facets_dir=facets_dir)
+        (facets_dir / "type.json").write_text("{}")
+
+        outputs = compile_gear.compile_outputs(gear_dir, facets_dir=facets_dir)
+        assert compile_gear.stale_outputs(outputs) == [facets_dir / "type.json"]
+        assert compile_gear.write_catalog(gear_dir, facets_dir=facets_dir) is True
+        assert compile_gear.stale_outputs(outputs) == []
@@ -0,0 +1,193 @@
+"""
+Unit tests for content_index.py
+
+Tests cover cache hits and misses across runs, invalidation on change,
+recovery from unreadable caches, and concurrent use from threads.
+"""
+
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+import yaml
+from content_index import ContentIndex, default_cache_path, open_index
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Create a small website/data tree."""
+    data = tmp_path / "website" / "data"
+    (data / "live").mkdir(parents=True)
+    (data / "gear").mkdir()
+    (data / "live" / "2025-01-01-test.yaml").write_text(
+        "---\ntitle: Test\ndate: 2025-01-01\n---\n\nBody text\n"
+    )
+    (data / "gear" / "boss-bd-2.yaml").write_text(
+        "name: BD-2\nmanufacturer: BOSS\ncategory: Pedal\n"
+    )
+    return data
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """Return index cache location."""
+    return tmp_path / ".cache" / "content-index.pickle"
+
+
+class TestContentIndex:
+    """Test ContentIndex class."""
+
+    def test_load_parses_and_caches(self, data_dir, cache_path):
+        """Test first load parses, second load is a hit."""
+        index = ContentIndex(cache_path)
+        path = data_dir / "gear" / "boss-bd-2.yaml"
+
+        assert index.load(path)['name'] == 'BD-2'
+        assert index.load(path)['name'] == 'BD-2'
+        assert index.misses == 1
+        assert index.hits == 1
+
+    def test_load_returns_copy(self, data_dir, cache_path):
+        """Test callers can mutate results without touching the cache."""
+        index = ContentIndex(cache_path)
+        path = data_dir / "gear" / "boss-bd-2.yaml"
+
+        data = index.load(path)
+        data['_filename'] = 'x'
+
+        assert '_filename' not in index.load(path)
+
+    def test_warm_run_skips_parsing(self, data_dir, cache_path):
+        """Test a second process reuses the persisted index."""
+        ContentIndex(cache_path).warm(data_dir)
+        assert cache_path.exists()
+
+        index = ContentIndex(cache_path)
+        with patch('content_index.frontmatter_codec.load') as mock_load:
+            index.warm(data_dir)
+
+        mock_load.assert_not_called()
+        assert index.hits == 2
+        assert index.misses == 0
+
+    def test_changed_file_is_reparsed(self, data_dir, cache_path):
+        """Test content changes invalidate the entry."""
+        path = data_dir / "gear" / "boss-bd-2.yaml"
+        ContentIndex(cache_path).warm(data_dir)
+
+        path.write_text("name: BD-2w\nmanufacturer: BOSS\ncategory: Pedal\n")
+        index = ContentIndex(cache_path)
+
+        assert index.load(path)['name'] == 'BD-2w'
+        assert index.misses == 1
+
+    def test_touched_file_is_not_reparsed(self, data_dir, cache_path):
+        """Test mtime change with identical content only refreshes the stat key."""
+        path = data_dir / "gear" / "boss-bd-2.yaml"
+        index = ContentIndex(cache_path)
+        index.load(path)
+
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+
+        with patch('content_index.frontmatter_codec.load') as mock_load:
+            assert index.load(path)['name'] == 'BD-2'
+        mock_load.assert_not_called()
+        assert index.entries[os.path.abspath(path)]['mtime_ns'] == st.st_mtime_ns + 10_000_000
+
+    def test_body_edit_is_not_reparsed(self, data_dir, cache_path):
+        """Test edits below the frontmatter keep the cached header."""
+        path = data_dir / "live" / "2025-01-01-test.yaml"
+        index = ContentIndex(cache_path)
+        index.load(path)
+
+        path.write_text("---\ntitle: Test\ndate: 2025-01-01\n---\n\nLonger body text\n")
+
+        with patch('content_index.frontmatter_codec.load') as mock_load:
+            assert index.load(path)['title'] == 'Test'
+        mock_load.assert_not_called()
+
+    def test_load_many_collects_errors(self, data_dir, cache_path):
+        """Test invalid files are reported per file."""
+        bad = data_dir / "live" / "bad.yaml"
+        bad.write_text("invalid: yaml: content:")
+        good = data_dir / "gear" / "boss-bd-2.yaml"
+
+        results = ContentIndex(cache_path).load_many([bad, good])
+
+        assert results[0][1] is None
+        assert isinstance(results[0][2], yaml.YAMLError)
+        assert results[1][1]['manufacturer'] == 'BOSS'
+        assert results[1][2] is None
+
+    def test_forget_and_prune(self, data_dir, cache_path):
+        """Test entries for deleted files are dropped."""
+        index = ContentIndex(cache_path)
+        index.warm(data_dir)
+        live = data_dir / "live" / "2025-01-01-test.yaml"
+        gear = data_dir / "gear" / "boss-bd-2.yaml"
+
+        index.forget(live)
+        gear.unlink()
+
+        assert index.prune() == 1
+        assert index.entries == {}
+
+    def test_corrupt_cache_is_ignored(self, data_dir, cache_path):
+        """Test unreadable cache files start an empty index."""
+        cache_path.parent.mkdir(parents=True)
+        cache_path.write_bytes(b"not a pickle")
+
+        index = ContentIndex(cache_path)
+
+        assert index.entries == {}
+        assert index.warm(data_dir) == 2
+
+    def test_outdated_cache_version_is_ignored(self, data_dir, cache_path):
+        """Test caches from another index version are discarded."""
+        cache_path.parent.mkdir(parents=True)
+        with open(cache_path, 'wb') as f:
+            pickle.dump({'version': -1, 'entries': {'x': {}}}, f)
+
+        assert ContentIndex(cache_path).entries == {}
+
+    def test_save_failure_is_not_fatal(self, data_dir, cache_path, capsys):
+        """Test failing to persist only prints a warning."""
+        index = ContentIndex(cache_path)
+        index.load(data_dir / "gear" / "boss-bd-2.yaml")
+
+        with patch('content_index.pickle.dump', side_effect=OSError("disk full")):
+            index.save()
+
+        assert "Could not save content index" in capsys.readouterr().err
+        assert index.dirty
+
+    def test_open_index(self, tmp_path):
+        """Test the shared index lives under .cache in the project root."""
+        index = open_index(tmp_path)
+        assert index.cache_path == default_cache_path(tmp_path)
+        assert index.cache_path == tmp_path / ".cache" / "content-index.pickle"
+
+    def test_concurrent_loads_and_saves(self, data_dir, cache_path):
+        """Test threads loading many files while others save lose no entries."""
+        gear = data_dir / "gear"
+        paths = []
+        for i in range(40):
+            path = gear / f"item-{i}.yaml"
+            path.write_text(f"name: Item {i}\n")
+            paths.append(path)
+        index = ContentIndex(cache_path)
+
+        def work(path):
+            data = index.load(path)
+            index.save()
+            return data['name']
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            names = list(pool.map(work, paths))
+
+        assert names == [f"Item {i}" for i in range(40)]
+        index.save()
+        assert len(ContentIndex(cache_path).entries) == 40
@@ -0,0 +1,157 @@
+"""
+Unit tests for download_cache.py
+
+Tests cover freshness rules, LRU eviction under the size cap, bodies
+shared between URLs, releasing blobs of changed bodies, sweeping
+unreferenced blobs and recovering from missing blobs.
+"""
+
+import hashlib
+
+import pytest
+from download_cache import DownloadCache, freshness
+
+VALIDATORS = {"etag": '"v1"', "last-modified": "Sat, 11 Oct 2025 18:00:00 GMT"}
+
+
+def body_file(tmp_path, name, content):
+    """Write a downloaded body; return (path, sha256)."""
+    path = tmp_path / name
+    path.write_bytes(content)
+    return path, hashlib.sha256(content).hexdigest()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a cache that fits 100 bytes."""
+    return DownloadCache(tmp_path / "cache", max_bytes=100)
+
+
+class TestFreshness:
+    """Test freshness function."""
+
+    def test_rules(self):
+        """Test max-age, Expires, no-cache and no-store."""
+        assert freshness({"cache-control": "public, max-age=60"}, 1000) == 1060
+        assert freshness({"cache-control": "no-cache, max-age=60"}, 1000) == 1000
+        assert freshness({"cache-control": "no-store"}, 1000) is None
+        assert freshness({}, 1000) == 1000
+
+    def test_expires_relative_to_server_date(self):
+        """Test Expires is measured against the server's Date header."""
+        headers = {"date": "Sat, 11 Oct 2025 18:00:00 GMT", "expires": "Sat, 11 Oct 2025 18:05:00 GMT"}
+        assert freshness(headers, 1000) == 1300
+
+
+class TestDownloadCache:
+    """Test DownloadCache class."""
+
+    def test_store_and_lookup(self, cache, tmp_path):
+        """Test an entry survives reopening and revalidation headers come from it."""
+        path, digest = body_file(tmp_path, "a.jpg", b"a" * 10)
+        assert cache.store("https://x/a.jpg", path, digest, VALIDATORS)
+        cache.save()
+
+        reopened = DownloadCache(tmp_path / "cache")
+        entry = reopened.lookup("https://x/a.jpg")
+        assert entry["sha256"] == digest and entry["size"] == 10
+        assert not reopened.is_fresh(entry)
+        assert reopened.conditional_headers(entry) == {
+            "If-None-Match": '"v1"', "If-Modified-Since": VALIDATORS["last-modified"]}
+
+        copy = tmp_path / "copy.jpg"
+        reopened.copy_to(entry, copy)
+        assert copy.read_bytes() == b"a" * 10
+
+    def test_lru_eviction(self, cache, tmp_path):
+        """Test the least recently used entries go first when over the cap."""
+        for name in ("a", "b", "c"):
+            path, digest = body_file(tmp_path, name, name.encode() * 40)
+            cache.store(f"https://x/{name}", path, digest, VALIDATORS)
+            if name == "b":
+                # Use "a" so that "b" becomes the oldest
+                cache.hit("https://x/a")
+
+        assert cache.lookup("https://x/b") is None
+        assert cache.lookup("https://x/a") and cache.lookup("https://x/c")
+        assert cache.total_bytes() == 80
+        assert len([p for p in (tmp_path / "cache" / "blobs").rglob("*") if p.is_file()]) == 2
+
+    def test_shared_body_counted_once(self, cache, tmp_path):
+        """Test two URLs with the same body share one blob until both are gone."""
+        path, digest = body_file(tmp_path, "a.jpg", b"x" * 60)
+        cache.store("https://x/a.jpg", path, digest, VALIDATORS)
+        cache.store("https://mirror/a.jpg", path, digest, VALIDATORS)
+        assert cache.total_bytes() == 60
+
+        other, other_digest = body_file(tmp_path, "b.jpg", b"y" * 30)
+        cache.store("https://x/b.jpg", other, other_digest, VALIDATORS)
+        assert cache.lookup("https://mirror/a.jpg")
+
+        big, big_digest = body_file(tmp_path, "c.jpg", b"z" * 50)
+        cache.store("https://x/c.jpg", big, big_digest, VALIDATORS)
+        assert cache.lookup("https://x/a.jpg") is None
+        assert not cache.blob_path(digest).exists()
+
+    def test_changed_body_replaces_blob(self, cache, tmp_path):
+        """Test a URL whose body changed drops its old blob unless another URL shares it."""
+        old, old_digest = body_file(tmp_path, "old.jpg", b"o" * 30)
+        cache.store("https://x/a.jpg", old, old_digest, VALIDATORS)
+        cache.store("https://mirror/a.jpg", old, old_digest, VALIDATORS)
+        new, new_digest = body_file(tmp_path, "new.jpg", b"n" * 30)
+
+        cache.store("https://x/a.jpg", new, new_digest, VALIDATORS)
+        assert cache.blob_path(old_digest).exists()
+
+        cache.store("https://mirror/a.jpg", new, new_digest, VALIDATORS)
+        assert not cache.blob_path(old_digest).exists()
+        assert cache.total_bytes() == 30
+
+    def test_sweep(self, cache, tmp_path):
+        """Test blobs without an entry are deleted and referenced ones kept."""
+        path, digest = body_file(tmp_path, "a.jpg", b"a" * 10)
+        cache.store("https://x/a.jpg", path, digest, VALIDATORS)
+        orphan = cache.blob_path("ff" * 32)
+        orphan.parent.mkdir(parents=True, exist_ok=True)
+        orphan.write_bytes(b"orphan")
+
+        assert cache.sweep() == 1
+        assert not orphan.exists() and cache.blob_path(digest).exists()
+
+    def test_not_cached(self, cache, tmp_path):
+        """Test no-store and oversized bodies are skipped."""
+        path, digest = body_file(tmp_path, "a.jpg", b"a" * 10)
+        assert not cache.store("https://x/a.jpg", path, digest, {"cache-control": "no-store"})
+
+        big, big_digest = body_file(tmp_path, "big.jpg", b"b" * 101)
+        assert not cache.store("https://x/big.jpg", big, big_digest, VALIDATORS)
+        assert cache.entries == {}
+
+    def test_missing_blob_dropped(self, cache, tmp_path):
+        """Test an entry whose body was deleted is forgotten."""
+        path, digest = body_file(tmp_path, "a.jpg", b"a" * 10)
+        cache.store("https://x/a.jpg", path, digest, VALIDATORS)
+        cache.blob_path(digest).unlink()
+
+        assert cache.lookup("https://x/a.jpg") is None
+        assert "https://x/a.jpg" not in cache.entries
+
+    def test_revalidation_updates_validators(self, cache, tmp_path):
+        """Test a 304 reply refreshes the ETag and freshness lifetime."""
+        path, digest = body_file(tmp_path, "a.jpg", b"a" * 10)
+        cache.store("https://x/a.jpg", path, digest, VALIDATORS)
+
+        cache.hit("https://x/a.jpg", revalidated=True, headers={"etag": '"v2"', "cache-control": "max-age=60"})
+
+        entry = cache.lookup("https://x/a.jpg")
+        assert entry["etag"] == '"v2"' and cache.is_fresh(entry)
+        assert cache.revalidated == 1
+
+    def test_clear(self, cache, tmp_path):
+        """Test clearing removes entries and bodies."""
+        path, digest = body_file(tmp_path, "a.jpg", b"a" * 10)
+        cache.store("https://x/a.jpg", path, digest, VALIDATORS)
+
+        assert cache.clear() == 1
+        assert not cache.blob_path(digest).exists()
+        assert DownloadCache(tmp_path / "cache").entries == {}
@@ -0,0 +1,341 @@
+"""
+Unit tests for downloader.py
+
+Tests run against a local HTTP/1.1 server and cover parallel downloads
+over reused connections, replacing idle connections the server closed,
+percent-encoding URLs, Range resume after a dropped transfer, retries,
+redirects, the size limit, cleanup of partial files, and serving repeat
+fetches from the download cache.
+"""
+
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import downloader
+import pytest
+from download_cache import DownloadCache
+
+BODY = bytes(range(256)) * 400
+MODIFIED = "Sat, 11 Oct 2025 18:00:00 GMT"
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serve BODY with Range support, plus a few misbehaving endpoints."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def hit(self):
+        """Count requests per path; return this request's number."""
+        with self.server.lock:
+            self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+            return self.server.hits[self.path]
+
+    def send_body(self, body, status=200, headers=()):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        count = self.hit()
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.path != "/no-range":
+            start = int(range_header.split("=")[1].rstrip("-"))
+
+        if self.headers.get("If-None-Match") == '"v1"' or self.headers.get("If-Modified-Since") == MODIFIED:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        elif self.path == "/fresh":
+            self.send_body(BODY, 200, [("Cache-Control", "max-age=3600")])
+        elif self.path == "/modified":
+            self.send_body(BODY, 200, [("Last-Modified", MODIFIED)])
+        elif self.path == "/private":
+            self.send_body(BODY, 200, [("ETag", '"v1"'), ("Cache-Control", "no-store")])
+        elif self.path == "/flaky" and count == 1:
+            self.send_body(b"busy", 503, [("Retry-After", "0")])
+        elif self.path == "/missing":
+            self.send_body(b"nope", 404)
+        elif self.path == "/redirect":
+            self.send_body(b"", 302, [("Location", "/photo/moved.jpg")])
+        elif self.path in ("/drop", "/no-range") and count == 1:
+            # Promise the whole body, send half, hang up
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(BODY)))
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            self.wfile.write(BODY[:len(BODY) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+        elif start:
+            self.send_body(BODY[start:], 206, [
+                ("Content-Range", f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"), ("ETag", '"v1"')])
+        else:
+            self.send_body(BODY, 200, [("ETag", '"v1"')])
+
+
+class IdleClosingHandler(Handler):
+    """Handler that hangs up on connections idle for longer than a moment."""
+
+    timeout = 0.2
+
+
+def run_server(handler):
+    """Start a test server with the given handler on a free port."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.connections = 0
+    httpd.hits = {}
+    threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True).start()
+    return httpd
+
+
+@pytest.fixture
+def server():
+    """Run the test server on a free port."""
+    httpd = run_server(Handler)
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def idle_server():
+    """Run a test server that closes idle keep-alive connections."""
+    httpd = run_server(IdleClosingHandler)
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url(server, path):
+    """Return a URL on the test server."""
+    return f"http://127.0.0.1:{server.server_port}{path}"
+
+
+def leftovers(directory):
+    """Return partial files left in directory."""
+    return [p.name for p in directory.iterdir() if p.name.endswith(".part")]
+
+
+@pytest.fixture
+def fetcher():
+    """Create a downloader that doesn't wait between retries."""
+    with downloader.Downloader(workers=4, timeout=5, backoff=0) as d:
+        yield d
+
+
+class TestFetch:
+    """Test single downloads."""
+
+    def test_download(self, server, fetcher, tmp_path):
+        """Test the body lands at the destination with no temp files left."""
+        dest = tmp_path / "gig" / "photo.jpg"
+
+        result = fetcher.fetch(url(server, "/photo.jpg"), dest)
+
+        assert result.ok and result.size == len(BODY) and result.attempts == 1
+        assert result.sha256 == hashlib.sha256(BODY).hexdigest()
+        assert dest.read_bytes() == BODY
+        assert leftovers(dest.parent) == []
+
+    def test_resume_after_drop(self, server, fetcher, tmp_path):
+        """Test a dropped transfer continues with a Range request."""
+        dest = tmp_path / "photo.jpg"
+
+        result = fetcher.fetch(url(server, "/drop"), dest)
+
+        assert result.ok and result.resumed and result.attempts == 2
+        assert result.sha256 == hashlib.sha256(BODY).hexdigest()
+        assert dest.read_bytes() == BODY
+
+    def test_restart_without_range_support(self, server, fetcher, tmp_path):
+        """Test a server that ignores Range gets a clean full download."""
+        dest = tmp_path / "photo.jpg"
+
+        result = fetcher.fetch(url(server, "/no-range"), dest)
+
+        assert result.ok and not result.resumed
+        assert result.sha256 == hashlib.sha256(BODY).hexdigest()
+        assert dest.read_bytes() == BODY
+
+    def test_retry_on_503(self, server, fetcher, tmp_path):
+        """Test temporary server errors are retried."""
+        result = fetcher.fetch(url(server, "/flaky"), tmp_path / "photo.jpg")
+
+        assert result.ok and result.attempts == 2
+
+    def test_not_found_is_not_retried(self, server, fetcher, tmp_path):
+        """Test client errors fail at once and leave nothing behind."""
+        dest = tmp_path / "photo.jpg"
+
+        result = fetcher.fetch(url(server, "/missing"), dest)
+
+        assert not result.ok and result.attempts == 1
+        assert "404" in result.error
+        assert list(tmp_path.iterdir()) == []
+
+    def test_redirect(self, server, fetcher, tmp_path):
+        """Test redirects are followed."""
+        dest = tmp_path / "photo.jpg"
+
+        assert fetcher.fetch(url(server, "/redirect"), dest).ok
+        assert server.hits["/photo/moved.jpg"] == 1
+
+    def test_size_limit(self, server, tmp_path):
+        """Test bodies over the limit are refused and an existing file is untouched."""
+        dest = tmp_path / "photo.jpg"
+        dest.write_bytes(b"old")
+
+        with downloader.Downloader(max_bytes=1000) as d:
+            result = d.fetch(url(server, "/photo.jpg"), dest)
+
+        assert not result.ok and "Too large" in result.error
+        assert dest.read_bytes() == b"old"
+        assert leftovers(tmp_path) == []
+
+    def test_unsupported_url(self, fetcher, tmp_path):
+        """Test non-HTTP URLs are rejected."""
+        result = fetcher.fetch("ftp://example.com/photo.jpg", tmp_path / "photo.jpg")
+        assert not result.ok and "Unsupported URL" in result.error
+
+    def test_invalid_url(self, fetcher, tmp_path):
+        """Test a malformed URL is reported as a failed result without retrying."""
+        result = fetcher.fetch("http://[::1/photo.jpg", tmp_path / "photo.jpg")
+        assert not result.ok and result.attempts == 1 and "Invalid URL" in result.error
+
+    def test_path_percent_encoded(self, server, fetcher, tmp_path):
+        """Test non-ASCII characters and spaces in the path and query are percent-encoded."""
+        result = fetcher.fetch(url(server, "/kuvat/kuva-ä 1.jpg?koko=iso ä"), tmp_path / "kuva.jpg")
+
+        assert result.ok
+        assert "/kuvat/kuva-%C3%A4%201.jpg?koko=iso%20%C3%A4" in server.hits
+
+    def test_stale_idle_connection_replaced(self, idle_server, fetcher, tmp_path):
+        """Test a pooled connection the server closed is replaced without using up an attempt."""
+        jobs = [(url(idle_server, f"/photo-{i}.jpg"), tmp_path / f"photo-{i}.jpg") for i in range(4)]
+        assert all(r.ok for r in fetcher.fetch_many(jobs))
+        time.sleep(0.5)
+
+        result = fetcher.fetch(url(idle_server, "/later.jpg"), tmp_path / "later.jpg")
+
+        assert result.ok and result.attempts == 1
+        assert (tmp_path / "later.jpg").read_bytes() == BODY
+
+
+class TestConnectionPool:
+    """Test ConnectionPool class."""
+
+    def test_reuse_and_idle_expiry(self):
+        """Test released connections are reused until they have been idle too long."""
+        pool = downloader.ConnectionPool(idle_timeout=0.1)
+        conn, reused = pool.acquire("http", "example.com")
+        assert not reused
+
+        pool.release("http", "example.com", conn, reusable=True)
+        assert pool.acquire("http", "example.com") == (conn, True)
+
+        pool.release("http", "example.com", conn, reusable=True)
+        time.sleep(0.2)
+        other, reused = pool.acquire("http", "example.com")
+        assert other is not conn and not reused
+        assert pool.created == 2
+
+
+class TestFetchMany:
+    """Test concurrent downloads."""
+
+    def test_parallel_over_pooled_connections(self, server, fetcher, tmp_path):
+        """Test 50 photos download in order over at most one connection per worker."""
+        jobs = [(url(server, f"/photo-{i}.jpg"), tmp_path / f"photo-{i}.jpg") for i in range(50)]
+        seen = []
+
+        results = fetcher.fetch_many(jobs, progress=seen.append)
+
+        assert [r.path for r in results] == [dest for _, dest in jobs]
+        assert all(r.ok for r in results) and len(seen) == 50
+        assert all(dest.read_bytes() == BODY for _, dest in jobs)
+        assert server.connections <= fetcher.workers
+        assert leftovers(tmp_path) == []
+
+    def test_failures_reported_per_job(self, server, fetcher, tmp_path):
+        """Test one failure doesn't affect the others."""
+        jobs = [(url(server, "/a.jpg"), tmp_path / "a.jpg"),
+                (url(server, "/missing"), tmp_path / "b.jpg"),
+                (url(server, "/c.jpg"), tmp_path / "c.jpg")]
+
+        assert [r.ok for r in fetcher.fetch_many(jobs)] == [True, False, True]
+
+    def test_empty(self, fetcher):
+        """Test no jobs means no work."""
+        assert fetcher.fetch_many([]) == []
+
+
+class TestCache:
+    """Test repeat fetches through a download cache."""
+
+    @pytest.fixture
+    def cached(self, tmp_path):
+        """Create a downloader with a cache."""
+        cache = DownloadCache(tmp_path / "cache")
+        with downloader.Downloader(backoff=0, cache=cache) as d:
+            yield d
+
+    def fetch_twice(self, server, fetcher, tmp_path, path):
+        """Fetch a URL into two files; return both results."""
+        first = fetcher.fetch(url(server, path), tmp_path / "first.jpg")
+        second = fetcher.fetch(url(server, path), tmp_path / "second.jpg")
+        assert (tmp_path / "second.jpg").read_bytes() == BODY
+        return first, second
+
+    def test_revalidate_with_etag(self, server, cached, tmp_path):
+        """Test a repeat fetch sends If-None-Match and is served from the cache on 304."""
+        first, second = self.fetch_twice(server, cached, tmp_path, "/photo.jpg")
+
+        assert first.cache == "" and second.cache == "revalidated"
+        assert second.sha256 == first.sha256
+        assert server.hits["/photo.jpg"] == 2
+        assert cached.cache.revalidated == 1
+
+    def test_revalidate_with_last_modified(self, server, cached, tmp_path):
+        """Test If-Modified-Since is used when there is no ETag."""
+        _, second = self.fetch_twice(server, cached, tmp_path, "/modified")
+        assert second.cache == "revalidated"
+
+    def test_fresh_served_without_request(self, server, cached, tmp_path):
+        """Test a response within max-age is served from disk."""
+        _, second = self.fetch_twice(server, cached, tmp_path, "/fresh")
+
+        assert second.cache == "hit" and second.attempts == 0
+        assert server.hits["/fresh"] == 1
+
+    def test_no_store(self, server, cached, tmp_path):
+        """Test no-store responses are downloaded every time."""
+        _, second = self.fetch_twice(server, cached, tmp_path, "/private")
+
+        assert second.cache == ""
+        assert server.hits["/private"] == 2
+
+    def test_shared_between_downloaders(self, server, cached, tmp_path):
+        """Test another downloader on the same cache directory sees earlier downloads."""
+        cached.fetch(url(server, "/fresh"), tmp_path / "first.jpg")
+
+        with downloader.Downloader(cache=DownloadCache(tmp_path / "cache")) as other:
+            result = other.fetch(url(server, "/fresh"), tmp_path / "poster.jpg")
+
+        assert result.cache == "hit"
+        assert server.hits["/fresh"] == 1
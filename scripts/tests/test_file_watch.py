@@ -0,0 +1,70 @@
+"""
+Unit tests for file_watch.py
+
+Tests cover change detection with both watchers: created, modified,
+renamed and deleted files are reported and swap and hidden files ignored.
+"""
+
+import file_watch
+import pytest
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """Create a data directory with one YAML file."""
+    (tmp_path / "gig.yaml").write_text("title: Gig\n")
+    return tmp_path
+
+
+class TestPollingWatcher:
+    """Test PollingWatcher class."""
+
+    def test_detects_changes(self, data_dir):
+        """Test created, modified and deleted files are reported."""
+        watcher = file_watch.PollingWatcher([data_dir], interval=0)
+        gig = data_dir / "gig.yaml"
+        new = data_dir / "new.yaml"
+
+        gig.write_text("title: Changed gig\n")
+        new.write_text("title: New\n")
+        assert watcher.poll(0) == {gig, new}
+
+        new.unlink()
+        assert watcher.poll(0) == {new}
+        assert watcher.poll(0) == set()
+
+    def test_ignores_non_data_files(self, data_dir):
+        """Test swap and hidden files are ignored."""
+        watcher = file_watch.PollingWatcher([data_dir], interval=0)
+        (data_dir / ".gig.yaml.swp").write_text("x")
+        (data_dir / ".tmp.yaml").write_text("x")
+
+        assert watcher.poll(0) == set()
+
+
+class TestInotifyWatcher:
+    """Test InotifyWatcher class."""
+
+    @pytest.fixture
+    def watcher(self, data_dir):
+        """Create an inotify watcher or skip where unsupported."""
+        try:
+            watcher = file_watch.InotifyWatcher([data_dir])
+        except OSError as e:
+            pytest.skip(f"inotify unavailable: {e}")
+        yield watcher
+        watcher.close()
+
+    def test_detects_write_and_rename(self, watcher, data_dir):
+        """Test writes and editor-style rename saves are reported."""
+        gig = data_dir / "gig.yaml"
+        gig.write_text("title: Changed\n")
+        tmp = data_dir / ".gig.yaml.tmp"
+        tmp.write_text("title: Renamed\n")
+        tmp.rename(data_dir / "other.yaml")
+
+        assert watcher.poll(1.0) == {gig, data_dir / "other.yaml"}
+
+    def test_timeout_without_events(self, watcher):
+        """Test poll returns an empty set when nothing happens."""
+        assert watcher.poll(0) == set()
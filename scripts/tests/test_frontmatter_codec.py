@@ -0,0 +1,138 @@
+"""
+Unit tests for frontmatter_codec.py
+
+Tests cover splitting and parsing both data file formats, header-only
+reads that never touch the body, and round-tripping through the writer.
+"""
+
+import datetime
+from unittest.mock import patch
+
+import frontmatter_codec
+import pytest
+import yaml
+
+FRONTMATTER_CONTENT = """---
+title: "Test Event"
+date: 2025-01-01
+---
+
+Long description body.
+"""
+
+
+class TestSplitAndParse:
+    """Test split and parse functions."""
+
+    def test_split_frontmatter(self):
+        """Test frontmatter is split into header and body."""
+        header, body = frontmatter_codec.split(FRONTMATTER_CONTENT)
+        assert header == 'title: "Test Event"\ndate: 2025-01-01'
+        assert body == "\nLong description body.\n"
+
+    def test_split_pure_yaml(self):
+        """Test pure YAML has no header."""
+        assert frontmatter_codec.split("title: Test\n") == (None, "title: Test\n")
+
+    def test_split_unclosed(self):
+        """Test unclosed frontmatter raises ValueError."""
+        with pytest.raises(ValueError, match="missing closing ---"):
+            frontmatter_codec.split("---\ntitle: Test\n")
+
+    def test_parse_frontmatter(self):
+        """Test parsing frontmatter format."""
+        data, body, has_frontmatter = frontmatter_codec.parse(FRONTMATTER_CONTENT)
+        assert data == {'title': 'Test Event', 'date': datetime.date(2025, 1, 1)}
+        assert body.strip() == "Long description body."
+        assert has_frontmatter is True
+
+    def test_parse_pure_yaml(self):
+        """Test parsing pure YAML format."""
+        data, body, has_frontmatter = frontmatter_codec.parse("title: Test\n")
+        assert data == {'title': 'Test'}
+        assert body == ""
+        assert has_frontmatter is False
+
+    def test_parse_invalid_yaml(self):
+        """Test invalid YAML raises YAMLError."""
+        with pytest.raises(yaml.YAMLError):
+            frontmatter_codec.parse("invalid: yaml: content:")
+
+
+class TestReadHeader:
+    """Test header-only reads."""
+
+    def test_read_header_frontmatter(self, tmp_path):
+        """Test header is parsed from frontmatter files."""
+        path = tmp_path / "gig.yaml"
+        path.write_text(FRONTMATTER_CONTENT)
+
+        assert frontmatter_codec.read_header(path)['title'] == "Test Event"
+
+    def test_read_header_ignores_invalid_body(self, tmp_path):
+        """Test the body is never parsed (or even needs to be YAML)."""
+        path = tmp_path / "gig.yaml"
+        path.write_text("---\ntitle: Test\n---\n\n: [ not yaml\n")
+
+        assert frontmatter_codec.read_header(path) == {'title': 'Test'}
+
+    def test_read_header_stops_at_delimiter(self, tmp_path):
+        """Test lines after the closing delimiter are not read."""
+        path = tmp_path / "gig.yaml"
+        path.write_text("---\ntitle: Test\n---\n" + "body line\n" * 1000)
+
+        header, has_frontmatter = frontmatter_codec.read_header_text(path)
+
+        assert header == "title: Test\n"
+        assert has_frontmatter is True
+
+    def test_read_header_pure_yaml(self, tmp_path):
+        """Test pure YAML files are read whole."""
+        path = tmp_path / "gear.yaml"
+        path.write_text("name: BD-2\nmanufacturer: BOSS\n")
+
+        assert frontmatter_codec.read_header_text(path) == ("name: BD-2\nmanufacturer: BOSS\n", False)
+        assert frontmatter_codec.read_header(path) == {'name': 'BD-2', 'manufacturer': 'BOSS'}
+
+    def test_read_header_unclosed(self, tmp_path):
+        """Test unclosed frontmatter raises ValueError."""
+        path = tmp_path / "gig.yaml"
+        path.write_text("---\ntitle: Test\n")
+
+        with pytest.raises(ValueError, match="Invalid YAML frontmatter"):
+            frontmatter_codec.read_header(path)
+
+
+class TestWrite:
+    """Test dump and format_document functions."""
+
+    def test_dump_matches_pyyaml(self):
+        """Test output matches the pure Python dumper byte for byte."""
+        data = {'title': 'Ääni', 'items': [{'type': 'mention', 'url': 'https://x'}]}
+        expected = yaml.dump(data, default_flow_style=False, allow_unicode=True)
+        assert frontmatter_codec.dump(data) == expected
+
+    def test_dump_sort_keys(self):
+        """Test extra yaml.dump options are forwarded."""
+        assert frontmatter_codec.dump({'b': 1, 'a': 2}, sort_keys=False) == "b: 1\na: 2\n"
+
+    def test_format_document_round_trip(self, tmp_path):
+        """Test frontmatter documents survive a write/read cycle."""
+        path = tmp_path / "gig.yaml"
+        data = {'title': 'Test', 'draft': False}
+        path.write_text(frontmatter_codec.format_document(data, "\nBody"))
+
+        assert path.read_text() == "---\ndraft: false\ntitle: Test\n---\n\nBody"
+        assert frontmatter_codec.read_document(path) == (data, "\nBody", True)
+
+    def test_format_document_pure_yaml(self):
+        """Test pure YAML documents are written without delimiters."""
+        content = frontmatter_codec.format_document({'title': 'Test'}, "ignored", has_frontmatter=False)
+        assert content == "title: Test\n"
+
+    def test_pure_python_fallback(self):
+        """Test the codec works when libyaml is unavailable."""
+        with patch.object(frontmatter_codec, 'SafeLoader', yaml.SafeLoader), \
+                patch.object(frontmatter_codec, 'Dumper', yaml.Dumper):
+            assert frontmatter_codec.load("a: 1") == {'a': 1}
+            assert frontmatter_codec.dump({'a': 1}) == "a: 1\n"
@@ -0,0 +1,144 @@
+"""
+Unit tests for gear_batch.py
+
+Tests cover up-front validation of add/update/delete batches, all-or-nothing
+application, and the result table.
+"""
+
+import os
+
+import frontmatter_codec
+import gear_batch
+import pytest
+
+PEDAL = {'name': 'DS-1', 'manufacturer': 'BOSS', 'category': 'Pedal', 'technology': 'Analog'}
+
+
+@pytest.fixture
+def gear_dir(tmp_path):
+    """Create a gear directory with one existing item."""
+    gear_dir = tmp_path / "gear"
+    gear_dir.mkdir()
+    (gear_dir / "boss-bd-2.yaml").write_text(
+        "name: BD-2\nmanufacturer: BOSS\ncategory: Pedal\ntechnology: Analog\n")
+    return gear_dir
+
+
+def statuses(results):
+    """Return (slug, status) pairs."""
+    return [(item.slug, item.status) for item in results]
+
+
+class TestPlan:
+    """Test batch validation."""
+
+    def test_plan_add_valid(self, gear_dir):
+        """Test valid items are planned with missing-field notes."""
+        plan = gear_batch.plan_add([dict(PEDAL, url="https://boss.info")], gear_dir)
+
+        assert statuses(plan) == [("boss-ds-1", gear_batch.OK)]
+        assert plan[0].note == "missing: controls, description"
+
+    def test_plan_add_errors(self, gear_dir):
+        """Test schema violations, duplicates and existing files are rejected."""
+        plan = gear_batch.plan_add([
+            dict(PEDAL, category="Guitar"),
+            {'name': 'X'},
+            dict(PEDAL, name='BD-2'),
+            dict(PEDAL, types="Fuzz"),
+            PEDAL,
+            PEDAL,
+        ], gear_dir)
+
+        assert [item.note for item in plan] == [
+            "category must be one of Pedal, Synth",
+            "manufacturer required; category required; technology required",
+            "already exists",
+            "types must be a list of strings",
+            "missing: controls, url, description",
+            "duplicate in batch",
+        ]
+
+    def test_plan_update_and_delete(self, gear_dir):
+        """Test missing slugs and empty updates are rejected."""
+        updates = gear_batch.plan_update([
+            {'slug': 'boss-bd-2', 'controls': ['Level']},
+            {'slug': 'boss-bd-2'},
+            {'slug': 'missing', 'url': 'x'},
+        ], gear_dir)
+        deletes = gear_batch.plan_delete(['boss-bd-2', 'missing'], gear_dir)
+
+        assert [item.note for item in updates] == ["controls", "no fields to update", "not found"]
+        assert statuses(deletes) == [("boss-bd-2", gear_batch.OK), ("missing", gear_batch.ERROR)]
+
+    def test_locate_other_statuses(self, gear_dir):
+        """Test a locator finds items outside gear_dir and blocks adding their slug."""
+        sold = gear_dir / "sold" / "boss-rc-20.yaml"
+        sold.parent.mkdir()
+        sold.write_text("name: RC-20\n")
+
+        def locate(slug):
+            return sold if slug == "boss-rc-20" else None
+
+        adds = gear_batch.plan_add([{'name': 'RC 20', 'manufacturer': 'BOSS', 'category': 'Pedal',
+                                     'technology': 'Digital'}], gear_dir, locate)
+        deletes = gear_batch.plan_delete(['boss-rc-20'], gear_dir, locate)
+
+        assert adds[0].note == "already exists"
+        assert deletes[0].path == sold and deletes[0].status == gear_batch.OK
+
+
+class TestApply:
+    """Test batch application."""
+
+    def test_add_batch(self, gear_dir):
+        """Test every item is written in canonical field order."""
+        items = [dict(PEDAL, name=f"P{i}", types=['Fuzz']) for i in range(30)]
+
+        results = gear_batch.apply(gear_batch.plan_add(items, gear_dir), frontmatter_codec.read_header)
+
+        assert all(item.status == gear_batch.OK for item in results)
+        assert len(list(gear_dir.glob("*.yaml"))) == 31
+        assert (gear_dir / "boss-p0.yaml").read_text().startswith("name: P0\nmanufacturer: BOSS\n")
+
+    def test_invalid_item_writes_nothing(self, gear_dir):
+        """Test one invalid item rejects the whole batch."""
+        plan = gear_batch.plan_add([PEDAL, dict(PEDAL, name='BD-2')], gear_dir)
+
+        results = gear_batch.apply(plan, frontmatter_codec.read_header)
+
+        assert statuses(results) == [("boss-ds-1", gear_batch.SKIPPED), ("boss-bd-2", gear_batch.ERROR)]
+        assert os.listdir(gear_dir) == ["boss-bd-2.yaml"]
+
+    def test_race_detected_under_lock(self, gear_dir):
+        """Test a file created after planning aborts the batch."""
+        plan = gear_batch.plan_add([PEDAL], gear_dir)
+        (gear_dir / "boss-ds-1.yaml").write_text("name: other\n")
+
+        results = gear_batch.apply(plan, frontmatter_codec.read_header)
+
+        assert statuses(results) == [("boss-ds-1", gear_batch.ERROR)]
+        assert (gear_dir / "boss-ds-1.yaml").read_text() == "name: other\n"
+
+    def test_update_and_delete(self, gear_dir):
+        """Test updates merge fields and deletes remove files."""
+        gear_batch.apply(gear_batch.plan_add([PEDAL], gear_dir), frontmatter_codec.read_header)
+
+        gear_batch.apply(gear_batch.plan_update([{'slug': 'boss-bd-2', 'controls': ['Tone']}], gear_dir),
+                         frontmatter_codec.read_header)
+        gear_batch.apply(gear_batch.plan_delete(['boss-ds-1'], gear_dir), frontmatter_codec.read_header)
+
+        assert frontmatter_codec.read_header(gear_dir / "boss-bd-2.yaml")['controls'] == ['Tone']
+        assert os.listdir(gear_dir) == ["boss-bd-2.yaml"]
+
+
+def test_format_results(gear_dir):
+    """Test the compact result table."""
+    results = gear_batch.apply(gear_batch.plan_delete(['boss-bd-2', 'nope'], gear_dir), frontmatter_codec.read_header)
+
+    assert gear_batch.format_results(results) == (
+        "❌ Batch rejected: 1 invalid of 2, nothing written\n"
+        "\n"
+        "skipped delete boss-bd-2  batch not applied\n"
+        "error   delete nope       not found"
+    )
@@ -0,0 +1,167 @@
+"""
+Unit tests for gear_query.py
+
+Tests cover keyset pagination of listings (with filters and concurrent
+changes between pages), rank-paged search, cursors, field projection and
+the JSON result format.
+"""
+
+import json
+
+import pytest
+from gear_query import (
+    MAX_LIMIT,
+    clamp_limit,
+    decode_cursor,
+    encode_cursor,
+    format_projection,
+    list_page,
+    page_to_json,
+    project,
+    search_page,
+    validate_fields,
+)
+from gear_store import GearStore
+
+
+@pytest.fixture
+def gear_dir(tmp_path, write_gear):
+    """Create a gear directory with ten items, every third a synth."""
+    gear_dir = tmp_path / "gear"
+    gear_dir.mkdir()
+    for i in range(10):
+        write_gear(gear_dir, f"boss-dd-{i}", f"DD-{i} Delay", category="Synth" if i % 3 == 0 else "Pedal",
+                   types=("Delay",))
+    return gear_dir
+
+
+@pytest.fixture
+def index(gear_dir):
+    """Create a store over the gear directory."""
+    index = GearStore(gear_dir, use_inotify=False)
+    yield index
+    index.close()
+
+
+def collect_pages(fetch):
+    """Follow cursors until the last page; return the pages."""
+    pages = [fetch(None)]
+    while pages[-1].next_cursor:
+        pages.append(fetch(pages[-1].next_cursor))
+    return pages
+
+
+class TestCursor:
+    """Test cursor encoding and limits."""
+
+    def test_round_trip(self):
+        """Test cursors decode to the state they encode."""
+        cursor = encode_cursor({"after": "boss-dd-3.yaml"})
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == {"after": "boss-dd-3.yaml"}
+
+    @pytest.mark.parametrize("cursor", ["!!!", "bm90IGpzb24", encode_cursor([1, 2])])
+    def test_invalid(self, cursor):
+        """Test garbage cursors are rejected."""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor(cursor)
+
+    def test_clamp_limit(self):
+        """Test page sizes are kept in range."""
+        assert clamp_limit(None) == 50
+        assert clamp_limit(0) == 1
+        assert clamp_limit(10 ** 6) == MAX_LIMIT
+
+
+class TestListPage:
+    """Test list_page function."""
+
+    def test_pages_cover_everything_once(self, index):
+        """Test following cursors visits every item once, in order."""
+        pages = collect_pages(lambda cursor: list_page(index, limit=3, cursor=cursor))
+
+        assert [len(p.items) for p in pages] == [3, 3, 3, 1]
+        slugs = [g['_filename'] for p in pages for g in p.items]
+        assert slugs == sorted(f"boss-dd-{i}.yaml" for i in range(10))
+
+    def test_exact_last_page_has_no_cursor(self, index):
+        """Test no cursor is returned when nothing follows."""
+        assert list_page(index, limit=10).next_cursor is None
+
+    def test_filters(self, index):
+        """Test filters apply across pages and unknown keys are ignored."""
+        pages = collect_pages(lambda cursor: list_page(index, {"category": "Synth", "query": "x"}, 2, cursor))
+
+        names = [g['name'] for p in pages for g in p.items]
+        assert names == ["DD-0 Delay", "DD-3 Delay", "DD-6 Delay", "DD-9 Delay"]
+
+    def test_stable_across_changes(self, index, gear_dir, write_gear):
+        """Test items added or removed before the cursor don't shift the next page."""
+        first = list_page(index, limit=3)
+        (gear_dir / "boss-dd-0.yaml").unlink()
+        write_gear(gear_dir, "aaa-first", "First")
+
+        second = list_page(index, limit=3, cursor=first.next_cursor)
+
+        assert [g['_filename'] for g in second.items] == ["boss-dd-3.yaml", "boss-dd-4.yaml", "boss-dd-5.yaml"]
+
+    def test_search_cursor_rejected(self, index):
+        """Test a search cursor can't be used for a listing."""
+        with pytest.raises(ValueError):
+            list_page(index, cursor=encode_cursor({"query": "delay", "offset": 2}))
+
+
+class TestSearchPage:
+    """Test search_page function."""
+
+    def test_pages_follow_ranking(self, index):
+        """Test paged results equal one unpaged search."""
+        full = search_page(index, "delay", limit=100)
+        pages = collect_pages(lambda cursor: search_page(index, "delay", limit=4, cursor=cursor))
+
+        assert [g['_filename'] for p in pages for g in p.items] == [g['_filename'] for g in full.items]
+        assert len(full.items) == 10
+        assert full.scores == sorted(full.scores, reverse=True)
+
+    def test_cursor_bound_to_query(self, index):
+        """Test a cursor from one query is rejected for another."""
+        page = search_page(index, "delay", limit=2)
+        with pytest.raises(ValueError, match="Invalid cursor for query"):
+            search_page(index, "boss", limit=2, cursor=page.next_cursor)
+
+
+class TestProjection:
+    """Test field projection and output formats."""
+
+    def test_project(self, index):
+        """Test only requested fields are copied and slug is derived."""
+        record = index.get("boss-dd-1")
+        assert project(record, ["slug", "name", "url"]) == {"slug": "boss-dd-1", "name": "DD-1 Delay"}
+        assert "_filename" not in project(record)
+        assert project(record)["types"] == ["Delay"]
+
+    def test_project_does_not_share_record(self, index):
+        """Test the projection is a new dict, not the index record."""
+        record = index.get("boss-dd-1")
+        project(record)["name"] = "changed"
+        assert index.get("boss-dd-1")["name"] == "DD-1 Delay"
+
+    def test_validate_fields(self):
+        """Test unknown or malformed projections are reported."""
+        assert validate_fields(None) == []
+        assert validate_fields(["slug", "name"]) == []
+        assert "unknown fields: price" in validate_fields(["name", "price"])[0]
+        assert validate_fields("name") == ["fields must be a list of strings"]
+
+    def test_page_to_json(self, index):
+        """Test JSON output carries projected items, scores and the cursor."""
+        payload = json.loads(page_to_json(search_page(index, "dd-1", limit=1), ["slug"]))
+
+        assert payload["items"][0]["slug"] == "boss-dd-1"
+        assert set(payload["items"][0]) == {"slug", "score"}
+        assert payload["next_cursor"]
+
+    def test_format_projection(self, index):
+        """Test text rendering of a projection."""
+        line = format_projection(index.get("boss-dd-1"), ["slug", "types"])
+        assert line == "• slug: boss-dd-1 | types: Delay"
@@ -0,0 +1,127 @@
+"""
+Unit tests for gear_search.py
+
+Tests cover tokenization, BM25 ranking across weighted fields, prefix and
+trigram fuzzy matching, incremental updates, and that early-terminating
+top-k search agrees with exhaustive scoring.
+"""
+
+import math
+import random
+
+import pytest
+from gear_search import K1, B, SearchIndex, build_index, tokenize
+
+GEAR = [
+    {'_filename': 'earthquaker-devices-hizumitas.yaml', 'name': 'Hizumitas', 'manufacturer': 'EarthQuaker Devices',
+     'types': ['Fuzz'], 'controls': ['Volume', 'Sustain', 'Tone'],
+     'description': 'Wall of fuzz sustainer.'},
+    {'_filename': 'boss-bd-2-blues-driver.yaml', 'name': 'BD-2 Blues Driver', 'manufacturer': 'BOSS',
+     'types': ['Overdrive'], 'controls': ['Level', 'Tone', 'Gain'],
+     'description': 'Classic overdrive that pairs well with fuzz.'},
+    {'_filename': 'death-by-audio-fuzz-war.yaml', 'name': 'Fuzz War', 'manufacturer': 'Death By Audio',
+     'types': ['Fuzz'], 'controls': ['Volume', 'Fuzz', 'Tone'],
+     'description': 'Extreme fuzz.'},
+    {'_filename': 'sold.yaml', 'name': 1010, 'manufacturer': 'Elektron', 'types': ['Synth']},
+]
+
+
+@pytest.fixture
+def index():
+    """Build an index over the sample gear."""
+    return build_index(GEAR)
+
+
+def keys(results):
+    """Return result keys."""
+    return [r.key for r in results]
+
+
+class TestTokenize:
+    """Test tokenize function."""
+
+    def test_hyphenated_words(self):
+        """Test hyphenated words index parts and the joined form."""
+        assert tokenize("BD-2 Blues") == ["bd", "2", "bd2", "blues"]
+
+    def test_casefold_and_unicode(self):
+        """Test terms are case-insensitive and keep non-ASCII letters."""
+        assert tokenize("Metsään ECHO") == ["metsään", "echo"]
+
+
+class TestSearch:
+    """Test SearchIndex.search."""
+
+    def test_name_ranks_above_description(self, index):
+        """Test a name match outranks a description mention."""
+        results = index.search("fuzz")
+        assert keys(results)[0] == 'death-by-audio-fuzz-war.yaml'
+        assert keys(results)[-1] == 'boss-bd-2-blues-driver.yaml'
+        assert results[0].score > results[-1].score
+
+    def test_typo_tolerant(self, index):
+        """Test misspelled queries match through trigrams."""
+        assert keys(index.search("hizumita")) == ['earthquaker-devices-hizumitas.yaml']
+        assert keys(index.search("blues drivr"))[0] == 'boss-bd-2-blues-driver.yaml'
+
+    def test_prefix(self, index):
+        """Test partial words match terms starting with them."""
+        assert keys(index.search("hizu")) == ['earthquaker-devices-hizumitas.yaml']
+
+    def test_controls_and_joined_terms(self, index):
+        """Test controls are searchable and hyphen-less spellings match."""
+        assert keys(index.search("sustain"))[0] == 'earthquaker-devices-hizumitas.yaml'
+        assert keys(index.search("bd2")) == ['boss-bd-2-blues-driver.yaml']
+
+    def test_numeric_name(self, index):
+        """Test non-string field values are indexed."""
+        assert keys(index.search("1010")) == ['sold.yaml']
+
+    def test_limit_and_no_match(self, index):
+        """Test limit caps results and unknown terms return nothing."""
+        assert len(index.search("fuzz", limit=1)) == 1
+        assert index.search("xqzvw") == []
+        assert index.search("") == []
+
+
+class TestIncremental:
+    """Test adding and removing documents."""
+
+    def test_remove(self, index):
+        """Test removed documents and their unique terms disappear."""
+        index.remove('earthquaker-devices-hizumitas.yaml')
+
+        assert 'earthquaker-devices-hizumitas.yaml' not in index
+        assert index.search("hizumitas") == []
+        assert 'hizumitas' not in index.postings
+
+    def test_readd_updates(self, index):
+        """Test re-adding a key replaces its previous content."""
+        index.search("fuzz")  # warm cached scores
+        index.add('sold.yaml', {'name': 'Fuzz Factory', 'manufacturer': 'ZVEX'})
+
+        assert len(index) == 4
+        assert 'sold.yaml' in keys(index.search("fuzz"))
+        assert index.search("elektron") == []
+
+    def test_matches_exhaustive_scoring(self):
+        """Test early-terminating top-k equals scoring every document."""
+        rng = random.Random(7)
+        words = [f"w{i}" for i in range(40)]
+        index = SearchIndex()
+        for i in range(300):
+            index.add(f"d{i}", {'name': rng.choice(words), 'description': " ".join(rng.choices(words, k=8))})
+
+        count = len(index)
+        avg = index.total_length / count
+        for query in ["w1", "w2 w3", "w4 w5 w6"]:
+            expected = {}
+            for term in query.split():
+                docs = index.postings[term]
+                idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+                for key, tf in docs.items():
+                    norm = K1 * (1 - B + B * index.doc_lengths[key] / avg)
+                    expected[key] = expected.get(key, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+            best = sorted(expected.values(), reverse=True)[:10]
+
+            assert [r.score for r in index.search(query, limit=10)] == pytest.approx(best)
@@ -0,0 +1,267 @@
+"""
+Unit tests for gear_store.py
+
+Tests cover building the store, per-file refresh through both the mtime
+scan and inotify, that repeated queries don't re-read files, concurrent
+access from threads, and the status partitions: listing and searching
+subsets of statuses and moving items between them.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from gear_store import GearStore
+
+
+def bump_mtime(path):
+    """Make sure an edit is visible to the mtime scan on coarse clocks."""
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def gear_dir(tmp_path, write_gear):
+    """Create a gear directory with two items."""
+    gear_dir = tmp_path / "gear"
+    gear_dir.mkdir()
+    write_gear(gear_dir, "boss-ds-1", "DS-1")
+    write_gear(gear_dir, "boss-bd-2", "BD-2")
+    return gear_dir
+
+
+@pytest.fixture(params=[False, True], ids=["scan", "inotify"])
+def index(request, gear_dir):
+    """Create a store using either change detection strategy."""
+    index = GearStore(gear_dir, use_inotify=request.param)
+    if request.param and index._watcher is None:
+        pytest.skip("inotify unavailable")
+    yield index
+    index.close()
+
+
+class TestGearStore:
+    """Test GearStore class."""
+
+    def test_build(self, index):
+        """Test records are loaded and sorted by filename."""
+        assert [g['name'] for g in index.all()] == ["BD-2", "DS-1"]
+        assert index.all()[0]['_filename'] == "boss-bd-2.yaml"
+        assert index.get("boss-ds-1")['name'] == "DS-1"
+
+    def test_repeated_queries_served_from_memory(self, index):
+        """Test unchanged files are never re-read."""
+        loads = index.loads
+        for _ in range(10):
+            index.all()
+        assert index.loads == loads
+
+    def test_refresh_changed_file_only(self, index, gear_dir, write_gear):
+        """Test an edit re-reads just that file."""
+        loads = index.loads
+        path = write_gear(gear_dir, "boss-ds-1", "DS-1X")
+        bump_mtime(path)
+
+        assert index.get("boss-ds-1")['name'] == "DS-1X"
+        assert index.loads == loads + 1
+
+    def test_refresh_added_and_deleted(self, index, gear_dir, write_gear):
+        """Test new files appear and deleted files disappear."""
+        write_gear(gear_dir, "boss-hm-2", "HM-2")
+        (gear_dir / "boss-bd-2.yaml").unlink()
+
+        assert [g['name'] for g in index.all()] == ["DS-1", "HM-2"]
+
+    def test_invalid_file_skipped(self, index, gear_dir):
+        """Test unparseable files are reported in errors, not returned."""
+        (gear_dir / "broken.yaml").write_text("name: [unclosed\n")
+
+        assert len(index.all()) == 2
+        assert "broken.yaml" in index.errors
+
+    def test_invalidate(self, gear_dir, write_gear):
+        """Test invalidate re-reads a file without waiting for detection."""
+        index = GearStore(gear_dir, use_inotify=False)
+        path = write_gear(gear_dir, "boss-ds-1", "DS-1X")
+
+        index.invalidate(path)
+
+        assert index.records["boss-ds-1.yaml"]['name'] == "DS-1X"
+
+    def test_missing_directory(self, tmp_path):
+        """Test a missing directory gives an empty index."""
+        index = GearStore(tmp_path / "missing")
+        assert index.all() == []
+        assert len(index) == 0
+
+    def test_search_follows_changes(self, index, gear_dir, write_gear):
+        """Test the search index is updated with the records."""
+        assert [r.key for r in index.search("ds1")] == ["boss-ds-1.yaml"]
+
+        (gear_dir / "boss-ds-1.yaml").unlink()
+        write_gear(gear_dir, "boss-hm-2", "HM-2")
+
+        assert index.search("ds1") == []
+        assert [r.key for r in index.search("hm2")] == ["boss-hm-2.yaml"]
+
+    def test_concurrent_reads_and_writes(self, gear_dir, write_gear):
+        """Test readers on other threads always see a consistent index."""
+        index = GearStore(gear_dir, use_inotify=False)
+
+        def writer(i):
+            path = write_gear(gear_dir, f"tmp-{i}", f"Tmp {i}")
+            index.invalidate(path)
+            path.unlink()
+            index.invalidate(path)
+
+        def reader(_):
+            names = [g['name'] for g in index.all()]
+            assert "BD-2" in names and "DS-1" in names
+            return [hit.key for hit in index.search("ds-1")]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            writes = [pool.submit(writer, i) for i in range(20)]
+            reads = [pool.submit(reader, i) for i in range(200)]
+            for future in writes + reads:
+                future.result()
+
+        assert sorted(index.records) == ["boss-bd-2.yaml", "boss-ds-1.yaml"]
+        assert len(index.search_index) == 2
+
+    def test_page(self, index, gear_dir, write_gear):
+        """Test keyset pages start after the given key and report more."""
+        write_gear(gear_dir, "boss-rc-1", "RC-1")
+        index.refresh()
+
+        items, more = index.page(limit=2)
+        assert [g['name'] for g in items] == ["BD-2", "DS-1"]
+        assert more
+
+        items, more = index.page(after="boss-ds-1.yaml", limit=2)
+        assert [g['name'] for g in items] == ["RC-1"]
+        assert not more
+
+        items, more = index.page(limit=5, match=lambda g: g['name'] != "DS-1")
+        assert [g['name'] for g in items] == ["BD-2", "RC-1"]
+
+
+@pytest.fixture
+def status_dir(gear_dir, write_gear):
+    """Add sold, want and archived items to the gear directory."""
+    for status, slug, name in [("sold", "boss-rc-20", "RC-20"), ("want", "dod-fx86", "FX86"),
+                               ("archived", "acme-old", "Old")]:
+        (gear_dir / status).mkdir()
+        write_gear(gear_dir / status, slug, name)
+    return gear_dir
+
+
+class TestStatusPartitions:
+    """Test status partitions of GearStore."""
+
+    @pytest.fixture(params=[False, True], ids=["scan", "inotify"])
+    def store(self, request, status_dir):
+        """Create a store over every status directory."""
+        store = GearStore(status_dir, use_inotify=request.param)
+        if request.param and store._watcher is None:
+            pytest.skip("inotify unavailable")
+        yield store
+        store.close()
+
+    def test_partitions(self, store):
+        """Test each status directory is its own partition."""
+        assert store.counts() == {"active": 2, "sold": 1, "want": 1, "archived": 1}
+        assert [g['name'] for g in store.all(["active"])] == ["BD-2", "DS-1"]
+        assert [g['name'] for g in store.all(["sold", "want"])] == ["RC-20", "FX86"]
+        assert store.get("boss-rc-20")['_status'] == "sold"
+        assert store.get("boss-rc-20", ["active"]) is None
+
+    def test_all_merges_by_filename(self, store):
+        """Test listing several statuses gives one filename-sorted sequence."""
+        assert [g['_filename'] for g in store.all()] == [
+            "acme-old.yaml", "boss-bd-2.yaml", "boss-ds-1.yaml", "boss-rc-20.yaml", "dod-fx86.yaml"]
+
+    def test_by_display_kept_sorted(self, store, status_dir, write_gear):
+        """Test display order follows edits, additions, moves and deletes without re-sorting."""
+        def display(statuses=None):
+            return [(g['manufacturer'], g['name']) for g in store.by_display(statuses)]
+
+        assert display(["active", "sold"]) == [("BOSS", "BD-2"), ("BOSS", "DS-1"), ("BOSS", "RC-20")]
+        active = store._display["active"]
+
+        bump_mtime(write_gear(status_dir, "boss-ds-1", "DS-1", manufacturer="Acme"))
+        write_gear(status_dir, "boss-sd-1", "SD-1")
+        store.move("boss-bd-2", "sold")
+        (status_dir / "want" / "dod-fx86.yaml").unlink()
+
+        assert display(["active", "sold"]) == [("Acme", "DS-1"), ("BOSS", "BD-2"), ("BOSS", "RC-20"),
+                                               ("BOSS", "SD-1")]
+        assert display() == sorted(display())
+        assert store._display["active"] is active
+
+    def test_page_across_statuses(self, store):
+        """Test keyset pages over a status subset."""
+        items, more = store.page(limit=2, statuses=["active", "sold"])
+        assert [g['name'] for g in items] == ["BD-2", "DS-1"] and more
+
+        items, more = store.page(after="boss-ds-1.yaml", limit=2, statuses=["active", "sold"])
+        assert [g['name'] for g in items] == ["RC-20"] and not more
+
+    def test_search_filters_statuses(self, store):
+        """Test search only returns hits of the requested statuses."""
+        assert [r.key for r in store.search("boss", statuses=["sold"])] == ["boss-rc-20.yaml"]
+        assert len(store.search("boss")) == 5
+
+    def test_unknown_status(self, store):
+        """Test unknown statuses are rejected."""
+        with pytest.raises(ValueError, match="Unknown status: gone"):
+            store.all(["gone"])
+
+    def test_move(self, store, status_dir):
+        """Test moving renames the file and switches partition without re-reading."""
+        store.all(["active", "sold"])
+        loads = store.loads
+
+        path = store.move("boss-ds-1", "sold")
+
+        assert path == status_dir / "sold" / "boss-ds-1.yaml"
+        assert path.exists() and not (status_dir / "boss-ds-1.yaml").exists()
+        assert store.loads == loads
+        assert [g['name'] for g in store.all(["sold"])] == ["DS-1", "RC-20"]
+        assert [g['name'] for g in store.all(["active"])] == ["BD-2"]
+        assert store.get("boss-ds-1")['_status'] == "sold"
+        assert [r.key for r in store.search("ds-1", statuses=["active"])] == []
+
+    def test_move_creates_directory(self, gear_dir):
+        """Test moving into a status whose directory doesn't exist yet."""
+        store = GearStore(gear_dir, use_inotify=False)
+
+        store.move("boss-ds-1", "archived")
+
+        assert (gear_dir / "archived" / "boss-ds-1.yaml").exists()
+        assert store.status("boss-ds-1") == "archived"
+        assert GearStore(gear_dir, use_inotify=False).status("boss-ds-1") == "archived"
+
+    def test_move_missing(self, store):
+        """Test moving a slug that doesn't exist."""
+        with pytest.raises(KeyError):
+            store.move("nope", "sold")
+
+    def test_external_move_detected(self, store, status_dir):
+        """Test a file moved by something else changes status on refresh."""
+        os.rename(status_dir / "want" / "dod-fx86.yaml", status_dir / "sold" / "dod-fx86.yaml")
+
+        assert store.status("dod-fx86") == "sold"
+        assert store.counts()["want"] == 0
+
+    def test_duplicate_slug(self, status_dir, write_gear):
+        """Test a slug in two statuses keeps the first and reports the second."""
+        write_gear(status_dir / "sold", "boss-ds-1", "DS-1 again")
+        store = GearStore(status_dir, use_inotify=False)
+
+        assert store.get("boss-ds-1")['name'] == "DS-1"
+        assert "duplicates boss-ds-1.yaml" in str(store.failures()["sold/boss-ds-1.yaml"])
+        assert store.failures(["active"]) == {}
+
+        (status_dir / "boss-ds-1.yaml").unlink()
+        assert store.get("boss-ds-1")['name'] == "DS-1 again"
+        assert store.failures() == {}
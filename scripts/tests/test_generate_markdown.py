@@ -0,0 +1,247 @@
+"""
+Unit tests for generate_markdown.py
+
+Tests cover the text to HTML conversion, textual key removal, rendering of
+each content type, and byte-identical output against the committed content
+generated by the original shell pipeline.
+"""
+
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import generate_markdown
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+LIVE_YAML = """title: "Test Gig"
+date: 2025-01-01
+description: |
+  First line https://example.com/a
+  second line
+
+  New paragraph
+venue: "Venue"
+media:
+  pictures:
+    images:
+      - one.jpg
+"""
+
+
+class TestTextToHtml:
+    """Test text_to_html function."""
+
+    def test_paragraphs_and_breaks(self):
+        """Test blank lines split paragraphs and newlines become <br>."""
+        html = generate_markdown.text_to_html("One\nTwo\n\n\nThree\n")
+        assert html == "<p>One<br>\nTwo</p>\n\n<p>Three</p>"
+
+    def test_linkifies_urls(self):
+        """Test URLs become links that open in a new window."""
+        html = generate_markdown.text_to_html("See https://example.com/x?y=1.")
+        assert html == ('<p>See <a href="https://example.com/x?y=1." target="_blank" '
+                        'rel="noopener noreferrer">https://example.com/x?y=1.</a></p>')
+
+    def test_whitespace_only_line_is_blank(self):
+        """Test lines of spaces close a paragraph like awk's NF == 0."""
+        assert generate_markdown.text_to_html("One\n  \t\nTwo") == "<p>One</p>\n\n<p>Two</p>"
+
+    def test_empty(self):
+        """Test empty text gives empty output."""
+        assert generate_markdown.text_to_html("") == ""
+
+
+class TestStripTopLevelKeys:
+    """Test strip_top_level_keys function."""
+
+    def test_removes_block_scalar(self):
+        """Test a key and its block are removed, everything else verbatim."""
+        result = generate_markdown.strip_top_level_keys(LIVE_YAML, ('description',))
+        assert result == ('title: "Test Gig"\ndate: 2025-01-01\nvenue: "Venue"\n'
+                          'media:\n  pictures:\n    images:\n      - one.jpg\n')
+
+    def test_removes_indentless_sequence(self):
+        """Test indentless sequence values are removed with their key."""
+        text = "title: A\ncontent:\n- one\n- two\ndraft: false"
+        assert generate_markdown.strip_top_level_keys(text, ('content',)) == "title: A\ndraft: false\n"
+
+    def test_nested_keys_untouched(self):
+        """Test only top-level keys are removed."""
+        text = "media:\n  description: nested\n"
+        assert generate_markdown.strip_top_level_keys(text, ('description',)) == text
+
+
+class TestRender:
+    """Test the per content type renderers."""
+
+    def test_render_live(self):
+        """Test live output has frontmatter without description and HTML body."""
+        rendered = generate_markdown.render_live(LIVE_YAML)
+
+        assert rendered.startswith('---\ntitle: "Test Gig"\n')
+        assert 'description' not in rendered
+        assert rendered.endswith('---\n\n<p>First line <a href="https://example.com/a" target="_blank" '
+                                 'rel="noopener noreferrer">https://example.com/a</a><br>\n'
+                                 'second line</p>\n\n<p>New paragraph</p>\n')
+
+    def test_render_live_frontmatter_source(self):
+        """Test files written in frontmatter format use the body as description."""
+        rendered = generate_markdown.render_live("---\ntitle: Test\n---\n\nBody text\n")
+        assert rendered == "---\ntitle: Test\n---\n\n<p>Body text</p>\n"
+
+    def test_render_live_without_description(self):
+        """Test a missing description gives an empty body line."""
+        assert generate_markdown.render_live("title: Test\n") == "---\ntitle: Test\n---\n\n\n"
+
+    def test_render_music(self):
+        """Test music output uses content as body."""
+        rendered = generate_markdown.render_music("title: Album\ncontent: |\n  Liner notes\n")
+        assert rendered == "---\ntitle: Album\n---\n\n<p>Liner notes</p>\n"
+
+    def test_render_media(self):
+        """Test media output is the YAML verbatim."""
+        assert generate_markdown.render_media("title: Others\n") == "---\ntitle: Others\n\n---\n"
+
+    def test_render_rejects_non_mapping(self):
+        """Test non-mapping documents raise ValueError."""
+        with pytest.raises(ValueError, match="must be a YAML mapping"):
+            generate_markdown.render_live("- a\n- b\n")
+
+
+class TestGenerate:
+    """Test generate function."""
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        """Create a minimal project with one file per content type."""
+        data_dir = tmp_path / "website" / "data"
+        for kind in generate_markdown.CONTENT_TYPES:
+            (data_dir / kind).mkdir(parents=True)
+        (data_dir / "live" / "2025-01-01-gig.yaml").write_text(LIVE_YAML)
+        (data_dir / "music" / "album.yaml").write_text("title: Album\ncontent: Notes\n")
+        (data_dir / "media" / "others.yaml").write_text("title: Others\n")
+        return tmp_path
+
+    def test_generate_single_type(self, project):
+        """Test only the requested content type is generated."""
+        results = generate_markdown.generate("music", project)
+
+        assert [r.output for r in results] == [project / "website" / "content" / "music" / "album.md"]
+        assert results[0].status == generate_markdown.WRITTEN
+        assert not (project / "website" / "content" / "live").exists()
+
+    def test_generate_all(self, project):
+        """Test all content types are generated."""
+        results = generate_markdown.generate("all", project)
+        assert [r.output.name for r in results] == ["2025-01-01-gig.md", "album.md", "others.md"]
+
+    def test_generate_all_in_process_pool(self, project):
+        """Test pooled generation writes the same output as inline generation."""
+        results = generate_markdown.generate("all", project, jobs=1)
+        inline = {r.output: r.output.read_text() for r in results}
+        for r in results:
+            r.output.unlink()
+
+        with patch.object(generate_markdown, 'PARALLEL_THRESHOLD', 1):
+            pooled = generate_markdown.generate("all", project, jobs=2)
+
+        assert {r.output: r.output.read_text() for r in pooled} == inline
+
+    def test_identical_output_not_rewritten(self, project):
+        """Test outputs that render the same keep their mtime."""
+        md_file = generate_markdown.generate("music", project)[0].output
+        mtime = md_file.stat().st_mtime_ns
+
+        results = generate_markdown.generate("music", project)
+
+        assert results[0].status == generate_markdown.IDENTICAL
+        assert md_file.stat().st_mtime_ns == mtime
+
+    def test_incremental_skips_unchanged_sources(self, project):
+        """Test incremental runs only render data files that changed."""
+        generate_markdown.generate("all", project)
+        (project / "website" / "data" / "music" / "album.yaml").write_text("title: Album\ncontent: New\n")
+
+        mock_render = MagicMock()
+        with patch.dict(generate_markdown.RENDERERS, {'live': mock_render}):
+            results = generate_markdown.generate("all", project, incremental=True)
+
+        mock_render.assert_not_called()
+        assert [r.status for r in results] == [generate_markdown.UNCHANGED, generate_markdown.WRITTEN,
+                                               generate_markdown.UNCHANGED]
+        assert "<p>New</p>" in results[1].output.read_text()
+
+    def test_incremental_repairs_edited_output(self, project):
+        """Test hand-edited outputs are regenerated even if the source is unchanged."""
+        md_file = generate_markdown.generate("music", project)[0].output
+        md_file.write_text("edited")
+
+        results = generate_markdown.generate("music", project, incremental=True)
+
+        assert results[0].status == generate_markdown.WRITTEN
+        assert md_file.read_text() != "edited"
+
+    def test_manifest_persisted(self, project):
+        """Test the manifest records source and output hashes."""
+        result = generate_markdown.generate("music", project)[0]
+
+        manifest = generate_markdown.Manifest(generate_markdown.default_manifest_path(project))
+        assert manifest.get(result.source) == {'source': result.source_hash, 'output': result.output_hash}
+
+    def test_generate_unknown_type(self, project):
+        """Test unknown content types raise ValueError."""
+        with pytest.raises(ValueError, match="Unknown content type"):
+            generate_markdown.generate("posters", project)
+
+
+class TestGeneratePaths:
+    """Test generate_paths function."""
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        """Create a minimal project with two live performances."""
+        live_dir = tmp_path / "website" / "data" / "live"
+        live_dir.mkdir(parents=True)
+        (live_dir / "a.yaml").write_text("title: A\n")
+        (live_dir / "b.yaml").write_text("title: B\n")
+        return tmp_path
+
+    def test_single_file(self, project):
+        """Test only the given data file is regenerated."""
+        source = project / "website" / "data" / "live" / "a.yaml"
+
+        results = generate_markdown.generate_paths([source], project)
+
+        assert [r.output.name for r in results] == ["a.md"]
+        assert not (project / "website" / "content" / "live" / "b.md").exists()
+
+    def test_removed_source_removes_output(self, project):
+        """Test markdown for deleted data files is removed."""
+        source = project / "website" / "data" / "live" / "a.yaml"
+        md_file = generate_markdown.generate_paths([source], project)[0].output
+        source.unlink()
+
+        results = generate_markdown.generate_paths([source], project)
+
+        assert results[0].status == generate_markdown.REMOVED
+        assert not md_file.exists()
+
+    def test_rejects_paths_outside_data(self, project):
+        """Test paths that are not data files raise ValueError."""
+        with pytest.raises(ValueError, match="Not a data file"):
+            generate_markdown.generate_paths([project / "a.yaml"], project)
+
+
+@pytest.mark.parametrize("content_type", ["live", "media"])
+def test_matches_committed_content(content_type):
+    """Test output is byte-identical to content generated by the shell pipeline."""
+    data_dir = PROJECT_ROOT / "website" / "data" / content_type
+    content_dir = PROJECT_ROOT / "website" / "content" / content_type
+    render = generate_markdown.RENDERERS[content_type]
+
+    sources = sorted(data_dir.glob("*.yaml"))
+    assert sources
+    for yaml_file in sources:
+        expected = (content_dir / f"{yaml_file.stem}.md").read_text(encoding='utf-8')
+        assert render(yaml_file.read_text(encoding='utf-8')) == expected, yaml_file.name
@@ -0,0 +1,114 @@
+"""
+Unit tests for image_manifest.py
+
+Tests cover measuring images, site-path keys for assets and static,
+skipping unchanged images, pruning deleted ones, writing only on change,
+and reporting files that aren't images.
+"""
+
+import json
+
+import image_manifest
+import pytest
+
+
+@pytest.fixture
+def website(pil, tmp_path):
+    """Create a site with a gig photo in assets and a standalone picture in static."""
+    website = tmp_path / "website"
+    gig = website / "assets" / "media" / "live" / "2025-10-11-gig"
+    standalone = website / "static" / "media" / "standalone"
+    gig.mkdir(parents=True)
+    standalone.mkdir(parents=True)
+    pil.new("RGB", (300, 200), (200, 30, 30)).save(gig / "photo.jpg")
+    pil.new("RGB", (100, 150), (20, 20, 200)).save(standalone / "picture.png")
+    return website
+
+
+def images(website):
+    """Return every image under the site's default paths."""
+    return image_manifest.find_images(website / path for path in image_manifest.DEFAULT_PATHS)
+
+
+class TestDescribe:
+    """Test measuring one image."""
+
+    def test_dimensions_color_and_placeholder(self, website):
+        """Test an entry records size, dominant color and an inline JPEG."""
+        entry = image_manifest.describe(website / "assets" / "media" / "live" / "2025-10-11-gig" / "photo.jpg")
+
+        assert (entry["width"], entry["height"]) == (300, 200)
+        red, green, blue = (int(entry["color"][i:i + 2], 16) for i in (1, 3, 5))
+        assert red > 150 and green < 80 and blue < 80
+        assert entry["lqip"].startswith("data:image/jpeg;base64,")
+        assert len(entry["sha256"]) == 64
+
+    def test_manifest_key(self, tmp_path):
+        """Test keys are site paths regardless of the tree an image lives in."""
+        website = tmp_path / "website"
+
+        assert image_manifest.manifest_key(website / "assets" / "media" / "a.jpg", website) == "media/a.jpg"
+        assert image_manifest.manifest_key(website / "static" / "media" / "b.jpg", website) == "media/b.jpg"
+        assert image_manifest.manifest_key(tmp_path / "elsewhere.jpg", website) is None
+
+
+class TestUpdateManifest:
+    """Test update_manifest function."""
+
+    def test_backfill(self, website):
+        """Test every image is recorded under its site path."""
+        updated, errors = image_manifest.update_manifest(website, images(website), workers=1)
+
+        assert (updated, errors) == (2, [])
+        payload = json.loads(image_manifest.default_manifest_path(website).read_text())
+        assert payload["version"] == image_manifest.MANIFEST_VERSION
+        assert sorted(payload["images"]) == ["media/live/2025-10-11-gig/photo.jpg", "media/standalone/picture.png"]
+        assert payload["images"]["media/standalone/picture.png"]["height"] == 150
+
+    def test_unchanged_images_skipped(self, website):
+        """Test a second run describes nothing and leaves the file alone."""
+        image_manifest.update_manifest(website, images(website), workers=1)
+        manifest_path = image_manifest.default_manifest_path(website)
+        mtime = manifest_path.stat().st_mtime_ns
+
+        assert image_manifest.update_manifest(website, images(website), workers=1) == (0, [])
+        assert manifest_path.stat().st_mtime_ns == mtime
+
+    def test_changed_image_redescribed(self, pil, website):
+        """Test an image whose content changed is measured again."""
+        image_manifest.update_manifest(website, images(website), workers=1)
+        photo = website / "assets" / "media" / "live" / "2025-10-11-gig" / "photo.jpg"
+        pil.new("RGB", (120, 60), "white").save(photo)
+
+        assert image_manifest.update_manifest(website, [photo], workers=1) == (1, [])
+        entry = image_manifest.load_manifest(image_manifest.default_manifest_path(website))[
+            "media/live/2025-10-11-gig/photo.jpg"]
+        assert (entry["width"], entry["height"]) == (120, 60)
+
+    def test_prune(self, website):
+        """Test entries for deleted images are only dropped when pruning."""
+        image_manifest.update_manifest(website, images(website), workers=1)
+        (website / "static" / "media" / "standalone" / "picture.png").unlink()
+        manifest_path = image_manifest.default_manifest_path(website)
+
+        image_manifest.update_manifest(website, images(website), workers=1)
+        assert "media/standalone/picture.png" in image_manifest.load_manifest(manifest_path)
+
+        image_manifest.update_manifest(website, images(website), prune=True, workers=1)
+        assert list(image_manifest.load_manifest(manifest_path)) == ["media/live/2025-10-11-gig/photo.jpg"]
+
+    def test_not_an_image(self, website):
+        """Test files that can't be decoded are reported and left out."""
+        broken = website / "static" / "media" / "standalone" / "poster.jpg"
+        broken.write_text("<html></html>")
+
+        updated, errors = image_manifest.update_manifest(website, images(website), workers=1)
+
+        assert updated == 2
+        assert len(errors) == 1 and errors[0].startswith("media/standalone/poster.jpg: ")
+        assert "media/standalone/poster.jpg" not in image_manifest.load_manifest(
+            image_manifest.default_manifest_path(website))
+
+    def test_parallel(self, website):
+        """Test a process pool gives the same manifest."""
+        assert image_manifest.update_manifest(website, images(website), workers=2) == (2, [])
@@ -0,0 +1,129 @@
+"""
+Unit tests for image_optimizer.py
+
+Tests cover downscaling, applying and stripping EXIF orientation, leaving
+already-optimal images alone, parallel batches, and running without
+Pillow installed.
+"""
+
+import image_optimizer
+
+
+def write_jpeg(pil, path, size=(3000, 2000), orientation=None, quality=98):
+    """Write a noisy JPEG, optionally with an EXIF orientation tag."""
+    image = pil.effect_noise(size, 60).convert("RGB")
+    exif = pil.Exif()
+    if orientation:
+        exif[image_optimizer.EXIF_ORIENTATION] = orientation
+    image.save(path, "JPEG", quality=quality, exif=exif.tobytes())
+    return path
+
+
+class TestOptimizeFile:
+    """Test optimize_file function."""
+
+    def test_downscale_in_place(self, pil, tmp_path):
+        """Test a large photo is capped and recompressed in place."""
+        path = write_jpeg(pil, tmp_path / "photo.jpg", size=(3000, 2000))
+
+        result = image_optimizer.optimize_file(path, max_dimension=1200)
+
+        assert result.changed and result.path == path and result.after < result.before
+        with pil.open(path) as image:
+            assert image.size == (1200, 800)
+        assert not list(tmp_path.glob(".*"))
+
+    def test_orientation_applied_then_stripped(self, pil, tmp_path):
+        """Test a rotated photo is turned upright and loses its EXIF."""
+        path = write_jpeg(pil, tmp_path / "photo.jpg", size=(400, 300), orientation=6)
+
+        result = image_optimizer.optimize_file(path)
+
+        assert result.changed
+        with pil.open(path) as image:
+            assert image.size == (300, 400)
+            assert not image.getexif()
+
+    def test_separate_dest(self, pil, tmp_path):
+        """Test the source is untouched when writing elsewhere."""
+        source = write_jpeg(pil, tmp_path / "photo.jpg", size=(2000, 1000))
+        before = source.read_bytes()
+
+        result = image_optimizer.optimize_file(source, tmp_path / "out.jpg", max_dimension=500)
+
+        assert result.path == tmp_path / "out.jpg"
+        assert source.read_bytes() == before
+
+    def test_optimal_image_left_alone(self, pil, tmp_path):
+        """Test a small image without metadata isn't rewritten (or copied to dest)."""
+        path = tmp_path / "small.png"
+        pil.new("RGB", (50, 50), "black").save(path, optimize=True)
+
+        result = image_optimizer.optimize_file(path, tmp_path / "out.png")
+
+        assert not result.changed and result.path == path
+        assert not (tmp_path / "out.png").exists()
+
+    def test_dry_run(self, pil, tmp_path):
+        """Test a dry run measures savings without writing."""
+        path = write_jpeg(pil, tmp_path / "photo.jpg", size=(2000, 1000))
+        before = path.read_bytes()
+
+        result = image_optimizer.optimize_file(path, max_dimension=500, dry_run=True)
+
+        assert result.changed and result.saved > 0
+        assert path.read_bytes() == before
+
+    def test_not_an_image(self, pil, tmp_path):
+        """Test unreadable files are reported, not raised."""
+        path = tmp_path / "broken.jpg"
+        path.write_bytes(b"not a jpeg")
+
+        result = image_optimizer.optimize_file(path)
+
+        assert result.error and not result.changed
+        assert path.read_bytes() == b"not a jpeg"
+
+    def test_other_formats_skipped(self, pil, tmp_path):
+        """Test GIFs are left alone."""
+        path = tmp_path / "logo.gif"
+        pil.new("P", (10, 10)).save(path)
+
+        assert not image_optimizer.optimize_file(path).changed
+
+
+class TestOptimizeMany:
+    """Test batches."""
+
+    def test_parallel_in_order(self, pil, tmp_path):
+        """Test a batch runs on a pool and returns results in job order."""
+        paths = [write_jpeg(pil, tmp_path / f"photo-{i}.jpg", size=(1000 + i * 100, 800)) for i in range(4)]
+
+        results = image_optimizer.optimize_many([(p, None) for p in paths], workers=2, max_dimension=600)
+
+        assert [r.source for r in results] == paths
+        assert all(r.changed for r in results)
+        assert "4 of 4 images" in image_optimizer.summarize(results)
+
+    def test_find_images(self, tmp_path):
+        """Test only optimizable, non-hidden files are collected."""
+        (tmp_path / "gig").mkdir()
+        for name in ("gig/a.jpg", "gig/b.PNG", "gig/c.gif", "gig/.d.jpg.tmp", "gig/.e.jpg"):
+            (tmp_path / name).write_bytes(b"")
+
+        assert image_optimizer.find_images([tmp_path]) == [tmp_path / "gig" / "a.jpg", tmp_path / "gig" / "b.PNG"]
+
+
+class TestWithoutPillow:
+    """Test behavior when Pillow isn't installed."""
+
+    def test_images_pass_through(self, monkeypatch, tmp_path):
+        """Test images are reported unoptimized and untouched."""
+        monkeypatch.setattr(image_optimizer, "Image", None)
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(b"jpeg")
+
+        assert not image_optimizer.available()
+        results = image_optimizer.optimize_many([(path, None), (path, None)])
+        assert [r.path for r in results] == [path, path]
+        assert all(not r.changed and "Pillow" in r.error for r in results)
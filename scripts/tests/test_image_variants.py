@@ -0,0 +1,130 @@
+"""
+Unit tests for image_variants.py
+
+Tests cover planning widths without upscaling, building variants per
+width and format, skipping images narrower than the smallest width, reusing variants of unchanged images, pruning variants
+of replaced images, and the per-gig byte report.
+"""
+
+import image_manifest
+import image_variants
+import pytest
+
+
+@pytest.fixture
+def website(pil, tmp_path):
+    """Create a site with one gig (poster and a narrow photo) recorded in the manifest."""
+    website = tmp_path / "website"
+    gig = website / "assets" / "media" / "live" / "2025-10-11-gig"
+    gig.mkdir(parents=True)
+    pil.effect_noise((900, 600), 40).convert("RGB").save(gig / "poster.jpg")
+    pil.effect_noise((500, 300), 40).convert("RGB").save(gig / "photo.jpg")
+    data = website / "data" / "live"
+    data.mkdir(parents=True)
+    (data / "2025-10-11-gig.yaml").write_text(
+        "title: Gig\nposter: poster.jpg\nmedia:\n  pictures:\n    images:\n      - photo.jpg\n")
+    image_manifest.update_manifest(website, [gig / "poster.jpg", gig / "photo.jpg"], workers=1)
+    return website
+
+
+def entry(website, name):
+    """Return a gig image's manifest entry."""
+    manifest = image_manifest.load_manifest(image_manifest.default_manifest_path(website))
+    return manifest[f"media/live/2025-10-11-gig/{name}"]
+
+
+def test_plan_widths():
+    """Test widths stop at the source width, leaving none for narrow images."""
+    assert image_variants.plan_widths(2000) == [400, 800, 1200, 1600]
+    assert image_variants.plan_widths(900) == [400, 800]
+    assert image_variants.plan_widths(300) == []
+
+
+class TestUpdateVariants:
+    """Test update_variants function."""
+
+    def test_builds_each_width_and_format(self, website):
+        """Test variants are written per planned width and sized in the index."""
+        encoded, written, errors = image_variants.update_variants(website, workers=1, formats=["webp"])
+
+        assert (encoded, written, errors) == (2, 3, [])
+        variants_dir = image_variants.default_variants_dir(website)
+        sha = entry(website, "poster.jpg")["sha256"]
+        assert image_variants.variant_path(variants_dir, sha, 800, "webp").exists()
+        assert not image_variants.variant_path(variants_dir, sha, 1200, "webp").exists()
+        sizes = image_variants.load_index(variants_dir)[sha]
+        assert set(sizes) == {"400", "800"}
+        assert sizes["400"]["jpeg"] > 0 and sizes["400"]["webp"] > 0
+
+    def test_avif(self, website):
+        """Test AVIF variants are written when Pillow supports them."""
+        if "avif" not in image_variants.available_formats():
+            pytest.skip("Pillow built without AVIF")
+
+        image_variants.update_variants(website, workers=1, formats=["avif"])
+
+        sha = entry(website, "photo.jpg")["sha256"]
+        path = image_variants.variant_path(image_variants.default_variants_dir(website), sha, 400, "avif")
+        assert path.read_bytes()[4:12] == b"ftypavif"
+
+    def test_unchanged_images_cached(self, website):
+        """Test a second run encodes nothing."""
+        image_variants.update_variants(website, workers=1, formats=["webp"])
+
+        assert image_variants.update_variants(website, workers=1, formats=["webp"]) == (0, 0, [])
+
+    def test_replaced_image(self, pil, website):
+        """Test a changed image gets new variants and the old ones are pruned."""
+        image_variants.update_variants(website, workers=1, formats=["webp"])
+        variants_dir = image_variants.default_variants_dir(website)
+        old_sha = entry(website, "photo.jpg")["sha256"]
+        photo = website / "assets" / "media" / "live" / "2025-10-11-gig" / "photo.jpg"
+        pil.new("RGB", (450, 300), "white").save(photo)
+        image_manifest.update_manifest(website, [photo], workers=1)
+
+        assert image_variants.update_variants(website, workers=1, formats=["webp"])[:2] == (1, 1)
+        assert not list(variants_dir.glob(f"*/{old_sha}-*"))
+        assert image_variants.variant_path(variants_dir, entry(website, "photo.jpg")["sha256"], 400, "webp").exists()
+
+    def test_narrow_image_skipped(self, pil, website):
+        """Test an image narrower than the smallest width gets no variants, now or on later runs."""
+        image_variants.update_variants(website, workers=1, formats=["webp"])
+        variants_dir = image_variants.default_variants_dir(website)
+        photo = website / "assets" / "media" / "live" / "2025-10-11-gig" / "photo.jpg"
+        pil.new("RGB", (300, 200), "white").save(photo)
+        image_manifest.update_manifest(website, [photo], workers=1)
+        sha = entry(website, "photo.jpg")["sha256"]
+        # A variant named after a width the image doesn't have, as older versions wrote
+        stale = image_variants.variant_path(variants_dir, sha, 400, "webp")
+        stale.parent.mkdir(parents=True, exist_ok=True)
+        stale.write_bytes(b"stale")
+
+        assert image_variants.update_variants(website, workers=1, formats=["webp"]) == (1, 0, [])
+        assert image_variants.load_index(variants_dir)[sha] == {}
+        assert not stale.exists()
+        assert image_variants.update_variants(website, workers=1, formats=["webp"]) == (0, 0, [])
+
+    def test_parallel(self, website):
+        """Test a process pool builds the same variants."""
+        assert image_variants.update_variants(website, workers=2, formats=["webp"]) == (2, 3, [])
+
+
+class TestReport:
+    """Test the per-gig byte report."""
+
+    def test_page_weights(self, website):
+        """Test a page counts the poster at 800px and thumbnails at 400px."""
+        image_variants.update_variants(website, workers=1, formats=["webp"])
+        index = image_variants.load_index(image_variants.default_variants_dir(website))
+        poster = index[entry(website, "poster.jpg")["sha256"]]["800"]
+        photo = index[entry(website, "photo.jpg")["sha256"]]["400"]
+
+        assert image_variants.page_weights(website) == [
+            ("2025-10-11-gig", 2, {name: poster[name] + photo[name] for name in ("jpeg", "webp")}),
+        ]
+
+    def test_report_without_variants(self, website, capsys):
+        """Test the report says when nothing has been measured."""
+        image_variants.report(website)
+
+        assert "No measured gig images" in capsys.readouterr().out
@@ -0,0 +1,219 @@
+"""
+Unit tests for manage_gear.py
+
+Tests cover loading gear through the session gear store (sorted, served
+from memory, per status), moving gear between statuses, and bulk import
+from CSV and JSONL files.
+"""
+
+import json
+
+import manage_gear
+import pytest
+from content_index import ContentIndex
+
+
+@pytest.fixture
+def gear_dir(tmp_path, monkeypatch, write_gear):
+    """Create a gear directory and point manage_gear at it."""
+    gear_dir = tmp_path / "gear"
+    gear_dir.mkdir()
+    write_gear(gear_dir, "boss-ds-1", "DS-1")
+    write_gear(gear_dir, "acme-fuzz", "Fuzz", manufacturer="Acme")
+    monkeypatch.setattr(manage_gear, '_content_index', ContentIndex(tmp_path / "index.pickle"))
+    monkeypatch.setattr(manage_gear, '_gear_store', None)
+    monkeypatch.setattr(manage_gear, 'GEAR_DIR', gear_dir)
+    return gear_dir
+
+
+def names(items):
+    """Return (manufacturer, name) pairs."""
+    return [(g['manufacturer'], g['name']) for g in items]
+
+
+class TestLoadGear:
+    """Test load_gear and the session gear store."""
+
+    def test_sorted_and_served_from_memory(self, gear_dir):
+        """Test the list is sorted by manufacturer and repeated calls don't re-read files."""
+        assert names(manage_gear.load_gear()) == [("Acme", "Fuzz"), ("BOSS", "DS-1")]
+        loads = manage_gear.get_gear_store().loads
+        manage_gear.load_gear()
+        manage_gear.load_gear()
+        assert manage_gear.get_gear_store().loads == loads
+
+    def test_returns_copy_of_session_list(self, gear_dir):
+        """Test callers can reorder what they get without affecting later calls."""
+        first = manage_gear.load_gear()
+        first.reverse()
+
+        assert names(manage_gear.load_gear()) == [("Acme", "Fuzz"), ("BOSS", "DS-1")]
+
+    def test_statuses(self, gear_dir, write_gear):
+        """Test sold, want and archived gear are loaded only when asked for."""
+        (gear_dir / "sold").mkdir()
+        write_gear(gear_dir / "sold", "boss-rc-20", "RC-20")
+
+        assert ("BOSS", "RC-20") not in names(manage_gear.load_gear())
+        assert names(manage_gear.load_gear(("sold",))) == [("BOSS", "RC-20")]
+        gear = manage_gear.load_gear(("active", "sold"))[-1]
+        assert manage_gear.gear_path(gear) == gear_dir / "sold" / "boss-rc-20.yaml"
+
+    def test_save_gear_then_invalidate(self, gear_dir):
+        """Test a saved item shows up after reading only that file."""
+        manage_gear.load_gear()
+        loads = manage_gear.get_gear_store().loads
+
+        path = manage_gear.save_gear({'name': 'RC-1', 'manufacturer': 'BOSS', 'category': 'Pedal'})
+        manage_gear.get_gear_store().invalidate(path)
+
+        assert ("BOSS", "RC-1") in names(manage_gear.load_gear())
+        assert manage_gear.get_gear_store().loads == loads + 1
+
+    def test_external_change(self, gear_dir, write_gear):
+        """Test files added and removed by something else are picked up."""
+        manage_gear.load_gear()
+
+        write_gear(gear_dir, "boss-bd-2", "BD-2")
+        (gear_dir / "acme-fuzz.yaml").unlink()
+
+        assert names(manage_gear.load_gear()) == [("BOSS", "BD-2"), ("BOSS", "DS-1")]
+
+
+class TestChangeStatus:
+    """Test moving gear between statuses from the menu."""
+
+    @pytest.fixture(autouse=True)
+    def no_catalog(self, monkeypatch):
+        """Don't compile the real gear catalog from tests."""
+        monkeypatch.setattr(manage_gear, 'compile_catalog', lambda: None)
+
+    def pick(self, monkeypatch, *answers):
+        """Answer fzf prompts in order."""
+        replies = iter(answers)
+        monkeypatch.setattr(manage_gear, 'fzf_select', lambda options, prompt="Select": next(replies))
+
+    def test_archive_and_unarchive(self, gear_dir, monkeypatch, capsys):
+        """Test archiving moves to archived/ and unarchiving moves back."""
+        self.pick(monkeypatch, "BOSS - DS-1 [active]")
+        manage_gear.archive_gear()
+
+        assert (gear_dir / "archived" / "boss-ds-1.yaml").exists()
+        assert names(manage_gear.load_gear()) == [("Acme", "Fuzz")]
+        assert "Moved to archived: BOSS - DS-1" in capsys.readouterr().out
+
+        self.pick(monkeypatch, "BOSS - DS-1 [archived]")
+        manage_gear.unarchive_gear()
+
+        assert (gear_dir / "boss-ds-1.yaml").exists()
+        assert names(manage_gear.load_gear()) == [("Acme", "Fuzz"), ("BOSS", "DS-1")]
+
+    def test_change_to_sold(self, gear_dir, monkeypatch):
+        """Test any gear can be moved to a chosen status."""
+        self.pick(monkeypatch, "Acme - Fuzz [active]", "sold")
+        manage_gear.change_status()
+
+        assert (gear_dir / "sold" / "acme-fuzz.yaml").exists()
+        assert names(manage_gear.load_gear(("sold",))) == [("Acme", "Fuzz")]
+
+    def test_nothing_to_unarchive(self, gear_dir, capsys):
+        """Test an empty status is reported."""
+        manage_gear.unarchive_gear()
+        assert "No archived gear found" in capsys.readouterr().out
+
+
+CSV_HEADER = "name,manufacturer,category,technology,types,controls,url,description\n"
+
+
+class TestImportGear:
+    """Test bulk import from CSV and JSONL."""
+
+    @pytest.fixture(autouse=True)
+    def no_catalog(self, monkeypatch):
+        """Don't compile the real gear catalog from tests."""
+        monkeypatch.setattr(manage_gear, 'compile_catalog', lambda: None)
+
+    def test_csv(self, gear_dir, tmp_path, capsys):
+        """Test CSV rows are validated, slugified and written with list fields split."""
+        source = tmp_path / "gear.csv"
+        source.write_text(
+            CSV_HEADER
+            + "BD-2 Blues Driver,BOSS,Pedal,Analog,Overdrive;Distortion,Level;Tone;Gain,,\n"
+            + "Rooms,Death By Audio,Pedal,Digital,Reverb,,https://example.com,\"Reverb, weird\"\n"
+            + "Bad,Acme,Amp,Analog,,,,\n"
+        )
+
+        assert manage_gear.import_gear(source) == 1
+
+        data = manage_gear.frontmatter_codec.read_header(gear_dir / "boss-bd-2-blues-driver.yaml")
+        assert data == {"name": "BD-2 Blues Driver", "manufacturer": "BOSS", "category": "Pedal",
+                        "technology": "Analog", "types": ["Overdrive", "Distortion"],
+                        "controls": ["Level", "Tone", "Gain"]}
+        rooms = manage_gear.frontmatter_codec.read_header(gear_dir / "death-by-audio-rooms.yaml")
+        assert rooms["description"] == "Reverb, weird"
+
+        output = capsys.readouterr().out
+        assert "Imported 2 of 3 rows from gear.csv" in output
+        assert "line 4" in output
+        assert "category must be one of" in output
+
+    def test_jsonl_collisions(self, gear_dir, tmp_path, capsys):
+        """Test collisions with existing files and earlier rows are rejected."""
+        source = tmp_path / "gear.jsonl"
+        rows = [
+            {"name": "DS-1", "manufacturer": "BOSS", "category": "Pedal", "technology": "Analog"},
+            {"name": "RC-1", "manufacturer": "BOSS", "category": "Pedal", "technology": "Digital"},
+            {"name": "RC 1", "manufacturer": "boss", "category": "Pedal", "technology": "Digital"},
+        ]
+        source.write_text("\n".join(json.dumps(r) for r in rows) + "\n\nnot json\n")
+
+        assert manage_gear.import_gear(source) == 1
+
+        assert (gear_dir / "boss-rc-1.yaml").exists()
+        output = capsys.readouterr().out
+        assert "Imported 1 of 4 rows" in output
+        assert "already exists" in output
+        assert "duplicate of line 2" in output
+        assert "invalid JSON" in output
+
+    def test_collision_with_other_status(self, gear_dir, tmp_path, capsys, write_gear):
+        """Test a slug that is sold or archived counts as taken."""
+        (gear_dir / "sold").mkdir()
+        write_gear(gear_dir / "sold", "boss-rc-1", "RC-1")
+        source = tmp_path / "gear.csv"
+        source.write_text(CSV_HEADER + "RC-1,BOSS,Pedal,Digital,,,,\n")
+
+        assert manage_gear.import_gear(source) == 1
+        assert not (gear_dir / "boss-rc-1.yaml").exists()
+        assert "already exists" in capsys.readouterr().out
+
+    def test_dry_run_writes_nothing(self, gear_dir, tmp_path, capsys):
+        """Test --dry-run only reports."""
+        source = tmp_path / "gear.csv"
+        source.write_text(CSV_HEADER + "RC-1,BOSS,Pedal,Digital,,,,\n")
+
+        assert manage_gear.import_gear(source, dry_run=True) == 0
+
+        assert not (gear_dir / "boss-rc-1.yaml").exists()
+        assert "Would import 1 of 1 rows" in capsys.readouterr().out
+
+    def test_unsupported_file(self, gear_dir, tmp_path, capsys):
+        """Test unknown file types are rejected up front."""
+        source = tmp_path / "gear.xlsx"
+        source.write_text("")
+
+        assert manage_gear.import_gear(source) == 1
+        assert "Unsupported import file type" in capsys.readouterr().out
+
+    def test_bulk_import_updates_store(self, gear_dir, tmp_path):
+        """Test hundreds of rows land in one pass and each new file is read once."""
+        manage_gear.load_gear()
+        source = tmp_path / "gear.csv"
+        source.write_text(CSV_HEADER + "".join(
+            f"Item {i},Maker {i % 10},Pedal,Analog,Fuzz,,,\n" for i in range(300)))
+
+        assert manage_gear.import_gear(source) == 0
+
+        assert len(list(gear_dir.glob("*.yaml"))) == 302
+        assert len(manage_gear.load_gear()) == 302
+        assert manage_gear.get_gear_store().loads == 302
@@ -9,8 +9,6 @@ Tests the LiveManager class functionality including:
 - Error handling
 """
 
-import subprocess
-
 # Import the module under test
 import sys
 import tempfile
@@ -20,6 +18,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from downloader import DownloadResult
 from manage_live import LiveManager
 
 
@@ -60,6 +59,7 @@ class TestLiveManager:
         assert manager.live_dir == temp_project / "website" / "data" / "live"
         assert manager.content_dir == temp_project / "website" / "content" / "live"
         assert manager.script_dir == temp_project / "scripts"
+        assert manager.downloader.cache.cache_dir == temp_project / ".cache" / "downloads"
 
     def test_create_slug(self, manager):
         """Test slug creation from text."""
@@ -68,19 +68,20 @@ class TestLiveManager:
         assert manager.create_slug("Special!@#$%^&*()Characters") == "specialcharacters"
         assert manager.create_slug("Multiple   Spaces") == "multiple-spaces"
 
-    @patch('urllib.request.urlretrieve')
-    def test_download_poster_success(self, mock_urlretrieve, manager):
+    @patch('downloader.Downloader.fetch')
+    def test_download_poster_success(self, mock_fetch, manager):
         """Test successful poster download."""
         output_path = manager.project_root / "test_poster.jpg"
+        mock_fetch.return_value = DownloadResult("https://example.com/poster.jpg", output_path, True, 10, 1)
 
         result = manager.download_poster("https://example.com/poster.jpg", output_path)
 
         assert result is True
-        mock_urlretrieve.assert_called_once_with("https://example.com/poster.jpg", output_path)
-        assert output_path.parent.exists()
+        mock_fetch.assert_called_once_with("https://example.com/poster.jpg", output_path)
 
-    @patch('urllib.request.urlretrieve', side_effect=Exception("Download failed"))
-    def test_download_poster_failure(self, mock_urlretrieve, manager):
+    @patch('downloader.Downloader.fetch',
+           return_value=DownloadResult("https://example.com/poster.jpg", None, False, error="Download failed"))
+    def test_download_poster_failure(self, mock_fetch, manager):
         """Test failed poster download."""
         output_path = manager.project_root / "test_poster.jpg"
 
@@ -168,34 +169,33 @@ This is the event description."""
         assert parsed_data == data
         assert parsed_body == body
 
-    @patch('subprocess.run')
-    def test_run_generate_markdown_success(self, mock_run, manager):
-        """Test successful markdown generation."""
-        # Create the script file
-        script_path = manager.script_dir / "generate-markdown.sh"
-        script_path.touch()
+    def test_run_generate_markdown_success(self, manager):
+        """Test markdown is generated in-process."""
+        test_file = manager.live_dir / "2025-01-01-test.yaml"
+        manager.write_live_file(test_file, {'title': 'Test Event'}, "Event description")
 
         manager.run_generate_markdown("live")
 
-        mock_run.assert_called_once_with([str(script_path), "live"], check=True)
+        md_file = manager.project_root / "website" / "content" / "live" / "2025-01-01-test.md"
+        assert md_file.read_text() == "---\ntitle: Test Event\n---\n\n<p>Event description</p>\n"
 
-    @patch('subprocess.run')
-    def test_run_generate_markdown_missing_script(self, mock_run, manager):
-        """Test markdown generation with missing script."""
+    @patch('manage_live.generate_markdown.generate', side_effect=OSError("disk full"))
+    def test_run_generate_markdown_failure(self, mock_generate, manager, capsys):
+        """Test failed markdown generation."""
+        # Should not raise exception, just print error
         manager.run_generate_markdown("live")
 
-        mock_run.assert_not_called()
+        mock_generate.assert_called_once_with("live", manager.project_root, incremental=True)
+        assert "✗ Error generating markdown: disk full" in capsys.readouterr().out
 
-    @patch('subprocess.run', side_effect=subprocess.CalledProcessError(1, 'cmd'))
-    def test_run_generate_markdown_failure(self, mock_run, manager):
-        """Test failed markdown generation."""
-        script_path = manager.script_dir / "generate-markdown.sh"
-        script_path.touch()
+    @patch('manage_live.generate_markdown.generate_paths')
+    def test_run_generate_markdown_paths(self, mock_generate_paths, manager):
+        """Test touched files are regenerated on their own."""
+        test_file = manager.live_dir / "2025-01-01-test.yaml"
 
-        # Should not raise exception, just print error
-        manager.run_generate_markdown("live")
+        manager.run_generate_markdown("live", [test_file])
 
-        mock_run.assert_called_once()
+        mock_generate_paths.assert_called_once_with([test_file], manager.project_root)
 
     @patch('builtins.input', side_effect=[
         'Test Event',  # event_name
@@ -386,7 +386,8 @@ Description"""
         result = manager.get_performers()
         assert result == []
 
-    @patch('urllib.request.urlretrieve')
+    @patch('downloader.Downloader.fetch',
+           side_effect=lambda url, dest: DownloadResult(url, dest, True))
     @patch('builtins.input', side_effect=[
         'Test Event',
         '2025-01-01',
@@ -398,16 +399,12 @@ Description"""
         '',
         'n'
     ])
-    @patch('subprocess.run')
-    def test_create_live_with_url_poster(self, mock_run, mock_input, mock_urlretrieve, manager):
+    def test_create_live_with_url_poster(self, mock_input, mock_fetch, manager):
         """Test creating live performance with URL poster."""
-        script_path = manager.script_dir / "generate-markdown.sh"
-        script_path.touch()
-
         manager.create_live()
 
         # Check URL download was attempted
-        mock_urlretrieve.assert_called_once()
+        mock_fetch.assert_called_once()
 
     @patch('builtins.input', side_effect=[EOFError()])
     def test_create_live_eof(self, mock_input, manager):
@@ -5,10 +5,12 @@ Tests cover YAML parsing/writing, file operations, and core functionality.
 Uses pytest fixtures for temporary files and mocking for external dependencies.
 """
 
-import subprocess
+import hashlib
 from unittest.mock import Mock, patch
 
+import image_optimizer
 import pytest
+from downloader import DownloadResult
 
 from scripts.manage_media import MediaManager
 
@@ -35,6 +37,12 @@ def mock_fzf():
         yield
 
 
+def fake_download(url, dest):
+    """Stand in for Downloader.fetch: write a small body to dest."""
+    dest.write_bytes(b"jpeg")
+    return DownloadResult(url, dest, True, 4, 1, sha256=hashlib.sha256(b"jpeg").hexdigest())
+
+
 @pytest.fixture
 def media_manager(temp_project_root):
     """Create MediaManager instance with temporary project root."""
@@ -77,6 +85,7 @@ class TestMediaManager:
         assert manager.media_dir == temp_project_root / "website" / "assets" / "media"
         assert manager.others_file == temp_project_root / "website" / "data" / "media" / "others.yaml"
         assert manager.script_dir == temp_project_root / "scripts"
+        assert manager.downloader.cache.cache_dir == temp_project_root / ".cache" / "downloads"
 
     def test_get_live_performances_empty(self, media_manager):
         """Test getting live performances when directory is empty."""
@@ -122,49 +131,53 @@ class TestMediaManager:
         youtube_id = media_manager.extract_youtube_id(url)
         assert youtube_id is None
 
-    @patch('urllib.request.urlretrieve')
-    def test_download_file_success(self, mock_urlretrieve, media_manager, tmp_path):
+    @patch('downloader.Downloader.fetch')
+    def test_download_file_success(self, mock_fetch, media_manager, tmp_path):
         """Test successful file download."""
         url = "https://example.com/image.jpg"
         output_path = tmp_path / "downloaded.jpg"
+        mock_fetch.return_value = DownloadResult(url, output_path, True, 10, 1)
 
         result = media_manager.download_file(url, output_path)
 
         assert result is True
-        mock_urlretrieve.assert_called_once_with(url, output_path)
-        assert output_path.parent.exists()
+        mock_fetch.assert_called_once_with(url, output_path)
 
-    @patch('urllib.request.urlretrieve')
-    def test_download_file_failure(self, mock_urlretrieve, media_manager, tmp_path):
+    @patch('downloader.Downloader.fetch')
+    def test_download_file_failure(self, mock_fetch, media_manager, tmp_path, capsys):
         """Test failed file download."""
-        mock_urlretrieve.side_effect = Exception("Download failed")
-
         url = "https://example.com/image.jpg"
         output_path = tmp_path / "downloaded.jpg"
+        mock_fetch.return_value = DownloadResult(url, output_path, False, error="HTTP 404 Not Found")
 
         result = media_manager.download_file(url, output_path)
 
         assert result is False
+        assert "HTTP 404 Not Found" in capsys.readouterr().out
+
+    @patch('downloader.Downloader.fetch')
+    def test_download_files_keeps_order(self, mock_fetch, media_manager, tmp_path):
+        """Test several downloads report success per job, in order."""
+        mock_fetch.side_effect = lambda url, dest: DownloadResult(url, dest, "bad" not in url)
+        jobs = [(f"https://example.com/{name}.jpg", tmp_path / f"{name}.jpg") for name in ("a", "bad", "c")]
 
-    @patch('shutil.copy2')
-    def test_generate_image_versions_success(self, mock_copy, media_manager, tmp_path):
-        """Test successful image version generation."""
+        assert [result.ok for result in media_manager.download_files(jobs)] == [True, False, True]
+
+    def test_generate_image_versions_success(self, media_manager, tmp_path):
+        """Test an image is stored once and hardlinked into the output directory."""
         source_file = tmp_path / "source.jpg"
-        source_file.touch()
+        source_file.write_bytes(b"jpeg")
         output_dir = tmp_path / "output"
-        base_name = "test.jpg"
 
-        result = media_manager.generate_image_versions(source_file, base_name, output_dir)
+        assert media_manager.generate_image_versions(source_file, "test.jpg", output_dir) is True
+        assert media_manager.generate_image_versions(source_file, "again.jpg", output_dir) is True
 
-        assert result is True
-        mock_copy.assert_called_once_with(source_file, output_dir / base_name)
-        assert output_dir.exists()
+        first, second = (output_dir / "test.jpg").stat(), (output_dir / "again.jpg").stat()
+        assert (output_dir / "test.jpg").read_bytes() == b"jpeg"
+        assert first.st_ino == second.st_ino
 
-    @patch('shutil.copy2')
-    def test_generate_image_versions_failure(self, mock_copy, media_manager, tmp_path):
+    def test_generate_image_versions_failure(self, media_manager, tmp_path):
         """Test failed image version generation."""
-        mock_copy.side_effect = Exception("Copy failed")
-
         source_file = tmp_path / "source.jpg"
         output_dir = tmp_path / "output"
         base_name = "test.jpg"
@@ -173,6 +186,27 @@ class TestMediaManager:
 
         assert result is False
 
+    def test_optimize_images(self, pil, media_manager, tmp_path):
+        """Test large images are optimized into the temp dir and the source is untouched."""
+        source = tmp_path / "camera.jpg"
+        pil.new("RGB", (5000, 100), "red").save(source, quality=98)
+        before = source.read_bytes()
+
+        [(optimized, sha256)] = media_manager.optimize_images([(source, "abc")], tmp_path)
+
+        assert optimized != source and sha256 is None
+        with pil.open(optimized) as image:
+            assert max(image.size) == image_optimizer.MAX_DIMENSION
+        assert source.read_bytes() == before
+
+    def test_optimize_images_without_pillow(self, media_manager, tmp_path, monkeypatch, capsys):
+        """Test images are stored as they are, with a warning, when Pillow is missing."""
+        monkeypatch.setattr(image_optimizer, "Image", None)
+        sources = [(tmp_path / "a.jpg", "abc")]
+
+        assert media_manager.optimize_images(sources, tmp_path) == sources
+        assert "Pillow is not installed" in capsys.readouterr().out
+
     def test_update_live_performance_yaml_success(self, media_manager, sample_live_performance):
         """Test successful YAML update."""
         file_path, _ = sample_live_performance
@@ -259,37 +293,27 @@ items:
         assert 'type: review' in content
         assert 'Test Review' in content
 
-    @patch('subprocess.run')
-    def test_run_generate_markdown_success(self, mock_run, media_manager):
-        """Test successful markdown generation."""
-        # Create the script file
-        script_path = media_manager.script_dir / "generate-markdown.sh"
-        script_path.touch()
-
+    @patch('scripts.manage_media.generate_markdown.generate')
+    def test_run_generate_markdown_success(self, mock_generate, media_manager):
+        """Test markdown is generated in-process."""
         media_manager.run_generate_markdown("live")
 
-        mock_run.assert_called_once_with([str(script_path), "live"], check=True)
+        mock_generate.assert_called_once_with("live", media_manager.project_root, incremental=True)
 
-    @patch('subprocess.run')
-    def test_run_generate_markdown_script_missing(self, mock_run, media_manager):
-        """Test markdown generation when script is missing."""
-        media_manager.run_generate_markdown("live")
+    @patch('scripts.manage_media.generate_markdown.generate_paths')
+    def test_run_generate_markdown_paths(self, mock_generate_paths, media_manager):
+        """Test only the touched data file is regenerated."""
+        media_manager.run_generate_markdown("media", [media_manager.others_file])
 
-        # Should not call subprocess if script doesn't exist
-        mock_run.assert_not_called()
+        mock_generate_paths.assert_called_once_with([media_manager.others_file], media_manager.project_root)
 
-    @patch('subprocess.run')
-    def test_run_generate_markdown_failure(self, mock_run, media_manager):
+    @patch('scripts.manage_media.generate_markdown.generate', side_effect=ValueError("bad data"))
+    def test_run_generate_markdown_failure(self, mock_generate, media_manager, capsys):
         """Test markdown generation failure."""
-        mock_run.side_effect = subprocess.CalledProcessError(1, 'cmd')
-
-        # Create the script file
-        script_path = media_manager.script_dir / "generate-markdown.sh"
-        script_path.touch()
-
         # Should not raise exception
         media_manager.run_generate_markdown("live")
 
+        assert "✗ Error generating markdown: bad data" in capsys.readouterr().out
 
     @patch('builtins.input')
     def test_select_live_performance_cancel(self, mock_input, media_manager, sample_live_performance):
@@ -337,7 +361,7 @@ class TestMainFunction:
 
         from scripts.manage_media import main
 
-        result = main()
+        result = main([])
 
         assert result == 0
         mock_manager.show_menu.assert_called_once()
@@ -355,7 +379,7 @@ class TestMainFunction:
         except ImportError:
             # If yaml is missing, main() should return 1
             from scripts.manage_media import main
-            result = main()
+            result = main([])
             assert result == 1
 
 
@@ -365,9 +389,8 @@ class TestIntegrationWorkflows:
 
 
     @patch('builtins.input')
-    @patch('urllib.request.urlretrieve')
-    @patch('shutil.copy2')
-    def test_add_pictures_workflow(self, mock_copy, mock_urlretrieve, mock_input,
+    @patch('downloader.Downloader.fetch')
+    def test_add_pictures_workflow(self, mock_fetch, mock_input,
                                    media_manager, sample_live_performance):
         """Test complete add pictures workflow."""
         # Mock user inputs
@@ -379,13 +402,17 @@ class TestIntegrationWorkflows:
             "",  # Finish adding pictures
         ]
 
+        mock_fetch.side_effect = fake_download
+
         media_manager.add_pictures()
 
         # Verify download was called
-        mock_urlretrieve.assert_called()
+        mock_fetch.assert_called()
 
-        # Verify file was copied
-        mock_copy.assert_called()
+        # Verify file was saved
+        file_path, _ = sample_live_performance
+        gig_dir = media_manager.project_root / "website" / "assets" / "media" / "live" / file_path.stem
+        assert (gig_dir / f"obscvrat-{file_path.stem}-performance-1.jpg").read_bytes() == b"jpeg"
 
         # Verify YAML was updated
         file_path, _ = sample_live_performance
@@ -659,8 +686,8 @@ class TestIntegrationWorkflows:
         media_manager.show_menu()
 
     @patch('builtins.input')
-    @patch('urllib.request.urlretrieve')
-    def test_add_standalone_picture_with_url_success(self, mock_urlretrieve, mock_input, media_manager):
+    @patch('downloader.Downloader.fetch')
+    def test_add_standalone_picture_with_url_success(self, mock_fetch, mock_input, media_manager):
         """Test add_standalone_picture with successful URL download."""
         mock_input.side_effect = [
             "Test Picture",
@@ -671,10 +698,29 @@ class TestIntegrationWorkflows:
             "test-gig-slug"
         ]
 
+        mock_fetch.side_effect = lambda url, dest: DownloadResult(url, dest, False, error="offline")
+
         media_manager.add_standalone_picture()
 
         # Verify download was attempted
-        mock_urlretrieve.assert_called()
+        mock_fetch.assert_called()
+
+    @patch('builtins.input')
+    @patch('downloader.Downloader.fetch', side_effect=fake_download)
+    def test_add_standalone_picture_reuses_gig_copy(self, mock_fetch, mock_input, media_manager, tmp_path):
+        """Test a standalone picture of a gig photo references the gig's copy instead of a new file."""
+        source = tmp_path / "pic.jpg"
+        source.write_bytes(b"jpeg")
+        gig_dir = media_manager.project_root / "website" / "assets" / "media" / "live" / "gig"
+        media_manager.generate_image_versions(source, "photo-1.jpg", gig_dir)
+        mock_input.side_effect = ["Same Photo", "https://example.com/pic.jpg", "Photographer", "", "", ""]
+
+        media_manager.add_standalone_picture()
+
+        website = media_manager.project_root / "website"
+        pictures = list((website / "content" / "media" / "pictures").iterdir())
+        assert "image: media/live/gig/photo-1.jpg" in pictures[0].read_text()
+        assert list((website / "assets" / "media" / "standalone").iterdir()) == []
 
     @patch('builtins.input')
     def test_add_standalone_video_success(self, mock_input, media_manager):
@@ -709,3 +755,34 @@ class TestIntegrationWorkflows:
 
         result = media_manager.select_live_performance()
         assert result is None
+
+
+    @patch('scripts.manage_media.MediaManager.run_generate_markdown')
+    def test_ingest_workflow(self, mock_generate, pil, media_manager, sample_live_performance, tmp_path, capsys):
+        """Test a manifest adds pictures after the existing ones and skips unknown gigs."""
+        file_path, _ = sample_live_performance
+        gig_dir = media_manager.media_dir / "live" / file_path.stem
+        gig_dir.mkdir(parents=True)
+        pil.new("RGB", (60, 40), "red").save(gig_dir / f"obscvrat-{file_path.stem}-performance-2.jpg")
+        photos = tmp_path / "photos"
+        photos.mkdir()
+        for color in ("green", "blue"):
+            pil.new("RGB", (60, 40), color).save(photos / f"{color}.jpg")
+        manifest = tmp_path / "ingest.yaml"
+        manifest.write_text(f"- gig: {file_path.stem}\n  author: Test Photographer\n  pictures: photos/\n"
+                            "- gig: 2099-01-01-nowhere\n  pictures: photos/\n")
+
+        assert media_manager.ingest(manifest, cpu_workers=1, io_workers=1) == 0
+
+        names = [f"obscvrat-{file_path.stem}-performance-{n}.jpg" for n in (3, 4)]
+        assert all((gig_dir / name).exists() for name in names)
+        content = file_path.read_text()
+        assert "author: Test Photographer" in content
+        assert all(name in content for name in names)
+        mock_generate.assert_called_once_with("live", [file_path])
+        out = capsys.readouterr().out
+        assert "✗ Unknown gig 2099-01-01-nowhere" in out
+        assert "2 of 2 pictures written" in out
+
+        assert media_manager.ingest(manifest, cpu_workers=1, io_workers=1) == 0
+        assert len(list(gig_dir.iterdir())) == 3
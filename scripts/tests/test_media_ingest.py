@@ -0,0 +1,175 @@
+"""
+Unit tests for media_ingest.py
+
+Tests cover reading YAML and CSV manifests with directories and globs,
+sniffing image types, and the staged pipeline: rejecting non-images,
+reporting missing files, deduplicating, renaming fetched files by their
+content and writing in manifest order with a bounded number in flight.
+"""
+
+import hashlib
+
+import media_ingest
+import pytest
+from downloader import DownloadResult
+from media_ingest import Picture
+
+
+@pytest.fixture
+def photos(pil, tmp_path):
+    """Create a directory of small photos."""
+    directory = tmp_path / "photos"
+    directory.mkdir()
+    for i, color in enumerate(("red", "green", "blue"), 1):
+        pil.new("RGB", (60, 40), color).save(directory / f"IMG_{i}.JPG")
+    return directory
+
+
+class FakeFetcher:
+    """Stand in for downloader.Downloader: serve bodies from a dict."""
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+
+    def fetch(self, url, dest):
+        if url not in self.bodies:
+            return DownloadResult(url, dest, False, error="HTTP 404")
+        dest.write_bytes(self.bodies[url])
+        return DownloadResult(url, dest, True, len(self.bodies[url]),
+                              sha256=hashlib.sha256(self.bodies[url]).hexdigest())
+
+
+class TestLoadManifest:
+    """Test load_manifest function."""
+
+    def test_yaml(self, photos, tmp_path):
+        """Test URLs, relative directories and globs expand per gig in order."""
+        manifest = tmp_path / "ingest.yaml"
+        manifest.write_text(
+            "- gig: gig-a\n  author: Someone\n  pictures:\n"
+            "    - https://example.com/1.jpg\n    - photos/\n"
+            "- gig: gig-b\n  pictures: photos/IMG_[12].JPG\n"
+            "- gig: gig-a\n  author: Ignored\n  author_url: https://someone.example\n  pictures: []\n")
+
+        batches = media_ingest.load_manifest(manifest)
+
+        assert [b.gig for b in batches] == ["gig-a", "gig-b"]
+        assert batches[0].author == "Someone" and batches[0].author_url == "https://someone.example"
+        assert batches[0].sources == ["https://example.com/1.jpg"] + [
+            str(photos / f"IMG_{i}.JPG") for i in (1, 2, 3)]
+        assert batches[1].sources == [str(photos / "IMG_1.JPG"), str(photos / "IMG_2.JPG")]
+
+    def test_csv(self, tmp_path):
+        """Test one row per picture, grouped by gig."""
+        manifest = tmp_path / "ingest.csv"
+        manifest.write_text("gig,picture,author\ngig-a,https://example.com/1.jpg,Someone\n"
+                            "gig-a,https://example.com/2.jpg,\n")
+
+        batches = media_ingest.load_manifest(manifest)
+
+        assert len(batches) == 1
+        assert batches[0].author == "Someone"
+        assert batches[0].sources == ["https://example.com/1.jpg", "https://example.com/2.jpg"]
+
+    @pytest.mark.parametrize("name,content", [
+        ("ingest.yaml", "gig: gig-a\n"),
+        ("ingest.yaml", "- pictures: [a.jpg]\n"),
+        ("ingest.csv", "gig,url\ngig-a,a.jpg\n"),
+    ])
+    def test_malformed(self, tmp_path, name, content):
+        """Test malformed manifests raise IngestError."""
+        manifest = tmp_path / name
+        manifest.write_text(content)
+
+        with pytest.raises(media_ingest.IngestError):
+            media_ingest.load_manifest(manifest)
+
+
+def test_sniff(pil, tmp_path):
+    """Test image types are recognized by content, not name."""
+    pil.new("RGB", (8, 8)).save(tmp_path / "a.png", "PNG")
+    pil.new("RGB", (8, 8)).save(tmp_path / "b.jpg", "WEBP")
+    (tmp_path / "c.jpg").write_text("<!DOCTYPE html>")
+
+    assert media_ingest.sniff(tmp_path / "a.png") == ".png"
+    assert media_ingest.sniff(tmp_path / "b.jpg") == ".webp"
+    assert media_ingest.sniff(tmp_path / "c.jpg") is None
+
+
+class TestRunPipeline:
+    """Test run_pipeline function."""
+
+    def run(self, pictures, tmp_path, fetcher=None, known=None, **options):
+        """Run the pipeline, collecting writes in order."""
+        written = []
+
+        def write(prepared):
+            written.append(prepared)
+            return prepared
+
+        temp_dir = tmp_path / "temp"
+        temp_dir.mkdir(exist_ok=True)
+        stats = media_ingest.run_pipeline(pictures, fetcher or FakeFetcher({}), temp_dir, write, known,
+                                          io_workers=2, cpu_workers=1, **options)
+        return stats, written
+
+    def test_stages(self, photos, tmp_path):
+        """Test good pictures are written in order and bad ones are reported."""
+        page = tmp_path / "page.jpg"
+        page.write_text("<!DOCTYPE html>")
+        pictures = [
+            Picture(0, "gig", str(photos / "IMG_1.JPG")),
+            Picture(1, "gig", str(page)),
+            Picture(2, "gig", str(tmp_path / "missing.jpg")),
+            Picture(3, "gig", str(photos / "IMG_2.JPG")),
+            Picture(4, "gig", str(photos / "IMG_1.JPG")),
+        ]
+
+        stats, written = self.run(pictures, tmp_path)
+
+        assert [p.picture.index for p in written] == [0, 3]
+        assert all(p.sha256 and p.suffix == ".jpg" for p in written)
+        assert stats.counts == {"ok": 2, "duplicate": 1, "rejected": 1, "failed": 1}
+        assert "2 of 5 pictures written" in stats.summary()
+        assert not list((tmp_path / "temp").iterdir())
+
+    def test_fetched_and_known(self, pil, photos, tmp_path):
+        """Test URLs are fetched, named by content, and pictures already in the gig are skipped."""
+        existing = (photos / "IMG_3.JPG").read_bytes()
+        png = tmp_path / "x.png"
+        pil.new("RGB", (20, 20), "white").save(png)
+        fetcher = FakeFetcher({"https://example.com/a": png.read_bytes(), "https://example.com/b": existing})
+        _, earlier = self.run([Picture(0, "gig", str(photos / "IMG_3.JPG"))], tmp_path)
+        known = {"gig": {earlier[0].sha256}}
+        pictures = [Picture(0, "gig", "https://example.com/a"), Picture(1, "gig", "https://example.com/b"),
+                    Picture(2, "gig", "https://example.com/missing")]
+
+        stats, written = self.run(pictures, tmp_path, fetcher, known)
+
+        assert [(p.picture.index, p.suffix) for p in written] == [(0, ".png")]
+        assert stats.counts == {"ok": 1, "duplicate": 1, "rejected": 0, "failed": 1}
+
+    def test_failed_write_keeps_later_duplicate(self, photos, tmp_path):
+        """Test a picture whose write fails doesn't make a later copy of it a duplicate."""
+        written = []
+
+        def write(prepared):
+            if prepared.picture.index == 0:
+                return prepared._replace(status="failed", error="disk full")
+            written.append(prepared.picture.index)
+            return prepared
+
+        pictures = [Picture(i, "gig", str(photos / "IMG_1.JPG")) for i in range(3)]
+        stats = media_ingest.run_pipeline(pictures, FakeFetcher({}), tmp_path, write, io_workers=2, cpu_workers=1)
+
+        assert written == [1]
+        assert stats.counts == {"ok": 1, "duplicate": 1, "rejected": 0, "failed": 1}
+
+    def test_bounded_in_flight(self, photos, tmp_path):
+        """Test one picture at a time still completes in order."""
+        pictures = [Picture(i, "gig", str(photos / f"IMG_{i + 1}.JPG")) for i in range(3)]
+
+        stats, written = self.run(pictures, tmp_path, max_in_flight=1)
+
+        assert [p.picture.index for p in written] == [0, 1, 2]
+        assert stats.counts["ok"] == 3
@@ -0,0 +1,134 @@
+"""
+Unit tests for media_store.py
+
+Tests cover storing content once per hash, hardlinked working copies,
+finding existing published copies, the duplicate report, and migrating
+existing duplicates including standalone picture references.
+"""
+
+import hashlib
+
+import media_store
+import pytest
+from media_store import MediaStore
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Create a project with a duplicated gig photo and standalone picture."""
+    website = tmp_path / "website"
+    gig = website / "static" / "media" / "live" / "2025-10-11-gig"
+    standalone = website / "static" / "media" / "standalone"
+    assets = website / "assets" / "media" / "live" / "2025-10-11-gig"
+    for directory in (gig, standalone, assets):
+        directory.mkdir(parents=True)
+    (gig / "photo-1.jpg").write_bytes(b"photo" * 100)
+    (gig / "photo-2.jpg").write_bytes(b"other" * 100)
+    (standalone / "2025-10-12-photo.jpg").write_bytes(b"photo" * 100)
+    (assets / "poster.jpg").write_bytes(b"photo" * 100)
+
+    content = website / "content" / "media" / "pictures"
+    content.mkdir(parents=True)
+    (content / "2025-10-12-photo.yaml").write_text(
+        "---\ntitle: Photo\nimage: /media/standalone/2025-10-12-photo.jpg\n---\n")
+    return tmp_path
+
+
+@pytest.fixture
+def store(project):
+    """Open the project's media store."""
+    return media_store.open_store(project)
+
+
+class TestMediaStore:
+    """Test MediaStore class."""
+
+    def test_add_stores_once(self, store, tmp_path):
+        """Test the same content at two paths shares one blob."""
+        source = tmp_path / "source.jpg"
+        source.write_bytes(b"jpeg")
+
+        digest = store.add(source, tmp_path / "a" / "one.jpg")
+        assert store.add(source, tmp_path / "b" / "two.jpg") == digest
+
+        assert digest == hashlib.sha256(b"jpeg").hexdigest()
+        blob = store.blob_path(digest).stat()
+        assert blob.st_nlink == 3
+        assert (tmp_path / "b" / "two.jpg").read_bytes() == b"jpeg"
+        assert store.published(digest) == [tmp_path / "a" / "one.jpg", tmp_path / "b" / "two.jpg"]
+
+    def test_index_persists(self, store, project, tmp_path):
+        """Test a reopened store knows where content was placed."""
+        source = tmp_path / "source.jpg"
+        source.write_bytes(b"jpeg")
+        dest = project / "website" / "assets" / "media" / "live" / "g" / "x.jpg"
+        digest = store.add(source, dest)
+
+        reopened = MediaStore(store.root, project)
+        assert reopened.asset_path(digest) == "media/live/g/x.jpg"
+        assert reopened.refs[digest] == ["website/assets/media/live/g/x.jpg"]
+
+    def test_replaced_copy_not_published(self, store, tmp_path):
+        """Test a working copy overwritten with other content is no longer reported."""
+        source = tmp_path / "source.jpg"
+        source.write_bytes(b"jpeg")
+        dest = tmp_path / "one.jpg"
+        digest = store.add(source, dest)
+
+        dest.unlink()
+        dest.write_bytes(b"edited")
+
+        assert store.published(digest) == []
+
+    def test_known_hash_skips_reading(self, store, tmp_path):
+        """Test a hash computed elsewhere is trusted when the blob exists."""
+        source = tmp_path / "source.jpg"
+        source.write_bytes(b"jpeg")
+        digest = store.put(source)
+
+        assert store.put(tmp_path / "missing.jpg", digest) == digest
+
+
+class TestDuplicates:
+    """Test the duplicate report and migration."""
+
+    def test_find_duplicates(self, project):
+        """Test identical files across assets and static are grouped."""
+        files = media_store.media_files(project / root for root in media_store.MEDIA_ROOTS)
+        groups = media_store.find_duplicates(files)
+
+        assert list(groups) == [hashlib.sha256(b"photo" * 100).hexdigest()]
+        assert len(next(iter(groups.values()))) == 3
+        assert media_store.wasted_bytes(groups) == 1000
+
+    def test_report(self, project, capsys):
+        """Test the report lists groups and reclaimable space."""
+        assert media_store.report(project) == 1
+        output = capsys.readouterr().out
+        assert "website/static/media/standalone/2025-10-12-photo.jpg" in output
+        assert "Scanned 4 media files: 1 duplicated" in output
+
+    def test_migrate_dry_run(self, project, store, capsys):
+        """Test a dry run changes nothing."""
+        linked, repointed, reclaimed = media_store.migrate(project, store, dry_run=True)
+
+        assert (linked, repointed, reclaimed) == (0, 1, 1000)
+        assert (project / "website" / "static" / "media" / "standalone" / "2025-10-12-photo.jpg").exists()
+        assert "Would point" in capsys.readouterr().out
+
+    def test_migrate(self, project, store):
+        """Test duplicates become hardlinks and the standalone picture points at the gig's asset."""
+        linked, repointed, reclaimed = media_store.migrate(project, store)
+
+        assert (linked, repointed, reclaimed) == (3, 1, 1000)
+        website = project / "website"
+        gig_photo = website / "static" / "media" / "live" / "2025-10-11-gig" / "photo-1.jpg"
+        poster = website / "assets" / "media" / "live" / "2025-10-11-gig" / "poster.jpg"
+        assert gig_photo.stat().st_ino == poster.stat().st_ino
+        assert not (website / "static" / "media" / "standalone" / "2025-10-12-photo.jpg").exists()
+
+        content = (website / "content" / "media" / "pictures" / "2025-10-12-photo.yaml").read_text()
+        assert "image: media/live/2025-10-11-gig/poster.jpg" in content
+        assert "title: Photo" in content
+
+        assert media_store.migrate(project, store)[1:] == (0, 0)
@@ -0,0 +1,105 @@
+"""
+Unit tests for static_media.py
+
+Tests cover moving gig and standalone pictures into assets/, rewriting
+standalone image fields and path-style gig entries, dropping copies
+already in assets/, leaving conflicts and non-images in place, and the
+check for unresized photos under static/.
+"""
+
+import media_store
+import pytest
+import static_media
+import yaml
+
+
+@pytest.fixture
+def project(pil, tmp_path):
+    """Create a project with gig and standalone pictures still under static/media."""
+    website = tmp_path / "website"
+    static_gig = website / "static" / "media" / "live" / "2025-10-11-gig"
+    static_standalone = website / "static" / "media" / "standalone"
+    assets_gig = website / "assets" / "media" / "live" / "2025-10-11-gig"
+    for directory in (static_gig, static_standalone, assets_gig):
+        directory.mkdir(parents=True)
+    pil.new("RGB", (40, 30), "red").save(static_gig / "photo-1.jpg")
+    pil.new("RGB", (40, 30), "blue").save(static_gig / "poster.jpg")
+    (assets_gig / "poster.jpg").write_bytes((static_gig / "poster.jpg").read_bytes())
+    pil.new("RGB", (40, 30), "green").save(static_standalone / "2025-10-12-photo.jpg")
+
+    data = website / "data" / "live"
+    data.mkdir(parents=True)
+    (data / "2025-10-11-gig.yaml").write_text(
+        "title: Gig\nposter: poster.jpg\nmedia:\n  pictures:\n    author: Someone\n    images:\n"
+        "      - /media/live/2025-10-11-gig/photo-1.jpg\n")
+    content = website / "content" / "media" / "pictures"
+    content.mkdir(parents=True)
+    (content / "2025-10-12-photo.yaml").write_text(
+        "---\ntitle: Photo\nimage: /media/standalone/2025-10-12-photo.jpg\n---\n")
+    return tmp_path
+
+
+@pytest.fixture
+def store(project):
+    """Open the project's media store."""
+    return media_store.open_store(project)
+
+
+class TestMigrate:
+    """Test migrate function."""
+
+    def test_dry_run(self, project, store, capsys):
+        """Test a dry run reports the plan and changes nothing."""
+        moved, rewritten, problems = static_media.migrate(project, store, dry_run=True)
+
+        assert (moved, rewritten, problems) == (3, 2, [])
+        assert (project / "website" / "static" / "media" / "live" / "2025-10-11-gig" / "photo-1.jpg").exists()
+        assert "Would remove duplicate /media/live/2025-10-11-gig/poster.jpg" in capsys.readouterr().out
+
+    def test_migrate(self, project, store):
+        """Test files move to assets/, references follow and static/media is removed."""
+        assert static_media.migrate(project, store) == (3, 2, [])
+
+        website = project / "website"
+        assert (website / "assets" / "media" / "live" / "2025-10-11-gig" / "photo-1.jpg").exists()
+        assert (website / "assets" / "media" / "standalone" / "2025-10-12-photo.jpg").exists()
+        assert not (website / "static" / "media").exists()
+
+        content = (website / "content" / "media" / "pictures" / "2025-10-12-photo.yaml").read_text()
+        assert "image: media/standalone/2025-10-12-photo.jpg" in content
+        gig = yaml.safe_load((website / "data" / "live" / "2025-10-11-gig.yaml").read_text())
+        assert gig["media"]["pictures"] == {"author": "Someone", "images": ["photo-1.jpg"]}
+        assert gig["poster"] == "poster.jpg"
+
+        assert static_media.migrate(project, store) == (0, 0, [])
+        assert static_media.verify(project) == []
+
+    def test_conflicts_and_non_images_left(self, project, store):
+        """Test a file differing from its assets/ namesake and a non-image stay put."""
+        static_gig = project / "website" / "static" / "media" / "live" / "2025-10-11-gig"
+        (project / "website" / "assets" / "media" / "live" / "2025-10-11-gig" / "photo-1.jpg").write_bytes(b"x")
+        (static_gig / "page.jpg").write_text("<!DOCTYPE html>")
+
+        moved, _, problems = static_media.migrate(project, store)
+
+        assert moved == 2
+        assert [problem.split(":")[0] for problem in problems] == [
+            "website/static/media/live/2025-10-11-gig/page.jpg",
+            "website/static/media/live/2025-10-11-gig/photo-1.jpg",
+        ]
+        assert (static_gig / "photo-1.jpg").exists()
+        assert len(static_media.verify(project)) == 2
+
+
+class TestVerify:
+    """Test verify function."""
+
+    def test_oversized_static_image(self, pil, project, store):
+        """Test a large photo elsewhere in static/ is flagged, small ones pass."""
+        static_media.migrate(project, store)
+        images = project / "website" / "static" / "images"
+        images.mkdir()
+        pil.new("RGB", (3000, 2000)).save(images / "background.jpg")
+        pil.new("RGB", (32, 32)).save(images / "icon.png")
+
+        assert static_media.verify(project) == ["website/static/images/background.jpg: 3000x2000 exceeds 2400px"]
@@ -0,0 +1,107 @@
+"""
+Unit tests for tool_metrics.py
+
+Tests cover histogram bucketing and percentile estimates, per-thread I/O
+attribution from the content index observer, and the JSONL dump.
+"""
+
+import json
+import os
+import threading
+
+from content_index import ContentIndex
+from tool_metrics import BUCKETS_MS, IOCounters, Metrics, ToolStats, format_snapshot, read_snapshots
+
+
+class TestToolStats:
+    """Test ToolStats class."""
+
+    def test_histogram_and_percentiles(self):
+        """Test calls land in the right buckets and percentiles use bucket bounds."""
+        stats = ToolStats()
+        for ms in [0.5] * 90 + [30] * 9 + [9000]:
+            stats.add(ms, False, None)
+
+        assert stats.buckets[0] == 90
+        assert stats.buckets[BUCKETS_MS.index(50)] == 9
+        assert stats.buckets[-1] == 1
+        assert stats.percentile(50) == 1.0
+        assert stats.percentile(99) == 50.0
+        assert stats.percentile(100) == 9000
+
+    def test_to_dict(self):
+        """Test serialized stats include I/O counters and error counts."""
+        stats = ToolStats()
+        io = IOCounters()
+        io.files_read = 2
+        stats.add(4.0, True, io)
+
+        data = stats.to_dict()
+        assert data["calls"] == 1
+        assert data["errors"] == 1
+        assert data["files_read"] == 2
+        assert data["histogram_ms"]["le_5"] == 1
+        assert data["latency_ms"]["mean"] == 4.0
+
+
+class TestMetrics:
+    """Test Metrics class."""
+
+    def test_io_attributed_per_thread(self, tmp_path):
+        """Test loads count towards the call running on the same thread only."""
+        path = tmp_path / "gear.yaml"
+        path.write_text("name: BD-2\n")
+        metrics = Metrics()
+        index = ContentIndex(tmp_path / "index.pickle")
+        index.observer = metrics.observe_load
+
+        index.load(path)  # outside any call: not counted
+        path.write_text("name: DS-1\n")
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        first, second = IOCounters(), IOCounters()
+
+        def call(counters):
+            with metrics.io_scope(counters):
+                index.load(path)
+                index.load(path)
+
+        thread = threading.Thread(target=call, args=(first,))
+        thread.start()
+        thread.join()
+        call(second)
+
+        assert vars(first) == {"files_read": 1, "bytes_read": 11, "bytes_parsed": 11,
+                               "cache_hits": 1, "cache_misses": 1}
+        assert vars(second) == {"files_read": 0, "bytes_read": 0, "bytes_parsed": 0,
+                                "cache_hits": 2, "cache_misses": 0}
+
+    def test_snapshot_and_report(self):
+        """Test recorded calls show up in snapshots and the text report."""
+        metrics = Metrics()
+        metrics.record("list_gear", 0.003)
+        metrics.record("list_gear", 0.004, error=True)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["tools"]["list_gear"]["calls"] == 2
+        assert snapshot["tools"]["list_gear"]["errors"] == 1
+        assert "list_gear" in metrics.format_report()
+
+    def test_empty_report(self):
+        """Test the report before any calls."""
+        assert "No tool calls yet." in Metrics().format_report()
+
+    def test_dump_appends_jsonl(self, tmp_path):
+        """Test each dump appends one parseable line."""
+        path = tmp_path / "metrics" / "gear.jsonl"
+        metrics = Metrics()
+        metrics.dump(path)
+        metrics.record("search_gear", 0.001)
+        metrics.dump(path)
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 2
+        assert json.loads(lines[1])["tools"]["search_gear"]["calls"] == 1
+        assert read_snapshots(path)[0]["tools"] == {}
+        assert "search_gear" in format_snapshot(read_snapshots(path)[-1])
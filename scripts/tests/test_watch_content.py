@@ -0,0 +1,128 @@
+"""
+Unit tests for watch_content.py
+
+Tests cover the debounced regeneration loop and per-file error handling
+at startup and per batch.
+"""
+
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import generate_markdown
+import pytest
+import watch_content
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Create a minimal project with one live performance."""
+    live_dir = tmp_path / "website" / "data" / "live"
+    live_dir.mkdir(parents=True)
+    (live_dir / "gig.yaml").write_text("title: Gig\n")
+    return tmp_path
+
+
+def live_dir(project: Path) -> Path:
+    """Return the live data directory of a test project."""
+    return project / "website" / "data" / "live"
+
+
+class TestWatch:
+    """Test the debounced watch loop."""
+
+    def test_burst_regenerated_once(self, project):
+        """Test a burst of changes is regenerated in one batch."""
+        gig = live_dir(project) / "gig.yaml"
+        other = live_dir(project) / "other.yaml"
+        events = [{gig}, {gig, other}, set()]
+        stop = threading.Event()
+
+        class FakeWatcher:
+            def poll(self, timeout):
+                if events:
+                    return events.pop(0)
+                stop.set()
+                return set()
+
+        with patch.object(watch_content, 'regenerate') as mock_regenerate:
+            watch_content.watch(project, FakeWatcher(), debounce=0, stop=stop)
+
+        mock_regenerate.assert_called_once_with([gig, other], project)
+
+    def test_regenerate_writes_and_removes(self, project, capsys):
+        """Test changed files are generated and deleted ones removed."""
+        gig = live_dir(project) / "gig.yaml"
+        generate_markdown.generate_paths([gig], project, verbose=False)
+        gig.unlink()
+        (live_dir(project) / "new.yaml").write_text("title: New\n")
+
+        watch_content.regenerate([gig, live_dir(project) / "new.yaml"], project)
+
+        content_dir = project / "website" / "content" / "live"
+        assert not (content_dir / "gig.md").exists()
+        assert (content_dir / "new.md").exists()
+        output = capsys.readouterr().out
+        assert "✓ Removed gig.md" in output
+        assert "✓ Generated new.md" in output
+
+    def test_regenerate_survives_invalid_yaml(self, project, capsys):
+        """Test half-written YAML is reported per file and the rest of the batch still regenerates."""
+        gig = live_dir(project) / "gig.yaml"
+        gig.write_text("title: [unclosed\n")
+        other = live_dir(project) / "other.yaml"
+        other.write_text("title: Other\n")
+
+        watch_content.regenerate([gig, other], project)
+
+        assert (project / "website" / "content" / "live" / "other.md").exists()
+        output = capsys.readouterr().out
+        assert "✗ Error generating markdown for gig.yaml" in output
+        assert "✓ Generated other.md" in output
+
+    def test_catch_up_survives_invalid_yaml(self, project, capsys):
+        """Test one bad file at startup doesn't keep the others from being generated."""
+        (live_dir(project) / "bad.yaml").write_text("title: [unclosed\n")
+        gear_dir = project / "website" / "data" / "gear"
+        gear_dir.mkdir()
+        (gear_dir / "broken.yaml").write_text("name: [unclosed\n")
+
+        watch_content.catch_up(project)
+
+        assert (project / "website" / "content" / "live" / "gig.md").exists()
+        assert "✗ Error generating markdown for bad.yaml" in capsys.readouterr().out
+
+    def test_regenerate_compiles_gear_catalog(self, project, capsys):
+        """Test gear changes recompile the catalog alongside content changes."""
+        gear_dir = project / "website" / "data" / "gear"
+        (gear_dir / "sold").mkdir(parents=True)
+        sold = gear_dir / "sold" / "boss-ds-1.yaml"
+        sold.write_text("name: DS-1\nmanufacturer: BOSS\ncategory: Pedal\n")
+
+        watch_content.regenerate([sold, live_dir(project) / "gig.yaml"], project)
+
+        catalog = project / "website" / "data" / "gear_catalog.json"
+        assert '"sold": 1' in catalog.read_text()
+        output = capsys.readouterr().out
+        assert "✓ Compiled gear_catalog.json" in output
+        assert "✓ Generated gig.md" in output
+
+    def test_end_to_end_polling(self, project):
+        """Test an edit reaches website/content through a running watcher."""
+        watcher = watch_content.PollingWatcher([live_dir(project)], interval=0.02)
+        stop = threading.Event()
+        thread = threading.Thread(target=watch_content.watch,
+                                  args=(project, watcher), kwargs={'debounce': 0.02, 'stop': stop})
+        thread.start()
+        try:
+            (live_dir(project) / "gig.yaml").write_text("title: Edited\n")
+            md_file = project / "website" / "content" / "live" / "gig.md"
+            deadline = time.monotonic() + 5
+            while not md_file.exists() and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            stop.set()
+            thread.join()
+
+        assert "title: Edited" in md_file.read_text()
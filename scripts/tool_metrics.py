@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Per-tool call metrics for the gear MCP server.
+
+Records, per tool name: call and error counts, a latency histogram, files
+read, bytes read and parsed, and content index cache hits and misses.
+I/O is attributed to the call running on the current thread, so
+concurrent calls on the server's I/O pool don't mix up their counts.
+
+Snapshots can be appended to a JSONL file for trend tracking; print a
+summary of such a file with:
+
+    python tool_metrics.py report FILE
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+PERCENTILES = (50, 90, 99)
+
+
+class IOCounters:
+    """File I/O done by one tool call."""
+
+    def __init__(self):
+        self.files_read = 0
+        self.bytes_read = 0
+        self.bytes_parsed = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class ToolStats:
+    """Accumulated metrics for one tool."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.io = IOCounters()
+
+    def add(self, elapsed_ms: float, error: bool, io: Optional[IOCounters]) -> None:
+        """Add one call."""
+        self.calls += 1
+        self.errors += int(error)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        for i, bound in enumerate(BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        if io is not None:
+            for field, value in vars(io).items():
+                setattr(self.io, field, getattr(self.io, field) + value)
+
+    def percentile(self, pct: float) -> float:
+        """
+        Estimate a latency percentile from the histogram.
+
+        Returns:
+            Upper bound of the bucket holding the percentile (max latency
+            for the overflow bucket), in milliseconds
+        """
+        if not self.calls:
+            return 0.0
+        rank = pct / 100 * self.calls
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the stats as JSON-serializable data."""
+        histogram = {f"le_{bound}": count for bound, count in zip(BUCKETS_MS, self.buckets)}
+        histogram["inf"] = self.buckets[-1]
+        latency = {f"p{p}": self.percentile(p) for p in PERCENTILES}
+        latency["mean"] = round(self.total_ms / self.calls, 3) if self.calls else 0.0
+        latency["max"] = round(self.max_ms, 3)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_ms": latency,
+            "histogram_ms": histogram,
+            **vars(self.io),
+        }
+
+
+class Metrics:
+    """Thread-safe registry of per-tool stats."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.tools: Dict[str, ToolStats] = {}
+        self._lock = threading.Lock()
+        self._current = threading.local()
+
+    @contextlib.contextmanager
+    def io_scope(self, counters: IOCounters) -> Iterator[IOCounters]:
+        """Attribute I/O observed on this thread to counters while active."""
+        previous = getattr(self._current, 'counters', None)
+        self._current.counters = counters
+        try:
+            yield counters
+        finally:
+            self._current.counters = previous
+
+    def observe_load(self, hit: bool, bytes_read: int, bytes_parsed: int) -> None:
+        """
+        Record one content index load (ContentIndex.observer callback).
+
+        Args:
+            hit: Whether the parsed data came from the cache
+            bytes_read: Bytes read from disk (0 when the stat check sufficed)
+            bytes_parsed: Bytes of YAML parsed (0 on cache hits)
+        """
+        counters = getattr(self._current, 'counters', None)
+        if counters is None:
+            return
+        if bytes_read:
+            counters.files_read += 1
+        counters.bytes_read += bytes_read
+        counters.bytes_parsed += bytes_parsed
+        if hit:
+            counters.cache_hits += 1
+        else:
+            counters.cache_misses += 1
+
+    def record(self, tool: str, elapsed: float, error: bool = False,
+               io: Optional[IOCounters] = None) -> None:
+        """
+        Record one finished tool call.
+
+        Args:
+            tool: Tool name
+            elapsed: Latency in seconds
+            error: Whether the call raised
+            io: I/O done by the call
+        """
+        with self._lock:
+            self.tools.setdefault(tool, ToolStats()).add(elapsed * 1000, error, io)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all stats as JSON-serializable data."""
+        with self._lock:
+            tools = {name: stats.to_dict() for name, stats in sorted(self.tools.items())}
+        now = time.time()
+        return {"timestamp": round(now, 3), "uptime_s": round(now - self.started, 3), "tools": tools}
+
+    def dump(self, path: Path) -> None:
+        """Append a snapshot as one JSON line."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.snapshot()) + "\n")
+
+    def format_report(self) -> str:
+        """Format a snapshot as a table."""
+        return format_snapshot(self.snapshot())
+
+
+def format_snapshot(snapshot: Dict[str, Any]) -> str:
+    """
+    Format a snapshot as a table.
+
+    Returns:
+        Uptime line followed by one row per tool
+    """
+    lines = [f"Uptime: {snapshot['uptime_s']:.0f}s", ""]
+    tools = snapshot["tools"]
+    if not tools:
+        lines.append("No tool calls yet.")
+        return "\n".join(lines)
+
+    width = max(len(name) for name in tools)
+    columns = "".join(f"{f'p{p}':>8}" for p in PERCENTILES)
+    lines.append(f"{'tool':<{width}} {'calls':>6} {'errs':>5}{columns}{'max':>9} "
+                 f"{'files':>6} {'parsed':>9} {'hit':>6} {'miss':>6}")
+    for name, stats in tools.items():
+        latency = stats["latency_ms"]
+        cells = "".join(f"{latency[f'p{p}']:>8.0f}" for p in PERCENTILES)
+        lines.append(f"{name:<{width}} {stats['calls']:>6} {stats['errors']:>5}{cells}"
+                     f"{latency['max']:>9.1f} {stats['files_read']:>6} {stats['bytes_parsed']:>9} "
+                     f"{stats['cache_hits']:>6} {stats['cache_misses']:>6}")
+    lines.append("")
+    lines.append("Latency in ms (percentiles are histogram bucket bounds); parsed in bytes.")
+    return "\n".join(lines)
+
+
+def read_snapshots(path: Path) -> List[Dict[str, Any]]:
+    """Read snapshots from a JSONL dump, skipping malformed lines."""
+    snapshots = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                snapshots.append(json.loads(line))
+            except ValueError:
+                continue
+    return snapshots
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    try:
+        snapshots = read_snapshots(args.file)
+    except OSError as e:
+        print(f"✗ Could not read {args.file}: {e}", file=sys.stderr)
+        return 1
+    if not snapshots:
+        print(f"✗ No snapshots in {args.file}", file=sys.stderr)
+        return 1
+
+    print(f"{len(snapshots)} snapshots, latest:")
+    print()
+    print(format_snapshot(snapshots[-1]))
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    report_parser = subparsers.add_parser('report', help='Summarize a JSONL metrics dump')
+    report_parser.add_argument('file', type=Path, help='JSONL file written by the server')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
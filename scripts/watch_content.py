@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Watch website/data and regenerate content on change.
+
+Runs alongside `make serve`: when a YAML file under website/data/live,
+music or media is written, renamed or deleted, only the matching
+website/content markdown is regenerated through generate_markdown.
+Changes under website/data/gear (including sold/ and want/) recompile
+the gear catalog through compile_gear.
+Bursts of events (editors writing temp files, bulk copies) are debounced
+into a single regeneration.
+
+Uses inotify on Linux and falls back to mtime polling elsewhere.
+
+Usage:
+    python watch_content.py [--poll] [--debounce SECONDS] [--interval SECONDS]
+"""
+
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Set
+
+import compile_gear
+import generate_markdown
+import yaml
+from file_watch import DEFAULT_POLL_INTERVAL, PollingWatcher, create_watcher
+
+# Errors a single data file can cause; editors may save half-written YAML
+DATA_ERRORS = (OSError, ValueError, UnicodeDecodeError, yaml.YAMLError)
+
+DEFAULT_DEBOUNCE = 0.15
+
+
+def watch(project_root: Path, watcher, debounce: float = DEFAULT_DEBOUNCE,
+          stop: Optional[threading.Event] = None) -> None:
+    """
+    Regenerate content for changed data files until stopped.
+
+    Changes are collected until no new event has arrived for `debounce`
+    seconds, then the affected files are regenerated in one batch.
+
+    Args:
+        project_root: Project root directory
+        watcher: InotifyWatcher or PollingWatcher over the data directories
+        debounce: Quiet period before regenerating
+        stop: Event that ends the loop (runs until interrupted if omitted)
+    """
+    pending: Set[Path] = set()
+    deadline = 0.0
+
+    while stop is None or not stop.is_set():
+        if pending:
+            timeout = max(0.0, deadline - time.monotonic())
+        else:
+            # Wake up periodically so a stop request is noticed
+            timeout = 0.5 if stop is not None else None
+
+        changed = watcher.poll(timeout)
+        if changed:
+            pending |= changed
+            deadline = time.monotonic() + debounce
+            continue
+
+        if pending and time.monotonic() >= deadline:
+            batch = sorted(pending)
+            pending.clear()
+            regenerate(batch, project_root)
+
+
+def regenerate(paths: List[Path], project_root: Path) -> None:
+    """Regenerate a batch of data files and report the time taken."""
+    start = time.perf_counter()
+    gear_dir = project_root / "website" / "data" / "gear"
+    gear_paths = [path for path in paths if compile_gear.is_gear_path(path, gear_dir)]
+    paths = [path for path in paths if path not in gear_paths]
+
+    if gear_paths:
+        compile_catalog(gear_dir)
+
+    results = generate_each(paths, project_root)
+
+    elapsed = (time.perf_counter() - start) * 1000
+    for result in results:
+        if result.status == generate_markdown.WRITTEN:
+            print(f"✓ Generated {result.output.name}")
+        elif result.status == generate_markdown.REMOVED:
+            print(f"✓ Removed {result.output.name}")
+    print(f"  {len(paths) + len(gear_paths)} changed, regenerated in {elapsed:.0f}ms")
+
+
+def generate_each(paths: List[Path], project_root: Path) -> List[generate_markdown.GenerateResult]:
+    """
+    Regenerate data files so that one bad file doesn't hold back the others.
+
+    The batch is generated in one go; if any file in it fails, each file is
+    retried on its own and failures are reported per file.
+
+    Args:
+        paths: Changed data files
+        project_root: Project root directory
+
+    Returns:
+        Results of the files that were generated
+    """
+    try:
+        return generate_markdown.generate_paths(paths, project_root, verbose=False)
+    except DATA_ERRORS:
+        pass
+
+    results = []
+    for path in paths:
+        try:
+            results.extend(generate_markdown.generate_paths([path], project_root, verbose=False))
+        except DATA_ERRORS as e:
+            print(f"✗ Error generating markdown for {path.name}: {e}")
+    return results
+
+
+def compile_catalog(gear_dir: Path) -> None:
+    """Recompile the gear catalog, reporting errors instead of raising."""
+    try:
+        if compile_gear.write_catalog(gear_dir):
+            print(f"✓ Compiled {compile_gear.CATALOG_NAME}")
+    except DATA_ERRORS as e:
+        print(f"✗ Error compiling gear catalog: {e}")
+
+
+def catch_up(project_root: Path) -> None:
+    """Generate anything edited while the watcher was not running."""
+    data_dir = project_root / "website" / "data"
+    try:
+        generate_markdown.generate('all', project_root, incremental=True)
+    except DATA_ERRORS:
+        sources = [path for _, path in generate_markdown.collect_sources('all', data_dir)]
+        generate_markdown.report(generate_each(sources, project_root))
+    compile_catalog(data_dir / "gear")
+
+
+def main() -> int:
+    """Main function."""
+    args = parse_args()
+    project_root = Path(__file__).parent.parent
+    data_dir = project_root / "website" / "data"
+    gear_dir = data_dir / "gear"
+    directories = [data_dir / kind for kind in generate_markdown.CONTENT_TYPES
+                   if (data_dir / kind).is_dir()]
+    directories += [gear_dir / subdir for _, subdir in compile_gear.STATUS_DIRS
+                    if (gear_dir / subdir).is_dir()]
+
+    catch_up(project_root)
+
+    watcher = create_watcher(directories, force_polling=args.poll, interval=args.interval)
+    mode = "polling" if isinstance(watcher, PollingWatcher) else "inotify"
+    print(f"✓ Watching {', '.join(d.name for d in directories)} ({mode}), Ctrl-C to stop")
+
+    try:
+        watch(project_root, watcher, debounce=args.debounce)
+    except KeyboardInterrupt:
+        print("\n✓ Stopped watching")
+    finally:
+        watcher.close()
+    return 0
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--poll', action='store_true', help='Use polling instead of inotify')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help=f'Quiet period before regenerating in seconds (default: {DEFAULT_DEBOUNCE})')
+    parser.add_argument('--interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f'Polling interval in seconds (default: {DEFAULT_POLL_INTERVAL})')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main())